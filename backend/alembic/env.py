@@ -9,13 +9,14 @@ from __future__ import annotations
 
 import asyncio
 import os
+import re
 from logging.config import fileConfig
 
 from alembic import context
 from sqlalchemy import Connection, engine_from_config, pool
 from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
 
-from app.db.models import Tenant, User  # noqa: F401  # Ensure models are imported for metadata discovery
+from app.db.models import Dataset, DatasetRollup, Job, Tenant, User  # noqa: F401  # Ensure models are imported for metadata discovery
 from app.db.base import Base
 
 # Alembic Config object, providing access to values in alembic.ini.
@@ -56,8 +57,29 @@ def run_migrations_offline() -> None:
         context.run_migrations()
 
 
+# Partitions of partitioned tables (users_p0, ...) are created by migrations, not models.
+_PARTITION_NAME = re.compile(
+    "^(%s)_p[0-9]+$"
+    % "|".join(
+        re.escape(t.name) for t in target_metadata.sorted_tables
+        if t.dialect_options["postgresql"].get("partition_by")
+    )
+)
+
+
+def _include_name(name: str | None, type_: str, parent_names: dict) -> bool:
+    if type_ == "table" and name is not None:
+        return not _PARTITION_NAME.match(name)
+    return True
+
+
 def _configure_and_run(connection: Connection) -> None:
-    context.configure(connection=connection, target_metadata=target_metadata, compare_type=True)
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        compare_type=True,
+        include_name=_include_name,
+    )
 
     with context.begin_transaction():
         context.run_migrations()
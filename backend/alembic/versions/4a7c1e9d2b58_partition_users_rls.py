@@ -0,0 +1,105 @@
+"""hash-partition users by tenant, row-level security
+
+Revision ID: 4a7c1e9d2b58
+Revises: 1c8b3ea7ee65
+Create Date: 2026-10-18 13:02:11.408216
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4a7c1e9d2b58'
+down_revision = '1c8b3ea7ee65'
+branch_labels = None
+depends_on = None
+
+# Changing the count later means another copy of the table; 16 keeps each tenant's
+# rows in a partition ~1/16 the size while planning stays cheap.
+PARTITIONS = 16
+# Unset (or reset to '' at the end of a transaction) -> NULL -> no rows.
+TENANT_PREDICATE = "tenant_id = NULLIF(current_setting('app.tenant_id', true), '')::uuid"
+COLUMNS = (
+    "id, tenant_id, email, password_hash, is_active, is_email_verified,"
+    " created_at, updated_at, last_login_at"
+)
+
+
+def _enable_rls(table: str) -> None:
+    op.execute(f"ALTER TABLE {table} ENABLE ROW LEVEL SECURITY")
+    # FORCE: the owner (the role the app usually connects as) is subject to it too;
+    # only superusers and BYPASSRLS roles are not.
+    op.execute(f"ALTER TABLE {table} FORCE ROW LEVEL SECURITY")
+    op.execute(
+        f"CREATE POLICY tenant_isolation ON {table}"
+        f" USING ({TENANT_PREDICATE}) WITH CHECK ({TENANT_PREDICATE})"
+    )
+
+
+def upgrade() -> None:
+    op.rename_table('users', 'users_unpartitioned')
+    op.execute("ALTER INDEX users_pkey RENAME TO users_unpartitioned_pkey")
+    op.execute("ALTER INDEX uq_users_tenant_email RENAME TO uq_users_unpartitioned_tenant_email")
+    op.drop_index('ix_users_email', table_name='users_unpartitioned')
+    op.drop_index('ix_users_tenant_id', table_name='users_unpartitioned')
+
+    op.create_table('users',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('tenant_id', sa.UUID(), nullable=False),
+    sa.Column('email', sa.String(length=255), nullable=False),
+    sa.Column('password_hash', sa.String(length=255), nullable=False),
+    sa.Column('is_active', sa.Boolean(), server_default=sa.text('true'), nullable=False),
+    sa.Column('is_email_verified', sa.Boolean(), server_default=sa.text('false'), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('last_login_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['tenant_id'], ['tenants.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id', 'tenant_id'),
+    sa.UniqueConstraint('tenant_id', 'email', name='uq_users_tenant_email'),
+    postgresql_partition_by='HASH (tenant_id)',
+    )
+    for i in range(PARTITIONS):
+        op.execute(
+            f"CREATE TABLE users_p{i} PARTITION OF users"
+            f" FOR VALUES WITH (MODULUS {PARTITIONS}, REMAINDER {i})"
+        )
+    op.create_index(op.f('ix_users_email'), 'users', ['email'], unique=False)
+
+    op.execute(f"INSERT INTO users ({COLUMNS}) SELECT {COLUMNS} FROM users_unpartitioned")
+    op.drop_table('users_unpartitioned')
+
+    # Queries through the parent use its policy; partitions get the same one in case
+    # anything addresses them directly.
+    for table in ['users'] + [f"users_p{i}" for i in range(PARTITIONS)]:
+        _enable_rls(table)
+
+
+def downgrade() -> None:
+    op.rename_table('users', 'users_partitioned')
+    op.execute("ALTER TABLE users_partitioned DISABLE ROW LEVEL SECURITY")
+    op.execute("ALTER TABLE users_partitioned NO FORCE ROW LEVEL SECURITY")
+    op.execute("ALTER INDEX users_pkey RENAME TO users_partitioned_pkey")
+    op.execute("ALTER INDEX uq_users_tenant_email RENAME TO uq_users_partitioned_tenant_email")
+    op.drop_index('ix_users_email', table_name='users_partitioned')
+
+    op.create_table('users',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('tenant_id', sa.UUID(), nullable=False),
+    sa.Column('email', sa.String(length=255), nullable=False),
+    sa.Column('password_hash', sa.String(length=255), nullable=False),
+    sa.Column('is_active', sa.Boolean(), server_default=sa.text('true'), nullable=False),
+    sa.Column('is_email_verified', sa.Boolean(), server_default=sa.text('false'), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('last_login_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['tenant_id'], ['tenants.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('tenant_id', 'email', name='uq_users_tenant_email')
+    )
+    op.create_index(op.f('ix_users_email'), 'users', ['email'], unique=False)
+    op.create_index(op.f('ix_users_tenant_id'), 'users', ['tenant_id'], unique=False)
+
+    # Reading through the parent applies only its (now disabled) policy, not the partitions'.
+    op.execute(f"INSERT INTO users ({COLUMNS}) SELECT {COLUMNS} FROM users_partitioned")
+    op.drop_table('users_partitioned')
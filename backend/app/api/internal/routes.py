@@ -1,14 +1,26 @@
 import logging
 
 from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import PlainTextResponse
 from sqlalchemy import text
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache.tenant_cache import CachedTenant, tenant_cache
 from app.core.errors.exceptions import DatabaseUnavailableError
-from app.db.models.tenant import Tenant
+from app.core.metrics.registry import registry
+from app.core.security.hash_executor import password_hash_executor
 from app.db.repos.tenant_repo import get_tenant_by_slug
-from app.db.session import get_db
+from app.db.pool_metrics import pool_status
+from app.db.session import (
+    engine,
+    get_db,
+    get_read_db,
+    read_engine,
+    set_session_tenant,
+    use_primary,
+)
+from app.features.query.cache import query_result_cache
 
 
 router = APIRouter()
@@ -32,11 +44,47 @@ async def db_ping(db: AsyncSession = Depends(get_db)) -> dict[str, str]:
     return {"db": "ok"}
 
 
+@router.get("/query-cache", summary="Query result cache stats")
+async def query_cache_stats() -> dict[str, int | float]:
+    """Hit ratio and bytes held (memory and disk tiers) of the query result cache."""
+    return query_result_cache.stats()
+
+
+@router.get("/metrics", summary="Prometheus metrics", response_class=PlainTextResponse)
+async def metrics() -> PlainTextResponse:
+    """Per-worker metrics in Prometheus text exposition format."""
+    return PlainTextResponse(
+        registry.render(),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
+
+@router.get("/db-pool", summary="DB connection pool stats")
+async def db_pool() -> dict[str, object]:
+    """Checked-out/overflow gauges plus wait counts and checkout latency."""
+    status = pool_status(engine.sync_engine)
+    if read_engine is not None:
+        status["replica"] = pool_status(read_engine.sync_engine)
+    return status
+
+
+@router.get("/password-hasher", summary="Password hashing executor stats")
+async def password_hasher_stats() -> dict[str, object]:
+    """Queue depth, rejections and wait/run timings of the hashing pool."""
+    return password_hash_executor.stats()
+
+
+@router.get("/tenant-cache", summary="Tenant resolution cache stats")
+async def tenant_cache_stats() -> dict[str, int | float]:
+    """Hit/miss counters and size of the tenant resolution cache."""
+    return tenant_cache.stats()
+
+
 async def resolve_tenant(
     request: Request,
-    db: AsyncSession = Depends(get_db),
-) -> Tenant:
-    """Resolve the current tenant from the X-Tenant-ID header."""
+    db: AsyncSession = Depends(get_read_db),
+) -> CachedTenant:
+    """Resolve the current tenant from the X-Tenant-ID header (cached, read from the replica)."""
     slug = request.headers.get("X-Tenant-ID")
     if not slug:
         raise HTTPException(
@@ -44,7 +92,13 @@ async def resolve_tenant(
             detail="X-Tenant-ID header required",
         )
 
-    tenant = await get_tenant_by_slug(db, slug=slug)
+    async def _load(slug: str) -> CachedTenant | None:
+        tenant = await get_tenant_by_slug(db, slug=slug)
+        if tenant is None and await use_primary(db):
+            tenant = await get_tenant_by_slug(db, slug=slug)  # signed up moments ago
+        return CachedTenant.from_model(tenant) if tenant is not None else None
+
+    tenant = await tenant_cache.get(slug, _load)
     if tenant is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -58,10 +112,19 @@ async def resolve_tenant(
     return tenant
 
 
+async def get_tenant_db(
+    tenant: CachedTenant = Depends(resolve_tenant),
+    db: AsyncSession = Depends(get_db),
+) -> AsyncSession:
+    """Primary session scoped to the request's tenant (row-level security on users)."""
+    await set_session_tenant(db, tenant.id)
+    return db
+
+
 @router.get("/tenant", summary="Resolve current tenant")
 async def get_current_tenant(
     request: Request,
-    tenant: Tenant = Depends(resolve_tenant),
+    tenant: CachedTenant = Depends(resolve_tenant),
 ) -> dict[str, str]:
     """Return the resolved tenant identifiers from the request context."""
     # Values were set by resolve_tenant; fall back to model in case of state issues.
@@ -12,6 +12,11 @@ from fastapi import APIRouter
 from app.api.internal.routes import router as internal_router
 from app.api.v1.auth.routes import router as auth_router
 from app.api.v1.router import v1_router
+from app.features.catalog.routes import router as catalog_router
+from app.features.datasets.routes import router as datasets_router
+from app.features.jobs.routes import router as jobs_router
+from app.features.provisioning.routes import router as provisioning_router
+from app.features.query.routes import router as query_router
 
 
 api_router = APIRouter()
@@ -23,4 +28,11 @@ api_router.include_router(internal_router, prefix="/internal", tags=["internal"]
 api_router.include_router(auth_router, prefix="/v1/auth", tags=["auth"])
 api_router.include_router(v1_router, prefix="/v1", tags=["v1"])
 
+# Feature modules
+api_router.include_router(provisioning_router, prefix="/v1/users", tags=["users"])
+api_router.include_router(datasets_router, prefix="/v1/datasets", tags=["datasets"])
+api_router.include_router(query_router, prefix="/v1/query", tags=["query"])
+api_router.include_router(jobs_router, prefix="/v1/jobs", tags=["jobs"])
+api_router.include_router(catalog_router, prefix="/v1/catalog", tags=["catalog"])
+
 
@@ -30,7 +30,6 @@ async def signup_endpoint(
 ) -> SignupResponse:
     """Self-serve signup: creates tenant by domain, adds user. No enumeration."""
     await signup(db, email=body.email, password=body.password)
-    await db.commit()
     return SignupResponse()
 
 
@@ -0,0 +1,217 @@
+"""
+Byte-size-bounded LRU cache for serialized values, with an optional disk tier.
+
+Memory is bounded by the total size of the stored byte strings (not entry
+count), so a few huge values cannot crowd the process. With a spill
+directory, entries evicted from memory are written there (one file each,
+bounded by spill_max_bytes) and promoted back on the next hit.
+
+Entries can carry tags; invalidate_tag drops every entry with that tag from
+both tiers. Thread-safe: disk reads/writes may run in worker threads. Only
+the spill directory configured here is ever written or deleted.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable
+
+logger = logging.getLogger(__name__)
+
+_SPILL_NAME = re.compile(r"[0-9a-f]{64}")
+
+
+@dataclass
+class _Entry:
+    size: int
+    tags: frozenset[str]
+    value: bytes | None = None  # None while the entry lives on disk
+
+
+class ByteLRUCache:
+    """LRU keyed by str, bounded by total value bytes; optional disk spill tier."""
+
+    def __init__(
+        self,
+        *,
+        max_bytes: int,
+        max_entry_bytes: int | None = None,
+        spill_dir: str | os.PathLike[str] | None = None,
+        spill_max_bytes: int = 0,
+    ) -> None:
+        self.max_bytes = max(0, max_bytes)
+        self.max_entry_bytes = min(max_entry_bytes or self.max_bytes, self.max_bytes)
+        self.spill_dir = Path(spill_dir) if spill_dir and spill_max_bytes > 0 else None
+        self.spill_max_bytes = spill_max_bytes if self.spill_dir else 0
+        self._memory: OrderedDict[str, _Entry] = OrderedDict()
+        self._disk: OrderedDict[str, _Entry] = OrderedDict()
+        self._memory_bytes = 0
+        self._disk_bytes = 0
+        self._lock = threading.Lock()
+        # Bumped by invalidation; disk I/O done outside the lock re-checks it.
+        self._generation = 0
+
+        self._memory_hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._spills = 0
+        self._invalidations = 0
+        self._rejected = 0
+
+        if self.spill_dir is not None:
+            self.spill_dir.mkdir(parents=True, exist_ok=True)
+            # Leftovers from a previous run are not indexed; remove our own files only.
+            for path in self.spill_dir.iterdir():
+                if _SPILL_NAME.fullmatch(path.name) and path.is_file():
+                    path.unlink(missing_ok=True)
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def _path(self, key: str) -> Path:
+        assert self.spill_dir is not None
+        return self.spill_dir / hashlib.sha256(key.encode()).hexdigest()
+
+    def get(self, key: str) -> bytes | None:
+        """Value for key, or None. A disk hit reads a file (blocking)."""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                self._memory_hits += 1
+                return entry.value
+            entry = self._disk.pop(key, None)
+            if entry is None:
+                self._misses += 1
+                return None
+            self._disk_bytes -= entry.size
+            generation = self._generation
+        try:
+            path = self._path(key)
+            value = path.read_bytes()
+            path.unlink(missing_ok=True)
+        except OSError:
+            with self._lock:
+                self._misses += 1
+            return None
+        with self._lock:
+            self._disk_hits += 1
+            if generation != self._generation:
+                return value  # invalidated while reading; serve it once, do not keep it
+            spilled = self._insert(key, value, entry.tags)
+        self._spill(spilled)
+        return value
+
+    def set(self, key: str, value: bytes, tags: Iterable[str] = ()) -> bool:
+        """Store value; returns False if it is larger than max_entry_bytes."""
+        if not self.enabled or len(value) > self.max_entry_bytes:
+            with self._lock:
+                self._rejected += 1
+            return False
+        with self._lock:
+            self._drop(key)
+            spilled = self._insert(key, value, frozenset(tags))
+        self._spill(spilled)
+        return True
+
+    def invalidate_tag(self, tag: str) -> int:
+        """Drop every entry carrying tag from both tiers; returns how many."""
+        with self._lock:
+            keys = [k for k, e in self._memory.items() if tag in e.tags]
+            keys += [k for k, e in self._disk.items() if tag in e.tags]
+            for key in keys:
+                self._drop(key)
+            self._invalidations += len(keys)
+            self._generation += 1
+        return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            for key in list(self._disk):
+                self._drop(key)
+            self._memory.clear()
+            self._memory_bytes = 0
+            self._generation += 1
+
+    def _insert(
+        self, key: str, value: bytes, tags: frozenset[str]
+    ) -> list[tuple[str, _Entry, int]]:
+        """Add to memory (lock held); returns entries evicted for the disk tier."""
+        self._memory[key] = _Entry(size=len(value), tags=tags, value=value)
+        self._memory_bytes += len(value)
+        evicted: list[tuple[str, _Entry, int]] = []
+        while self._memory_bytes > self.max_bytes:
+            old_key, old = self._memory.popitem(last=False)
+            self._memory_bytes -= old.size
+            self._evictions += 1
+            if self.spill_dir is not None and old.size <= self.spill_max_bytes:
+                evicted.append((old_key, old, self._generation))
+        return evicted
+
+    def _drop(self, key: str) -> None:
+        """Remove key from both tiers (lock held)."""
+        entry = self._memory.pop(key, None)
+        if entry is not None:
+            self._memory_bytes -= entry.size
+        entry = self._disk.pop(key, None)
+        if entry is not None:
+            self._disk_bytes -= entry.size
+            self._path(key).unlink(missing_ok=True)
+
+    def _spill(self, evicted: list[tuple[str, _Entry, int]]) -> None:
+        """Write memory evictions to disk (outside the lock), trimming the disk tier."""
+        for key, entry, generation in evicted:
+            path = self._path(key)
+            try:
+                path.write_bytes(entry.value or b"")
+            except OSError:
+                logger.warning("Cache spill write failed", exc_info=True)
+                continue
+            with self._lock:
+                if key in self._disk:  # spilled twice; the other write owns the file
+                    continue
+                if key in self._memory:  # re-set while writing
+                    path.unlink(missing_ok=True)
+                    continue
+                if generation != self._generation:  # invalidated while writing
+                    path.unlink(missing_ok=True)
+                    continue
+                entry.value = None
+                self._disk[key] = entry
+                self._disk_bytes += entry.size
+                self._spills += 1
+                while self._disk_bytes > self.spill_max_bytes:
+                    old_key, old = self._disk.popitem(last=False)
+                    self._disk_bytes -= old.size
+                    self._path(old_key).unlink(missing_ok=True)
+
+    def stats(self) -> dict[str, int | float]:
+        with self._lock:
+            hits = self._memory_hits + self._disk_hits
+            lookups = hits + self._misses
+            return {
+                "hits": hits,
+                "memory_hits": self._memory_hits,
+                "disk_hits": self._disk_hits,
+                "misses": self._misses,
+                "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+                "entries": len(self._memory),
+                "bytes": self._memory_bytes,
+                "max_bytes": self.max_bytes,
+                "disk_entries": len(self._disk),
+                "disk_bytes": self._disk_bytes,
+                "disk_max_bytes": self.spill_max_bytes,
+                "evictions": self._evictions,
+                "spills": self._spills,
+                "invalidations": self._invalidations,
+                "rejected": self._rejected,
+            }
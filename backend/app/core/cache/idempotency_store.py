@@ -0,0 +1,208 @@
+"""
+Idempotency-Key records: the stored response of a completed request, or an
+in-progress marker while the first request with that key runs.
+
+Two backends with one interface:
+1. MemoryIdempotencyStore: per worker process; duplicates that reach another
+   worker are not coalesced.
+2. RedisIdempotencyStore: shared by all workers/pods. The in-progress marker
+   expires after IDEMPOTENCY_LOCK_SECONDS so a crashed worker cannot hold a
+   key forever; completion and release only act on the caller's own marker.
+
+claim() returns the stored record, IN_PROGRESS, or None when the caller now
+owns the key and must complete() or release() it. Waiters for an in-progress
+key call wait() and claim() again.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import itertools
+import json
+import secrets
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Protocol
+
+from app.core.cache.redis_client import get_redis
+from app.core.cache.ttl_lru import MISSING, TTLLRUCache
+from app.core.config.settings import settings
+
+IN_PROGRESS = object()
+_KEY_PREFIX = "idempotency:"
+_IN_PROGRESS_PREFIX = b"\x00in-progress:"
+
+
+@dataclass(frozen=True)
+class IdempotencyRecord:
+    """A completed response, replayed verbatim to later requests with the same key."""
+
+    request_hash: str
+    status: int
+    headers: tuple[tuple[bytes, bytes], ...]
+    body: bytes
+
+    def to_bytes(self) -> bytes:
+        return json.dumps(
+            {
+                "request_hash": self.request_hash,
+                "status": self.status,
+                "headers": [[k.decode("latin-1"), v.decode("latin-1")] for k, v in self.headers],
+                "body": base64.b64encode(self.body).decode(),
+            }
+        ).encode()
+
+    @classmethod
+    def from_bytes(cls, raw: bytes) -> "IdempotencyRecord":
+        data = json.loads(raw)
+        return cls(
+            request_hash=data["request_hash"],
+            status=data["status"],
+            headers=tuple((k.encode("latin-1"), v.encode("latin-1")) for k, v in data["headers"]),
+            body=base64.b64decode(data["body"]),
+        )
+
+
+class IdempotencyStore(Protocol):
+    async def claim(self, key: str) -> IdempotencyRecord | object | None: ...
+
+    async def wait(self, key: str, timeout: float) -> None: ...
+
+    async def complete(self, key: str, record: IdempotencyRecord) -> None: ...
+
+    async def release(self, key: str) -> None: ...
+
+
+class MemoryIdempotencyStore:
+    """Per-process store; in-progress duplicates wait on an event instead of polling."""
+
+    def __init__(
+        self,
+        *,
+        ttl_seconds: float,
+        max_entries: int,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._records: TTLLRUCache[IdempotencyRecord] = TTLLRUCache(
+            max_entries=max_entries, ttl_seconds=ttl_seconds, clock=clock
+        )
+        self._in_progress: dict[str, asyncio.Event] = {}
+
+    async def claim(self, key: str) -> IdempotencyRecord | object | None:
+        record = self._records.get(key)
+        if record is not MISSING:
+            return record
+        if key in self._in_progress:
+            return IN_PROGRESS
+        self._in_progress[key] = asyncio.Event()
+        return None
+
+    async def wait(self, key: str, timeout: float) -> None:
+        event = self._in_progress.get(key)
+        if event is not None:
+            try:
+                await asyncio.wait_for(event.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def complete(self, key: str, record: IdempotencyRecord) -> None:
+        self._records.set(key, record)
+        self._finish(key)
+
+    async def release(self, key: str) -> None:
+        self._finish(key)
+
+    def _finish(self, key: str) -> None:
+        event = self._in_progress.pop(key, None)
+        if event is not None:
+            event.set()
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+
+# Replace or delete the key only while it still holds the caller's in-progress marker.
+_COMPLETE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('SET', KEYS[1], ARGV[2], 'EX', ARGV[3])
+end
+return nil
+"""
+_RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+_POLL_SECONDS = (0.02, 0.05, 0.1, 0.2, 0.5)
+
+
+class RedisIdempotencyStore:
+    """Shared store on Redis; waiters poll the key with backoff."""
+
+    def __init__(self, redis: Any, *, ttl_seconds: float, lock_seconds: float) -> None:
+        self._redis = redis
+        self.ttl_seconds = ttl_seconds
+        self.lock_seconds = lock_seconds
+        self._markers: dict[str, bytes] = {}
+
+    async def claim(self, key: str) -> IdempotencyRecord | object | None:
+        marker = _IN_PROGRESS_PREFIX + secrets.token_hex(8).encode()
+        redis_key = _KEY_PREFIX + key
+        while True:
+            if await self._redis.set(redis_key, marker, nx=True, ex=max(1, int(self.lock_seconds))):
+                self._markers[key] = marker
+                return None
+            raw = await self._redis.get(redis_key)
+            if raw is None:
+                continue  # expired or released in between
+            if raw.startswith(_IN_PROGRESS_PREFIX):
+                return IN_PROGRESS
+            return IdempotencyRecord.from_bytes(raw)
+
+    async def wait(self, key: str, timeout: float) -> None:
+        deadline = time.monotonic() + timeout
+        for attempt in itertools.count():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            step = _POLL_SECONDS[min(attempt, len(_POLL_SECONDS) - 1)]
+            await asyncio.sleep(min(step, remaining))
+            raw = await self._redis.get(_KEY_PREFIX + key)
+            if raw is None or not raw.startswith(_IN_PROGRESS_PREFIX):
+                return
+
+    async def complete(self, key: str, record: IdempotencyRecord) -> None:
+        marker = self._markers.pop(key, None)
+        if marker is not None:
+            await self._redis.eval(
+                _COMPLETE_SCRIPT,
+                1,
+                _KEY_PREFIX + key,
+                marker,
+                record.to_bytes(),
+                max(1, int(self.ttl_seconds)),
+            )
+
+    async def release(self, key: str) -> None:
+        marker = self._markers.pop(key, None)
+        if marker is not None:
+            await self._redis.eval(_RELEASE_SCRIPT, 1, _KEY_PREFIX + key, marker)
+
+
+def _build_store() -> IdempotencyStore:
+    redis = get_redis() if settings.IDEMPOTENCY_SHARED else None
+    if redis is not None:
+        return RedisIdempotencyStore(
+            redis,
+            ttl_seconds=settings.IDEMPOTENCY_TTL_SECONDS,
+            lock_seconds=settings.IDEMPOTENCY_LOCK_SECONDS,
+        )
+    return MemoryIdempotencyStore(
+        ttl_seconds=settings.IDEMPOTENCY_TTL_SECONDS,
+        max_entries=settings.IDEMPOTENCY_MAX_ENTRIES,
+    )
+
+
+idempotency_store = _build_store()
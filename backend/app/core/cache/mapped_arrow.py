@@ -0,0 +1,262 @@
+"""
+Registry of memory-mapped Arrow IPC files with reference counting.
+
+Readers acquire a lease on a set of files and get one zero-copy pa.Table over
+them: column buffers point straight into the mapping, so the data is never
+copied onto the heap. Mappings are MAP_SHARED and read-only, so every process
+on the host that maps the same file (uvicorn workers, job workers) shares the
+same page-cache pages instead of holding a private copy each.
+
+A file stays mapped while any lease uses it. Once unused it is kept for reuse
+(up to max_idle_files, least recently used first out) unless it was
+invalidated, or the file was deleted or replaced on disk; then it is
+unmapped as soon as the last lease is released. A file's inode is checked
+each time it is acquired, and all mappings are swept at most every
+sweep_interval seconds during acquire() (owners may also call sweep() on a
+timer), so files deleted by another process are unmapped here too (the disk
+space is freed once no process maps them).
+
+Thread-safe; mapping happens outside the lock. pyarrow is imported lazily.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Callable, Sequence
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+logger = logging.getLogger(__name__)
+
+
+def _file_identity(path: str) -> tuple[int, int, int]:
+    st = os.stat(path)
+    return st.st_dev, st.st_ino, st.st_mtime_ns
+
+
+@dataclass(eq=False)
+class _Mapping:
+    path: str
+    identity: tuple[int, int, int]
+    source: Any  # pa.MemoryMappedFile
+    table: "pa.Table"
+    size: int
+    refs: int = 0
+    retired: bool = False  # invalidated or replaced; unmap when refs reaches 0
+
+    def close(self) -> None:
+        # Buffers still referenced elsewhere keep their region alive; this drops ours.
+        self.table = None  # type: ignore[assignment]
+        self.source.close()
+
+
+class MappedLease:
+    """Zero-copy table over leased files; release() (or the context manager) ends the lease."""
+
+    def __init__(self, registry: "MappedArrowRegistry", mappings: list[_Mapping]) -> None:
+        import pyarrow as pa
+
+        self._registry = registry
+        self._mappings = mappings
+        tables = [m.table for m in mappings]
+        self.table: "pa.Table" = tables[0] if len(tables) == 1 else pa.concat_tables(tables)
+        self._released = False
+
+    def release(self) -> None:
+        if self._released:
+            return
+        self._released = True
+        self.table = None  # type: ignore[assignment]
+        self._registry._release(self._mappings)
+
+    def __enter__(self) -> "MappedLease":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.release()
+
+
+class MappedArrowRegistry:
+    """Process-wide cache of read-only mappings of Arrow IPC files."""
+
+    def __init__(self, *, max_idle_files: int = 256, sweep_interval: float = 30.0) -> None:
+        self.max_idle_files = max(0, max_idle_files)
+        self.sweep_interval = sweep_interval
+        self._last_sweep = time.monotonic()
+        self._lock = threading.Lock()
+        self._current: dict[str, _Mapping] = {}
+        self._idle: OrderedDict[str, _Mapping] = OrderedDict()
+        self._retired_in_use: set[_Mapping] = set()
+
+        self._hits = 0
+        self._misses = 0
+        self._unmapped = 0
+
+    def acquire(self, paths: Sequence[str]) -> MappedLease:
+        """Lease the given files (mapping them if needed); FileNotFoundError if one is gone."""
+        if not paths:
+            raise ValueError("acquire() needs at least one file")
+        now = time.monotonic()
+        if now - self._last_sweep >= self.sweep_interval:
+            self._last_sweep = now
+            self.sweep()
+        mappings: list[_Mapping] = []
+        try:
+            for path in paths:
+                mappings.append(self._acquire_one(str(path)))
+        except BaseException:
+            self._release(mappings)
+            raise
+        return MappedLease(self, mappings)
+
+    def _acquire_one(self, path: str) -> _Mapping:
+        identity = _file_identity(path)
+        to_close: list[_Mapping] = []
+        with self._lock:
+            mapping = self._current.get(path)
+            if mapping is not None and mapping.identity != identity:
+                to_close += self._retire(mapping)
+                mapping = None
+            if mapping is not None:
+                self._hits += 1
+                mapping.refs += 1
+                self._idle.pop(path, None)
+        self._close(to_close)
+        if mapping is not None:
+            return mapping
+
+        created = self._map(path, identity)
+        to_close = []
+        with self._lock:
+            self._misses += 1
+            existing = self._current.get(path)
+            if existing is not None and existing.identity == identity:
+                # Mapped concurrently by another thread; use that one.
+                existing.refs += 1
+                self._idle.pop(path, None)
+                duplicate, mapping = created, existing
+            else:
+                if existing is not None:
+                    to_close += self._retire(existing)
+                created.refs = 1
+                self._current[path] = created
+                duplicate, mapping = None, created
+        if duplicate is not None:
+            to_close.append(duplicate)
+        self._close(to_close)
+        return mapping
+
+    def _map(self, path: str, identity: tuple[int, int, int]) -> _Mapping:
+        import pyarrow as pa
+
+        source = pa.memory_map(path, "r")
+        try:
+            table = pa.ipc.open_file(source).read_all()
+        except BaseException:
+            source.close()
+            raise
+        return _Mapping(
+            path=path, identity=identity, source=source, table=table, size=source.size()
+        )
+
+    def _release(self, mappings: list[_Mapping]) -> None:
+        to_close: list[_Mapping] = []
+        with self._lock:
+            for mapping in mappings:
+                mapping.refs -= 1
+                if mapping.refs > 0:
+                    continue
+                if mapping.retired:
+                    self._retired_in_use.discard(mapping)
+                    to_close.append(mapping)
+                else:
+                    self._idle[mapping.path] = mapping
+            to_close += self._trim_idle()
+        self._close(to_close)
+
+    def _retire(self, mapping: _Mapping) -> list[_Mapping]:
+        """Take mapping out of service (lock held); returns it if it can be closed now."""
+        if mapping.retired:
+            return []
+        if self._current.get(mapping.path) is mapping:
+            del self._current[mapping.path]
+        if self._idle.get(mapping.path) is mapping:
+            del self._idle[mapping.path]
+        mapping.retired = True
+        if mapping.refs > 0:
+            self._retired_in_use.add(mapping)
+            return []
+        return [mapping]
+
+    def _trim_idle(self) -> list[_Mapping]:
+        evicted = []
+        while len(self._idle) > self.max_idle_files:
+            _, mapping = self._idle.popitem(last=False)
+            del self._current[mapping.path]
+            mapping.retired = True
+            evicted.append(mapping)
+        return evicted
+
+    def _close(self, mappings: list[_Mapping]) -> None:
+        for mapping in mappings:
+            try:
+                mapping.close()
+            except Exception:  # noqa: BLE001 - unmapping is best effort
+                logger.warning("Could not close mapping path=%s", mapping.path, exc_info=True)
+        if mappings:
+            with self._lock:
+                self._unmapped += len(mappings)
+
+    def invalidate(self, predicate: Callable[[str], bool]) -> int:
+        """Retire every mapping whose path matches; in-use ones unmap on last release."""
+        with self._lock:
+            matched = [m for path, m in self._current.items() if predicate(path)]
+            to_close = [c for m in matched for c in self._retire(m)]
+        self._close(to_close)
+        return len(matched)
+
+    def invalidate_dir(self, directory: str | os.PathLike[str]) -> int:
+        prefix = os.path.join(os.fspath(directory), "")
+        return self.invalidate(lambda path: path.startswith(prefix))
+
+    def sweep(self) -> int:
+        """Retire mappings whose file was deleted or replaced (e.g. by another process)."""
+        with self._lock:
+            candidates = list(self._current.values())
+        stale = []
+        for mapping in candidates:
+            try:
+                current = _file_identity(mapping.path)
+            except FileNotFoundError:
+                current = None
+            if current != mapping.identity:
+                stale.append(mapping)
+        with self._lock:
+            to_close = [c for m in stale for c in self._retire(m)]
+        self._close(to_close)
+        return len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            to_close = [c for m in list(self._current.values()) for c in self._retire(m)]
+        self._close(to_close)
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            mapped = list(self._current.values()) + list(self._retired_in_use)
+            return {
+                "mapped_files": len(mapped),
+                "mapped_bytes": sum(m.size for m in mapped),
+                "leased_files": sum(1 for m in mapped if m.refs > 0),
+                "idle_files": len(self._idle),
+                "retired_in_use": len(self._retired_in_use),
+                "hits": self._hits,
+                "misses": self._misses,
+                "unmapped": self._unmapped,
+            }
@@ -0,0 +1,33 @@
+"""
+Lazily created shared Redis client.
+
+Returns None when REDIS_URL is not configured so callers can treat Redis as
+an optional tier. The redis package is only imported on first use.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+from app.core.config.settings import settings
+
+_client: Any = None
+
+
+def get_redis() -> Any | None:
+    """Return the process-wide redis.asyncio client, or None if Redis is disabled."""
+    global _client
+    if not settings.REDIS_URL:
+        return None
+    if _client is None:
+        import redis.asyncio as redis_asyncio
+
+        _client = redis_asyncio.Redis.from_url(settings.REDIS_URL)
+    return _client
+
+
+async def close_redis() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
@@ -0,0 +1,229 @@
+"""
+Tenant resolution cache.
+
+Two tiers in front of the tenants table:
+1. in-process TTL+LRU cache (per worker)
+2. optional shared Redis tier (all workers/pods)
+
+Unknown slugs are cached too (negative entries, shorter TTL) so a client
+hammering a bad X-Tenant-ID does not hit the DB on every request. Writes to
+tenants must call ``invalidate`` once committed (signup does), or a lookup
+racing the commit can re-cache the slug as unknown. ``invalidate`` reaches
+only this process and Redis, so the local tier keeps negative entries for
+at most local_negative_ttl_seconds (about a second): a tenant created by
+signup on one worker is not 404 on the others for the full negative TTL.
+
+Entries are plain ``CachedTenant`` snapshots, never ORM instances, so they
+are safe to share across sessions.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import uuid
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Protocol
+
+from app.core.cache.redis_client import get_redis
+from app.core.cache.ttl_lru import MISSING, TTLLRUCache
+from app.core.config.settings import settings
+from app.core.metrics.registry import numeric_stats, registry
+
+logger = logging.getLogger(__name__)
+
+_KEY_PREFIX = "tenant:slug:"
+_NEGATIVE = b"null"
+
+
+@dataclass(frozen=True)
+class CachedTenant:
+    """Immutable tenant snapshot used for request-time resolution."""
+
+    id: uuid.UUID
+    slug: str
+    name: str
+    primary_domain: str | None = None
+
+    @classmethod
+    def from_model(cls, tenant: Any) -> "CachedTenant":
+        return cls(
+            id=tenant.id,
+            slug=tenant.slug,
+            name=tenant.name,
+            primary_domain=tenant.primary_domain,
+        )
+
+    def to_bytes(self) -> bytes:
+        return json.dumps(
+            {
+                "id": str(self.id),
+                "slug": self.slug,
+                "name": self.name,
+                "primary_domain": self.primary_domain,
+            }
+        ).encode()
+
+    @classmethod
+    def from_bytes(cls, raw: bytes) -> "CachedTenant":
+        data = json.loads(raw)
+        return cls(
+            id=uuid.UUID(data["id"]),
+            slug=data["slug"],
+            name=data["name"],
+            primary_domain=data.get("primary_domain"),
+        )
+
+
+class SharedCacheBackend(Protocol):
+    """Subset of the redis.asyncio client API used by the shared tier."""
+
+    async def get(self, key: str) -> bytes | None: ...
+
+    async def set(self, key: str, value: bytes, ex: int | None = None) -> Any: ...
+
+    async def delete(self, *keys: str) -> Any: ...
+
+
+TenantLoader = Callable[[str], Awaitable["CachedTenant | None"]]
+
+
+class TenantCache:
+    """Slug -> CachedTenant lookups with local + shared tiers and hit/miss counters."""
+
+    def __init__(
+        self,
+        *,
+        ttl_seconds: float,
+        negative_ttl_seconds: float,
+        max_entries: int,
+        local_negative_ttl_seconds: float = 1.0,
+        shared: SharedCacheBackend | None = None,
+        clock: Callable[[], float] | None = None,
+    ) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self.local_negative_ttl_seconds = min(local_negative_ttl_seconds, negative_ttl_seconds)
+        kwargs = {"clock": clock} if clock is not None else {}
+        self._local: TTLLRUCache[CachedTenant | None] = TTLLRUCache(
+            max_entries=max_entries, ttl_seconds=ttl_seconds, **kwargs
+        )
+        self._shared = shared
+        self._inflight: dict[str, asyncio.Future[CachedTenant | None]] = {}
+        self._counters = {
+            "local_hits": 0,
+            "shared_hits": 0,
+            "misses": 0,
+            "negative_hits": 0,
+            "loads": 0,
+            "invalidations": 0,
+            "shared_errors": 0,
+        }
+
+    def _ttl_for(self, value: CachedTenant | None) -> float:
+        return self.ttl_seconds if value is not None else self.negative_ttl_seconds
+
+    def _local_ttl_for(self, value: CachedTenant | None) -> float:
+        return self.ttl_seconds if value is not None else self.local_negative_ttl_seconds
+
+    async def _shared_get(self, slug: str) -> CachedTenant | None | object:
+        if self._shared is None:
+            return MISSING
+        try:
+            raw = await self._shared.get(_KEY_PREFIX + slug)
+        except Exception:  # noqa: BLE001 - shared tier is best effort
+            self._counters["shared_errors"] += 1
+            logger.warning("Tenant cache shared tier unavailable (get)")
+            return MISSING
+        if raw is None:
+            return MISSING
+        return None if raw == _NEGATIVE else CachedTenant.from_bytes(raw)
+
+    async def _shared_set(self, slug: str, value: CachedTenant | None) -> None:
+        if self._shared is None:
+            return
+        raw = _NEGATIVE if value is None else value.to_bytes()
+        try:
+            await self._shared.set(_KEY_PREFIX + slug, raw, ex=max(1, int(self._ttl_for(value))))
+        except Exception:  # noqa: BLE001
+            self._counters["shared_errors"] += 1
+            logger.warning("Tenant cache shared tier unavailable (set)")
+
+    async def get(self, slug: str, loader: TenantLoader) -> CachedTenant | None:
+        """Return the tenant for slug (None if unknown), loading via loader on a miss."""
+        value = self._local.get(slug)
+        if value is not MISSING:
+            self._counters["local_hits"] += 1
+            if value is None:
+                self._counters["negative_hits"] += 1
+            return value  # type: ignore[return-value]
+
+        value = await self._shared_get(slug)
+        if value is not MISSING:
+            self._counters["shared_hits"] += 1
+            if value is None:
+                self._counters["negative_hits"] += 1
+            self._local.set(slug, value, self._local_ttl_for(value))  # type: ignore[arg-type]
+            return value  # type: ignore[return-value]
+
+        self._counters["misses"] += 1
+
+        # Coalesce concurrent misses for the same slug into one DB query.
+        pending = self._inflight.get(slug)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        future: asyncio.Future[CachedTenant | None] = asyncio.get_running_loop().create_future()
+        self._inflight[slug] = future
+        try:
+            self._counters["loads"] += 1
+            loaded = await loader(slug)
+            self._local.set(slug, loaded, self._local_ttl_for(loaded))
+            await self._shared_set(slug, loaded)
+            future.set_result(loaded)
+            return loaded
+        except BaseException as exc:
+            future.set_exception(exc)
+            # Waiters re-raise; mark retrieved so the loop does not warn.
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(slug, None)
+
+    async def invalidate(self, slug: str) -> None:
+        """Drop slug from both tiers (call after any write to that tenant)."""
+        self._counters["invalidations"] += 1
+        self._local.delete(slug)
+        if self._shared is not None:
+            try:
+                await self._shared.delete(_KEY_PREFIX + slug)
+            except Exception:  # noqa: BLE001
+                self._counters["shared_errors"] += 1
+                logger.warning("Tenant cache shared tier unavailable (delete)")
+
+    def clear_local(self) -> None:
+        self._local.clear()
+
+    def stats(self) -> dict[str, int | float]:
+        hits = self._counters["local_hits"] + self._counters["shared_hits"]
+        total = hits + self._counters["misses"]
+        return {
+            **self._counters,
+            "hit_ratio": round(hits / total, 4) if total else 0.0,
+            "local_entries": len(self._local),
+            "shared_enabled": int(self._shared is not None),
+        }
+
+
+tenant_cache = TenantCache(
+    ttl_seconds=settings.TENANT_CACHE_TTL_SECONDS,
+    negative_ttl_seconds=settings.TENANT_CACHE_NEGATIVE_TTL_SECONDS,
+    max_entries=settings.TENANT_CACHE_MAX_ENTRIES,
+    local_negative_ttl_seconds=settings.TENANT_CACHE_LOCAL_NEGATIVE_TTL_SECONDS,
+    shared=get_redis() if settings.TENANT_CACHE_SHARED else None,
+)
+registry.register_collector(
+    "Tenant resolution cache stats (see /internal/tenant-cache)",
+    lambda: numeric_stats("ambient_tenant_cache", tenant_cache.stats()),
+)
@@ -0,0 +1,135 @@
+"""
+Bounded thread/process pool for blocking work called from the event loop.
+
+The number of pending jobs (running + queued) is capped at max_workers +
+max_queue: once the queue is full, callers fail fast with
+ServiceUnavailableError (503) rather than piling up behind the pool. A job's
+slot is held until the pool is done with it, also when its caller is
+cancelled. Wait (queued) and run times are tracked for stats().
+
+All bookkeeping happens on the event loop thread, so no locks are needed.
+Used for password hashing (app.core.security.hash_executor) and analytical
+queries (app.features.query.service), each with its own instance.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
+
+from app.core.errors.exceptions import ServiceUnavailableError
+
+T = TypeVar("T")
+
+
+def _run_timed(fn: Callable[..., T], args: tuple[Any, ...]) -> tuple[float, float, T]:
+    """Run fn in the worker and report when it started and finished (monotonic clock)."""
+    started = time.monotonic()
+    result = fn(*args)
+    return started, time.monotonic(), result
+
+
+class BoundedExecutor:
+    """Thread/process pool with a bounded queue and basic wait/run metrics."""
+
+    def __init__(
+        self,
+        *,
+        kind: str = "thread",
+        max_workers: int = 4,
+        max_queue: int = 64,
+        name: str,
+    ) -> None:
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unsupported executor kind: {kind}")
+        self.kind = kind
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max(0, max_queue)
+        self.name = name
+        self._executor: Executor | None = None
+
+        self._pending = 0
+        self._submitted = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._wait_seconds_total = 0.0
+        self._wait_seconds_max = 0.0
+        self._run_seconds_total = 0.0
+
+    def _get_executor(self) -> Executor:
+        # Created lazily so importing the app does not spawn workers.
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix=self.name
+                )
+        return self._executor
+
+    @property
+    def capacity(self) -> int:
+        return self.max_workers + self.max_queue
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        """Run fn(*args) on the pool; raise ServiceUnavailableError when saturated."""
+        if self._pending >= self.capacity:
+            self._rejected += 1
+            raise ServiceUnavailableError("Server busy, please retry")
+
+        loop = asyncio.get_running_loop()
+        submitted_at = time.monotonic()  # before submit: handing the job over is waiting too
+        future = self._get_executor().submit(_run_timed, fn, args)
+        self._pending += 1
+        self._submitted += 1
+        # A cancelled caller (client disconnect) does not stop a job that is already
+        # running: the slot is freed when the pool is done with it, not when the caller is.
+        future.add_done_callback(lambda _: self._release_slot(loop))
+        try:
+            started, finished, result = await asyncio.wrap_future(future)
+        except BaseException:
+            self._failed += 1
+            raise
+
+        wait = max(0.0, started - submitted_at)
+        self._completed += 1
+        self._wait_seconds_total += wait
+        self._wait_seconds_max = max(self._wait_seconds_max, wait)
+        self._run_seconds_total += finished - started
+        return result
+
+    def _release_slot(self, loop: asyncio.AbstractEventLoop) -> None:
+        # Runs on the worker thread (or here, if the job was cancelled while queued).
+        try:
+            loop.call_soon_threadsafe(self._decrement_pending)
+        except RuntimeError:  # loop already closed
+            self._decrement_pending()
+
+    def _decrement_pending(self) -> None:
+        self._pending -= 1
+
+    def stats(self) -> dict[str, Any]:
+        """Snapshot of queue depth and wait/run timings."""
+        completed = self._completed or 1
+        return {
+            "kind": self.kind,
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "in_flight": self._pending,
+            "queue_depth": max(0, self._pending - self.max_workers),
+            "submitted": self._submitted,
+            "completed": self._completed,
+            "failed": self._failed,
+            "rejected": self._rejected,
+            "wait_ms_avg": round(self._wait_seconds_total / completed * 1000, 3),
+            "wait_ms_max": round(self._wait_seconds_max * 1000, 3),
+            "run_ms_avg": round(self._run_seconds_total / completed * 1000, 3),
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -17,8 +17,24 @@ class Settings:
 
     ENVIRONMENT: str = os.getenv("ENVIRONMENT", "development")
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
+    # Logging pipeline: background writer thread, text|json, per-logger sampling/rate limits
+    LOG_ASYNC: bool = os.getenv("LOG_ASYNC", "true").lower() in ("true", "1", "yes")
+    LOG_FORMAT: str = os.getenv("LOG_FORMAT", "text")
+    LOG_SAMPLE_RATES: str = os.getenv("LOG_SAMPLE_RATES", "")  # e.g. "app.api.internal.routes=0.01"
+    LOG_RATE_LIMITS: str = os.getenv("LOG_RATE_LIMITS", "")  # e.g. "app.api.internal.routes=1" (per second)
     DATABASE_URL: str = os.getenv("DATABASE_URL", "")
     DOCS_ENABLED: bool = os.getenv("DOCS_ENABLED", "true").lower() in ("true", "1", "yes")
+    # Prebuilt OpenAPI schema (scripts/maintenance/build_openapi.py); empty = build on first access
+    OPENAPI_SCHEMA_PATH: str = os.getenv("OPENAPI_SCHEMA_PATH", "")
+
+    # DB connection pool (SQLAlchemy QueuePool + asyncpg)
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    DB_POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", "-1"))  # seconds; -1 disables
+    DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("true", "1", "yes")
+    # 0 disables asyncpg prepared statement caching (needed behind pgbouncer transaction mode)
+    DB_PREPARED_STATEMENT_CACHE_SIZE: int = int(os.getenv("DB_PREPARED_STATEMENT_CACHE_SIZE", "100"))
 
     # Auth / security placeholders (no auth implementation)
     AUTH_ACCESS_TOKEN_TTL_SECONDS: int = int(os.getenv("AUTH_ACCESS_TOKEN_TTL_SECONDS", "900"))
@@ -28,6 +44,122 @@ class Settings:
     EMAIL_VERIFY_TTL_SECONDS: int = int(os.getenv("EMAIL_VERIFY_TTL_SECONDS", "3600"))
     APP_PUBLIC_BASE_URL: str = os.getenv("APP_PUBLIC_BASE_URL", "http://localhost:8000")
 
+    # Password hashing executor (bcrypt runs off the event loop)
+    PASSWORD_HASH_EXECUTOR: str = os.getenv("PASSWORD_HASH_EXECUTOR", "thread")  # thread | process
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", "4"))
+    PASSWORD_HASH_QUEUE_SIZE: int = int(os.getenv("PASSWORD_HASH_QUEUE_SIZE", "64"))
+
+    # Bulk user provisioning
+    BULK_IMPORT_BATCH_SIZE: int = int(os.getenv("BULK_IMPORT_BATCH_SIZE", "500"))
+    BULK_HASH_PROCESSES: int = int(os.getenv("BULK_HASH_PROCESSES", str(os.cpu_count() or 2)))
+    # POST /v1/users/bulk creates users for any X-Tenant-ID and there is no admin auth yet:
+    # keep it off in exposed deployments (the maintenance script does not need it)
+    BULK_IMPORT_ENDPOINT_ENABLED: bool = os.getenv(
+        "BULK_IMPORT_ENDPOINT_ENABLED", "false"
+    ).lower() in ("true", "1", "yes")
+
+    # Redis (optional; empty disables shared cache tiers)
+    REDIS_URL: str = os.getenv("REDIS_URL", "")
+
+    # Tenant resolution cache
+    TENANT_CACHE_TTL_SECONDS: float = float(os.getenv("TENANT_CACHE_TTL_SECONDS", "300"))
+    TENANT_CACHE_NEGATIVE_TTL_SECONDS: float = float(
+        os.getenv("TENANT_CACHE_NEGATIVE_TTL_SECONDS", "30")
+    )
+    # Negative entries in the per-worker tier; other workers do not see invalidations
+    TENANT_CACHE_LOCAL_NEGATIVE_TTL_SECONDS: float = float(
+        os.getenv("TENANT_CACHE_LOCAL_NEGATIVE_TTL_SECONDS", "1")
+    )
+    TENANT_CACHE_MAX_ENTRIES: int = int(os.getenv("TENANT_CACHE_MAX_ENTRIES", "10000"))
+    TENANT_CACHE_SHARED: bool = os.getenv("TENANT_CACHE_SHARED", "true").lower() in ("true", "1", "yes")
+
+    # Datasets: Arrow IPC part files under DATASETS_DIR/<tenant_id>/<dataset_id>/
+    DATASETS_DIR: str = os.getenv("DATASETS_DIR", "./data/datasets")
+    # Uploads are parsed in record-aligned blocks of about this size (bounds memory per upload)
+    DATASET_INGEST_BLOCK_BYTES: int = int(os.getenv("DATASET_INGEST_BLOCK_BYTES", str(8 << 20)))
+    # Part files stay memory-mapped between queries (page cache shared by all workers on a host)
+    DATASET_MAPPED_IDLE_FILES: int = int(os.getenv("DATASET_MAPPED_IDLE_FILES", "256"))
+    DATASET_MAPPED_SWEEP_SECONDS: float = float(os.getenv("DATASET_MAPPED_SWEEP_SECONDS", "30"))
+    # Each rollup is updated inside every append's commit; bounds the work per append
+    DATASET_MAX_ROLLUPS: int = int(os.getenv("DATASET_MAX_ROLLUPS", "8"))
+
+    # Analytical queries (embedded DuckDB; one connection per query)
+    QUERY_MEMORY_LIMIT: str = os.getenv("QUERY_MEMORY_LIMIT", "512MB")  # per query
+    QUERY_THREADS: int = int(os.getenv("QUERY_THREADS", "2"))  # per query
+    QUERY_WORKERS: int = int(os.getenv("QUERY_WORKERS", "4"))  # concurrent queries per process
+    QUERY_QUEUE_SIZE: int = int(os.getenv("QUERY_QUEUE_SIZE", "16"))
+    QUERY_TIMEOUT_SECONDS: float = float(os.getenv("QUERY_TIMEOUT_SECONDS", "30"))
+    QUERY_DEFAULT_PAGE_SIZE: int = int(os.getenv("QUERY_DEFAULT_PAGE_SIZE", "1000"))
+    QUERY_MAX_PAGE_SIZE: int = int(os.getenv("QUERY_MAX_PAGE_SIZE", "10000"))
+    # Streamed results (Accept: application/x-ndjson or Arrow stream): open DuckDB results per process
+    QUERY_MAX_STREAMS: int = int(os.getenv("QUERY_MAX_STREAMS", "8"))
+    QUERY_STREAM_BATCH_ROWS: int = int(os.getenv("QUERY_STREAM_BATCH_ROWS", "16384"))
+
+    # Query result cache (per worker; 0 disables). Spill tier is off unless a directory is set.
+    QUERY_CACHE_MAX_BYTES: int = int(os.getenv("QUERY_CACHE_MAX_BYTES", str(256 << 20)))
+    QUERY_CACHE_MAX_ENTRY_BYTES: int = int(os.getenv("QUERY_CACHE_MAX_ENTRY_BYTES", str(16 << 20)))
+    QUERY_CACHE_SPILL_DIR: str = os.getenv("QUERY_CACHE_SPILL_DIR", "")
+    QUERY_CACHE_SPILL_MAX_BYTES: int = int(os.getenv("QUERY_CACHE_SPILL_MAX_BYTES", str(2 << 30)))
+
+    # Background jobs (python -m app.features.jobs.worker)
+    JOB_RESULTS_DIR: str = os.getenv("JOB_RESULTS_DIR", "./data/job-results")
+    JOB_WORKER_PROCESSES: int = int(os.getenv("JOB_WORKER_PROCESSES", "2"))  # jobs run in parallel
+    JOB_POLL_INTERVAL_SECONDS: float = float(os.getenv("JOB_POLL_INTERVAL_SECONDS", "1"))
+    JOB_STALE_SECONDS: float = float(os.getenv("JOB_STALE_SECONDS", "300"))  # no heartbeat -> requeue
+    JOB_MAX_ATTEMPTS: int = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+    JOB_QUERY_TIMEOUT_SECONDS: float = float(os.getenv("JOB_QUERY_TIMEOUT_SECONDS", "3600"))
+    # Result files older than this are deleted by the worker (0 keeps them forever)
+    JOB_RESULT_TTL_SECONDS: float = float(os.getenv("JOB_RESULT_TTL_SECONDS", "604800"))
+    # Job event streams (GET /v1/jobs/{id}/events): "listen" uses one LISTEN connection per
+    # process; "poll" reads watched jobs every JOB_EVENTS_POLL_SECONDS (e.g. behind pgbouncer)
+    JOB_EVENTS_BACKEND: str = os.getenv("JOB_EVENTS_BACKEND", "listen")  # listen | poll
+    JOB_EVENTS_POLL_SECONDS: float = float(os.getenv("JOB_EVENTS_POLL_SECONDS", "1"))
+    JOB_EVENTS_KEEPALIVE_SECONDS: float = float(os.getenv("JOB_EVENTS_KEEPALIVE_SECONDS", "15"))
+    JOB_EVENTS_MAX_STREAMS: int = int(os.getenv("JOB_EVENTS_MAX_STREAMS", "1000"))  # per process
+
+    # Catalog search (GET /v1/catalog/search): in-memory index per tenant, per worker process
+    CATALOG_MAX_TENANTS: int = int(os.getenv("CATALOG_MAX_TENANTS", "128"))  # least recent out
+    CATALOG_FUZZY_THRESHOLD: float = float(os.getenv("CATALOG_FUZZY_THRESHOLD", "0.3"))
+
+    # Read replica for read-only endpoints (get_read_db); empty = everything on DATABASE_URL.
+    # Pool sized like the primary's (DB_*). Reads go to the primary while the replica is
+    # unreachable or more than DB_READ_MAX_LAG_SECONDS behind (checked every ..._CHECK_SECONDS)
+    DATABASE_READ_URL: str = os.getenv("DATABASE_READ_URL", "")
+    DB_READ_MAX_LAG_SECONDS: float = float(os.getenv("DB_READ_MAX_LAG_SECONDS", "5"))
+    DB_READ_LAG_CHECK_SECONDS: float = float(os.getenv("DB_READ_LAG_CHECK_SECONDS", "2"))
+
+    # Per-request SQL budget: warn when a request runs more statements than this, or one
+    # statement shape this many times (N+1). 0 disables either check
+    DB_QUERY_BUDGET: int = int(os.getenv("DB_QUERY_BUDGET", "25"))
+    DB_QUERY_REPEAT_THRESHOLD: int = int(os.getenv("DB_QUERY_REPEAT_THRESHOLD", "5"))
+
+    # Idempotency-Key on POST/PUT/PATCH/DELETE: responses kept per (tenant, method, path, key).
+    # Shared via Redis when REDIS_URL is set and IDEMPOTENCY_SHARED, else per worker process
+    IDEMPOTENCY_ENABLED: bool = os.getenv("IDEMPOTENCY_ENABLED", "true").lower() in ("true", "1", "yes")
+    IDEMPOTENCY_SHARED: bool = os.getenv("IDEMPOTENCY_SHARED", "true").lower() in ("true", "1", "yes")
+    IDEMPOTENCY_TTL_SECONDS: float = float(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400"))
+    IDEMPOTENCY_WAIT_SECONDS: float = float(os.getenv("IDEMPOTENCY_WAIT_SECONDS", "30"))  # then 409
+    # Redis in-progress marker expiry, so a crashed worker does not hold a key forever
+    IDEMPOTENCY_LOCK_SECONDS: float = float(os.getenv("IDEMPOTENCY_LOCK_SECONDS", "120"))
+    IDEMPOTENCY_MAX_RESPONSE_BYTES: int = int(os.getenv("IDEMPOTENCY_MAX_RESPONSE_BYTES", "1048576"))
+    IDEMPOTENCY_MAX_ENTRIES: int = int(os.getenv("IDEMPOTENCY_MAX_ENTRIES", "10000"))  # memory store
+
+    # Token-bucket rate limits per X-Tenant-ID and per client IP (rate = tokens/second, burst =
+    # bucket size; 0 rate disables that bucket). Shared via Redis when REDIS_URL is set and
+    # RATE_LIMIT_SHARED, else per worker process. Requests cost 1 token unless weighted in
+    # RATE_LIMIT_COSTS ("METHOD /path=cost", a path also covers its subpaths)
+    RATE_LIMIT_ENABLED: bool = os.getenv("RATE_LIMIT_ENABLED", "true").lower() in ("true", "1", "yes")
+    RATE_LIMIT_SHARED: bool = os.getenv("RATE_LIMIT_SHARED", "true").lower() in ("true", "1", "yes")
+    RATE_LIMIT_TENANT_RATE: float = float(os.getenv("RATE_LIMIT_TENANT_RATE", "50"))
+    RATE_LIMIT_TENANT_BURST: float = float(os.getenv("RATE_LIMIT_TENANT_BURST", "200"))
+    RATE_LIMIT_IP_RATE: float = float(os.getenv("RATE_LIMIT_IP_RATE", "20"))
+    RATE_LIMIT_IP_BURST: float = float(os.getenv("RATE_LIMIT_IP_BURST", "100"))
+    RATE_LIMIT_COSTS: str = os.getenv(
+        "RATE_LIMIT_COSTS",
+        "POST /v1/auth/signup=5,POST /v1/users/bulk=20,POST /v1/query=5,POST /v1/jobs=5",
+    )
+    RATE_LIMIT_MAX_KEYS: int = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))  # memory backend
+
 
 settings = Settings()
 
@@ -22,11 +22,31 @@ class NotFoundError(AppError):
         super().__init__(message=message, status_code=404)
 
 
+class ConflictError(AppError):
+    def __init__(self, message: str = "Conflict") -> None:
+        super().__init__(message=message, status_code=409)
+
+
+class RequestTimeoutError(AppError):
+    def __init__(self, message: str = "Request timed out") -> None:
+        super().__init__(message=message, status_code=408)
+
+
+class UnsupportedMediaTypeError(AppError):
+    def __init__(self, message: str = "Unsupported media type") -> None:
+        super().__init__(message=message, status_code=415)
+
+
 class InternalServerError(AppError):
     def __init__(self, message: str = "Internal server error") -> None:
         super().__init__(message=message, status_code=500)
 
 
+class ServiceUnavailableError(AppError):
+    def __init__(self, message: str = "Service temporarily unavailable") -> None:
+        super().__init__(message=message, status_code=503)
+
+
 class DatabaseUnavailableError(Exception):
     """
     Raised when the database is unreachable/unhealthy.
@@ -4,17 +4,31 @@ Structured logging setup using Python stdlib only.
 Log format includes timestamp, level, logger name, request_id (when available), and message.
 Secrets (passwords, tokens, full DATABASE_URL) must never be logged; keep redaction
 in application code when logging config or connection info.
+
+In async mode, log calls on the event loop only interpolate the message and
+enqueue the record (DeferredQueueHandler); traceback formatting, the JSON or
+text layout and stdout writes happen on a background QueueListener thread.
+Sampling and rate-limit filters run before enqueueing,
+so dropped records cost almost nothing. WARNING and above are never dropped.
 """
 
 from __future__ import annotations
 
+import copy
+import json
 import logging
+import logging.handlers
+import queue
+import random
 import sys
+import time
 from contextvars import ContextVar
 
 # Set by request_id middleware when handling a request.
 request_id_ctx: ContextVar[str | None] = ContextVar("request_id", default=None)
 
+_listener: logging.handlers.QueueListener | None = None
+
 
 class RequestIdFilter(logging.Filter):
     """Inject request_id into the log record when available (from context var)."""
@@ -25,23 +39,175 @@ class RequestIdFilter(logging.Filter):
         return True
 
 
-def configure_logging(log_level: str = "INFO") -> None:
+def _match_logger(name: str, table: dict[str, float]) -> float | None:
+    """Longest dotted-prefix match of a logger name against a config table."""
+    while name:
+        if name in table:
+            return table[name]
+        name = name.rpartition(".")[0]
+    return None
+
+
+class SamplingFilter(logging.Filter):
+    """Keep only a fraction of sub-WARNING records for the configured loggers."""
+
+    def __init__(self, rates: dict[str, float]) -> None:
+        super().__init__()
+        self.rates = rates
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = _match_logger(record.name, self.rates)
+        return rate is None or random.random() < rate
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Token bucket per logger: at most N sub-WARNING records per second.
+
+    The next record let through reports how many were suppressed.
+    """
+
+    def __init__(self, limits: dict[str, float]) -> None:
+        super().__init__()
+        self.limits = limits
+        self._buckets: dict[str, list[float]] = {}  # name -> [tokens, last_refill, suppressed]
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        per_second = _match_logger(record.name, self.limits)
+        if per_second is None:
+            return True
+
+        now = time.monotonic()
+        bucket = self._buckets.setdefault(record.name, [per_second, now, 0])
+        bucket[0] = min(per_second, bucket[0] + (now - bucket[1]) * per_second)
+        bucket[1] = now
+        if bucket[0] < 1:
+            bucket[2] += 1
+            return False
+
+        bucket[0] -= 1
+        if bucket[2]:
+            record.msg = f"{record.msg} [{int(bucket[2])} similar suppressed]"
+            bucket[2] = 0
+        return True
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that leaves the expensive formatting to the listener thread.
+
+    The message (``msg % args``) is interpolated here, on the calling thread:
+    a mutable argument changed after the log call, or an ORM object whose
+    repr needs its session, must not be formatted later on another thread.
+    The traceback and the JSON/text layout, which cost most, stay with the
+    listener's formatter; unlike the stdlib prepare(), exc_info is kept so
+    JsonFormatter still sees it.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line; keeps request_id for correlation."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": self.formatTime(record, "%Y-%m-%dT%H:%M:%S%z"),
+            "level": record.levelname,
+            "logger": record.name,
+            "request_id": getattr(record, "request_id", "-"),
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(payload, default=str)
+
+
+def parse_logger_table(raw: str) -> dict[str, float]:
+    """Parse "logger=value,logger2=value" settings strings."""
+    table: dict[str, float] = {}
+    for item in raw.split(","):
+        name, sep, value = item.strip().partition("=")
+        if sep and name:
+            table[name.strip()] = float(value)
+    return table
+
+
+def configure_logging(
+    log_level: str = "INFO",
+    *,
+    async_mode: bool = False,
+    json_format: bool = False,
+    sample_rates: dict[str, float] | None = None,
+    rate_limits: dict[str, float] | None = None,
+) -> None:
     """
     Configure root logging: level, format, and handlers.
-    Uses stdlib logging only. Safe to call at startup.
+    Uses stdlib logging only. Safe to call at startup (and again; the
+    previous background listener is stopped first).
     """
+    global _listener
+    shutdown_logging()
+
     level = getattr(logging, log_level.upper(), logging.INFO)
 
-    fmt = (
-        "%(asctime)s | %(levelname)-8s | %(name)s | request_id=%(request_id)s | %(message)s"
-    )
-    formatter = logging.Formatter(fmt, datefmt="%Y-%m-%d %H:%M:%S")
+    if json_format:
+        formatter: logging.Formatter = JsonFormatter()
+    else:
+        fmt = (
+            "%(asctime)s | %(levelname)-8s | %(name)s | request_id=%(request_id)s | %(message)s"
+        )
+        formatter = logging.Formatter(fmt, datefmt="%Y-%m-%d %H:%M:%S")
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(formatter)
 
-    handler = logging.StreamHandler(sys.stdout)
-    handler.setFormatter(formatter)
+    if async_mode:
+        log_queue: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+        handler: logging.Handler = DeferredQueueHandler(log_queue)
+        _listener = logging.handlers.QueueListener(log_queue, stream_handler)
+        _listener.start()
+    else:
+        handler = stream_handler
+
+    # Filters run in the calling thread: request_id must be read from the
+    # context var there, and dropped records never reach the queue.
+    if sample_rates:
+        handler.addFilter(SamplingFilter(sample_rates))
+    if rate_limits:
+        handler.addFilter(RateLimitFilter(rate_limits))
     handler.addFilter(RequestIdFilter())
 
     root = logging.getLogger()
     root.setLevel(level)
     root.handlers.clear()
     root.addHandler(handler)
+
+
+def shutdown_logging() -> None:
+    """
+    Flush and stop the background listener (no-op in sync mode).
+
+    Root falls back to writing synchronously so late log calls are not lost.
+    """
+    global _listener
+    if _listener is None:
+        return
+    _listener.stop()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        if isinstance(handler, logging.handlers.QueueHandler):
+            root.removeHandler(handler)
+            for target in _listener.handlers:
+                for flt in handler.filters:
+                    target.addFilter(flt)
+                root.addHandler(target)
+    _listener = None
@@ -0,0 +1,41 @@
+"""HTTP request metrics: latency histogram, in-flight gauge, status counters, SQL per request."""
+
+from __future__ import annotations
+
+from app.core.metrics.registry import registry
+
+http_requests_in_flight = registry.gauge(
+    "ambient_http_requests_in_flight",
+    "HTTP requests currently being served",
+)
+http_requests_total = registry.counter(
+    "ambient_http_requests_total",
+    "HTTP requests by method, route template and status code",
+    ("method", "route", "status"),
+)
+http_request_duration_seconds = registry.histogram(
+    "ambient_http_request_duration_seconds",
+    "HTTP request latency by method and route template",
+    ("method", "route"),
+)
+db_statements_per_request = registry.histogram(
+    "ambient_db_statements_per_request",
+    "SQL statements run per HTTP request, by method and route template",
+    ("method", "route"),
+    buckets=(1, 2, 3, 5, 10, 20, 50, 100, 200),
+)
+db_budget_warnings_total = registry.counter(
+    "ambient_db_query_budget_warnings_total",
+    "Requests over the SQL statement budget or repeating a statement shape",
+    ("method", "route", "reason"),
+)
+idempotency_requests_total = registry.counter(
+    "ambient_idempotency_requests_total",
+    "Requests carrying an Idempotency-Key, by outcome",
+    ("outcome",),
+)
+rate_limit_requests_total = registry.counter(
+    "ambient_rate_limit_requests_total",
+    "Rate-limited requests by outcome (admitted, rejected, unavailable) and limiting bucket",
+    ("outcome", "bucket"),
+)
@@ -0,0 +1,130 @@
+"""
+Per-request SQL accounting: statement count, DB time, rows, repeated shapes.
+
+The cursor hooks of app.db.query_metrics report every statement to
+record_statement(). It adds the statement to the QueryStats of the current
+request (a context variable set by QueryBudgetMiddleware, so work the
+request awaits is counted and other requests are not) and to any collector
+opened with count_queries(). Statements are grouped by shape: literals and
+bind parameters replaced, IN/VALUES lists collapsed. The same shape many
+times in one request is the N+1 pattern. Endpoints whose statement count
+grows with their input by design (batched imports) call
+exempt_from_query_budget().
+
+Tests bound the statements an endpoint may run:
+
+    with assert_max_queries(3):
+        client.post("/v1/auth/signup", json=...)
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+
+@dataclass
+class QueryStats:
+    statements: int = 0
+    db_seconds: float = 0.0
+    rows: int = 0
+    shapes: Counter[str] = field(default_factory=Counter)
+    exempt: bool = False
+
+    def add(self, shape: str, seconds: float, rows: int) -> None:
+        self.statements += 1
+        self.db_seconds += seconds
+        self.rows += rows
+        self.shapes[shape] += 1
+
+    def most_repeated(self) -> tuple[str, int] | None:
+        return self.shapes.most_common(1)[0] if self.shapes else None
+
+
+_request_stats: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+# count_queries() collectors see every statement of the process, whatever the context:
+# test clients run the app on another thread.
+_collectors: list[QueryStats] = []
+_collectors_lock = threading.Lock()
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_PARAM = re.compile(r"\$\d+(?:::[\w\[\]]+)?|%\(\w+\)s|%s|\?|(?<![:\w]):\w+")
+_NUMBER = re.compile(r"(?<![\w$])\d+(?:\.\d+)?(?![\w])")
+_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_ROWS = re.compile(r"\(\.\.\.\)(?:\s*,\s*\(\.\.\.\))+")
+_SPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=2048)
+def normalize_statement(statement: str) -> str:
+    """Statement shape: literals and parameters as ?, lists of them as (...)."""
+    shape = _STRING.sub("?", statement)
+    shape = _PARAM.sub("?", shape)
+    shape = _NUMBER.sub("?", shape)
+    shape = _LIST.sub("(...)", shape)
+    shape = _ROWS.sub("(...)", shape)
+    return _SPACE.sub(" ", shape).strip()
+
+
+def record_statement(statement: str, seconds: float, rowcount: int) -> None:
+    """Account one executed statement (called from the engine cursor hooks)."""
+    stats = _request_stats.get()
+    if stats is None and not _collectors:
+        return
+    shape = normalize_statement(statement)
+    rows = max(rowcount, 0)
+    if stats is not None:
+        stats.add(shape, seconds, rows)
+    if _collectors:
+        with _collectors_lock:
+            for collector in _collectors:
+                collector.add(shape, seconds, rows)
+
+
+def exempt_from_query_budget() -> None:
+    """Skip the budget and repeat warnings for the current request."""
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.exempt = True
+
+
+@contextmanager
+def track_request_queries() -> Iterator[QueryStats]:
+    """Collect the statements run in this context (one request) into a fresh QueryStats."""
+    stats = QueryStats()
+    token = _request_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _request_stats.reset(token)
+
+
+@contextmanager
+def count_queries() -> Iterator[QueryStats]:
+    """Collect every statement the process runs while open (for tests and scripts)."""
+    stats = QueryStats()
+    with _collectors_lock:
+        _collectors.append(stats)
+    try:
+        yield stats
+    finally:
+        with _collectors_lock:
+            _collectors.remove(stats)
+
+
+@contextmanager
+def assert_max_queries(limit: int) -> Iterator[QueryStats]:
+    """Fail with the statement shapes run if the block runs more than limit statements."""
+    with count_queries() as stats:
+        yield stats
+    if stats.statements > limit:
+        shapes = "\n".join(f"  {n} x {shape}" for shape, n in stats.shapes.most_common())
+        raise AssertionError(
+            f"{stats.statements} SQL statements, expected at most {limit}:\n{shapes}"
+        )
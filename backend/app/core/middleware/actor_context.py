@@ -6,20 +6,16 @@ Sets request.state.actor = None. No token parsing or auth logic.
 
 from __future__ import annotations
 
-from typing import Callable
+from starlette.types import ASGIApp, Receive, Scope, Send
 
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.responses import Response
 
-
-class ActorContextMiddleware(BaseHTTPMiddleware):
+class ActorContextMiddleware:
     """Set request.state.actor = None as a stub for future auth."""
 
-    async def dispatch(
-        self,
-        request: Request,
-        call_next: Callable[[Request], Response],
-    ) -> Response:
-        request.state.actor = None  # type: ignore[attr-defined]
-        return await call_next(request)
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http":
+            scope.setdefault("state", {})["actor"] = None
+        await self.app(scope, receive, send)
@@ -0,0 +1,242 @@
+"""
+Idempotency-Key middleware (pure ASGI).
+
+A POST/PUT/PATCH/DELETE carrying an Idempotency-Key header runs at most once
+per (X-Tenant-ID, method, path, key) within IDEMPOTENCY_TTL_SECONDS:
+- first request: runs normally; its response is captured while it streams to
+  the client and stored, unless it is a 5xx, fails, or exceeds
+  IDEMPOTENCY_MAX_RESPONSE_BYTES (then the key is released for a retry);
+- repeat with the same request (hash of method, path, query and body): the
+  stored response is replayed with "Idempotent-Replayed: true", without
+  running the handler;
+- repeat with a different request: 422;
+- repeat while the first is still running: waits up to
+  IDEMPOTENCY_WAIT_SECONDS for its response, then 409.
+
+The request body is never buffered: the first request hashes it as the
+handler reads it, and a response is stored only if the handler read all of
+it (or there was none); a repeat hashes its body as it arrives and drops
+it. Streamed uploads (datasets, bulk user import) are not tracked: hashing
+them would mean reading gigabytes up front. When the store (Redis) is
+unreachable requests run without idempotency rather than failing.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import re
+import time
+from collections.abc import Awaitable
+from dataclasses import dataclass, field
+
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.cache.idempotency_store import (
+    IN_PROGRESS,
+    IdempotencyRecord,
+    IdempotencyStore,
+    idempotency_store,
+)
+from app.core.config.settings import settings
+from app.core.metrics.http import idempotency_requests_total
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENT_METHODS = frozenset(["POST", "PUT", "PATCH", "DELETE"])
+MAX_KEY_LENGTH = 255
+REPLAYED_HEADER = (b"idempotent-replayed", b"true")
+# Set per response by outer middleware; not part of the stored response
+_UNSTORED_HEADERS = frozenset([b"x-request-id"])
+# Streamed uploads: POST /v1/datasets, /v1/datasets/{id}/data and /v1/users/bulk
+_UNTRACKED_PATHS = re.compile(r"^/v1/(datasets(/[^/]+/data)?|users/bulk)/?$")
+
+
+@dataclass
+class _CapturedResponse:
+    status: int = 0
+    headers: list[tuple[bytes, bytes]] = field(default_factory=list)
+    chunks: list[bytes] = field(default_factory=list)
+    size: int = 0
+    complete: bool = False
+    too_large: bool = False
+
+
+class IdempotencyMiddleware:
+    """Replay the stored response of a request retried with the same Idempotency-Key."""
+
+    def __init__(self, app: ASGIApp, store: IdempotencyStore | None = None) -> None:
+        self.app = app
+        self.store = store if store is not None else idempotency_store
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["method"] not in IDEMPOTENT_METHODS
+            or not settings.IDEMPOTENCY_ENABLED
+            or _UNTRACKED_PATHS.match(scope["path"])
+        ):
+            await self.app(scope, receive, send)
+            return
+        headers = Headers(scope=scope)
+        key = headers.get("Idempotency-Key")
+        if key is None:
+            await self.app(scope, receive, send)
+            return
+        if not key or len(key) > MAX_KEY_LENGTH:
+            idempotency_requests_total.inc(("invalid",))
+            await _error(scope, receive, send, 400, "Idempotency-Key must be 1-255 characters")
+            return
+
+        scoped_key = _scoped_key(scope, headers.get("X-Tenant-ID", ""), key)
+        hasher = _request_hasher(scope)
+        deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_SECONDS
+        while True:
+            try:
+                state = await self.store.claim(scoped_key)
+            except Exception:  # noqa: BLE001 - idempotency is best effort when the store is down
+                idempotency_requests_total.inc(("unavailable",))
+                logger.warning("Idempotency store unavailable; running request without it")
+                await self.app(scope, receive, send)
+                return
+            if state is None:
+                break
+            if state is IN_PROGRESS:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    idempotency_requests_total.inc(("conflict",))
+                    await _error(
+                        scope, receive, send, 409,
+                        "A request with this Idempotency-Key is still in progress",
+                    )
+                    return
+                await self.store.wait(scoped_key, remaining)
+                continue
+            assert isinstance(state, IdempotencyRecord)
+            if not await _hash_body(receive, hasher):
+                return  # client went away mid-body
+            if state.request_hash != hasher.hexdigest():
+                idempotency_requests_total.inc(("mismatch",))
+                await _error(
+                    scope, receive, send, 422,
+                    "Idempotency-Key was already used for a different request",
+                )
+                return
+            idempotency_requests_total.inc(("replayed",))
+            await _replay(state, send)
+            return
+
+        await self._run_and_store(scope, receive, send, scoped_key, hasher)
+
+    async def _run_and_store(
+        self,
+        scope: Scope,
+        receive: Receive,
+        send: Send,
+        scoped_key: str,
+        hasher: hashlib._Hash,
+    ) -> None:
+        captured = _CapturedResponse()
+        limit = settings.IDEMPOTENCY_MAX_RESPONSE_BYTES
+        body_done = not _has_body(scope)
+
+        async def hashing_receive() -> Message:
+            nonlocal body_done
+            message = await receive()
+            if message["type"] == "http.request" and not body_done:
+                hasher.update(message.get("body", b""))
+                body_done = not message.get("more_body", False)
+            return message
+
+        async def capturing_send(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                captured.status = message["status"]
+                captured.headers = [
+                    (name, value)
+                    for name, value in message.get("headers", [])
+                    if name.lower() not in _UNSTORED_HEADERS
+                ]
+            elif message["type"] == "http.response.body" and not captured.too_large:
+                chunk = message.get("body", b"")
+                captured.size += len(chunk)
+                if captured.size > limit:
+                    captured.too_large = True
+                    captured.chunks.clear()
+                else:
+                    captured.chunks.append(chunk)
+                captured.complete = not message.get("more_body", False)
+            await send(message)
+
+        stored = False
+        try:
+            await self.app(scope, hashing_receive, capturing_send)
+            # Without the whole body hashed a repeat could not be told apart; let it run.
+            if body_done and captured.complete and not captured.too_large and captured.status < 500:
+                record = IdempotencyRecord(
+                    request_hash=hasher.hexdigest(),
+                    status=captured.status,
+                    headers=tuple(captured.headers),
+                    body=b"".join(captured.chunks),
+                )
+                await _quietly(self.store.complete(scoped_key, record))
+                stored = True
+                idempotency_requests_total.inc(("stored",))
+        finally:
+            if not stored:
+                idempotency_requests_total.inc(("not_stored",))
+                await _quietly(self.store.release(scoped_key))
+
+
+async def _quietly(call: Awaitable[None]) -> None:
+    try:
+        await call
+    except Exception:  # noqa: BLE001 - the response is already sent
+        logger.warning("Idempotency store unavailable; response not recorded")
+
+
+def _scoped_key(scope: Scope, tenant: str, key: str) -> str:
+    raw = "\0".join([tenant, scope["method"], scope["path"], key])
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def _request_hasher(scope: Scope) -> hashlib._Hash:
+    hasher = hashlib.sha256()
+    for part in (scope["method"].encode(), scope["path"].encode(), scope.get("query_string", b"")):
+        hasher.update(part + b"\0")
+    return hasher
+
+
+def _has_body(scope: Scope) -> bool:
+    headers = Headers(scope=scope)
+    return "transfer-encoding" in headers or headers.get("content-length", "0") != "0"
+
+
+async def _hash_body(receive: Receive, hasher: hashlib._Hash) -> bool:
+    """Hash the request body as it arrives, keeping none of it; False if the client left."""
+    while True:
+        message = await receive()
+        if message["type"] != "http.request":
+            return False
+        hasher.update(message.get("body", b""))
+        if not message.get("more_body", False):
+            return True
+
+
+async def _replay(record: IdempotencyRecord, send: Send) -> None:
+    await send(
+        {
+            "type": "http.response.start",
+            "status": record.status,
+            "headers": [*record.headers, REPLAYED_HEADER],
+        }
+    )
+    await send({"type": "http.response.body", "body": record.body})
+
+
+async def _error(scope: Scope, receive: Receive, send: Send, status: int, detail: str) -> None:
+    rid = scope.get("state", {}).get("request_id")
+    headers = {"X-Request-ID": rid} if rid else {}
+    response = JSONResponse(status_code=status, content={"detail": detail}, headers=headers)
+    await response(scope, receive, send)
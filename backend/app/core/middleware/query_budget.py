@@ -0,0 +1,73 @@
+"""
+Per-request SQL budget middleware (pure ASGI).
+
+Counts the statements each request runs (app.core.metrics.query_budget),
+records them per route template, and logs a warning naming the route when a
+request runs more than DB_QUERY_BUDGET statements, or the same statement
+shape DB_QUERY_REPEAT_THRESHOLD times or more (likely an N+1 loop). Sits
+inside RequestIDMiddleware so the warning carries the request ID.
+"""
+
+from __future__ import annotations
+
+import logging
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.config.settings import settings
+from app.core.metrics.http import db_budget_warnings_total, db_statements_per_request
+from app.core.metrics.query_budget import QueryStats, track_request_queries
+from app.core.middleware.metrics import UNMATCHED_ROUTE
+
+logger = logging.getLogger(__name__)
+
+_MAX_LOGGED_SHAPE = 500
+
+
+class QueryBudgetMiddleware:
+    """Warn about requests that run too many, or too many identical, SQL statements."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with track_request_queries() as stats:
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                if stats.statements:
+                    _report(scope, stats)
+
+
+def _report(scope: Scope, stats: QueryStats) -> None:
+    route = getattr(scope.get("route"), "path", None) or UNMATCHED_ROUTE
+    method = scope["method"]
+    db_statements_per_request.observe((method, route), stats.statements)
+    if stats.exempt:
+        return
+
+    shape, repeats = stats.most_repeated() or ("", 0)
+    budget, threshold = settings.DB_QUERY_BUDGET, settings.DB_QUERY_REPEAT_THRESHOLD
+    if budget > 0 and stats.statements > budget:
+        reason = "budget"
+        message = "SQL budget exceeded: %s %s ran %d statements (budget %d)"
+        args = (method, route, stats.statements, budget)
+    elif threshold > 0 and repeats >= threshold:
+        reason = "repeated"
+        message = "Repeated SQL statement (N+1?): %s %s ran one statement shape %d times"
+        args = (method, route, repeats)
+    else:
+        return
+    db_budget_warnings_total.inc((method, route, reason))
+    logger.warning(
+        message + " db_ms=%.1f rows=%d; most repeated (%dx): %s",
+        *args,
+        stats.db_seconds * 1000,
+        stats.rows,
+        repeats,
+        shape[:_MAX_LOGGED_SHAPE],
+    )
@@ -0,0 +1,115 @@
+"""
+Rate limiting middleware (pure ASGI).
+
+Token buckets (app.core.security.rate_limit) per X-Tenant-ID and per client
+IP; a request must fit in both. Requests cost 1 token unless
+RATE_LIMIT_COSTS weighs their route ("POST /v1/auth/signup=5": bcrypt), so a
+client cannot saturate CPU-heavy endpoints while cheap reads stay
+available. Rejected requests get 429 with Retry-After. Internal endpoints
+(health, metrics) and health checks are not limited. When the shared
+backend (Redis) is unreachable requests are admitted.
+
+The client IP is the ASGI peer; behind a proxy run uvicorn with
+--proxy-headers and --forwarded-allow-ips so it is the real client.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.config.settings import settings
+from app.core.metrics.http import rate_limit_requests_total
+from app.core.security.rate_limit import Bucket, RateLimiter, rate_limiter
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_SKIP_PATHS = frozenset(["/v1/health", "/v1/auth/health"])
+RATE_LIMIT_SKIP_PREFIXES = ("/internal/",)
+_MAX_TENANT_KEY = 128
+
+
+def parse_route_costs(raw: str) -> dict[tuple[str, str], float]:
+    """Parse "METHOD /path=cost,..." settings strings; a path also covers its subpaths."""
+    costs: dict[tuple[str, str], float] = {}
+    for item in raw.split(","):
+        route, sep, value = item.strip().rpartition("=")
+        method, _, path = route.strip().partition(" ")
+        if sep and method and path:
+            costs[(method.upper(), path.strip().rstrip("/"))] = float(value)
+    return costs
+
+
+class RateLimitMiddleware:
+    """Reject requests over the tenant or client IP token bucket with 429."""
+
+    def __init__(self, app: ASGIApp, limiter: RateLimiter | None = None) -> None:
+        self.app = app
+        self.limiter = limiter if limiter is not None else rate_limiter
+        self.costs = parse_route_costs(settings.RATE_LIMIT_COSTS)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not settings.RATE_LIMIT_ENABLED:
+            await self.app(scope, receive, send)
+            return
+        path = scope.get("path", "")
+        if path in RATE_LIMIT_SKIP_PATHS or path.startswith(RATE_LIMIT_SKIP_PREFIXES):
+            await self.app(scope, receive, send)
+            return
+
+        buckets = _buckets(scope)
+        if not buckets:
+            await self.app(scope, receive, send)
+            return
+        try:
+            decision = await self.limiter.acquire(buckets, self._cost(scope["method"], path))
+        except Exception:  # noqa: BLE001 - admit rather than fail when the backend is down
+            rate_limit_requests_total.inc(("unavailable", ""))
+            logger.warning("Rate limiter backend unavailable; request admitted")
+            await self.app(scope, receive, send)
+            return
+
+        if decision.allowed:
+            rate_limit_requests_total.inc(("admitted", ""))
+            await self.app(scope, receive, send)
+            return
+
+        rate_limit_requests_total.inc(("rejected", decision.limited_by or ""))
+        headers = {"Retry-After": str(max(1, math.ceil(decision.retry_after)))}
+        rid = scope.get("state", {}).get("request_id")
+        if rid:
+            headers["X-Request-ID"] = rid
+        response = JSONResponse(
+            status_code=429, content={"detail": "Rate limit exceeded"}, headers=headers
+        )
+        await response(scope, receive, send)
+
+    def _cost(self, method: str, path: str) -> float:
+        for (cost_method, prefix), cost in self.costs.items():
+            if cost_method == method and (path == prefix or path.startswith(prefix + "/")):
+                return cost
+        return 1.0
+
+
+def _buckets(scope: Scope) -> list[Bucket]:
+    buckets: list[Bucket] = []
+    tenant = Headers(scope=scope).get("X-Tenant-ID")
+    if tenant and settings.RATE_LIMIT_TENANT_RATE > 0:
+        buckets.append(
+            Bucket(
+                "tenant",
+                "tenant:" + tenant[:_MAX_TENANT_KEY],
+                settings.RATE_LIMIT_TENANT_RATE,
+                settings.RATE_LIMIT_TENANT_BURST,
+            )
+        )
+    client = scope.get("client")
+    if client and settings.RATE_LIMIT_IP_RATE > 0:
+        buckets.append(
+            Bucket("ip", "ip:" + client[0], settings.RATE_LIMIT_IP_RATE, settings.RATE_LIMIT_IP_BURST)
+        )
+    return buckets
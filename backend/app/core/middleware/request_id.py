@@ -4,41 +4,49 @@ Request ID middleware for request tracking.
 If the incoming request has an ``X-Request-ID`` header, it is preserved.
 Otherwise a new UUID4 is generated. The final ID is attached to the response
 as ``X-Request-ID``. Also sets the logging context var for request_id-aware logs.
+
+Implemented as plain ASGI middleware so the response body is never buffered
+and the context var stays visible to the endpoint (no extra task hop).
 """
 
 from __future__ import annotations
 
 import uuid
-from typing import Callable
 
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from app.core.logging.setup import request_id_ctx
 
 
-class RequestIDMiddleware(BaseHTTPMiddleware):
+class RequestIDMiddleware:
     """Attach a stable X-Request-ID header to every request/response pair."""
 
     header_name: str = "X-Request-ID"
 
-    async def dispatch(
-        self,
-        request: Request,
-        call_next: Callable[[Request], Response],
-    ) -> Response:
-        request_id = request.headers.get(self.header_name)
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = Headers(scope=scope).get(self.header_name)
         if not request_id:
             request_id = str(uuid.uuid4())
 
-        request.state.request_id = request_id  # type: ignore[attr-defined]
+        # Same dict that backs request.state for downstream handlers.
+        scope.setdefault("state", {})["request_id"] = request_id
+
+        async def send_with_request_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers[self.header_name] = request_id
+            await send(message)
 
         token = request_id_ctx.set(request_id)
         try:
-            response = await call_next(request)
-            response.headers[self.header_name] = request_id
-            return response
+            await self.app(scope, receive, send_with_request_id)
         finally:
             request_id_ctx.reset(token)
-
-
@@ -7,41 +7,54 @@ endpoints (signup, health, whoami, and future login/verify/resend).
 
 from __future__ import annotations
 
-from typing import Callable
-
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.responses import JSONResponse, Response
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
 
 # Paths where X-Tenant-ID is NOT required (auth endpoints)
 # TODO: add /v1/auth/login, /v1/auth/verify, /v1/auth/resend when implemented
 TENANT_SKIP_PATHS = frozenset(["/v1/auth/signup", "/v1/auth/health", "/v1/auth/whoami"])
 
 # Paths that require X-Tenant-ID
-TENANT_REQUIRED_PATHS = frozenset(["/internal/tenant"])
+TENANT_REQUIRED_PATHS = frozenset(["/internal/tenant", "/v1/users/bulk"])
+
+# Path prefixes whose whole subtree requires X-Tenant-ID
+TENANT_REQUIRED_PREFIXES = ("/v1/datasets", "/v1/query", "/v1/jobs")
+
 
+def _requires_tenant(path: str) -> bool:
+    if path in TENANT_REQUIRED_PATHS:
+        return True
+    return any(path == p or path.startswith(p + "/") for p in TENANT_REQUIRED_PREFIXES)
 
-class TenantEnforcementMiddleware(BaseHTTPMiddleware):
+
+class TenantEnforcementMiddleware:
     """Enforce X-Tenant-ID header for tenant-required routes only."""
 
-    async def dispatch(
-        self,
-        request: Request,
-        call_next: Callable[[Request], Response],
-    ) -> Response:
-        path = request.scope.get("path", "")
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        path = scope.get("path", "")
 
         if path in TENANT_SKIP_PATHS:
-            return await call_next(request)
+            await self.app(scope, receive, send)
+            return
 
-        if path in TENANT_REQUIRED_PATHS:
-            if not request.headers.get("X-Tenant-ID"):
-                rid = getattr(request.state, "request_id", None)
+        if _requires_tenant(path):
+            if not Headers(scope=scope).get("X-Tenant-ID"):
+                rid = scope.get("state", {}).get("request_id")
                 headers = {"X-Request-ID": rid} if rid else {}
-                return JSONResponse(
+                response = JSONResponse(
                     status_code=400,
                     content={"detail": "X-Tenant-ID header required"},
                     headers=headers,
                 )
+                await response(scope, receive, send)
+                return
 
-        return await call_next(request)
+        await self.app(scope, receive, send)
@@ -5,15 +5,11 @@ from __future__ import annotations
 import secrets
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache.tenant_cache import tenant_cache
 from app.core.errors.exceptions import BadRequestError
-from app.core.security.password import hash_password
-from app.db.models.tenant import Tenant
-from app.db.repos.tenant_repo import (
-    create_tenant,
-    get_tenant_by_primary_domain,
-    tenant_slug_exists,
-)
-from app.db.repos.user_repo import create_user, get_user_by_tenant_email
+from app.core.security.password import hash_password_async
+from app.db.repos.tenant_repo import upsert_tenant_by_domain
+from app.db.repos.user_repo import insert_user_if_absent
 
 PUBLIC_EMAIL_DOMAINS = frozenset([
     "gmail.com",
@@ -49,9 +45,13 @@ async def signup(
     password: str,
 ) -> None:
     """
-    Signup: create tenant if new domain, add user to tenant.
+    Signup: create tenant if new domain, add user to tenant, commit.
     Returns None on success. Raises BadRequestError for public domains.
     Same response for new user or existing user (no enumeration).
+
+    Two statements, then the commit: tenant get-or-create, and the user
+    insert-if-absent (which also sets the tenant for row-level security).
+    Concurrent signups for the same domain or email converge on the same rows.
     """
     normalized_email = _normalize_email(email)
     domain = _extract_domain(normalized_email)
@@ -59,32 +59,27 @@ async def signup(
     if domain in PUBLIC_EMAIL_DOMAINS:
         raise BadRequestError("Please use your work email address.")
 
-    tenant = await get_tenant_by_primary_domain(session, domain)
-
-    if tenant is None:
-        base_slug = _make_tenant_slug(domain)
-        slug = base_slug
-        while await tenant_slug_exists(session, slug):
-            suffix = secrets.token_hex(3)
-            slug = f"{base_slug}_{suffix}"
+    # Hash before touching the DB so no row lock is held during bcrypt.
+    # Always hashing also keeps timing identical for new and existing users.
+    password_hash = await hash_password_async(password)
 
-        tenant = await create_tenant(
-            session,
-            slug=slug,
-            name=domain,
-            primary_domain=domain,
-        )
-
-    existing_user = await get_user_by_tenant_email(
-        session, str(tenant.id), normalized_email
+    base_slug = _make_tenant_slug(domain)
+    tenant, created = await upsert_tenant_by_domain(
+        session,
+        slug=base_slug,
+        fallback_slug=f"{base_slug}_{secrets.token_hex(3)}",
+        name=domain,
+        primary_domain=domain,
     )
-    if existing_user is not None:
-        return
 
-    password_hash = hash_password(password)
-    await create_user(
+    await insert_user_if_absent(
         session,
         tenant_id=str(tenant.id),
         email=normalized_email,
         password_hash=password_hash,
     )
+    await session.commit()
+    if created:
+        # Only now is the row visible to other sessions; invalidating earlier would let a
+        # concurrent lookup re-cache the slug as unknown.
+        await tenant_cache.invalidate(tenant.slug)
@@ -0,0 +1,33 @@
+"""
+Bounded executor for CPU-heavy password hashing.
+
+bcrypt at cost 12 takes ~250 ms; running it on the event loop stalls every
+other request on the worker. Work is handed to a dedicated thread or process
+pool instead (app.core.concurrency.bounded_executor): once its queue is full,
+callers fail fast with ServiceUnavailableError (503) rather than piling up
+behind the pool.
+"""
+
+from __future__ import annotations
+
+from app.core.concurrency.bounded_executor import BoundedExecutor
+from app.core.config.settings import settings
+from app.core.metrics.registry import numeric_stats, registry
+
+
+class HashExecutor(BoundedExecutor):
+    """Bounded pool for password hashing (worker threads are named hash_*)."""
+
+    def __init__(self, *, kind: str = "thread", max_workers: int = 4, max_queue: int = 64) -> None:
+        super().__init__(kind=kind, max_workers=max_workers, max_queue=max_queue, name="hash")
+
+
+password_hash_executor = HashExecutor(
+    kind=settings.PASSWORD_HASH_EXECUTOR,
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_QUEUE_SIZE,
+)
+registry.register_collector(
+    "Password hashing executor stats (see /internal/password-hasher)",
+    lambda: numeric_stats("ambient_password_hash", password_hash_executor.stats()),
+)
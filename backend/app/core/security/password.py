@@ -2,11 +2,38 @@
 
 from __future__ import annotations
 
-from passlib.context import CryptContext
+from functools import lru_cache
+from typing import TYPE_CHECKING
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=12, bcrypt__ident="2b",)
+from app.core.security.hash_executor import password_hash_executor
+
+if TYPE_CHECKING:
+    from passlib.context import CryptContext
+
+
+@lru_cache(maxsize=1)
+def get_pwd_context() -> "CryptContext":
+    """Build the CryptContext on first use (keeps passlib out of app startup)."""
+    from passlib.context import CryptContext
+
+    return CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=12, bcrypt__ident="2b",)
 
 
 def hash_password(password: str) -> str:
     """Hash a password; never log or return the result to clients."""
-    return pwd_context.hash(password)
+    return get_pwd_context().hash(password)
+
+
+def verify_password(password: str, password_hash: str) -> bool:
+    """Check a password against a stored hash (constant-time compare in passlib)."""
+    return get_pwd_context().verify(password, password_hash)
+
+
+async def hash_password_async(password: str) -> str:
+    """hash_password on the bounded hashing executor (keeps the event loop free)."""
+    return await password_hash_executor.run(hash_password, password)
+
+
+async def verify_password_async(password: str, password_hash: str) -> bool:
+    """verify_password on the bounded hashing executor (for the login path)."""
+    return await password_hash_executor.run(verify_password, password, password_hash)
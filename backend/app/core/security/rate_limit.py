@@ -0,0 +1,135 @@
+"""
+Token-bucket rate limiting for RateLimitMiddleware.
+
+Each request takes `cost` tokens from every bucket that applies to it (its
+tenant, its client IP). A bucket holds up to `burst` tokens and refills at
+`rate` tokens per second. A request is admitted only if all of its buckets
+have the tokens; then all are debited, otherwise none is, and the caller is
+told how long until the fullest-needed bucket would admit it (Retry-After).
+
+Two backends with one interface:
+1. MemoryRateLimiter: per worker process, so the effective limit is the
+   configured one times the number of workers. Least recently used buckets
+   beyond RATE_LIMIT_MAX_KEYS are dropped (they come back full).
+2. RedisRateLimiter: shared by all workers/pods; one Lua script checks and
+   debits all buckets atomically using the Redis server clock.
+"""
+
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Protocol
+
+from app.core.cache.redis_client import get_redis
+from app.core.config.settings import settings
+
+_KEY_PREFIX = "ratelimit:"
+
+
+@dataclass(frozen=True)
+class Bucket:
+    name: str  # metric label: "tenant" or "ip"
+    key: str
+    rate: float  # tokens per second
+    burst: float  # capacity
+
+
+@dataclass(frozen=True)
+class RateDecision:
+    allowed: bool
+    retry_after: float = 0.0  # seconds
+    limited_by: str | None = None
+
+
+class RateLimiter(Protocol):
+    async def acquire(self, buckets: list[Bucket], cost: float) -> RateDecision: ...
+
+
+class MemoryRateLimiter:
+    def __init__(self, *, max_keys: int, clock: Callable[[], float] = time.monotonic) -> None:
+        self.max_keys = max_keys
+        self._clock = clock
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()  # tokens, updated
+
+    async def acquire(self, buckets: list[Bucket], cost: float) -> RateDecision:
+        now = self._clock()
+        levels: list[float] = []
+        wait, limited_by = 0.0, None
+        for bucket in buckets:
+            tokens, updated = self._buckets.get(bucket.key, (bucket.burst, now))
+            tokens = min(bucket.burst, tokens + (now - updated) * bucket.rate)
+            levels.append(tokens)
+            need = min(cost, bucket.burst)  # a cost above the burst still passes a full bucket
+            if tokens < need and (need - tokens) / bucket.rate > wait:
+                wait, limited_by = (need - tokens) / bucket.rate, bucket.name
+        if limited_by is not None:
+            return RateDecision(False, wait, limited_by)
+
+        for bucket, tokens in zip(buckets, levels):
+            self._buckets[bucket.key] = (tokens - min(cost, bucket.burst), now)
+            self._buckets.move_to_end(bucket.key)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return RateDecision(True)
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+# KEYS: bucket keys; ARGV: cost, then rate and burst per key.
+# Returns {index of the limiting bucket or 0, seconds to wait as a string}.
+_ACQUIRE_SCRIPT = """
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) + tonumber(now_parts[2]) / 1000000
+local cost = tonumber(ARGV[1])
+local levels = {}
+local wait, limited = 0, 0
+for i, key in ipairs(KEYS) do
+    local rate, burst = tonumber(ARGV[2 * i]), tonumber(ARGV[2 * i + 1])
+    local state = redis.call('HMGET', key, 'tokens', 'ts')
+    local tokens = tonumber(state[1]) or burst
+    local ts = tonumber(state[2]) or now
+    tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+    levels[i] = tokens
+    local need = math.min(cost, burst)
+    if tokens < need and (need - tokens) / rate > wait then
+        wait, limited = (need - tokens) / rate, i
+    end
+end
+if limited == 0 then
+    for i, key in ipairs(KEYS) do
+        local rate, burst = tonumber(ARGV[2 * i]), tonumber(ARGV[2 * i + 1])
+        redis.call('HSET', key, 'tokens', levels[i] - math.min(cost, burst), 'ts', now)
+        redis.call('PEXPIRE', key, math.ceil(burst / rate * 1000))
+    end
+end
+return {limited, tostring(wait)}
+"""
+
+
+class RedisRateLimiter:
+    def __init__(self, redis: Any) -> None:
+        self._redis = redis
+
+    async def acquire(self, buckets: list[Bucket], cost: float) -> RateDecision:
+        args: list[float] = [cost]
+        for bucket in buckets:
+            args += [bucket.rate, bucket.burst]
+        limited, wait = await self._redis.eval(
+            _ACQUIRE_SCRIPT, len(buckets), *(_KEY_PREFIX + b.key for b in buckets), *args
+        )
+        if int(limited) == 0:
+            return RateDecision(True)
+        return RateDecision(False, float(wait), buckets[int(limited) - 1].name)
+
+
+def _build_limiter() -> RateLimiter:
+    redis = get_redis() if settings.RATE_LIMIT_SHARED else None
+    if redis is not None:
+        return RedisRateLimiter(redis)
+    return MemoryRateLimiter(max_keys=settings.RATE_LIMIT_MAX_KEYS)
+
+
+rate_limiter = _build_limiter()
@@ -2,8 +2,11 @@
 
 from __future__ import annotations
 
+from app.db.models.dataset import Dataset
+from app.db.models.dataset_rollup import DatasetRollup
+from app.db.models.job import Job
 from app.db.models.tenant import Tenant
 from app.db.models.user import User
 
-__all__ = ["Tenant", "User"]
+__all__ = ["Dataset", "DatasetRollup", "Job", "Tenant", "User"]
 
@@ -0,0 +1,72 @@
+"""Dataset rollup ORM model."""
+
+from __future__ import annotations
+
+import uuid
+from datetime import datetime
+
+from sqlalchemy import (
+    BigInteger,
+    DateTime,
+    ForeignKey,
+    Integer,
+    String,
+    UniqueConstraint,
+    func,
+)
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class DatasetRollup(Base):
+    """
+    Declared time-bucketed aggregate of a dataset (see app.features.datasets.rollups).
+
+    version is the dataset version the rollup file covers; it is advanced in
+    the same transaction that commits each new part. Lookups by dataset use
+    the (dataset_id, name) unique index.
+    """
+
+    __tablename__ = "dataset_rollups"
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        primary_key=True,
+        default=uuid.uuid4,
+    )
+    tenant_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("tenants.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    dataset_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("datasets.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    name: Mapped[str] = mapped_column(String(length=255), nullable=False)
+    time_column: Mapped[str] = mapped_column(String(length=255), nullable=False)
+    granularity: Mapped[str] = mapped_column(String(length=16), nullable=False)
+    dimensions: Mapped[list[str]] = mapped_column(JSONB, nullable=False, default=list)
+    measures: Mapped[list[str]] = mapped_column(JSONB, nullable=False, default=list)
+    version: Mapped[int] = mapped_column(Integer, nullable=False)
+    row_count: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    byte_size: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False,
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now(),
+        nullable=False,
+    )
+
+    __table_args__ = (
+        UniqueConstraint("dataset_id", "name", name="uq_dataset_rollups_dataset_name"),
+    )
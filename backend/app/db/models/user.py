@@ -13,7 +13,13 @@ from app.db.base import Base
 
 
 class User(Base):
-    """Tenant-scoped user."""
+    """
+    Tenant-scoped user.
+
+    Hash-partitioned by tenant_id (the partition key is part of the primary
+    key) and under row-level security: rows are visible only to transactions
+    whose app.tenant_id is their tenant (app.db.session.set_session_tenant).
+    """
 
     __tablename__ = "users"
 
@@ -25,8 +31,7 @@ class User(Base):
     tenant_id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
         ForeignKey("tenants.id", ondelete="CASCADE"),
-        nullable=False,
-        index=True,
+        primary_key=True,
     )
     email: Mapped[str] = mapped_column(String(length=255), nullable=False, index=True)
     password_hash: Mapped[str] = mapped_column(String(length=255), nullable=False)
@@ -48,4 +53,7 @@ class User(Base):
         nullable=True,
     )
 
-    __table_args__ = (UniqueConstraint("tenant_id", "email", name="uq_users_tenant_email"),)
+    __table_args__ = (
+        UniqueConstraint("tenant_id", "email", name="uq_users_tenant_email"),
+        {"postgresql_partition_by": "HASH (tenant_id)"},
+    )
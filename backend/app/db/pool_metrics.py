@@ -0,0 +1,123 @@
+"""
+Connection pool instrumentation.
+
+Pool events (connect/checkout/checkin/invalidate) feed simple counters, and
+InstrumentedAsyncPool times each checkout so pool exhaustion shows up as
+waits and checkout latency instead of mystery p99 spikes.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+
+class PoolMetrics:
+    """Process-wide pool counters (updated from pool events/checkouts)."""
+
+    def __init__(self) -> None:
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidations = 0
+        self.waits = 0
+        self.timeouts = 0
+        self.checkout_seconds_total = 0.0
+        self.checkout_seconds_max = 0.0
+
+    def record_checkout(self, seconds: float, waited: bool) -> None:
+        self.checkout_seconds_total += seconds
+        self.checkout_seconds_max = max(self.checkout_seconds_max, seconds)
+        if waited:
+            self.waits += 1
+
+    def snapshot(self) -> dict[str, Any]:
+        checkouts = self.checkouts or 1
+        return {
+            "connects": self.connects,
+            "checkouts": self.checkouts,
+            "checkins": self.checkins,
+            "invalidations": self.invalidations,
+            "waits": self.waits,
+            "timeouts": self.timeouts,
+            "checkout_ms_avg": round(self.checkout_seconds_total / checkouts * 1000, 3),
+            "checkout_ms_max": round(self.checkout_seconds_max * 1000, 3),
+        }
+
+
+pool_metrics = PoolMetrics()
+replica_pool_metrics = PoolMetrics()
+
+
+class InstrumentedAsyncPool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that times checkouts and counts waits/timeouts."""
+
+    # Keep pool log records under the "sqlalchemy" logger (WARN by default).
+    _sqla_logger_namespace = "sqlalchemy.pool.impl.AsyncAdaptedQueuePool"
+    metrics = pool_metrics
+
+    def _do_get(self) -> Any:
+        # Pool already at size + max_overflow: this checkout has to wait.
+        waited = self._max_overflow > -1 and self.checkedout() >= self.size() + self._max_overflow
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except PoolTimeoutError:
+            self.metrics.timeouts += 1
+            raise
+        self.metrics.record_checkout(time.perf_counter() - start, waited)
+        return conn
+
+
+class InstrumentedReplicaAsyncPool(InstrumentedAsyncPool):
+    """Read replica pool; counted separately from the primary's."""
+
+    metrics = replica_pool_metrics
+
+
+def install_pool_events(engine: Engine) -> None:
+    """Attach counter listeners to the engine's pool (pass engine.sync_engine)."""
+    metrics = _metrics_for(engine.pool)
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_conn: Any, record: Any) -> None:
+        metrics.connects += 1
+
+    @event.listens_for(engine, "checkout")
+    def _on_checkout(dbapi_conn: Any, record: Any, proxy: Any) -> None:
+        metrics.checkouts += 1
+
+    @event.listens_for(engine, "checkin")
+    def _on_checkin(dbapi_conn: Any, record: Any) -> None:
+        metrics.checkins += 1
+
+    @event.listens_for(engine, "invalidate")
+    def _on_invalidate(dbapi_conn: Any, record: Any, exc: Any) -> None:
+        metrics.invalidations += 1
+
+
+def _metrics_for(pool: Any) -> PoolMetrics:
+    return getattr(pool, "metrics", pool_metrics)
+
+
+def pool_status(engine: Engine) -> dict[str, Any]:
+    """Live pool gauges plus accumulated counters."""
+    pool = engine.pool
+    status: dict[str, Any] = {"pool_class": type(pool).__name__}
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        status.update(
+            {
+                "size": pool.size(),
+                "max_overflow": pool._max_overflow,
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": pool.overflow(),
+            }
+        )
+    status.update(_metrics_for(pool).snapshot())
+    return status
@@ -0,0 +1,62 @@
+"""
+DB statement timings via engine cursor events.
+
+Statements are labelled by their leading SQL verb (SELECT/INSERT/...), which
+keeps label cardinality fixed regardless of query shape. Each statement is
+also accounted to the current request (app.core.metrics.query_budget).
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.metrics.registry import registry
+from app.core.metrics.query_budget import record_statement
+
+db_statement_duration_seconds = registry.histogram(
+    "ambient_db_statement_duration_seconds",
+    "DB statement execution time by SQL verb",
+    ("verb",),
+)
+db_statement_errors_total = registry.counter(
+    "ambient_db_statement_errors_total",
+    "DB statements that raised, by SQL verb",
+    ("verb",),
+)
+
+_KNOWN_VERBS = frozenset(
+    ["SELECT", "INSERT", "UPDATE", "DELETE", "WITH", "BEGIN", "COMMIT", "ROLLBACK", "SET"]
+)
+
+
+def statement_verb(statement: str) -> str:
+    head = statement.lstrip()[:16].split(None, 1)
+    verb = head[0].upper() if head else ""
+    return verb if verb in _KNOWN_VERBS else "OTHER"
+
+
+def install_query_metrics(engine: Engine) -> None:
+    """Attach timing listeners to a (sync) engine; pass engine.sync_engine for async."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn: Any, cursor: Any, statement: str, params: Any, context: Any, many: bool) -> None:
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn: Any, cursor: Any, statement: str, params: Any, context: Any, many: bool) -> None:
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        db_statement_duration_seconds.observe((statement_verb(statement),), elapsed)
+        record_statement(statement, elapsed, cursor.rowcount)
+
+    @event.listens_for(engine, "handle_error")
+    def _on_error(exception_context: Any) -> None:
+        conn = exception_context.connection
+        stack = conn.info.get("query_start") if conn is not None else None
+        if stack:
+            stack.pop()
+        statement = exception_context.statement or ""
+        db_statement_errors_total.inc((statement_verb(statement),))
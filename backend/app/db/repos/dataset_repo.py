@@ -0,0 +1,152 @@
+"""Repository helpers for dataset metadata."""
+
+from __future__ import annotations
+
+import uuid
+from datetime import datetime
+from typing import Any, Optional, Sequence
+
+from sqlalchemy import Row, select
+from sqlalchemy.orm import undefer
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models.dataset import Dataset
+
+
+async def get_dataset(
+    session: AsyncSession, tenant_id: uuid.UUID, dataset_id: uuid.UUID
+) -> Optional[Dataset]:
+    """Fetch a dataset by id within a tenant, or None if not found."""
+    stmt = select(Dataset).where(Dataset.tenant_id == tenant_id).where(Dataset.id == dataset_id)
+    result = await session.execute(stmt)
+    return result.scalar_one_or_none()
+
+
+async def get_dataset_by_name(
+    session: AsyncSession, tenant_id: uuid.UUID, name: str
+) -> Optional[Dataset]:
+    """Fetch a dataset by name within a tenant, or None if not found."""
+    stmt = select(Dataset).where(Dataset.tenant_id == tenant_id).where(Dataset.name == name)
+    result = await session.execute(stmt)
+    return result.scalar_one_or_none()
+
+
+async def list_datasets(session: AsyncSession, tenant_id: uuid.UUID) -> list[Dataset]:
+    """All datasets of a tenant, newest first."""
+    stmt = (
+        select(Dataset)
+        .where(Dataset.tenant_id == tenant_id)
+        .order_by(Dataset.created_at.desc(), Dataset.name)
+    )
+    result = await session.execute(stmt)
+    return list(result.scalars())
+
+
+async def list_dataset_stamps(
+    session: AsyncSession, tenant_id: uuid.UUID
+) -> dict[uuid.UUID, datetime]:
+    """updated_at of each of the tenant's committed datasets, by id."""
+    stmt = (
+        select(Dataset.id, Dataset.updated_at)
+        .where(Dataset.tenant_id == tenant_id)
+        .where(Dataset.version > 0)
+    )
+    result = await session.execute(stmt)
+    return {dataset_id: updated_at for dataset_id, updated_at in result}
+
+
+async def list_catalog_rows(
+    session: AsyncSession, tenant_id: uuid.UUID, dataset_ids: Sequence[uuid.UUID]
+) -> list[Row[Any]]:
+    """id, name, description, columns and updated_at of the given committed datasets."""
+    stmt = (
+        select(
+            Dataset.id, Dataset.name, Dataset.description, Dataset.columns, Dataset.updated_at
+        )
+        .where(Dataset.tenant_id == tenant_id)
+        .where(Dataset.id.in_(dataset_ids))
+        .where(Dataset.version > 0)
+    )
+    result = await session.execute(stmt)
+    return list(result)
+
+
+async def create_dataset(
+    session: AsyncSession,
+    *,
+    tenant_id: uuid.UUID,
+    name: str,
+    description: str | None,
+    source_format: str,
+) -> Dataset:
+    """Insert an empty dataset in the ``ingesting`` state (version 0, no parts)."""
+    dataset = Dataset(
+        tenant_id=tenant_id,
+        name=name,
+        description=description,
+        source_format=source_format,
+        status="ingesting",
+        columns=[],
+        row_count=0,
+        byte_size=0,
+        version=0,
+    )
+    session.add(dataset)
+    await session.flush()
+    return dataset
+
+
+async def lock_dataset(
+    session: AsyncSession, tenant_id: uuid.UUID, dataset_id: uuid.UUID
+) -> Optional[Dataset]:
+    """SELECT ... FOR UPDATE the dataset row, profile included (serializes part commits)."""
+    stmt = (
+        select(Dataset)
+        .options(undefer(Dataset.profile))
+        .where(Dataset.tenant_id == tenant_id)
+        .where(Dataset.id == dataset_id)
+        .with_for_update()
+        .execution_options(populate_existing=True)
+    )
+    result = await session.execute(stmt)
+    return result.scalar_one_or_none()
+
+
+async def get_dataset_with_profile(
+    session: AsyncSession, tenant_id: uuid.UUID, dataset_id: uuid.UUID
+) -> Optional[Dataset]:
+    """Like get_dataset, with the deferred profile column loaded."""
+    stmt = (
+        select(Dataset)
+        .options(undefer(Dataset.profile))
+        .where(Dataset.tenant_id == tenant_id)
+        .where(Dataset.id == dataset_id)
+    )
+    result = await session.execute(stmt)
+    return result.scalar_one_or_none()
+
+
+async def record_part(
+    session: AsyncSession,
+    dataset: Dataset,
+    *,
+    rows: int,
+    byte_size: int,
+    columns: list[dict[str, Any]],
+    profile: dict[str, Any] | None,
+) -> Dataset:
+    """Account for a newly committed part file on a locked dataset row."""
+    dataset.version += 1
+    dataset.row_count += rows
+    dataset.byte_size += byte_size
+    dataset.columns = columns
+    dataset.profile = profile
+    dataset.status = "ready"
+    await session.flush()
+    return dataset
+
+
+async def delete_dataset(session: AsyncSession, dataset: Dataset) -> None:
+    """Delete a dataset row (part files are removed by the caller)."""
+    await session.delete(dataset)
+    await session.flush()
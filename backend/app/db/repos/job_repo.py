@@ -0,0 +1,207 @@
+"""Repository helpers for background jobs."""
+
+from __future__ import annotations
+
+import uuid
+from datetime import datetime
+from typing import Any, Optional
+
+from sqlalchemy import Text, cast, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models.job import Job
+
+# NOTIFY channel carrying job state changes (see app.features.jobs.events).
+JOB_EVENTS_CHANNEL = "job_events"
+
+
+async def create_job(
+    session: AsyncSession,
+    *,
+    tenant_id: uuid.UUID,
+    kind: str,
+    payload: dict[str, Any],
+    request_id: str | None,
+) -> Job:
+    job = Job(
+        tenant_id=tenant_id,
+        kind=kind,
+        status="queued",
+        payload=payload,
+        progress=0.0,
+        cancel_requested=False,
+        attempts=0,
+        request_id=request_id,
+    )
+    session.add(job)
+    await session.flush()
+    return job
+
+
+async def get_job(
+    session: AsyncSession, tenant_id: uuid.UUID, job_id: uuid.UUID
+) -> Optional[Job]:
+    """Fetch a job by id within a tenant, or None if not found."""
+    stmt = select(Job).where(Job.tenant_id == tenant_id).where(Job.id == job_id)
+    result = await session.execute(stmt)
+    return result.scalar_one_or_none()
+
+
+async def claim_next_job(session: AsyncSession, worker_id: str) -> Optional[Job]:
+    """
+    Mark the oldest queued job as running for this worker and return it.
+
+    SKIP LOCKED lets many workers poll concurrently without blocking on, or
+    double-claiming, the same row. Caller commits.
+    """
+    stmt = (
+        select(Job)
+        .where(Job.status == "queued")
+        .order_by(Job.created_at)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+    )
+    job = (await session.execute(stmt)).scalar_one_or_none()
+    if job is None:
+        return None
+    job.status = "running"
+    job.worker_id = worker_id
+    job.attempts += 1
+    job.started_at = func.now()
+    job.heartbeat_at = func.now()
+    await session.flush()
+    await notify_job_events(session, [job.id])
+    await session.refresh(job)
+    return job
+
+
+async def update_progress(
+    session: AsyncSession, job_id: uuid.UUID, progress: float | None, message: str | None
+) -> None:
+    """progress=None keeps the stored progress and replaces only the message."""
+    values: dict[str, Any] = {"progress_message": message, "heartbeat_at": func.now()}
+    if progress is not None:
+        values["progress"] = progress
+    stmt = update(Job).where(Job.id == job_id).where(Job.status == "running").values(**values)
+    if (await session.execute(stmt)).rowcount:
+        await notify_job_events(session, [job_id])
+
+
+async def touch_jobs(session: AsyncSession, job_ids: list[uuid.UUID]) -> None:
+    """Refresh heartbeat_at of running jobs (one statement)."""
+    if not job_ids:
+        return
+    stmt = (
+        update(Job)
+        .where(Job.id.in_(job_ids))
+        .where(Job.status == "running")
+        .values(heartbeat_at=func.now())
+    )
+    await session.execute(stmt)
+
+
+async def get_cancel_requested(session: AsyncSession, job_ids: list[uuid.UUID]) -> set[uuid.UUID]:
+    if not job_ids:
+        return set()
+    stmt = select(Job.id).where(Job.id.in_(job_ids)).where(Job.cancel_requested.is_(True))
+    result = await session.execute(stmt)
+    return set(result.scalars())
+
+
+async def finish_job(
+    session: AsyncSession,
+    job_id: uuid.UUID,
+    *,
+    status: str,
+    result: dict[str, Any] | None = None,
+    error: str | None = None,
+) -> None:
+    values: dict[str, Any] = {
+        "status": status,
+        "result": result,
+        "error": error,
+        "finished_at": func.now(),
+    }
+    if status == "succeeded":
+        values["progress"] = 1.0
+    stmt = update(Job).where(Job.id == job_id).where(Job.status == "running").values(**values)
+    if (await session.execute(stmt)).rowcount:
+        await notify_job_events(session, [job_id])
+
+
+async def request_cancel(session: AsyncSession, job: Job) -> None:
+    """Cancel a queued job outright; flag a running one for its worker."""
+    queued = (
+        update(Job)
+        .where(Job.id == job.id)
+        .where(Job.status == "queued")
+        .values(status="cancelled", cancel_requested=True, finished_at=func.now())
+    )
+    if not (await session.execute(queued)).rowcount:
+        running = (
+            update(Job)
+            .where(Job.id == job.id)
+            .where(Job.status == "running")
+            .values(cancel_requested=True)
+        )
+        await session.execute(running)
+    await notify_job_events(session, [job.id])
+
+
+async def requeue_stale_jobs(
+    session: AsyncSession, *, stale_before: datetime, max_attempts: int
+) -> tuple[int, int]:
+    """
+    Recover running jobs whose worker stopped heartbeating: requeue them, or
+    fail them once max_attempts is reached. Returns (requeued, failed).
+    """
+    stale = (Job.status == "running") & (Job.heartbeat_at < stale_before)
+    cancelled = await session.execute(
+        update(Job)
+        .where(stale & Job.cancel_requested.is_(True))
+        .values(status="cancelled", finished_at=func.now())
+        .returning(Job.id)
+    )
+    failed = await session.execute(
+        update(Job)
+        .where(stale & (Job.attempts >= max_attempts))
+        .values(status="failed", error="Worker stopped responding", finished_at=func.now())
+        .returning(Job.id)
+    )
+    requeued = await session.execute(
+        update(Job)
+        .where(stale & (Job.attempts < max_attempts))
+        .values(status="queued", worker_id=None, progress=0.0, progress_message=None)
+        .returning(Job.id)
+    )
+    failed_ids, requeued_ids = list(failed.scalars()), list(requeued.scalars())
+    await notify_job_events(session, [*cancelled.scalars(), *failed_ids, *requeued_ids])
+    return len(requeued_ids), len(failed_ids)
+
+
+async def notify_job_events(session: AsyncSession, job_ids: list[uuid.UUID]) -> None:
+    """
+    NOTIFY JOB_EVENTS_CHANNEL with the current state of each job. Postgres
+    delivers notifications when the transaction commits (and drops them on
+    rollback), so listeners never see uncommitted state.
+    """
+    if not job_ids:
+        return
+    payload = func.json_build_object(
+        "id",
+        Job.id,
+        "tenant_id",
+        Job.tenant_id,
+        "status",
+        Job.status,
+        "progress",
+        Job.progress,
+        "progress_message",
+        Job.progress_message,
+        "cancel_requested",
+        Job.cancel_requested,
+    )
+    stmt = select(func.pg_notify(JOB_EVENTS_CHANNEL, cast(payload, Text))).where(
+        Job.id.in_(job_ids)
+    )
+    await session.execute(stmt)
@@ -0,0 +1,103 @@
+"""Repository helpers for dataset rollups."""
+
+from __future__ import annotations
+
+import uuid
+from typing import Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models.dataset_rollup import DatasetRollup
+
+
+async def list_rollups(
+    session: AsyncSession, tenant_id: uuid.UUID, dataset_id: uuid.UUID
+) -> list[DatasetRollup]:
+    """Rollups of a dataset, by name."""
+    stmt = (
+        select(DatasetRollup)
+        .where(DatasetRollup.tenant_id == tenant_id)
+        .where(DatasetRollup.dataset_id == dataset_id)
+        .order_by(DatasetRollup.name)
+    )
+    result = await session.execute(stmt)
+    return list(result.scalars())
+
+
+async def list_rollups_by_size(
+    session: AsyncSession, tenant_id: uuid.UUID, dataset_id: uuid.UUID
+) -> list[DatasetRollup]:
+    """Rollups of a dataset, smallest first (the order queries try them in)."""
+    stmt = (
+        select(DatasetRollup)
+        .where(DatasetRollup.tenant_id == tenant_id)
+        .where(DatasetRollup.dataset_id == dataset_id)
+        .order_by(DatasetRollup.row_count, DatasetRollup.name)
+    )
+    result = await session.execute(stmt)
+    return list(result.scalars())
+
+
+async def get_rollup(
+    session: AsyncSession, tenant_id: uuid.UUID, dataset_id: uuid.UUID, rollup_id: uuid.UUID
+) -> Optional[DatasetRollup]:
+    stmt = (
+        select(DatasetRollup)
+        .where(DatasetRollup.tenant_id == tenant_id)
+        .where(DatasetRollup.dataset_id == dataset_id)
+        .where(DatasetRollup.id == rollup_id)
+    )
+    result = await session.execute(stmt)
+    return result.scalar_one_or_none()
+
+
+async def create_rollup(
+    session: AsyncSession,
+    *,
+    rollup_id: uuid.UUID,
+    tenant_id: uuid.UUID,
+    dataset_id: uuid.UUID,
+    name: str,
+    time_column: str,
+    granularity: str,
+    dimensions: list[str],
+    measures: list[str],
+    version: int,
+    row_count: int,
+    byte_size: int,
+) -> DatasetRollup:
+    """Insert a rollup whose file for ``version`` is already written."""
+    rollup = DatasetRollup(
+        id=rollup_id,
+        tenant_id=tenant_id,
+        dataset_id=dataset_id,
+        name=name,
+        time_column=time_column,
+        granularity=granularity,
+        dimensions=dimensions,
+        measures=measures,
+        version=version,
+        row_count=row_count,
+        byte_size=byte_size,
+    )
+    session.add(rollup)
+    await session.flush()
+    return rollup
+
+
+async def record_rollup_version(
+    session: AsyncSession, rollup: DatasetRollup, *, version: int, row_count: int, byte_size: int
+) -> DatasetRollup:
+    """Point a rollup at its file for a new dataset version."""
+    rollup.version = version
+    rollup.row_count = row_count
+    rollup.byte_size = byte_size
+    await session.flush()
+    return rollup
+
+
+async def delete_rollup(session: AsyncSession, rollup: DatasetRollup) -> None:
+    """Delete a rollup row (its files are removed by the caller)."""
+    await session.delete(rollup)
+    await session.flush()
@@ -3,9 +3,11 @@
 from __future__ import annotations
 
 import secrets
+import uuid
 from typing import Optional
 
-from sqlalchemy import select
+from sqlalchemy import case, exists, select, union_all
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.models.tenant import Tenant
@@ -41,9 +43,60 @@ async def create_tenant(
     name: str,
     primary_domain: str,
 ) -> Tenant:
-    """Create a new tenant. Caller must ensure slug uniqueness."""
+    """
+    Create a new tenant. Caller must ensure slug uniqueness.
+
+    The caller must ``tenant_cache.invalidate(slug)`` after committing: done
+    before the commit, a concurrent lookup could still miss the row and
+    re-cache the slug as unknown.
+    """
     tenant = Tenant(slug=slug, name=name, primary_domain=primary_domain)
     session.add(tenant)
     await session.flush()
     return tenant
 
+
+async def upsert_tenant_by_domain(
+    session: AsyncSession,
+    *,
+    slug: str,
+    fallback_slug: str,
+    name: str,
+    primary_domain: str,
+) -> tuple[Tenant, bool]:
+    """
+    Get-or-create the tenant owning primary_domain, in one round trip.
+
+    INSERT ... ON CONFLICT (primary_domain) DO NOTHING RETURNING, unioned
+    with a SELECT of the existing row when nothing was inserted, so an
+    existing tenant is neither locked nor rewritten. Only when a concurrent
+    transaction inserted the domain after this statement's snapshot does a
+    second SELECT run. If slug is already taken by another domain,
+    fallback_slug is used. Returns (tenant, created); when created, the
+    caller invalidates tenant_cache after committing (see create_tenant).
+    """
+    new_id = uuid.uuid4()
+    slug_taken = exists().where(Tenant.slug == slug)
+    inserted = (
+        pg_insert(Tenant)
+        .values(
+            id=new_id,
+            slug=case((slug_taken, fallback_slug), else_=slug),
+            name=name,
+            primary_domain=primary_domain,
+        )
+        .on_conflict_do_nothing(index_elements=[Tenant.primary_domain])
+        .returning(*Tenant.__table__.c)
+        .cte("inserted")
+    )
+    existing = select(*Tenant.__table__.c).where(
+        Tenant.primary_domain == primary_domain, ~exists(select(inserted.c.id))
+    )
+    stmt = select(Tenant).from_statement(union_all(select(*inserted.c), existing))
+
+    result = await session.execute(stmt, execution_options={"populate_existing": True})
+    tenant = result.scalar_one_or_none()
+    if tenant is None:  # lost a race to a transaction our snapshot does not see
+        tenant = await get_tenant_by_primary_domain(session, primary_domain)
+        assert tenant is not None
+    return tenant, tenant.id == new_id
@@ -4,7 +4,8 @@ from __future__ import annotations
 
 from typing import Optional
 
-from sqlalchemy import select
+from sqlalchemy import cast, func, literal, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.models.user import User
@@ -25,6 +26,23 @@ async def get_user_by_tenant_email(
     return result.scalar_one_or_none()
 
 
+async def get_existing_emails(
+    session: AsyncSession, tenant_id: str, emails: list[str]
+) -> set[str]:
+    """Return which of the given emails already exist in the tenant (one query)."""
+    from uuid import UUID
+
+    if not emails:
+        return set()
+    stmt = (
+        select(User.email)
+        .where(User.tenant_id == UUID(tenant_id))
+        .where(User.email.in_(emails))
+    )
+    result = await session.execute(stmt)
+    return set(result.scalars().all())
+
+
 async def create_user(
     session: AsyncSession,
     *,
@@ -43,3 +61,72 @@ async def create_user(
     session.add(user)
     await session.flush()
     return user
+
+
+async def insert_user_if_absent(
+    session: AsyncSession,
+    *,
+    tenant_id: str,
+    email: str,
+    password_hash: str,
+) -> bool:
+    """
+    Insert a user unless (tenant_id, email) already exists; one round trip.
+
+    The same statement sets app.tenant_id for the rest of the transaction
+    (set_config in a CTE the inserted row is built from, so it runs before
+    the row-level security check); no separate set_session_tenant is needed.
+    Returns True if a row was created. Safe under concurrent signups.
+    """
+    from uuid import UUID, uuid4
+
+    scope = select(
+        func.set_config("app.tenant_id", str(UUID(tenant_id)), True).label("tenant_id")
+    ).cte("scope")
+    row = select(
+        literal(uuid4(), User.id.type),
+        cast(scope.c.tenant_id, User.tenant_id.type),
+        literal(email, User.email.type),
+        literal(password_hash, User.password_hash.type),
+    )
+    stmt = (
+        pg_insert(User)
+        .from_select([User.id, User.tenant_id, User.email, User.password_hash], row)
+        .on_conflict_do_nothing(constraint="uq_users_tenant_email")
+        .returning(User.id)
+    )
+    result = await session.execute(stmt)
+    return result.scalar_one_or_none() is not None
+
+
+async def bulk_insert_users(
+    session: AsyncSession,
+    *,
+    tenant_id: str,
+    rows: list[tuple[str, str]],
+) -> int:
+    """
+    Multi-row insert of (email, password_hash) pairs for one tenant.
+
+    Existing (tenant_id, email) pairs are skipped via ON CONFLICT DO NOTHING
+    on uq_users_tenant_email. Returns the number of rows actually inserted.
+    Keep batches well under asyncpg's 32767 bind-parameter limit.
+    """
+    from uuid import UUID
+
+    if not rows:
+        return 0
+    tenant_uuid = UUID(tenant_id)
+    stmt = (
+        pg_insert(User)
+        .values(
+            [
+                {"tenant_id": tenant_uuid, "email": email, "password_hash": password_hash}
+                for email, password_hash in rows
+            ]
+        )
+        .on_conflict_do_nothing(constraint="uq_users_tenant_email")
+        .returning(User.id)
+    )
+    result = await session.execute(stmt)
+    return len(result.scalars().all())
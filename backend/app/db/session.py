@@ -2,24 +2,191 @@
 Database session management.
 
 Foundation-only async SQLAlchemy plumbing:
-- async engine from settings.DATABASE_URL
+- async engine from settings.DATABASE_URL (pool sized via settings.DB_*)
 - async session maker
 - FastAPI dependency to yield a session and close it
+- optional read replica (settings.DATABASE_READ_URL) behind get_read_db
+- per-session tenant for row-level security (set_session_tenant)
+
+Read-only endpoints depend on get_read_db instead of get_db. Their sessions
+go to the replica while it is reachable and no more than
+DB_READ_MAX_LAG_SECONDS behind, and to the primary otherwise. Replay lag is
+measured at most every DB_READ_LAG_CHECK_SECONDS per process, by the request
+that finds the last measurement stale, so routing costs no query otherwise.
+A replica read can miss rows committed within the last moments (a resource
+the client just created); callers that turn a miss into 404 first retry on
+the primary with use_primary(). Anything that writes stays on get_db.
+
+Tables under row-level security (users) show and accept only the rows of
+the tenant in the transaction-local setting app.tenant_id. A session given
+a tenant with set_session_tenant() sets it at the start of every
+transaction, so sessions that commit in batches keep it; with none set such
+tables look empty. Superusers and BYPASSRLS roles are not subject to the
+policies, so production should connect as an ordinary role.
 """
 
 from __future__ import annotations
 
+import asyncio
+import logging
+import time
+import uuid
 from collections.abc import AsyncGenerator
+from typing import Any
 
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy import event, text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.orm import Session
 
 from app.core.config.settings import settings
+from app.core.metrics.registry import numeric_stats, registry
+from app.db.pool_metrics import (
+    InstrumentedAsyncPool,
+    InstrumentedReplicaAsyncPool,
+    install_pool_events,
+    pool_status,
+)
+from app.db.query_metrics import install_query_metrics
+
+logger = logging.getLogger(__name__)
+
+
+def _create_engine(url: str, poolclass: type[InstrumentedAsyncPool]) -> AsyncEngine:
+    created = create_async_engine(
+        url,
+        poolclass=poolclass,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        connect_args={"prepared_statement_cache_size": settings.DB_PREPARED_STATEMENT_CACHE_SIZE},
+    )
+    install_pool_events(created.sync_engine)
+    install_query_metrics(created.sync_engine)
+    return created
 
 
-engine = create_async_engine(settings.DATABASE_URL, pool_pre_ping=True)
+engine = _create_engine(settings.DATABASE_URL, InstrumentedAsyncPool)
+registry.register_collector(
+    "DB connection pool stats (see /internal/db-pool)",
+    lambda: numeric_stats("ambient_db_pool", pool_status(engine.sync_engine)),
+)
 
 AsyncSessionLocal = async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
 
+read_engine: AsyncEngine | None = None
+AsyncReadSessionLocal: async_sessionmaker[AsyncSession] | None = None
+if settings.DATABASE_READ_URL:
+    read_engine = _create_engine(settings.DATABASE_READ_URL, InstrumentedReplicaAsyncPool)
+    AsyncReadSessionLocal = async_sessionmaker(
+        bind=read_engine, class_=AsyncSession, expire_on_commit=False
+    )
+    registry.register_collector(
+        "Read replica connection pool stats",
+        lambda: numeric_stats("ambient_db_read_pool", pool_status(read_engine.sync_engine)),
+    )
+
+# Seconds of WAL replay the replica is behind; 0 when it has replayed all it received
+# (an idle primary otherwise looks ever more "behind"), and 0 for a non-replica.
+_REPLICA_LAG_SQL = text(
+    """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 'Infinity')
+    END
+    """
+)
+_LAG_CHECK_TIMEOUT_SECONDS = 2.0
+
+
+class ReplicaMonitor:
+    """Cached replica health: its last measured replay lag, or None when unreachable."""
+
+    def __init__(self, read_engine: AsyncEngine) -> None:
+        self._engine = read_engine
+        self.lag_seconds: float | None = None
+        self._checked_at = float("-inf")
+        self._checking = False
+        self._stats = {"lag_checks": 0, "lag_check_errors": 0}
+
+    async def usable(self) -> bool:
+        """Whether reads may go to the replica; refreshes a stale measurement first."""
+        stale = time.monotonic() - self._checked_at >= settings.DB_READ_LAG_CHECK_SECONDS
+        if stale and not self._checking:
+            # One request measures; concurrent ones route on the previous measurement.
+            self._checking = True
+            try:
+                await self._measure()
+            finally:
+                self._checking = False
+                self._checked_at = time.monotonic()
+        return self.lag_seconds is not None and self.lag_seconds <= settings.DB_READ_MAX_LAG_SECONDS
+
+    async def _measure(self) -> None:
+        self._stats["lag_checks"] += 1
+        was_usable = self.lag_seconds is not None
+        try:
+            async with asyncio.timeout(_LAG_CHECK_TIMEOUT_SECONDS):
+                async with self._engine.connect() as conn:
+                    self.lag_seconds = float((await conn.execute(_REPLICA_LAG_SQL)).scalar_one())
+        except (SQLAlchemyError, OSError, TimeoutError) as exc:
+            self._stats["lag_check_errors"] += 1
+            self.lag_seconds = None
+            if was_usable:
+                logger.warning(
+                    "Read replica unreachable, reading from primary: %s", type(exc).__name__
+                )
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "replica_up": int(self.lag_seconds is not None),
+            "replica_lag_seconds": self.lag_seconds if self.lag_seconds is not None else -1,
+            **self._stats,
+        }
+
+
+replica_monitor = ReplicaMonitor(read_engine) if read_engine is not None else None
+_read_stats = {"replica_sessions": 0, "primary_sessions": 0, "primary_retries": 0}
+
+
+def _read_routing_stats() -> dict[str, float]:
+    monitor = replica_monitor.stats() if replica_monitor is not None else {}
+    return {**_read_stats, **monitor}
+
+
+_SET_TENANT_SQL = text("SELECT set_config('app.tenant_id', :tenant_id, true)")
+
+
+@event.listens_for(Session, "after_begin")
+def _apply_session_tenant(session: Session, transaction: Any, connection: Any) -> None:
+    tenant_id = session.info.get("tenant_id")
+    if tenant_id is not None:
+        connection.execute(_SET_TENANT_SQL, {"tenant_id": tenant_id})
+
+
+async def set_session_tenant(session: AsyncSession, tenant_id: uuid.UUID) -> None:
+    """
+    Scope the session's transactions to one tenant (SET LOCAL app.tenant_id):
+    the current one, if any, and every later one.
+    """
+    session.info["tenant_id"] = str(tenant_id)
+    if session.in_transaction():
+        await session.execute(_SET_TENANT_SQL, {"tenant_id": str(tenant_id)})
+
+
+registry.register_collector(
+    "Read session routing (replica vs primary)",
+    lambda: numeric_stats("ambient_db_read", _read_routing_stats()),
+)
+
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     session: AsyncSession = AsyncSessionLocal()
@@ -27,3 +194,35 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
         yield session
     finally:
         await session.close()
+
+
+async def get_read_db() -> AsyncGenerator[AsyncSession, None]:
+    """Session for read-only work: on the replica when it is usable, else the primary."""
+    replica = replica_monitor is not None and await replica_monitor.usable()
+    if replica:
+        session: AsyncSession = AsyncReadSessionLocal()
+        session.info["replica"] = True
+        _read_stats["replica_sessions"] += 1
+    else:
+        session = AsyncSessionLocal()
+        _read_stats["primary_sessions"] += 1
+    try:
+        yield session
+    finally:
+        await session.close()
+
+
+async def use_primary(session: AsyncSession) -> bool:
+    """
+    Move a replica session to the primary, e.g. to retry a lookup that found
+    nothing or before writing. Objects loaded so far stay usable (detached).
+    False when the session is on the primary already.
+    """
+    if not session.info.get("replica"):
+        return False
+    await session.close()
+    session.bind = engine
+    session.sync_session.bind = engine.sync_engine
+    session.info["replica"] = False
+    _read_stats["primary_retries"] += 1
+    return True
@@ -0,0 +1 @@
+# Catalog search feature (dataset and column names across a tenant's datasets)
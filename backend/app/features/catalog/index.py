@@ -0,0 +1,359 @@
+"""
+In-memory search index over one tenant's datasets and their columns.
+
+Every dataset contributes one entry for itself and one per column. Entries
+are grouped by their lowercased name (a term; column names like ``id`` or
+``created_at`` repeat across datasets), and matching runs on terms:
+
+- a sorted list of keys (each term and every word of it) answers prefix
+  matches by bisection; words of dataset descriptions get a list of their own;
+- an inverted index from trigram to terms answers fuzzy matches. Trigrams
+  and similarity follow pg_trgm: words (runs of letters and digits) are
+  padded with two spaces in front and one behind, and similarity is shared
+  trigrams over the union of both sets.
+
+Updates are per dataset: apply() drops a dataset's entries and adds the new
+ones, touching only their terms plus one merge of the key lists. Dropped
+entries leave holes; the index is rebuilt from its live entries once holes
+outnumber them.
+
+All methods are blocking and thread-safe (one lock per index).
+"""
+
+from __future__ import annotations
+
+import bisect
+import heapq
+import re
+import threading
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Iterable, Sequence
+
+_WORD = re.compile(r"[^\W_]+")
+_KEY_END = "\U0010ffff"
+
+# Ranking tiers, best first; within a tier higher scores win.
+_TIERS = {"exact": 0, "prefix": 1, "fuzzy": 2, "description": 3}
+# A short prefix can match most keys; look at no more than this many.
+_MAX_PREFIX_KEYS = 2000
+
+
+def trigrams(text: str) -> set[str]:
+    grams: set[str] = set()
+    for word in _WORD.findall(text.lower()):
+        padded = f"  {word} "
+        grams.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+@dataclass(frozen=True)
+class DatasetDoc:
+    """What the index needs of a dataset; stamp changes whenever the dataset does."""
+
+    id: uuid.UUID
+    name: str
+    description: str | None
+    columns: Sequence[dict[str, Any]]
+    stamp: datetime
+
+
+@dataclass(frozen=True)
+class CatalogEntry:
+    kind: str  # "dataset" | "column"
+    dataset_id: uuid.UUID
+    dataset_name: str
+    column: str | None
+    type: str | None
+    description: str | None
+
+    @property
+    def name(self) -> str:
+        return self.column if self.column is not None else self.dataset_name
+
+    def sort_key(self) -> tuple[str, str]:
+        return self.dataset_name, self.column or ""
+
+
+@dataclass(frozen=True)
+class CatalogHit:
+    entry: CatalogEntry
+    match: str  # exact | prefix | fuzzy | description
+    score: float
+
+
+class CatalogIndex:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self) -> None:
+        self._datasets: dict[uuid.UUID, tuple[datetime, list[int]]] = {}
+        self._entries: list[CatalogEntry | None] = []
+        self._entry_terms: list[int] = []
+        self._holes = 0
+
+        self._term_ids: dict[str, int] = {}
+        self._terms: list[str] = []
+        self._term_entries: list[set[int]] = []
+        self._term_sizes: list[int] = []  # trigram count
+        # Bitsets over term ids (bit i of byte b is term 8 * b + i).
+        self._postings: dict[str, bytearray] = {}  # trigram -> terms having it
+        self._by_size: dict[int, bytearray] = {}  # trigram count -> terms
+        self._keys: list[tuple[str, int]] = []  # (term or word of it, term)
+        self._description_keys: list[tuple[str, int]] = []  # (word, dataset entry)
+
+    def stamps(self) -> dict[uuid.UUID, datetime]:
+        with self._lock:
+            return {dataset_id: stamp for dataset_id, (stamp, _) in self._datasets.items()}
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "datasets": len(self._datasets),
+                "entries": len(self._entries) - self._holes,
+                "terms": len(self._term_ids),
+            }
+
+    def apply(self, docs: Iterable[DatasetDoc], removed: Iterable[uuid.UUID] = ()) -> None:
+        """Index (or re-index) docs and drop the removed datasets."""
+        docs = list(docs)
+        with self._lock:
+            dropped: set[int] = set()
+            for dataset_id in [*removed, *(d.id for d in docs)]:
+                _, ids = self._datasets.pop(dataset_id, (None, []))
+                dropped.update(ids)
+            dead_terms = {t for t in map(self._drop, dropped) if t is not None}
+            if dead_terms:
+                self._keys = [k for k in self._keys if k[1] not in dead_terms]
+            if dropped:
+                self._description_keys = [
+                    k for k in self._description_keys if k[1] not in dropped
+                ]
+            for doc in docs:
+                self._insert(doc.id, doc.stamp, _entries_of(doc))
+            # Timsort merges the appended run into the sorted lists in linear time.
+            self._keys.sort()
+            self._description_keys.sort()
+
+            if self._holes > max(1024, len(self._entries) - self._holes):
+                live = [
+                    (dataset_id, stamp, [self._entries[i] for i in ids])
+                    for dataset_id, (stamp, ids) in self._datasets.items()
+                ]
+                self._reset()
+                for dataset_id, stamp, entries in live:
+                    self._insert(dataset_id, stamp, entries)  # type: ignore[arg-type]
+                self._keys.sort()
+                self._description_keys.sort()
+
+    def _insert(self, dataset_id: uuid.UUID, stamp: datetime, entries: list[CatalogEntry]) -> None:
+        """Store a dataset's entries; their keys are appended unsorted."""
+        ids = []
+        for entry in entries:
+            entry_id = len(self._entries)
+            ids.append(entry_id)
+            self._entries.append(entry)
+            term = entry.name.lower()
+            term_id = self._term_ids.get(term)
+            if term_id is None:
+                term_id = self._term_ids[term] = len(self._terms)
+                grams = trigrams(term)
+                self._terms.append(term)
+                self._term_entries.append(set())
+                self._term_sizes.append(len(grams))
+                for gram in grams:
+                    _set_bit(self._postings.setdefault(gram, bytearray()), term_id)
+                _set_bit(self._by_size.setdefault(len(grams), bytearray()), term_id)
+                self._keys.append((term, term_id))
+                words = dict.fromkeys(_WORD.findall(term))
+                self._keys += [(w, term_id) for w in words if w != term]
+            self._term_entries[term_id].add(entry_id)
+            self._entry_terms.append(term_id)
+            if entry.description:
+                words = dict.fromkeys(_WORD.findall(entry.description.lower()))
+                self._description_keys += [(w, entry_id) for w in words]
+        self._datasets[dataset_id] = (stamp, ids)
+
+    def _drop(self, entry_id: int) -> int | None:
+        """Remove entry; returns its term if that has no entries left."""
+        term_id = self._entry_terms[entry_id]
+        self._entries[entry_id] = None
+        self._holes += 1
+        entries = self._term_entries[term_id]
+        entries.discard(entry_id)
+        if entries:
+            return None
+        term = self._terms[term_id]
+        del self._term_ids[term]
+        for gram in trigrams(term):
+            _clear_bit(self._postings[gram], term_id)
+        _clear_bit(self._by_size[self._term_sizes[term_id]], term_id)
+        return term_id
+
+    def search(
+        self, query: str, *, kind: str | None = None, limit: int = 20, threshold: float = 0.3
+    ) -> list[CatalogHit]:
+        """
+        Best entries for query: exact names, then name or word prefixes, then
+        names at least threshold similar (pg_trgm similarity), then words of
+        dataset descriptions.
+        """
+        needle = query.strip().lower()
+        if not needle or limit <= 0:
+            return []
+        with self._lock:
+            terms: dict[int, tuple[int, float]] = {}  # term -> (tier, score)
+            for key, term_id in _prefixed(self._keys, needle):
+                if key == needle and self._terms[term_id] == needle:
+                    tier, score = 0, 1.0
+                else:
+                    tier, score = 1, len(needle) / len(key)
+                current = terms.get(term_id)
+                if current is None or (tier, -score) < (current[0], -current[1]):
+                    terms[term_id] = (tier, score)
+
+            # Fuzzy matches rank below prefix matches; only look for them if those fall short.
+            grams = trigrams(needle)
+            found = self._count(terms, kind, limit) if grams else limit
+            if found < limit:
+                self._fuzzy(grams, threshold, terms, kind, limit - found)
+
+            hits: list[CatalogHit] = []
+            order = lambda t: (t[1][0], -t[1][1], self._terms[t[0]])  # noqa: E731
+            if kind is None:
+                ranked = heapq.nsmallest(limit, terms.items(), key=order)
+            else:
+                ranked = sorted(terms.items(), key=order)  # terms may hold only the other kind
+            for term_id, (tier, score) in ranked:
+                if len(hits) >= limit:
+                    break
+                match = ("exact", "prefix", "fuzzy")[tier]
+                hits += self._expand(self._term_entries[term_id], match, score, kind, limit)
+            if len(hits) < limit:
+                seen = {id(h.entry) for h in hits}
+                described: dict[int, float] = {}
+                for word, entry_id in _prefixed(self._description_keys, needle):
+                    described[entry_id] = max(described.get(entry_id, 0.0), len(needle) / len(word))
+                for entry_id, score in described.items():
+                    entry = self._entries[entry_id]
+                    if entry is not None and id(entry) not in seen and kind in (None, entry.kind):
+                        hits.append(CatalogHit(entry, "description", round(score, 4)))
+            hits.sort(key=lambda h: (_TIERS[h.match], -h.score, h.entry.sort_key()))
+            return hits[:limit]
+
+    def _count(self, term_ids: Iterable[int], kind: str | None, limit: int) -> int:
+        """Entries of kind under term_ids, counted up to limit."""
+        found = 0
+        for term_id in term_ids:
+            entries = self._term_entries[term_id]
+            if kind is None:
+                found += len(entries)
+            else:
+                live = map(self._entries.__getitem__, entries)
+                found += sum(1 for e in live if e is not None and e.kind == kind)
+            if found >= limit:
+                break
+        return found
+
+    def _fuzzy(
+        self,
+        grams: set[str],
+        threshold: float,
+        terms: dict[int, tuple[int, float]],
+        kind: str | None,
+        wanted: int,
+    ) -> None:
+        """
+        Add the terms most similar to grams (at least threshold, not already in
+        terms) until they hold ``wanted`` entries of kind.
+
+        Shared trigram counts of all terms at once are summed bit-sliced:
+        counters[k] holds bit k of every term's count, so adding a posting is a
+        few big-integer operations whatever the number of terms.
+        """
+        q = len(grams)
+        counters: list[int] = []
+        for gram in grams:
+            postings = self._postings.get(gram)
+            if postings is None:
+                continue
+            carry = int.from_bytes(postings, "little")
+            for level, bits in enumerate(counters):
+                counters[level], carry = bits ^ carry, bits & carry
+                if not carry:
+                    break
+            if carry:
+                counters.append(carry)
+        if not counters:
+            return
+        # similarity s / (q + e - s) >= t needs s > t * q / (1 + t) shared trigrams.
+        need = int(threshold * q / (1 + threshold)) + 1
+        everything = (1 << len(self._terms)) - 1
+        by_count: list[tuple[int, int]] = []  # (shared trigrams, terms with exactly that many)
+        for shared in range(min(q, (1 << len(counters)) - 1), need - 1, -1):
+            mask = everything
+            for level, bits in enumerate(counters):
+                mask &= bits if shared >> level & 1 else ~bits
+            if mask:
+                by_count.append((shared, mask))
+        groups = sorted(
+            (
+                (shared / (q + size - shared), shared, size)
+                for shared, _ in by_count
+                for size in self._by_size
+                if size >= shared and shared / (q + size - shared) >= threshold
+            ),
+            reverse=True,
+        )
+        masks = dict(by_count)
+        sized: dict[int, int] = {}
+        found = 0
+        for similarity, shared, size in groups:
+            if size not in sized:
+                sized[size] = int.from_bytes(self._by_size[size], "little")
+            matches = masks[shared] & sized[size]
+            while matches and found < wanted:
+                lowest = matches & -matches
+                matches ^= lowest
+                term_id = lowest.bit_length() - 1
+                if term_id not in terms:
+                    terms[term_id] = (2, similarity)
+                    found += self._count([term_id], kind, wanted - found)
+            if found >= wanted:
+                return
+
+    def _expand(
+        self, entry_ids: set[int], match: str, score: float, kind: str | None, limit: int
+    ) -> list[CatalogHit]:
+        entries = [e for e in map(self._entries.__getitem__, entry_ids) if e is not None]
+        if kind is not None:
+            entries = [e for e in entries if e.kind == kind]
+        best = heapq.nsmallest(limit, entries, key=CatalogEntry.sort_key)
+        return [CatalogHit(e, match, round(score, 4)) for e in best]
+
+
+def _set_bit(bits: bytearray, i: int) -> None:
+    if len(bits) <= i >> 3:
+        bits.extend(bytes((i >> 3) + 1 - len(bits)))
+    bits[i >> 3] |= 1 << (i & 7)
+
+
+def _clear_bit(bits: bytearray, i: int) -> None:
+    bits[i >> 3] &= ~(1 << (i & 7)) & 0xFF
+
+
+def _prefixed(keys: list[tuple[str, int]], needle: str) -> list[tuple[str, int]]:
+    start = bisect.bisect_left(keys, (needle,))
+    end = bisect.bisect_left(keys, (needle + _KEY_END,), lo=start)
+    return keys[start : min(end, start + _MAX_PREFIX_KEYS)]
+
+
+def _entries_of(doc: DatasetDoc) -> list[CatalogEntry]:
+    entries = [CatalogEntry("dataset", doc.id, doc.name, None, None, doc.description)]
+    entries += [
+        CatalogEntry("column", doc.id, doc.name, c["name"], c.get("type"), None)
+        for c in doc.columns
+    ]
+    return entries
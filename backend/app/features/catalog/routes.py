@@ -0,0 +1,50 @@
+"""Catalog search router (tenant-scoped)."""
+
+from __future__ import annotations
+
+from typing import Literal
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.internal.routes import resolve_tenant
+from app.core.cache.tenant_cache import CachedTenant
+from app.db.session import get_read_db
+from app.features.catalog.schemas import CatalogHitResponse, CatalogSearchResponse
+from app.features.catalog.service import search_catalog
+
+router = APIRouter()
+
+
+@router.get("/search", response_model=CatalogSearchResponse)
+async def search(
+    q: str = Query(..., min_length=1, max_length=200),
+    kind: Literal["dataset", "column"] | None = None,
+    limit: int = Query(20, ge=1, le=100),
+    tenant: CachedTenant = Depends(resolve_tenant),
+    db: AsyncSession = Depends(get_read_db),
+) -> CatalogSearchResponse:
+    """
+    Find datasets and columns by name, for autocomplete and "find a column".
+
+    Exact names rank first, then names or words of names starting with q,
+    then names similar to q (trigram similarity, tolerates typos), then
+    datasets whose description has a word starting with q.
+    """
+    result = await search_catalog(db, tenant_id=tenant.id, q=q, kind=kind, limit=limit)
+    return CatalogSearchResponse(
+        items=[
+            CatalogHitResponse(
+                kind=hit.entry.kind,
+                dataset_id=hit.entry.dataset_id,
+                dataset_name=hit.entry.dataset_name,
+                column=hit.entry.column,
+                type=hit.entry.type,
+                description=hit.entry.description,
+                match=hit.match,
+                score=hit.score,
+            )
+            for hit in result.hits
+        ],
+        elapsed_ms=result.elapsed_ms,
+    )
@@ -0,0 +1,26 @@
+"""Catalog search response schemas."""
+
+from __future__ import annotations
+
+import uuid
+from typing import Literal
+
+from pydantic import BaseModel
+
+
+class CatalogHitResponse(BaseModel):
+    """A dataset (column is null) or one of its columns."""
+
+    kind: Literal["dataset", "column"]
+    dataset_id: uuid.UUID
+    dataset_name: str
+    column: str | None
+    type: str | None
+    description: str | None
+    match: Literal["exact", "prefix", "fuzzy", "description"]
+    score: float
+
+
+class CatalogSearchResponse(BaseModel):
+    items: list[CatalogHitResponse]
+    elapsed_ms: float
@@ -0,0 +1,122 @@
+"""
+Search over a tenant's dataset and column names.
+
+Each worker process keeps a CatalogIndex (app.features.catalog.index) per
+tenant, up to CATALOG_MAX_TENANTS, least recently searched out first. Before
+every search the index is checked against the updated_at of the tenant's
+committed datasets (one indexed query, no column lists): new or changed
+datasets are loaded and re-indexed, deleted ones dropped. A change made
+through any worker therefore shows up in the next search on all of them,
+without invalidation messages. Indexing and matching run in a thread.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config.settings import settings
+from app.core.metrics.registry import numeric_stats, registry
+from app.db.repos.dataset_repo import list_catalog_rows, list_dataset_stamps
+from app.features.catalog.index import CatalogHit, CatalogIndex, DatasetDoc
+
+
+@dataclass
+class _TenantCatalog:
+    index: CatalogIndex = field(default_factory=CatalogIndex)
+    refresh_lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+
+@dataclass
+class CatalogSearchResult:
+    hits: list[CatalogHit]
+    elapsed_ms: float
+
+
+_catalogs: OrderedDict[uuid.UUID, _TenantCatalog] = OrderedDict()
+_stats = {"searches": 0, "refreshes": 0, "reindexed_datasets": 0}
+
+
+def _catalog_stats() -> dict[str, int]:
+    totals = {"tenants": len(_catalogs), "datasets": 0, "entries": 0, "terms": 0, **_stats}
+    for catalog in list(_catalogs.values()):
+        for key, value in catalog.index.stats().items():
+            totals[key] += value
+    return totals
+
+
+registry.register_collector(
+    "Catalog search index stats", lambda: numeric_stats("ambient_catalog", _catalog_stats())
+)
+
+
+def _catalog(tenant_id: uuid.UUID) -> _TenantCatalog:
+    catalog = _catalogs.get(tenant_id)
+    if catalog is None:
+        catalog = _catalogs[tenant_id] = _TenantCatalog()
+        while len(_catalogs) > max(1, settings.CATALOG_MAX_TENANTS):
+            _catalogs.popitem(last=False)
+    else:
+        _catalogs.move_to_end(tenant_id)
+    return catalog
+
+
+async def _refresh(session: AsyncSession, tenant_id: uuid.UUID, catalog: _TenantCatalog) -> None:
+    """Bring the tenant's index in line with its committed datasets."""
+    stamps = await list_dataset_stamps(session, tenant_id)
+    if stamps == catalog.index.stamps():
+        return
+    async with catalog.refresh_lock:
+        # Another search may have refreshed meanwhile, or seen an older state; re-read.
+        stamps = await list_dataset_stamps(session, tenant_id)
+        indexed = catalog.index.stamps()
+        changed = [i for i, stamp in stamps.items() if indexed.get(i) != stamp]
+        removed = [i for i in indexed if i not in stamps]
+        if not changed and not removed:
+            return
+        rows = await list_catalog_rows(session, tenant_id, changed) if changed else []
+        docs = [
+            DatasetDoc(
+                id=row.id,
+                name=row.name,
+                description=row.description,
+                columns=row.columns,
+                stamp=row.updated_at,
+            )
+            for row in rows
+        ]
+        await asyncio.to_thread(catalog.index.apply, docs, removed)
+        _stats["refreshes"] += 1
+        _stats["reindexed_datasets"] += len(docs)
+
+
+async def search_catalog(
+    session: AsyncSession,
+    *,
+    tenant_id: uuid.UUID,
+    q: str,
+    kind: str | None = None,
+    limit: int = 20,
+) -> CatalogSearchResult:
+    """Best matching datasets and columns: exact, prefix, then fuzzy name matches."""
+    started = time.perf_counter()
+    catalog = _catalog(tenant_id)
+    await _refresh(session, tenant_id, catalog)
+    await session.close()
+
+    hits = await asyncio.to_thread(
+        catalog.index.search,
+        q,
+        kind=kind,
+        limit=limit,
+        threshold=settings.CATALOG_FUZZY_THRESHOLD,
+    )
+    _stats["searches"] += 1
+    return CatalogSearchResult(
+        hits=hits, elapsed_ms=round((time.perf_counter() - started) * 1000, 1)
+    )
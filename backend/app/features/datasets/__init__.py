@@ -0,0 +1 @@
+# Dataset ingestion feature (streamed uploads -> Arrow IPC part files)
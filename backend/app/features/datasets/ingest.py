@@ -0,0 +1,203 @@
+"""
+Streamed CSV/NDJSON -> Arrow IPC conversion.
+
+The request body is consumed as record-aligned blocks (see
+app.shared.utils.streams); each block is parsed into an Arrow table and
+appended to the part file before the next block is read, so memory is bounded
+by roughly one block (DATASET_INGEST_BLOCK_BYTES) plus its columnar copy,
+whatever the upload size. Parsing and file writes run in a worker thread to
+keep the event loop free.
+
+The schema is inferred from the first block (columns that are all-null there
+become strings) and then fixed: later blocks, and appends to an existing
+dataset, are parsed against it, and a record that does not fit is a 400.
+
+Each block is also folded into the part's column profile
+(app.features.datasets.profile) while it is in memory, so profiling never
+rereads the data.
+
+pyarrow is imported lazily so it stays off the app's import path.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import io
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, AsyncIterable
+
+from app.core.config.settings import settings
+from app.core.errors.exceptions import BadRequestError, UnsupportedMediaTypeError
+from app.features.datasets.profile import TableProfiler
+from app.shared.utils.streams import iter_record_blocks
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+CSV_MEDIA_TYPES = frozenset(["text/csv", "application/csv"])
+# Plain application/json is accepted as JSON Lines; a top-level array cannot be streamed.
+NDJSON_MEDIA_TYPES = frozenset(
+    ["application/x-ndjson", "application/ndjson", "application/jsonl", "application/json"]
+)
+# Rows per record batch in the part file (keeps later scans/exports granular).
+MAX_BATCH_ROWS = 64 * 1024
+MAX_ERROR_DETAIL = 200
+
+
+def detect_format(content_type: str | None) -> str:
+    """Map a request Content-Type to ``csv`` or ``ndjson``."""
+    media_type = (content_type or "").split(";", 1)[0].strip().lower()
+    if media_type in CSV_MEDIA_TYPES:
+        return "csv"
+    if media_type in NDJSON_MEDIA_TYPES:
+        return "ndjson"
+    raise UnsupportedMediaTypeError("Upload must be text/csv or application/x-ndjson")
+
+
+def describe_schema(schema: "pa.Schema") -> list[dict[str, Any]]:
+    """JSON-friendly column list stored on the dataset row."""
+    return [{"name": f.name, "type": str(f.type), "nullable": f.nullable} for f in schema]
+
+
+@dataclass(frozen=True)
+class PartInfo:
+    rows: int
+    byte_size: int
+    schema: "pa.Schema"
+    profile: dict[str, Any]
+
+
+class PartWriter:
+    """
+    Parses blocks of one upload and appends them to a single Arrow IPC file.
+
+    Methods are blocking; ingest_stream calls them from a worker thread.
+    """
+
+    def __init__(self, path: Path, source_format: str, schema: "pa.Schema | None" = None) -> None:
+        self.path = path
+        self.source_format = source_format
+        self.schema = schema
+        self.rows = 0
+        self.blocks = 0
+        self._sink: Any = None
+        self._writer: Any = None
+        self._profiler: TableProfiler | None = None
+
+    def write_block(self, block: bytes) -> int:
+        import pyarrow as pa
+
+        try:
+            if self.source_format == "csv":
+                table = self._parse_csv(block)
+            else:
+                table = self._parse_ndjson(block)
+        except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError) as exc:
+            detail = str(exc).splitlines()[0][:MAX_ERROR_DETAIL]
+            raise BadRequestError(
+                f"Could not parse upload (block {self.blocks + 1}): {detail}"
+            ) from exc
+
+        if self._writer is None:
+            self._sink = pa.OSFile(str(self.path), "wb")
+            self._writer = pa.ipc.new_file(self._sink, self.schema)
+            self._profiler = TableProfiler(self.schema)
+        self._writer.write_table(table, max_chunksize=MAX_BATCH_ROWS)
+        self._profiler.update(table)
+        self.blocks += 1
+        self.rows += table.num_rows
+        return table.num_rows
+
+    def close(self) -> PartInfo:
+        if self._writer is None:
+            raise BadRequestError("Upload is empty")
+        self._writer.close()
+        self._sink.close()
+        self._writer = self._sink = None
+        return PartInfo(
+            rows=self.rows,
+            byte_size=self.path.stat().st_size,
+            schema=self.schema,
+            profile=self._profiler.to_dict(),
+        )
+
+    def abort(self) -> None:
+        """Close and delete a partially written file."""
+        for handle in (self._writer, self._sink):
+            if handle is not None:
+                try:
+                    handle.close()
+                except Exception:  # noqa: BLE001 - best effort cleanup
+                    pass
+        self._writer = self._sink = None
+        self.path.unlink(missing_ok=True)
+
+    def _parse_csv(self, block: bytes) -> "pa.Table":
+        import pyarrow.csv as pacsv
+
+        first = self.blocks == 0
+        read_options = pacsv.ReadOptions(
+            # Later blocks have no header row; the first block's header names the columns.
+            column_names=None if first else self.schema.names,
+            # Infer types from the whole first block, not just Arrow's default 1 MiB.
+            block_size=max(len(block) + 1, 1 << 20),
+        )
+        convert_options = pacsv.ConvertOptions(
+            column_types=self.schema,
+            strings_can_be_null=True,
+        )
+        table = pacsv.read_csv(
+            io.BytesIO(block), read_options=read_options, convert_options=convert_options
+        )
+        return self._conform(table) if first else table
+
+    def _parse_ndjson(self, block: bytes) -> "pa.Table":
+        import pyarrow.json as pajson
+
+        parse_options = pajson.ParseOptions(
+            explicit_schema=self.schema,
+            unexpected_field_behavior="infer" if self.schema is None else "error",
+        )
+        read_options = pajson.ReadOptions(block_size=max(len(block) + 1, 1 << 20))
+        table = pajson.read_json(
+            io.BytesIO(block), read_options=read_options, parse_options=parse_options
+        )
+        return self._conform(table) if self.blocks == 0 else table
+
+    def _conform(self, table: "pa.Table") -> "pa.Table":
+        """Fix the schema from the first block, or check it against the existing one."""
+        import pyarrow as pa
+
+        if self.schema is None:
+            self.schema = pa.schema(
+                [f.with_type(pa.string()) if pa.types.is_null(f.type) else f for f in table.schema]
+            )
+        elif table.column_names != self.schema.names:
+            raise BadRequestError(
+                "Columns do not match the dataset: expected "
+                f"{', '.join(self.schema.names)}; got {', '.join(table.column_names)}"
+            )
+        return table.cast(self.schema)
+
+
+async def ingest_stream(
+    chunks: AsyncIterable[bytes],
+    writer: PartWriter,
+    *,
+    block_bytes: int | None = None,
+) -> PartInfo:
+    """Drive a PartWriter from a byte stream; deletes the file on any failure."""
+    block_bytes = block_bytes or settings.DATASET_INGEST_BLOCK_BYTES
+    try:
+        async for block in iter_record_blocks(
+            chunks,
+            block_bytes=block_bytes,
+            quote_aware=writer.source_format == "csv",
+        ):
+            if block.strip():
+                await asyncio.to_thread(writer.write_block, block)
+        return await asyncio.to_thread(writer.close)
+    except BaseException:
+        await asyncio.to_thread(writer.abort)
+        raise
@@ -0,0 +1,195 @@
+"""
+Rollups: time-bucketed group-by aggregates of a dataset, kept as Arrow IPC files.
+
+A rollup groups rows by date_trunc(granularity, time_column) plus its
+dimension columns and keeps, per group, the row count and for every measure
+column its sum, min, max and non-null count. Those are all decomposable, so
+an append only aggregates the new part and merges the result with the
+previous rollup file (work proportional to the part plus the rollup, never
+the whole dataset). Each dataset version gets its own rollup file, written
+next to the parts:
+
+    DATASETS_DIR/<tenant_id>/<dataset_id>/rollups/<rollup_id>-000003.arrow
+
+Dimension columns keep their dataset names, so the query rewriter
+(app.features.query.rewrite) can register a rollup under the dataset's name
+and only rewrite the aggregates and time buckets. Internal columns start
+with ``$rollup_``, which dataset columns used as dimensions may not.
+
+pyarrow and duckdb are imported lazily so they stay off the app's import path.
+"""
+
+from __future__ import annotations
+
+import os
+import uuid
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Sequence
+
+from app.core.errors.exceptions import BadRequestError
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+GRANULARITIES = ("minute", "hour", "day", "week", "month", "quarter", "year")
+_SUB_DAY = ("minute", "hour", "day")
+
+INTERNAL_PREFIX = "$rollup_"
+BUCKET_COLUMN = "$rollup_bucket"
+COUNT_COLUMN = "$rollup_count"
+MEASURE_STATS = ("sum", "min", "max", "count")
+
+
+def measure_column(stat: str, index: int) -> str:
+    return f"{INTERNAL_PREFIX}{stat}_{index}"
+
+
+def quote(identifier: str) -> str:
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+def covers(rollup_granularity: str, query_granularity: str) -> bool:
+    """Whether buckets of query_granularity are unions of rollup buckets."""
+    if query_granularity == rollup_granularity:
+        return True
+    if rollup_granularity in _SUB_DAY:
+        return GRANULARITIES.index(query_granularity) > GRANULARITIES.index(rollup_granularity)
+    if rollup_granularity == "month":
+        return query_granularity in ("quarter", "year")
+    if rollup_granularity == "quarter":
+        return query_granularity == "year"
+    return False
+
+
+@dataclass(frozen=True)
+class RollupSpec:
+    time_column: str
+    granularity: str
+    dimensions: tuple[str, ...]
+    measures: tuple[str, ...]
+
+
+def validate_spec(spec: RollupSpec, schema: "pa.Schema") -> None:
+    """BadRequestError unless spec fits the dataset's columns."""
+    import pyarrow as pa
+
+    if spec.granularity not in GRANULARITIES:
+        raise BadRequestError(f"granularity must be one of {', '.join(GRANULARITIES)}")
+    types = {f.name: f.type for f in schema}
+    named = [spec.time_column, *spec.dimensions, *spec.measures]
+    missing = sorted({n for n in named if n not in types})
+    if missing:
+        raise BadRequestError(f"Unknown columns: {', '.join(missing)}")
+    if len(set(named)) != len(named):
+        raise BadRequestError("A column can be used only once (time column, dimension or measure)")
+    time_type = types[spec.time_column]
+    if not (pa.types.is_timestamp(time_type) or pa.types.is_date(time_type)):
+        raise BadRequestError(f"Time column {spec.time_column!r} must be a timestamp or date")
+    for name in spec.dimensions:
+        if name.startswith(INTERNAL_PREFIX):
+            raise BadRequestError(f"Dimension names may not start with {INTERNAL_PREFIX!r}")
+        if pa.types.is_nested(types[name]):
+            raise BadRequestError(f"Dimension {name!r} must be a scalar column")
+    for name in spec.measures:
+        if not (pa.types.is_integer(types[name]) or pa.types.is_floating(types[name])):
+            raise BadRequestError(f"Measure {name!r} must be an integer or floating point column")
+
+
+def _partial_sql(spec: RollupSpec, table: str) -> str:
+    """Aggregate raw rows of table into rollup groups."""
+    items = [
+        f"date_trunc('{spec.granularity}', {quote(spec.time_column)}) AS {quote(BUCKET_COLUMN)}",
+        *(quote(d) for d in spec.dimensions),
+        f"count(*) AS {quote(COUNT_COLUMN)}",
+    ]
+    for i, name in enumerate(spec.measures):
+        column = quote(name)
+        items += [
+            f"sum({column}) AS {quote(measure_column('sum', i))}",
+            f"min({column}) AS {quote(measure_column('min', i))}",
+            f"max({column}) AS {quote(measure_column('max', i))}",
+            f"count({column}) AS {quote(measure_column('count', i))}",
+        ]
+    return f"SELECT {', '.join(items)} FROM {table} GROUP BY ALL"
+
+
+def _merge_sql(spec: RollupSpec, source: str) -> str:
+    """Combine rollup groups (rows of source sharing a group are merged)."""
+    items = [quote(BUCKET_COLUMN), *(quote(d) for d in spec.dimensions)]
+    items.append(f"CAST(sum({quote(COUNT_COLUMN)}) AS BIGINT) AS {quote(COUNT_COLUMN)}")
+    for i in range(len(spec.measures)):
+        for stat, merge in (("sum", "sum"), ("min", "min"), ("max", "max")):
+            column = quote(measure_column(stat, i))
+            items.append(f"{merge}({column}) AS {column}")
+        column = quote(measure_column("count", i))
+        items.append(f"CAST(sum({column}) AS BIGINT) AS {column}")
+    return f"SELECT {', '.join(items)} FROM {source} GROUP BY ALL"
+
+
+def _read_files(paths: Sequence[str]) -> tuple["pa.Table", list[Any]]:
+    """Zero-copy table over memory-mapped IPC files, plus the open mappings."""
+    import pyarrow as pa
+
+    sources, tables = [], []
+    try:
+        for path in paths:
+            sources.append(pa.memory_map(path))
+            tables.append(pa.ipc.open_file(sources[-1]).read_all())
+    except BaseException:
+        for source in sources:
+            source.close()
+        raise
+    return pa.concat_tables(tables), sources
+
+
+def update_rollup(
+    spec: RollupSpec,
+    base_path: str | None,
+    part_paths: Sequence[str],
+    out_path: str,
+    *,
+    memory_limit: str,
+    threads: int,
+) -> dict[str, int]:
+    """
+    Write the rollup of base_path's groups plus the rows of part_paths to
+    out_path (atomically). base_path None builds from the parts alone.
+    Returns row_count and byte_size of the new file.
+    """
+    import duckdb
+    import pyarrow as pa
+
+    parts, mappings = _read_files(part_paths)
+    base_mappings: list[Any] = []
+    con = duckdb.connect(
+        ":memory:",
+        config={
+            "memory_limit": memory_limit,
+            "threads": max(1, threads),
+            "python_enable_replacements": False,
+        },
+    )
+    try:
+        con.register("part", parts)
+        sql = _partial_sql(spec, "part")
+        if base_path is not None:
+            base, base_mappings = _read_files([base_path])
+            con.register("base", base)
+            sql = _merge_sql(spec, f"(SELECT * FROM base UNION ALL ({sql}))")
+        table = con.execute(sql).to_arrow_table()
+    finally:
+        con.close()
+        for source in mappings + base_mappings:
+            source.close()
+
+    staging = os.path.join(os.path.dirname(out_path), f".staging-{uuid.uuid4().hex}.arrow")
+    os.makedirs(os.path.dirname(out_path), exist_ok=True)
+    try:
+        with pa.OSFile(staging, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        os.replace(staging, out_path)
+    except BaseException:
+        if os.path.exists(staging):
+            os.unlink(staging)
+        raise
+    return {"row_count": table.num_rows, "byte_size": os.path.getsize(out_path)}
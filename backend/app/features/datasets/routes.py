@@ -0,0 +1,194 @@
+"""Dataset router (tenant-scoped)."""
+
+from __future__ import annotations
+
+import uuid
+
+from fastapi import APIRouter, Depends, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.internal.routes import resolve_tenant
+from app.core.cache.tenant_cache import CachedTenant
+from app.db.repos.dataset_repo import list_datasets
+from app.db.session import get_db, get_read_db
+from app.features.datasets.ingest import detect_format
+from app.features.datasets.schemas import (
+    ColumnProfile,
+    DatasetListResponse,
+    DatasetProfileResponse,
+    DatasetResponse,
+    RollupListResponse,
+    RollupRequest,
+    RollupResponse,
+)
+from app.features.datasets.rollups import RollupSpec
+from app.features.datasets.service import (
+    append_to_dataset,
+    create_dataset,
+    create_rollup,
+    delete_dataset,
+    delete_rollup,
+    get_dataset_or_404,
+    get_dataset_profile,
+    list_dataset_rollups,
+    open_dataset_stream,
+)
+from app.features.query.streaming import (
+    STREAMED_RESPONSES,
+    negotiate_stream_format,
+    stream_response,
+)
+
+router = APIRouter()
+
+
+@router.post("", response_model=DatasetResponse, status_code=201)
+async def upload_dataset(
+    request: Request,
+    name: str = Query(..., min_length=1, max_length=255),
+    description: str | None = Query(None, max_length=2000),
+    tenant: CachedTenant = Depends(resolve_tenant),
+    db: AsyncSession = Depends(get_db),
+) -> DatasetResponse:
+    """
+    Create a dataset from a streamed CSV (header row) or NDJSON request body.
+
+    The body is converted to columnar storage as it arrives; it is never
+    buffered whole.
+    """
+    dataset = await create_dataset(
+        db,
+        tenant_id=tenant.id,
+        name=name,
+        description=description,
+        source_format=detect_format(request.headers.get("content-type")),
+        chunks=request.stream(),
+    )
+    return DatasetResponse.model_validate(dataset)
+
+
+@router.post("/{dataset_id}/data", response_model=DatasetResponse)
+async def append_dataset(
+    dataset_id: uuid.UUID,
+    request: Request,
+    tenant: CachedTenant = Depends(resolve_tenant),
+    db: AsyncSession = Depends(get_db),
+) -> DatasetResponse:
+    """Append a streamed upload with the same columns as the dataset."""
+    dataset = await append_to_dataset(
+        db,
+        tenant_id=tenant.id,
+        dataset_id=dataset_id,
+        source_format=detect_format(request.headers.get("content-type")),
+        chunks=request.stream(),
+    )
+    return DatasetResponse.model_validate(dataset)
+
+
+@router.get("", response_model=DatasetListResponse)
+async def get_datasets(
+    tenant: CachedTenant = Depends(resolve_tenant),
+    db: AsyncSession = Depends(get_read_db),
+) -> DatasetListResponse:
+    datasets = await list_datasets(db, tenant.id)
+    return DatasetListResponse(items=[DatasetResponse.model_validate(d) for d in datasets])
+
+
+@router.get("/{dataset_id}", response_model=DatasetResponse)
+async def get_dataset(
+    dataset_id: uuid.UUID,
+    tenant: CachedTenant = Depends(resolve_tenant),
+    db: AsyncSession = Depends(get_read_db),
+) -> DatasetResponse:
+    dataset = await get_dataset_or_404(db, tenant.id, dataset_id)
+    return DatasetResponse.model_validate(dataset)
+
+
+@router.delete("/{dataset_id}", status_code=204)
+async def remove_dataset(
+    dataset_id: uuid.UUID,
+    tenant: CachedTenant = Depends(resolve_tenant),
+    db: AsyncSession = Depends(get_db),
+) -> Response:
+    """Delete a dataset and its data; running queries on it finish first."""
+    await delete_dataset(db, tenant.id, dataset_id)
+    return Response(status_code=204)
+
+
+@router.get("/{dataset_id}/profile", response_model=DatasetProfileResponse)
+async def get_profile(
+    dataset_id: uuid.UUID,
+    tenant: CachedTenant = Depends(resolve_tenant),
+    db: AsyncSession = Depends(get_read_db),
+) -> DatasetProfileResponse:
+    """Per-column statistics computed at ingest time (no data is scanned)."""
+    dataset, columns = await get_dataset_profile(db, tenant.id, dataset_id)
+    return DatasetProfileResponse(
+        dataset_id=dataset.id,
+        version=dataset.version,
+        row_count=dataset.row_count,
+        columns=[ColumnProfile(**c) for c in columns],
+    )
+
+
+@router.post("/{dataset_id}/rollups", response_model=RollupResponse, status_code=201)
+async def add_rollup(
+    dataset_id: uuid.UUID,
+    body: RollupRequest,
+    tenant: CachedTenant = Depends(resolve_tenant),
+    db: AsyncSession = Depends(get_db),
+) -> RollupResponse:
+    """
+    Declare a rollup. It is built from the current data now and updated
+    incrementally on every append.
+    """
+    rollup = await create_rollup(
+        db,
+        tenant_id=tenant.id,
+        dataset_id=dataset_id,
+        name=body.name,
+        spec=RollupSpec(
+            time_column=body.time_column,
+            granularity=body.granularity,
+            dimensions=tuple(body.dimensions),
+            measures=tuple(body.measures),
+        ),
+    )
+    return RollupResponse.model_validate(rollup)
+
+
+@router.get("/{dataset_id}/rollups", response_model=RollupListResponse)
+async def get_rollups(
+    dataset_id: uuid.UUID,
+    tenant: CachedTenant = Depends(resolve_tenant),
+    db: AsyncSession = Depends(get_read_db),
+) -> RollupListResponse:
+    rollups = await list_dataset_rollups(db, tenant.id, dataset_id)
+    return RollupListResponse(items=[RollupResponse.model_validate(r) for r in rollups])
+
+
+@router.delete("/{dataset_id}/rollups/{rollup_id}", status_code=204)
+async def remove_rollup(
+    dataset_id: uuid.UUID,
+    rollup_id: uuid.UUID,
+    tenant: CachedTenant = Depends(resolve_tenant),
+    db: AsyncSession = Depends(get_db),
+) -> Response:
+    await delete_rollup(db, tenant.id, dataset_id, rollup_id)
+    return Response(status_code=204)
+
+
+@router.get("/{dataset_id}/export", response_class=Response, responses=STREAMED_RESPONSES)
+async def export_dataset(
+    dataset_id: uuid.UUID,
+    request: Request,
+    tenant: CachedTenant = Depends(resolve_tenant),
+    db: AsyncSession = Depends(get_db),
+) -> Response:
+    """
+    Stream every row as NDJSON (default) or, with
+    ``Accept: application/vnd.apache.arrow.stream``, as an Arrow IPC stream.
+    """
+    fmt = negotiate_stream_format(request.headers.get("accept")) or "ndjson"
+    dataset, stream = await open_dataset_stream(db, tenant.id, dataset_id)
+    return stream_response(stream, fmt, headers={"X-Dataset-Version": str(dataset.version)})
@@ -0,0 +1,107 @@
+"""Dataset request/response schemas."""
+
+from __future__ import annotations
+
+import uuid
+from datetime import datetime
+
+from typing import Any, Literal
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class DatasetColumn(BaseModel):
+    name: str
+    type: str
+    nullable: bool = True
+
+
+class DatasetResponse(BaseModel):
+    """Dataset metadata (row data is never echoed)."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: uuid.UUID
+    name: str
+    description: str | None
+    source_format: str
+    status: str
+    columns: list[DatasetColumn]
+    row_count: int
+    byte_size: int
+    version: int
+    created_at: datetime
+    updated_at: datetime
+
+
+class DatasetListResponse(BaseModel):
+    items: list[DatasetResponse]
+
+
+class TopValue(BaseModel):
+    value: Any
+    count: int
+
+
+class ColumnProfile(BaseModel):
+    """
+    Statistics from the ingest-time profile. distinct_estimate and quantiles
+    are sketch estimates; top_values lists only values known to be more
+    frequent than any value not listed (counts are lower bounds).
+    """
+
+    name: str
+    type: str
+    count: int
+    null_count: int
+    null_fraction: float
+    distinct_estimate: int | None
+    min: Any
+    max: Any
+    mean: float | None
+    stddev: float | None
+    quantiles: dict[str, float] | None
+    top_values: list[TopValue] | None
+
+
+class DatasetProfileResponse(BaseModel):
+    dataset_id: uuid.UUID
+    version: int
+    row_count: int
+    columns: list[ColumnProfile]
+
+
+class RollupRequest(BaseModel):
+    """
+    Aggregate to maintain: rows grouped by date_trunc(granularity, time_column)
+    and the dimensions, with count(*) and per measure sum/min/max/count (avg
+    is derived). Queries on the dataset that only need these are answered
+    from the rollup automatically.
+    """
+
+    name: str = Field(..., min_length=1, max_length=64, pattern=r"^[A-Za-z0-9_.-]+$")
+    time_column: str = Field(..., min_length=1)
+    granularity: Literal["minute", "hour", "day", "week", "month", "quarter", "year"]
+    dimensions: list[str] = Field(default_factory=list, max_length=16)
+    measures: list[str] = Field(default_factory=list, max_length=32)
+
+
+class RollupResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: uuid.UUID
+    dataset_id: uuid.UUID
+    name: str
+    time_column: str
+    granularity: str
+    dimensions: list[str]
+    measures: list[str]
+    version: int
+    row_count: int
+    byte_size: int
+    created_at: datetime
+    updated_at: datetime
+
+
+class RollupListResponse(BaseModel):
+    items: list[RollupResponse]
@@ -0,0 +1,448 @@
+"""
+Dataset ingestion: create a dataset from a streamed upload, or append to one.
+
+Every upload becomes one new Arrow IPC part file. The flow keeps DB
+transactions short so no connection is held while a large body streams in:
+1. the dataset row is created (or looked up) and committed,
+2. the body is streamed into a staging file (app.features.datasets.ingest),
+3. the row is locked FOR UPDATE, the staging file is renamed to the next
+   part number and the counters/schema are updated in one commit.
+Concurrent appends to the same dataset therefore serialize only on step 3.
+
+Part files are never rewritten, so an export streams the parts of the version
+it started at while appends continue.
+
+Column profiles are computed while each part is ingested and merged into the
+dataset's profile in the same commit as the part, so GET .../profile only
+reads the row. Datasets ingested before profiling existed get their profile
+built from the part files on first request.
+
+Rollups are maintained the same way: while the dataset row is locked, each
+rollup's previous file is merged with the aggregate of the new part and the
+rollup row is moved to the new version in the same commit. A new rollup is
+built from the parts outside the lock and caught up with parts appended
+meanwhile before it is inserted.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import uuid
+from pathlib import Path
+from typing import Any, AsyncIterable
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config.settings import settings
+from app.core.errors.exceptions import BadRequestError, ConflictError, NotFoundError
+from app.db.models.dataset import Dataset
+from app.db.models.dataset_rollup import DatasetRollup
+from app.db.repos import dataset_repo, rollup_repo
+from app.db.session import use_primary
+from app.features.datasets import storage
+from app.features.datasets.ingest import PartInfo, PartWriter, describe_schema, ingest_stream
+from app.features.datasets.profile import merge_profiles, profile_files, summarize_profile
+from app.features.datasets.rollups import RollupSpec, update_rollup, validate_spec
+from app.features.query.cache import invalidate_dataset
+from app.features.query.streaming import ArrowFileStream
+
+logger = logging.getLogger(__name__)
+
+MAX_NAME_LENGTH = 255
+
+
+def _clean_name(name: str) -> str:
+    name = name.strip()
+    if not name or len(name) > MAX_NAME_LENGTH:
+        raise BadRequestError(f"Dataset name must be 1-{MAX_NAME_LENGTH} characters")
+    return name
+
+
+async def get_dataset_or_404(
+    session: AsyncSession, tenant_id: uuid.UUID, dataset_id: uuid.UUID
+) -> Dataset:
+    dataset = await dataset_repo.get_dataset(session, tenant_id, dataset_id)
+    if dataset is None and await use_primary(session):
+        dataset = await dataset_repo.get_dataset(session, tenant_id, dataset_id)
+    if dataset is None:
+        raise NotFoundError("Dataset not found")
+    return dataset
+
+
+async def _commit_part(
+    session: AsyncSession,
+    tenant_id: uuid.UUID,
+    dataset_id: uuid.UUID,
+    staged: PartInfo,
+    staging: Path,
+) -> Dataset:
+    """Promote a staged part file to the next version and record it."""
+    dataset = await dataset_repo.lock_dataset(session, tenant_id, dataset_id)
+    if dataset is None:
+        # Deleted while the upload was streaming.
+        await session.rollback()
+        staging.unlink(missing_ok=True)
+        raise NotFoundError("Dataset not found")
+    if dataset.version == 0:
+        profile = staged.profile
+    elif dataset.profile is not None:
+        profile = merge_profiles(dataset.profile, staged.profile)
+    else:
+        profile = None  # older parts were never profiled; rebuilt on demand
+    version = dataset.version + 1
+    rollups = await rollup_repo.list_rollups(session, tenant_id, dataset_id)
+    for rollup in rollups:
+        await _advance_rollup(session, rollup, dataset.version, staging)
+    target = storage.part_path(tenant_id, dataset_id, version)
+    await asyncio.to_thread(os.replace, staging, target)
+    await dataset_repo.record_part(
+        session,
+        dataset,
+        rows=staged.rows,
+        byte_size=staged.byte_size,
+        columns=describe_schema(staged.schema),
+        profile=profile,
+    )
+    await session.commit()
+    # Cached query pages for the previous version can no longer be served.
+    invalidate_dataset(tenant_id, dataset_id)
+    for rollup in rollups:
+        await asyncio.to_thread(
+            storage.remove_rollup_files,
+            tenant_id,
+            dataset_id,
+            rollup.id,
+            before_version=version - 1,
+        )
+    # updated_at is server-generated; load it before the session goes away.
+    await session.refresh(dataset)
+    return dataset
+
+
+def _rollup_spec(rollup: DatasetRollup) -> RollupSpec:
+    return RollupSpec(
+        time_column=rollup.time_column,
+        granularity=rollup.granularity,
+        dimensions=tuple(rollup.dimensions),
+        measures=tuple(rollup.measures),
+    )
+
+
+async def _write_rollup(
+    spec: RollupSpec,
+    rollup_id: uuid.UUID,
+    tenant_id: uuid.UUID,
+    dataset_id: uuid.UUID,
+    *,
+    base_version: int | None,
+    part_paths: list[str],
+    version: int,
+) -> dict[str, int]:
+    """Rollup file for version: the base_version file plus part_paths (or the parts alone)."""
+    base = None
+    if base_version is not None:
+        base = str(storage.rollup_path(tenant_id, dataset_id, rollup_id, base_version))
+    return await asyncio.to_thread(
+        update_rollup,
+        spec,
+        base,
+        part_paths,
+        str(storage.rollup_path(tenant_id, dataset_id, rollup_id, version)),
+        memory_limit=settings.QUERY_MEMORY_LIMIT,
+        threads=settings.QUERY_THREADS,
+    )
+
+
+async def _advance_rollup(
+    session: AsyncSession, rollup: DatasetRollup, committed_version: int, new_part: Path
+) -> None:
+    """Fold the part about to become committed_version + 1 into the rollup (row locked)."""
+    tenant_id, dataset_id = rollup.tenant_id, rollup.dataset_id
+    if rollup.version == committed_version:
+        base_version, part_paths = rollup.version, [str(new_part)]
+    else:  # not expected; rebuild rather than merge onto the wrong version
+        base_version = None
+        part_paths = [str(p) for p in storage.part_paths(tenant_id, dataset_id, committed_version)]
+        part_paths.append(str(new_part))
+    version = committed_version + 1
+    info = await _write_rollup(
+        _rollup_spec(rollup),
+        rollup.id,
+        tenant_id,
+        dataset_id,
+        base_version=base_version,
+        part_paths=part_paths,
+        version=version,
+    )
+    await rollup_repo.record_rollup_version(
+        session, rollup, version=version, row_count=info["row_count"], byte_size=info["byte_size"]
+    )
+
+
+async def create_dataset(
+    session: AsyncSession,
+    *,
+    tenant_id: uuid.UUID,
+    name: str,
+    description: str | None,
+    source_format: str,
+    chunks: AsyncIterable[bytes],
+) -> Dataset:
+    """Create a dataset whose first part is the streamed upload."""
+    name = _clean_name(name)
+    if await dataset_repo.get_dataset_by_name(session, tenant_id, name) is not None:
+        raise ConflictError("A dataset with this name already exists")
+    try:
+        dataset = await dataset_repo.create_dataset(
+            session,
+            tenant_id=tenant_id,
+            name=name,
+            description=description,
+            source_format=source_format,
+        )
+        await session.commit()
+    except IntegrityError as exc:
+        await session.rollback()
+        raise ConflictError("A dataset with this name already exists") from exc
+    dataset_id = dataset.id
+
+    staging = storage.staging_path(tenant_id, dataset_id)
+    try:
+        staged = await ingest_stream(chunks, PartWriter(staging, source_format))
+        dataset = await _commit_part(session, tenant_id, dataset_id, staged, staging)
+    except BaseException:
+        # A dataset that never received its first part is not kept.
+        await session.rollback()
+        orphan = await dataset_repo.get_dataset(session, tenant_id, dataset_id)
+        if orphan is not None and orphan.version == 0:
+            await dataset_repo.delete_dataset(session, orphan)
+            await session.commit()
+            await asyncio.to_thread(storage.remove_dataset_files, tenant_id, dataset_id)
+        raise
+
+    logger.info(
+        "Dataset created tenant_id=%s dataset_id=%s rows=%d bytes=%d",
+        tenant_id,
+        dataset_id,
+        dataset.row_count,
+        dataset.byte_size,
+    )
+    return dataset
+
+
+async def append_to_dataset(
+    session: AsyncSession,
+    *,
+    tenant_id: uuid.UUID,
+    dataset_id: uuid.UUID,
+    source_format: str,
+    chunks: AsyncIterable[bytes],
+) -> Dataset:
+    """Append the streamed upload as a new part; it must match the dataset's columns."""
+    dataset = await get_dataset_or_404(session, tenant_id, dataset_id)
+    if dataset.version == 0:
+        raise ConflictError("Dataset is still ingesting its first upload")
+    schema = await asyncio.to_thread(
+        storage.read_schema, storage.part_path(tenant_id, dataset_id, 1)
+    )
+    # Release the connection while the body streams.
+    await session.commit()
+
+    staging = storage.staging_path(tenant_id, dataset_id)
+    staged = await ingest_stream(chunks, PartWriter(staging, source_format, schema))
+    try:
+        dataset = await _commit_part(session, tenant_id, dataset_id, staged, staging)
+    except BaseException:
+        staging.unlink(missing_ok=True)
+        raise
+
+    logger.info(
+        "Dataset appended tenant_id=%s dataset_id=%s version=%d rows=%d",
+        tenant_id,
+        dataset_id,
+        dataset.version,
+        staged.rows,
+    )
+    return dataset
+
+
+async def get_dataset_profile(
+    session: AsyncSession, tenant_id: uuid.UUID, dataset_id: uuid.UUID
+) -> tuple[Dataset, list[dict[str, Any]]]:
+    """Dataset and its per-column statistics, from the stored profile."""
+    dataset = await dataset_repo.get_dataset_with_profile(session, tenant_id, dataset_id)
+    if dataset is None and await use_primary(session):
+        dataset = await dataset_repo.get_dataset_with_profile(session, tenant_id, dataset_id)
+    if dataset is None:
+        raise NotFoundError("Dataset not found")
+    if dataset.version == 0:
+        raise ConflictError("Dataset is still ingesting its first upload")
+    profile = dataset.profile
+    if profile is None:
+        profile = await _backfill_profile(session, dataset)
+    return dataset, summarize_profile(profile)
+
+
+async def _backfill_profile(session: AsyncSession, dataset: Dataset) -> dict[str, Any]:
+    """Profile a dataset ingested before profiling; stored unless it changed meanwhile."""
+    tenant_id, dataset_id, version = dataset.tenant_id, dataset.id, dataset.version
+    await session.commit()
+    await use_primary(session)  # the profile is stored on the primary
+    paths = storage.part_paths(tenant_id, dataset_id, version)
+    profile = await asyncio.to_thread(profile_files, [str(p) for p in paths])
+    locked = await dataset_repo.lock_dataset(session, tenant_id, dataset_id)
+    if locked is not None and locked.version == version and locked.profile is None:
+        locked.profile = profile
+        await session.commit()
+        logger.info("Dataset profile backfilled tenant_id=%s dataset_id=%s", tenant_id, dataset_id)
+    else:
+        await session.rollback()
+    return profile
+
+
+async def delete_dataset(
+    session: AsyncSession, tenant_id: uuid.UUID, dataset_id: uuid.UUID
+) -> None:
+    """
+    Delete the dataset row, then its files. Queries already running keep
+    reading their mappings; the files are unmapped when the last one ends.
+    """
+    dataset = await dataset_repo.lock_dataset(session, tenant_id, dataset_id)
+    if dataset is None:
+        raise NotFoundError("Dataset not found")
+    await dataset_repo.delete_dataset(session, dataset)
+    await session.commit()
+    invalidate_dataset(tenant_id, dataset_id)
+    await asyncio.to_thread(storage.remove_dataset_files, tenant_id, dataset_id)
+    logger.info("Dataset deleted tenant_id=%s dataset_id=%s", tenant_id, dataset_id)
+
+
+async def create_rollup(
+    session: AsyncSession,
+    *,
+    tenant_id: uuid.UUID,
+    dataset_id: uuid.UUID,
+    name: str,
+    spec: RollupSpec,
+) -> DatasetRollup:
+    """Declare a rollup and build it from the dataset's current parts."""
+    name = _clean_name(name)
+    dataset = await get_dataset_or_404(session, tenant_id, dataset_id)
+    if dataset.version == 0:
+        raise ConflictError("Dataset is still ingesting its first upload")
+    existing = await rollup_repo.list_rollups(session, tenant_id, dataset_id)
+    if any(r.name == name for r in existing):
+        raise ConflictError("A rollup with this name already exists")
+    if len(existing) >= settings.DATASET_MAX_ROLLUPS:
+        raise ConflictError(f"A dataset can have at most {settings.DATASET_MAX_ROLLUPS} rollups")
+    version = dataset.version
+    schema = await asyncio.to_thread(
+        storage.read_schema, storage.part_path(tenant_id, dataset_id, 1)
+    )
+    validate_spec(spec, schema)
+    # The build scans every part; do not hold a connection meanwhile.
+    await session.commit()
+
+    rollup_id = uuid.uuid4()
+    try:
+        info = await _write_rollup(
+            spec,
+            rollup_id,
+            tenant_id,
+            dataset_id,
+            base_version=None,
+            part_paths=[str(p) for p in storage.part_paths(tenant_id, dataset_id, version)],
+            version=version,
+        )
+        locked = await dataset_repo.lock_dataset(session, tenant_id, dataset_id)
+        if locked is None:
+            raise NotFoundError("Dataset not found")
+        if locked.version > version:
+            # Parts appended while building are folded in before the rollup becomes visible.
+            info = await _write_rollup(
+                spec,
+                rollup_id,
+                tenant_id,
+                dataset_id,
+                base_version=version,
+                part_paths=[
+                    str(storage.part_path(tenant_id, dataset_id, v))
+                    for v in range(version + 1, locked.version + 1)
+                ],
+                version=locked.version,
+            )
+            version = locked.version
+        rollup = await rollup_repo.create_rollup(
+            session,
+            rollup_id=rollup_id,
+            tenant_id=tenant_id,
+            dataset_id=dataset_id,
+            name=name,
+            time_column=spec.time_column,
+            granularity=spec.granularity,
+            dimensions=list(spec.dimensions),
+            measures=list(spec.measures),
+            version=version,
+            row_count=info["row_count"],
+            byte_size=info["byte_size"],
+        )
+        await session.commit()
+    except BaseException as exc:
+        await session.rollback()
+        await asyncio.to_thread(storage.remove_rollup_files, tenant_id, dataset_id, rollup_id)
+        if isinstance(exc, IntegrityError):
+            raise ConflictError("A rollup with this name already exists") from exc
+        raise
+    await asyncio.to_thread(
+        storage.remove_rollup_files, tenant_id, dataset_id, rollup_id, before_version=version
+    )
+    await session.refresh(rollup)
+    logger.info(
+        "Rollup created tenant_id=%s dataset_id=%s rollup_id=%s rows=%d",
+        tenant_id,
+        dataset_id,
+        rollup_id,
+        rollup.row_count,
+    )
+    return rollup
+
+
+async def list_dataset_rollups(
+    session: AsyncSession, tenant_id: uuid.UUID, dataset_id: uuid.UUID
+) -> list[DatasetRollup]:
+    await get_dataset_or_404(session, tenant_id, dataset_id)
+    return await rollup_repo.list_rollups(session, tenant_id, dataset_id)
+
+
+async def delete_rollup(
+    session: AsyncSession, tenant_id: uuid.UUID, dataset_id: uuid.UUID, rollup_id: uuid.UUID
+) -> None:
+    """Drop a rollup; queries stop using it immediately, running ones finish first."""
+    # Serializes with appends, which would otherwise write a new file for it.
+    if await dataset_repo.lock_dataset(session, tenant_id, dataset_id) is None:
+        raise NotFoundError("Dataset not found")
+    rollup = await rollup_repo.get_rollup(session, tenant_id, dataset_id, rollup_id)
+    if rollup is None:
+        raise NotFoundError("Rollup not found")
+    await rollup_repo.delete_rollup(session, rollup)
+    await session.commit()
+    await asyncio.to_thread(storage.remove_rollup_files, tenant_id, dataset_id, rollup_id)
+    logger.info(
+        "Rollup deleted tenant_id=%s dataset_id=%s rollup_id=%s", tenant_id, dataset_id, rollup_id
+    )
+
+
+async def open_dataset_stream(
+    session: AsyncSession, tenant_id: uuid.UUID, dataset_id: uuid.UUID
+) -> tuple[Dataset, ArrowFileStream]:
+    """All rows of the dataset's current version, for a streamed export."""
+    dataset = await get_dataset_or_404(session, tenant_id, dataset_id)
+    if dataset.version == 0:
+        raise ConflictError("Dataset is still ingesting its first upload")
+    await session.close()
+    paths = storage.part_paths(tenant_id, dataset_id, dataset.version)
+    stream = await asyncio.to_thread(ArrowFileStream, [str(p) for p in paths])
+    return dataset, stream
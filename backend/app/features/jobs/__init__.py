@@ -0,0 +1 @@
+# Background jobs feature (queued analyses run by a separate worker process)
@@ -0,0 +1,331 @@
+"""
+Job state changes pushed to clients as Server-Sent Events.
+
+Every change of a job's status or progress is announced with NOTIFY on
+job_repo.JOB_EVENTS_CHANNEL, in the transaction that makes it (by the
+worker, or by the API for cancellations). Each API process runs one
+JobEventHub: a single LISTEN connection whose notifications are fanned out
+in-process to the streams watching that job, so a thousand open streams
+cost one Postgres connection and no polling. With JOB_EVENTS_BACKEND=poll
+(for poolers that cannot hold a LISTEN, e.g. pgbouncer in transaction mode)
+the hub instead reads all watched jobs with one query per interval.
+
+A stream sends the job's current state first, then:
+
+    event: status    full job (as GET /v1/jobs/{id}) on status or cancellation changes
+    event: progress  {"id", "progress", "progress_message"} while running
+
+and ends after a finished status. Comment lines keep idle connections open.
+Notifications can be missed while the LISTEN connection is (re)established
+or a slow stream's backlog overflows; subscribers are then told to resync
+and re-read the job. Streams hold no DB connection between reads.
+
+The body goes out chunk by chunk through the app's pure ASGI middleware;
+X-Accel-Buffering turns off buffering in nginx-style proxies.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import json
+import logging
+import threading
+import uuid
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, AsyncIterator
+
+from sqlalchemy import select
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config.settings import settings
+from app.core.errors.exceptions import ServiceUnavailableError
+from app.core.metrics.registry import numeric_stats, registry
+from app.db.models.job import FINISHED_STATUSES, Job
+from app.db.repos.job_repo import JOB_EVENTS_CHANNEL
+from app.db.session import AsyncSessionLocal
+from app.features.jobs.schemas import JobResponse
+from app.features.jobs.service import get_job_or_404
+
+logger = logging.getLogger(__name__)
+
+EVENT_STREAM_MEDIA_TYPE = "text/event-stream"
+EVENT_STREAM_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+# Backlog per stream; on overflow the stream resyncs from the DB instead.
+_MAX_PENDING = 64
+_RECONNECT_SECONDS = (0.5, 1.0, 2.0, 5.0)
+
+
+@dataclass(frozen=True)
+class JobEvent:
+    id: uuid.UUID
+    tenant_id: uuid.UUID
+    status: str
+    progress: float
+    progress_message: str | None
+    cancel_requested: bool
+
+    @classmethod
+    def from_payload(cls, payload: str) -> "JobEvent":
+        data = json.loads(payload)
+        return cls(
+            id=uuid.UUID(data["id"]),
+            tenant_id=uuid.UUID(data["tenant_id"]),
+            status=data["status"],
+            progress=float(data["progress"]),
+            progress_message=data["progress_message"],
+            cancel_requested=bool(data["cancel_requested"]),
+        )
+
+
+class JobSubscription:
+    """Pending events of one job for one stream; None in the backlog means "resync"."""
+
+    def __init__(self, hub: "JobEventHub", job_id: uuid.UUID) -> None:
+        self.job_id = job_id
+        self._hub = hub
+        self._pending: deque[JobEvent | None] = deque()
+        self._wake = asyncio.Event()
+
+    def push(self, event: JobEvent | None) -> None:
+        if len(self._pending) >= _MAX_PENDING:
+            self._pending.clear()
+            event = None
+        self._pending.append(event)
+        self._wake.set()
+
+    async def next_events(self, timeout: float) -> list[JobEvent | None]:
+        """Everything pending, waiting up to timeout for something; [] on timeout."""
+        if not self._pending:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout)
+            except asyncio.TimeoutError:
+                return []
+        self._wake.clear()
+        events = list(self._pending)
+        self._pending.clear()
+        return events
+
+    def close(self) -> None:
+        self._hub._unsubscribe(self)
+
+
+class JobEventHub:
+    """In-process fan-out of job notifications; the source starts with the first subscriber."""
+
+    def __init__(self) -> None:
+        self._subscribers: dict[uuid.UUID, set[JobSubscription]] = {}
+        self._task: asyncio.Task[None] | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._streams = 0
+        self._streams_lock = threading.Lock()
+        self._stats = {"notifications": 0, "resyncs": 0, "reconnects": 0}
+
+    def subscribe(self, job_id: uuid.UUID) -> JobSubscription:
+        subscription = JobSubscription(self, job_id)
+        self._subscribers.setdefault(job_id, set()).add(subscription)
+        self._ensure_source()
+        return subscription
+
+    def _unsubscribe(self, subscription: JobSubscription) -> None:
+        subscribers = self._subscribers.get(subscription.job_id)
+        if subscribers is not None:
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[subscription.job_id]
+
+    def publish(self, event: JobEvent) -> None:
+        self._stats["notifications"] += 1
+        for subscription in list(self._subscribers.get(event.id, ())):
+            subscription.push(event)
+
+    def resync(self) -> None:
+        """Tell every subscriber that notifications may have been missed."""
+        self._stats["resyncs"] += 1
+        for subscribers in list(self._subscribers.values()):
+            for subscription in list(subscribers):
+                subscription.push(None)
+
+    def acquire_stream(self) -> None:
+        with self._streams_lock:
+            if self._streams >= settings.JOB_EVENTS_MAX_STREAMS:
+                raise ServiceUnavailableError("Too many job event streams, please retry")
+            self._streams += 1
+
+    def release_stream(self) -> None:
+        with self._streams_lock:
+            self._streams -= 1
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "streams": self._streams,
+            "watched_jobs": len(self._subscribers),
+            **self._stats,
+        }
+
+    def _ensure_source(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._task is not None and not self._task.done() and self._loop is loop:
+            return
+        self._loop = loop
+        source = self._poll if settings.JOB_EVENTS_BACKEND == "poll" else self._listen
+        # Fresh context: the first subscriber's request ID and SQL accounting stay with it.
+        self._task = loop.create_task(source(), name="job-events", context=contextvars.Context())
+
+    async def close(self) -> None:
+        task, self._task = self._task, None
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    async def _listen(self) -> None:
+        import asyncpg
+
+        url = make_url(settings.DATABASE_URL).set(drivername="postgresql")
+        dsn = url.render_as_string(hide_password=False)
+        attempt = 0
+        while True:
+            lost = asyncio.Event()
+            try:
+                connection = await asyncpg.connect(dsn)
+            except (OSError, asyncpg.PostgresError) as exc:
+                delay = _RECONNECT_SECONDS[min(attempt, len(_RECONNECT_SECONDS) - 1)]
+                logger.warning("Job events: could not connect (%s); retrying in %ss", exc, delay)
+                attempt += 1
+                await asyncio.sleep(delay)
+                continue
+            try:
+                connection.add_termination_listener(lambda _: lost.set())
+                await connection.add_listener(JOB_EVENTS_CHANNEL, self._on_notify)
+                if attempt:
+                    self._stats["reconnects"] += 1
+                attempt = 1
+                # Changes made before LISTEN took effect were not delivered.
+                self.resync()
+                await lost.wait()
+                logger.warning("Job events: LISTEN connection lost; reconnecting")
+            finally:
+                if not connection.is_closed():
+                    await connection.close(timeout=5)
+
+    def _on_notify(self, _connection: Any, _pid: int, _channel: str, payload: str) -> None:
+        try:
+            event = JobEvent.from_payload(payload)
+        except (ValueError, KeyError, TypeError):
+            logger.warning("Job events: malformed notification ignored")
+            return
+        self.publish(event)
+
+    async def _poll(self) -> None:
+        last: dict[uuid.UUID, JobEvent] = {}
+        while True:
+            await asyncio.sleep(max(0.1, settings.JOB_EVENTS_POLL_SECONDS))
+            watched = list(self._subscribers)
+            if not watched:
+                last.clear()
+                continue
+            try:
+                async with AsyncSessionLocal() as session:
+                    rows = await session.execute(
+                        select(
+                            Job.id,
+                            Job.tenant_id,
+                            Job.status,
+                            Job.progress,
+                            Job.progress_message,
+                            Job.cancel_requested,
+                        ).where(Job.id.in_(watched))
+                    )
+                    current = {row.id: JobEvent(*row) for row in rows}
+            except Exception:
+                logger.exception("Job events: poll failed")
+                continue
+            for job_id, event in current.items():
+                if last.get(job_id) != event:
+                    self.publish(event)
+            last = current
+
+
+job_events = JobEventHub()
+
+registry.register_collector(
+    "Job event stream stats", lambda: numeric_stats("ambient_job_events", job_events.stats())
+)
+
+
+def _sse(event: str | None, data: Any = None) -> bytes:
+    if event is None:
+        return b": keepalive\n\n"
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n".encode()
+
+
+def _status_event(job: Job) -> bytes:
+    return _sse("status", JobResponse.model_validate(job).model_dump(mode="json"))
+
+
+async def _read_job(tenant_id: uuid.UUID, job_id: uuid.UUID) -> Job | None:
+    async with AsyncSessionLocal() as session:
+        stmt = select(Job).where(Job.tenant_id == tenant_id).where(Job.id == job_id)
+        return (await session.execute(stmt)).scalar_one_or_none()
+
+
+async def open_job_event_stream(
+    session: AsyncSession, tenant_id: uuid.UUID, job_id: uuid.UUID
+) -> AsyncIterator[bytes]:
+    """SSE body for one job; a missing job raises NotFoundError here, before any output."""
+    job_events.acquire_stream()
+    # Subscribe before reading, so no change between the read and the subscription is lost.
+    subscription = job_events.subscribe(job_id)
+    try:
+        job = await get_job_or_404(session, tenant_id, job_id)
+        await session.close()
+        if session.info.get("replica") and job.status not in FINISHED_STATUSES:
+            # A replica read may predate changes announced before we subscribed.
+            subscription.push(None)
+    except BaseException:
+        subscription.close()
+        job_events.release_stream()
+        raise
+    return _job_event_body(subscription, job)
+
+
+async def _job_event_body(subscription: JobSubscription, job: Job) -> AsyncIterator[bytes]:
+    try:
+        yield f"retry: {_RECONNECT_SECONDS[-1] * 1000:.0f}\n\n".encode()
+        yield _status_event(job)
+        status, cancel_requested = job.status, job.cancel_requested
+        while status not in FINISHED_STATUSES:
+            events = await subscription.next_events(settings.JOB_EVENTS_KEEPALIVE_SECONDS)
+            if not events:
+                yield _sse(None)
+                continue
+            latest = events[-1]
+            changed = any(
+                event is None
+                or event.status != status
+                or event.cancel_requested != cancel_requested
+                for event in events
+            )
+            if changed:
+                current = await _read_job(job.tenant_id, job.id)
+                if current is None:
+                    return  # deleted with its tenant
+                status, cancel_requested = current.status, current.cancel_requested
+                yield _status_event(current)
+            elif latest is not None:
+                yield _sse(
+                    "progress",
+                    {
+                        "id": str(latest.id),
+                        "progress": latest.progress,
+                        "progress_message": latest.progress_message,
+                    },
+                )
+    finally:
+        subscription.close()
+        job_events.release_stream()
@@ -0,0 +1,115 @@
+"""
+Job handlers. They run inside the worker's process pool (spawned processes),
+receive a JobContext plus the job payload, and return a JSON-serializable
+result summary. Heavy output goes to ctx.result_path, not the return value.
+
+Handlers should call ctx.report() as they go and stop early (raise
+JobCancelled) once ctx.cancel_requested() turns true.
+"""
+
+from __future__ import annotations
+
+import logging
+import signal
+import uuid
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from app.core.config.settings import settings
+from app.core.logging.setup import configure_logging, request_id_ctx
+from app.features.datasets import storage
+from app.features.query.engine import DatasetSource, QueryCancelled, export_query
+
+logger = logging.getLogger(__name__)
+
+
+class JobCancelled(Exception):
+    """The job stopped because cancellation was requested."""
+
+
+@dataclass
+class JobContext:
+    job_id: str
+    tenant_id: str
+    result_path: str
+    progress_queue: Any  # multiprocessing.Manager().Queue()
+    cancel_flags: Any  # multiprocessing.Manager().dict(), job_id -> True
+
+    def report(self, progress: float | None, message: str | None = None) -> None:
+        """progress=None updates only the message (the total is not known yet)."""
+        if progress is not None:
+            progress = min(max(progress, 0.0), 1.0)
+        self.progress_queue.put((self.job_id, progress, message))
+
+    def cancel_requested(self) -> bool:
+        return bool(self.cancel_flags.get(self.job_id))
+
+
+def run_query_job(ctx: JobContext, payload: dict[str, Any]) -> dict[str, Any]:
+    """Run a full (unpaged) SELECT and write the result to ctx.result_path."""
+    tenant_id = uuid.UUID(ctx.tenant_id)
+    sources = [
+        DatasetSource(
+            id=uuid.UUID(s["id"]),
+            name=s["name"],
+            version=s["version"],
+            paths=tuple(
+                str(p) for p in storage.part_paths(tenant_id, uuid.UUID(s["id"]), s["version"])
+            ),
+        )
+        for s in payload["sources"]
+    ]
+    ctx.report(0.05, "Running query")
+    try:
+        result = export_query(
+            sources,
+            payload["sql"],
+            payload.get("params") or [],
+            ctx.result_path,
+            memory_limit=settings.QUERY_MEMORY_LIMIT,
+            threads=settings.QUERY_THREADS,
+            timeout_seconds=settings.JOB_QUERY_TIMEOUT_SECONDS,
+            on_rows=lambda rows: ctx.report(None, f"Writing results ({rows} rows)"),
+            should_cancel=ctx.cancel_requested,
+        )
+    except QueryCancelled as exc:
+        raise JobCancelled() from exc
+    ctx.report(1.0, f"Done ({result['row_count']} rows)")
+    return result
+
+
+JOB_HANDLERS: dict[str, Callable[[JobContext, dict[str, Any]], dict[str, Any]]] = {
+    "query": run_query_job,
+}
+
+
+def ignore_sigint() -> None:
+    """Ctrl+C reaches the whole process group; only the worker's main process handles it."""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def init_worker_process() -> None:
+    """Pool initializer: plain synchronous logging (no listener thread per process)."""
+    ignore_sigint()
+    configure_logging(settings.LOG_LEVEL, json_format=settings.LOG_FORMAT.lower() == "json")
+
+
+def execute_job(
+    kind: str,
+    job_id: str,
+    tenant_id: str,
+    payload: dict[str, Any],
+    result_path: str,
+    request_id: str | None,
+    progress_queue: Any,
+    cancel_flags: Any,
+) -> dict[str, Any]:
+    """Pool entry point: run one job with the submitting request's request_id in logs."""
+    token = request_id_ctx.set(request_id)
+    try:
+        handler = JOB_HANDLERS[kind]
+        ctx = JobContext(job_id, tenant_id, result_path, progress_queue, cancel_flags)
+        logger.info("Job running job_id=%s kind=%s", job_id, kind)
+        return handler(ctx, payload)
+    finally:
+        request_id_ctx.reset(token)
@@ -0,0 +1,37 @@
+"""Job result files: one Arrow IPC file per job under JOB_RESULTS_DIR/<tenant_id>/."""
+
+from __future__ import annotations
+
+import time
+import uuid
+from pathlib import Path
+
+from app.core.config.settings import settings
+from app.features.query.engine import QueryPage, page_from_table
+
+
+def result_path(tenant_id: uuid.UUID, job_id: uuid.UUID) -> Path:
+    return Path(settings.JOB_RESULTS_DIR) / str(tenant_id) / f"{job_id}.arrow"
+
+
+def remove_expired_results(max_age_seconds: float) -> int:
+    """Delete result files last written more than max_age_seconds ago; returns the count."""
+    cutoff = time.time() - max_age_seconds
+    removed = 0
+    for path in Path(settings.JOB_RESULTS_DIR).glob("*/*.arrow"):
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+                removed += 1
+        except FileNotFoundError:
+            pass
+    return removed
+
+
+def read_result_page(path: Path, offset: int, limit: int) -> QueryPage:
+    """Page of a result file; memory-mapped, so only the page's rows are materialized."""
+    import pyarrow as pa
+
+    with pa.memory_map(str(path)) as source:
+        table = pa.ipc.open_file(source).read_all()
+        return page_from_table(table, offset, limit)
@@ -0,0 +1,105 @@
+"""Background job router (tenant-scoped)."""
+
+from __future__ import annotations
+
+import uuid
+
+from fastapi import APIRouter, Depends, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.internal.routes import resolve_tenant
+from app.core.cache.tenant_cache import CachedTenant
+from app.db.session import get_db, get_read_db
+from app.features.jobs.events import (
+    EVENT_STREAM_HEADERS,
+    EVENT_STREAM_MEDIA_TYPE,
+    open_job_event_stream,
+)
+from app.features.jobs.schemas import JobResponse, JobResultResponse, QueryJobRequest
+from app.features.jobs.service import (
+    cancel_job,
+    get_job_or_404,
+    get_job_result_page,
+    open_job_result_stream,
+    submit_query_job,
+)
+from app.features.query.schemas import QueryColumn
+from app.features.query.streaming import (
+    STREAMED_RESPONSES,
+    negotiate_stream_format,
+    stream_response,
+)
+
+router = APIRouter()
+
+
+@router.post("", response_model=JobResponse, status_code=202)
+async def submit_job(
+    body: QueryJobRequest,
+    tenant: CachedTenant = Depends(resolve_tenant),
+    db: AsyncSession = Depends(get_db),
+) -> JobResponse:
+    """Queue a background query; follow GET /v1/jobs/{id}/events for progress."""
+    job = await submit_query_job(db, tenant_id=tenant.id, sql=body.sql, params=body.params)
+    return JobResponse.model_validate(job)
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def get_job(
+    job_id: uuid.UUID,
+    tenant: CachedTenant = Depends(resolve_tenant),
+    db: AsyncSession = Depends(get_read_db),
+) -> JobResponse:
+    job = await get_job_or_404(db, tenant.id, job_id)
+    return JobResponse.model_validate(job)
+
+
+@router.get("/{job_id}/events", responses={200: {"content": {EVENT_STREAM_MEDIA_TYPE: {}}}})
+async def job_events(
+    job_id: uuid.UUID,
+    tenant: CachedTenant = Depends(resolve_tenant),
+    db: AsyncSession = Depends(get_read_db),
+) -> StreamingResponse:
+    """Server-Sent Events: the job's state, then its status and progress changes until it ends."""
+    stream = await open_job_event_stream(db, tenant.id, job_id)
+    return StreamingResponse(
+        stream, media_type=EVENT_STREAM_MEDIA_TYPE, headers=EVENT_STREAM_HEADERS
+    )
+
+
+@router.post("/{job_id}/cancel", response_model=JobResponse)
+async def cancel(
+    job_id: uuid.UUID,
+    tenant: CachedTenant = Depends(resolve_tenant),
+    db: AsyncSession = Depends(get_db),
+) -> JobResponse:
+    """Cancel a queued job, or ask the worker to stop a running one."""
+    job = await cancel_job(db, tenant.id, job_id)
+    return JobResponse.model_validate(job)
+
+
+@router.get("/{job_id}/result", response_model=JobResultResponse, responses=STREAMED_RESPONSES)
+async def get_result(
+    job_id: uuid.UUID,
+    request: Request,
+    cursor: str | None = Query(None),
+    page_size: int | None = Query(None, ge=1),
+    tenant: CachedTenant = Depends(resolve_tenant),
+    db: AsyncSession = Depends(get_read_db),
+) -> JobResultResponse | Response:
+    """Page through a finished job's result, or stream all of it (see POST /v1/query)."""
+    fmt = negotiate_stream_format(request.headers.get("accept"))
+    if fmt is not None:
+        stream = await open_job_result_stream(db, tenant.id, job_id)
+        return stream_response(stream, fmt)
+
+    job, page, next_cursor = await get_job_result_page(
+        db, tenant.id, job_id, cursor=cursor, page_size=page_size
+    )
+    return JobResultResponse(
+        columns=[QueryColumn(**c) for c in page.columns],
+        rows=page.rows,
+        row_count=(job.result or {}).get("row_count", 0),
+        next_cursor=next_cursor,
+    )
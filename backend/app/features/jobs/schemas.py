@@ -0,0 +1,44 @@
+"""Job request/response schemas."""
+
+from __future__ import annotations
+
+import uuid
+from datetime import datetime
+from typing import Any, Literal
+
+from pydantic import BaseModel, ConfigDict, Field
+
+from app.features.query.schemas import QueryColumn
+
+
+class QueryJobRequest(BaseModel):
+    """A SELECT to run in the background; the whole result is kept for paging."""
+
+    kind: Literal["query"] = "query"
+    sql: str = Field(..., min_length=1, max_length=100_000)
+    params: list[Any] = Field(default_factory=list)
+
+
+class JobResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: uuid.UUID
+    kind: str
+    status: str
+    progress: float
+    progress_message: str | None
+    error: str | None
+    result: dict[str, Any] | None
+    cancel_requested: bool
+    attempts: int
+    request_id: str | None
+    created_at: datetime
+    started_at: datetime | None
+    finished_at: datetime | None
+
+
+class JobResultResponse(BaseModel):
+    columns: list[QueryColumn]
+    rows: list[list[Any]]
+    row_count: int
+    next_cursor: str | None
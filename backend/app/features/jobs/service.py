@@ -0,0 +1,116 @@
+"""
+Job submission, status, cancellation and results (paged or streamed; API side).
+
+Jobs are executed by the worker process (app.features.jobs.worker); the API
+only writes the jobs table and reads result files.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import uuid
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config.settings import settings
+from app.core.errors.exceptions import ConflictError, NotFoundError
+from app.core.logging.setup import request_id_ctx
+from app.db.models.job import FINISHED_STATUSES, Job
+from app.db.repos import job_repo
+from app.db.session import use_primary
+from app.features.jobs.results import read_result_page, result_path
+from app.features.query.engine import QueryPage
+from app.features.query.service import decode_cursor, encode_cursor, resolve_sources
+from app.features.query.streaming import ArrowFileStream
+
+logger = logging.getLogger(__name__)
+
+
+async def submit_query_job(
+    session: AsyncSession, *, tenant_id: uuid.UUID, sql: str, params: list[Any]
+) -> Job:
+    """Queue a query job; datasets are pinned at their current versions."""
+    sources = await resolve_sources(session, tenant_id, sql)
+    payload = {
+        "sql": sql,
+        "params": params,
+        "sources": [{"id": str(s.id), "name": s.name, "version": s.version} for s in sources],
+    }
+    job = await job_repo.create_job(
+        session,
+        tenant_id=tenant_id,
+        kind="query",
+        payload=payload,
+        request_id=request_id_ctx.get(),
+    )
+    await session.commit()
+    await session.refresh(job)
+    logger.info("Job submitted job_id=%s tenant_id=%s kind=query", job.id, tenant_id)
+    return job
+
+
+async def get_job_or_404(session: AsyncSession, tenant_id: uuid.UUID, job_id: uuid.UUID) -> Job:
+    job = await job_repo.get_job(session, tenant_id, job_id)
+    if job is None and await use_primary(session):
+        job = await job_repo.get_job(session, tenant_id, job_id)
+    if job is None:
+        raise NotFoundError("Job not found")
+    return job
+
+
+async def cancel_job(session: AsyncSession, tenant_id: uuid.UUID, job_id: uuid.UUID) -> Job:
+    job = await get_job_or_404(session, tenant_id, job_id)
+    if job.status in FINISHED_STATUSES:
+        raise ConflictError(f"Job already {job.status}")
+    await job_repo.request_cancel(session, job)
+    await session.commit()
+    await session.refresh(job)
+    logger.info("Job cancel requested job_id=%s status=%s", job.id, job.status)
+    return job
+
+
+async def _succeeded_job(
+    session: AsyncSession, tenant_id: uuid.UUID, job_id: uuid.UUID
+) -> Job:
+    job = await get_job_or_404(session, tenant_id, job_id)
+    if job.status != "succeeded" and await use_primary(session):
+        job = await get_job_or_404(session, tenant_id, job_id)  # the replica may lag
+    if job.status != "succeeded":
+        raise ConflictError(f"Job is {job.status}; results are available once it succeeds")
+    await session.close()
+    return job
+
+
+async def get_job_result_page(
+    session: AsyncSession,
+    tenant_id: uuid.UUID,
+    job_id: uuid.UUID,
+    *,
+    cursor: str | None,
+    page_size: int | None,
+) -> tuple[Job, QueryPage, str | None]:
+    job = await _succeeded_job(session, tenant_id, job_id)
+    limit = min(page_size or settings.QUERY_DEFAULT_PAGE_SIZE, settings.QUERY_MAX_PAGE_SIZE)
+    fingerprint = job.id.hex[:16]
+    offset = decode_cursor(cursor, fingerprint) if cursor else 0
+    path = result_path(tenant_id, job.id)
+    try:
+        page = await asyncio.to_thread(read_result_page, path, offset, limit)
+    except FileNotFoundError as exc:
+        raise NotFoundError("Job result is no longer available") from exc
+    next_cursor = encode_cursor(offset + limit, fingerprint) if page.has_more else None
+    return job, page, next_cursor
+
+
+async def open_job_result_stream(
+    session: AsyncSession, tenant_id: uuid.UUID, job_id: uuid.UUID
+) -> ArrowFileStream:
+    """The whole result of a succeeded job, for a streamed response."""
+    job = await _succeeded_job(session, tenant_id, job_id)
+    path = result_path(tenant_id, job.id)
+    try:
+        return await asyncio.to_thread(ArrowFileStream, [str(path)])
+    except FileNotFoundError as exc:
+        raise NotFoundError("Job result is no longer available") from exc
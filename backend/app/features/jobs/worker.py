@@ -0,0 +1,283 @@
+"""
+Background job worker.
+
+    python -m app.features.jobs.worker [--processes N]
+
+One asyncio loop claims queued jobs (SELECT ... FOR UPDATE SKIP LOCKED, so
+any number of workers can share the table) and runs each on a spawned
+process pool, at most --processes at a time. Alongside it:
+- progress reported by handlers through a Manager queue is written to the
+  job row (coalesced per job),
+- heartbeats of running jobs are refreshed and cancellation requests are
+  forwarded to the handlers,
+- running jobs whose worker stopped heartbeating are requeued (or failed
+  after JOB_MAX_ATTEMPTS),
+- result files older than JOB_RESULT_TTL_SECONDS are deleted (checked at
+  most every RESULT_SWEEP_INTERVAL seconds).
+
+Log lines of a job carry the request_id of the request that submitted it.
+SIGINT/SIGTERM stop claiming and wait for running jobs to finish.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import os
+import queue
+import signal
+import socket
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timedelta, timezone
+from multiprocessing.managers import SyncManager
+from typing import Any
+
+from app.core.config.settings import settings
+from app.core.errors.exceptions import AppError
+from app.core.logging.setup import (
+    configure_logging,
+    parse_logger_table,
+    request_id_ctx,
+    shutdown_logging,
+)
+from app.db.models.job import Job
+from app.db.repos import job_repo
+from app.db.session import AsyncSessionLocal
+from app.features.jobs.handlers import (
+    JobCancelled,
+    execute_job,
+    ignore_sigint,
+    init_worker_process,
+)
+from app.features.jobs.results import remove_expired_results, result_path
+
+logger = logging.getLogger(__name__)
+
+MAX_ERROR_LENGTH = 1000
+RESULT_SWEEP_INTERVAL = 3600.0
+
+
+class JobWorker:
+    def __init__(
+        self,
+        *,
+        processes: int,
+        poll_interval: float,
+        stale_seconds: float,
+        max_attempts: int,
+        result_ttl_seconds: float = 0,
+    ) -> None:
+        self.processes = max(1, processes)
+        self.poll_interval = poll_interval
+        self.stale_seconds = stale_seconds
+        self.max_attempts = max_attempts
+        self.result_ttl_seconds = result_ttl_seconds
+        self._next_sweep = 0.0
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._mp = multiprocessing.get_context("spawn")
+        self._active: dict[uuid.UUID, asyncio.Task[None]] = {}
+        self._pool: ProcessPoolExecutor | None = None
+        self._manager: Any = None
+        self._progress: Any = None
+        self._cancel_flags: Any = None
+
+    def _new_pool(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self.processes,
+            mp_context=self._mp,
+            initializer=init_worker_process,
+        )
+
+    async def run(self, stop: asyncio.Event) -> None:
+        self._manager = SyncManager(ctx=self._mp)
+        self._manager.start(ignore_sigint)
+        self._progress = self._manager.Queue()
+        self._cancel_flags = self._manager.dict()
+        self._pool = self._new_pool()
+        pump = asyncio.create_task(self._pump_progress())
+        logger.info("Job worker started worker_id=%s processes=%d", self.worker_id, self.processes)
+        try:
+            while not stop.is_set():
+                try:
+                    await self._maintain()
+                    while len(self._active) < self.processes:
+                        job = await self._claim()
+                        if job is None:
+                            break
+                        self._active[job.id] = asyncio.create_task(self._run_job(job))
+                except Exception:
+                    logger.exception("Job worker loop error")
+                try:
+                    await asyncio.wait_for(stop.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+            if self._active:
+                logger.info("Waiting for %d running job(s)", len(self._active))
+                await asyncio.gather(*self._active.values(), return_exceptions=True)
+        finally:
+            pump.cancel()
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._manager.shutdown()
+            logger.info("Job worker stopped worker_id=%s", self.worker_id)
+
+    async def _claim(self) -> Job | None:
+        async with AsyncSessionLocal() as session:
+            job = await job_repo.claim_next_job(session, self.worker_id)
+            await session.commit()
+            return job
+
+    async def _maintain(self) -> None:
+        """Heartbeats, cancellation forwarding and stale-job recovery (one transaction)."""
+        job_ids = list(self._active)
+        stale_before = datetime.now(timezone.utc) - timedelta(seconds=self.stale_seconds)
+        async with AsyncSessionLocal() as session:
+            await job_repo.touch_jobs(session, job_ids)
+            cancel = await job_repo.get_cancel_requested(session, job_ids)
+            requeued, failed = await job_repo.requeue_stale_jobs(
+                session, stale_before=stale_before, max_attempts=self.max_attempts
+            )
+            await session.commit()
+        for job_id in cancel:
+            self._cancel_flags[str(job_id)] = True
+        if requeued or failed:
+            logger.warning("Recovered stale jobs requeued=%d failed=%d", requeued, failed)
+        await self._sweep_results()
+
+    async def _sweep_results(self) -> None:
+        if self.result_ttl_seconds <= 0 or time.monotonic() < self._next_sweep:
+            return
+        self._next_sweep = time.monotonic() + RESULT_SWEEP_INTERVAL
+        removed = await asyncio.to_thread(remove_expired_results, self.result_ttl_seconds)
+        if removed:
+            logger.info("Removed expired job results count=%d", removed)
+
+    async def _run_job(self, job: Job) -> None:
+        token = request_id_ctx.set(job.request_id)
+        path = result_path(job.tenant_id, job.id)
+        status, result, error = "failed", None, None
+        try:
+            logger.info("Job claimed job_id=%s kind=%s attempt=%d", job.id, job.kind, job.attempts)
+            await asyncio.to_thread(path.parent.mkdir, parents=True, exist_ok=True)
+            loop = asyncio.get_running_loop()
+            pool = self._pool
+            result = await loop.run_in_executor(
+                pool,
+                execute_job,
+                job.kind,
+                str(job.id),
+                str(job.tenant_id),
+                job.payload,
+                str(path),
+                job.request_id,
+                self._progress,
+                self._cancel_flags,
+            )
+            status = "succeeded"
+        except JobCancelled:
+            status = "cancelled"
+        except AppError as exc:
+            error = exc.message[:MAX_ERROR_LENGTH]
+        except BrokenProcessPool:
+            error = "Job process terminated unexpectedly"
+            # Every job in flight on the broken pool lands here; only the first replaces it.
+            if self._pool is pool:
+                logger.error("Job process died job_id=%s; restarting pool", job.id)
+                self._pool = self._new_pool()
+                pool.shutdown(wait=False, cancel_futures=True)
+            else:
+                logger.error("Job process died job_id=%s", job.id)
+        except Exception:
+            logger.exception("Job failed job_id=%s", job.id)
+            error = "Job failed"
+        finally:
+            if status != "succeeded":
+                await asyncio.to_thread(path.unlink, missing_ok=True)
+            try:
+                async with AsyncSessionLocal() as session:
+                    await job_repo.finish_job(
+                        session, job.id, status=status, result=result, error=error
+                    )
+                    await session.commit()
+            except Exception:
+                # Left running; stale recovery will pick it up.
+                logger.exception("Could not record job outcome job_id=%s", job.id)
+            self._cancel_flags.pop(str(job.id), None)
+            self._active.pop(job.id, None)
+            logger.info("Job finished job_id=%s status=%s", job.id, status)
+            request_id_ctx.reset(token)
+
+    def _drain_progress(self) -> dict[str, tuple[float | None, str | None]]:
+        """Block briefly for progress messages; keep only the latest per job."""
+        latest: dict[str, tuple[float | None, str | None]] = {}
+        try:
+            job_id, progress, message = self._progress.get(timeout=self.poll_interval)
+            latest[job_id] = (progress, message)
+            while True:
+                job_id, progress, message = self._progress.get_nowait()
+                latest[job_id] = (progress, message)
+        except queue.Empty:
+            pass
+        return latest
+
+    async def _pump_progress(self) -> None:
+        while True:
+            latest = await asyncio.to_thread(self._drain_progress)
+            if not latest:
+                continue
+            try:
+                async with AsyncSessionLocal() as session:
+                    for job_id, (progress, message) in latest.items():
+                        await job_repo.update_progress(
+                            session, uuid.UUID(job_id), progress, message
+                        )
+                    await session.commit()
+            except Exception:
+                logger.exception("Could not record job progress")
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run background jobs.")
+    parser.add_argument("--processes", type=int, default=settings.JOB_WORKER_PROCESSES)
+    parser.add_argument(
+        "--poll-interval", type=float, default=settings.JOB_POLL_INTERVAL_SECONDS
+    )
+    return parser.parse_args(argv)
+
+
+async def _main(args: argparse.Namespace) -> None:
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    worker = JobWorker(
+        processes=args.processes,
+        poll_interval=args.poll_interval,
+        stale_seconds=settings.JOB_STALE_SECONDS,
+        max_attempts=settings.JOB_MAX_ATTEMPTS,
+        result_ttl_seconds=settings.JOB_RESULT_TTL_SECONDS,
+    )
+    await worker.run(stop)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    configure_logging(
+        settings.LOG_LEVEL,
+        async_mode=settings.LOG_ASYNC,
+        json_format=settings.LOG_FORMAT.lower() == "json",
+        sample_rates=parse_logger_table(settings.LOG_SAMPLE_RATES),
+        rate_limits=parse_logger_table(settings.LOG_RATE_LIMITS),
+    )
+    try:
+        asyncio.run(_main(args))
+    finally:
+        shutdown_logging()
+
+
+if __name__ == "__main__":
+    main()
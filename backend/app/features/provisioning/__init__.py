@@ -0,0 +1 @@
+# User provisioning feature (bulk import)
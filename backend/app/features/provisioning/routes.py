@@ -0,0 +1,49 @@
+"""Bulk provisioning router (tenant-scoped)."""
+
+from __future__ import annotations
+
+from fastapi import APIRouter, Depends, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.internal.routes import get_tenant_db, resolve_tenant
+from app.core.cache.tenant_cache import CachedTenant
+from app.core.config.settings import settings
+from app.core.errors.exceptions import NotFoundError
+from app.core.metrics.query_budget import exempt_from_query_budget
+from app.features.provisioning.schemas import BulkImportResponse
+from app.features.provisioning.service import import_users
+
+router = APIRouter()
+
+
+def require_bulk_import_endpoint() -> None:
+    """404 unless BULK_IMPORT_ENDPOINT_ENABLED (no tenant-admin check exists yet)."""
+    if not settings.BULK_IMPORT_ENDPOINT_ENABLED:
+        raise NotFoundError()
+
+
+@router.post(
+    "/bulk",
+    response_model=BulkImportResponse,
+    dependencies=[Depends(require_bulk_import_endpoint)],
+)
+async def bulk_import_users(
+    request: Request,
+    tenant: CachedTenant = Depends(resolve_tenant),
+    db: AsyncSession = Depends(get_tenant_db),
+) -> BulkImportResponse:
+    """
+    Import users from a CSV request body (``email,password`` header), streamed.
+
+    Disabled unless BULK_IMPORT_ENDPOINT_ENABLED is set.
+    """
+    exempt_from_query_budget()  # a few statements per batch, by design
+    report = await import_users(db, tenant_id=str(tenant.id), chunks=request.stream())
+    return BulkImportResponse(
+        processed=report.processed,
+        inserted=report.inserted,
+        skipped_existing=report.skipped_existing,
+        invalid=report.invalid,
+        errors=report.errors,
+        elapsed_ms=report.elapsed_ms,
+    )
@@ -0,0 +1,16 @@
+"""Bulk provisioning request/response schemas."""
+
+from __future__ import annotations
+
+from pydantic import BaseModel
+
+
+class BulkImportResponse(BaseModel):
+    """Outcome of a bulk user import (counts only; no credentials echoed)."""
+
+    processed: int
+    inserted: int
+    skipped_existing: int
+    invalid: int
+    errors: list[str]
+    elapsed_ms: float
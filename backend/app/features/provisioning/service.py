@@ -0,0 +1,195 @@
+"""
+Bulk user provisioning: streamed CSV -> hashed passwords -> batched inserts.
+
+The CSV (header row with ``email`` and ``password`` columns) is consumed as
+record-aligned blocks, so memory is bounded by one block plus one batch no
+matter how large the file is. Per batch:
+1. one query finds emails that already exist (they are not re-hashed),
+2. passwords are bcrypt-hashed in parallel on a process pool,
+3. one multi-row INSERT ... ON CONFLICT DO NOTHING writes the batch,
+4. the batch is committed, so progress survives a dropped connection and
+   re-running the same file is safe.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import csv
+import io
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import AsyncIterable, AsyncIterator, Callable
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config.settings import settings
+from app.core.errors.exceptions import BadRequestError
+from app.core.security.hash_executor import HashExecutor
+from app.core.security.password import hash_password
+from app.db.repos.user_repo import bulk_insert_users, get_existing_emails
+from app.shared.utils.streams import iter_record_blocks
+
+logger = logging.getLogger(__name__)
+
+REQUIRED_COLUMNS = ("email", "password")
+MAX_REPORTED_ERRORS = 100
+
+# Separate from the request-path hasher so a large import cannot starve signups.
+bulk_hash_executor = HashExecutor(
+    kind="process",
+    max_workers=settings.BULK_HASH_PROCESSES,
+    max_queue=settings.BULK_HASH_PROCESSES,
+)
+
+
+@dataclass
+class ImportReport:
+    processed: int = 0
+    inserted: int = 0
+    skipped_existing: int = 0
+    invalid: int = 0
+    errors: list[str] = field(default_factory=list)
+    started_at: float = field(default_factory=time.perf_counter)
+
+    def add_error(self, message: str) -> None:
+        self.invalid += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(message)
+
+    @property
+    def elapsed_ms(self) -> float:
+        return round((time.perf_counter() - self.started_at) * 1000, 1)
+
+
+def hash_passwords(passwords: list[str]) -> list[str]:
+    """Hash a chunk of passwords (runs inside a pool worker process)."""
+    return [hash_password(p) for p in passwords]
+
+
+async def _hash_batch(passwords: list[str]) -> list[str]:
+    """Split the batch into one chunk per worker and hash the chunks in parallel."""
+    workers = bulk_hash_executor.max_workers
+    size = max(1, -(-len(passwords) // workers))
+    chunks = [passwords[i : i + size] for i in range(0, len(passwords), size)]
+    hashed = await asyncio.gather(*(bulk_hash_executor.run(hash_passwords, c) for c in chunks))
+    return [h for chunk in hashed for h in chunk]
+
+
+async def iter_user_rows(
+    chunks: AsyncIterable[bytes],
+) -> AsyncIterator[tuple[int, str, str]]:
+    """Yield (row_number, email, password) from a streamed CSV with a header row."""
+    columns: dict[str, int] | None = None
+    row_number = 0
+    offset = 0
+    async for block in iter_record_blocks(chunks):
+        try:
+            text = block.decode("utf-8-sig" if columns is None else "utf-8")
+        except UnicodeDecodeError as exc:
+            # Records before the bad byte, plus the one it is in (hence the "x").
+            prefix = block[: exc.start].decode("utf-8-sig") + "x"
+            row = row_number + sum(1 for r in csv.reader(io.StringIO(prefix)) if r)
+            where = "header" if columns is None and row == 1 else f"row {row - (columns is None)}"
+            raise BadRequestError(
+                f"CSV {where} is not valid UTF-8 (byte {offset + exc.start})"
+            ) from None
+        offset += len(block)
+        for record in csv.reader(io.StringIO(text)):
+            if not record:
+                continue
+            if columns is None:
+                header = [c.strip().lower() for c in record]
+                missing = [c for c in REQUIRED_COLUMNS if c not in header]
+                if missing:
+                    raise BadRequestError(f"CSV header missing column(s): {', '.join(missing)}")
+                columns = {name: header.index(name) for name in REQUIRED_COLUMNS}
+                continue
+            row_number += 1
+            email_idx, password_idx = columns["email"], columns["password"]
+            email = record[email_idx] if email_idx < len(record) else ""
+            password = record[password_idx] if password_idx < len(record) else ""
+            yield row_number, email, password
+    if columns is None:
+        raise BadRequestError("CSV is empty")
+
+
+def _normalize_email(email: str) -> str | None:
+    email = email.strip().lower()
+    local, sep, domain = email.partition("@")
+    if not sep or not local or not domain or "@" in domain:
+        return None
+    return email
+
+
+async def _flush_batch(
+    session: AsyncSession,
+    tenant_id: str,
+    batch: dict[str, str],
+    report: ImportReport,
+) -> None:
+    existing = await get_existing_emails(session, tenant_id, list(batch))
+    report.skipped_existing += len(existing)
+    new_emails = [email for email in batch if email not in existing]
+    if new_emails:
+        hashes = await _hash_batch([batch[email] for email in new_emails])
+        inserted = await bulk_insert_users(
+            session, tenant_id=tenant_id, rows=list(zip(new_emails, hashes))
+        )
+        # Rows inserted concurrently by someone else since the existence check.
+        report.skipped_existing += len(new_emails) - inserted
+        report.inserted += inserted
+    await session.commit()
+
+
+async def import_users(
+    session: AsyncSession,
+    *,
+    tenant_id: str,
+    chunks: AsyncIterable[bytes],
+    batch_size: int | None = None,
+    progress: Callable[[ImportReport], None] | None = None,
+) -> ImportReport:
+    """Import users from a streamed CSV into one tenant; commits per batch."""
+    batch_size = batch_size or settings.BULK_IMPORT_BATCH_SIZE
+    report = ImportReport()
+    batch: dict[str, str] = {}  # email -> password; later duplicates in a batch win
+
+    async for row_number, raw_email, password in iter_user_rows(chunks):
+        report.processed += 1
+        email = _normalize_email(raw_email)
+        if email is None:
+            report.add_error(f"row {row_number}: invalid email")
+            continue
+        if not password:
+            report.add_error(f"row {row_number}: empty password")
+            continue
+        if email in batch:
+            report.skipped_existing += 1
+        batch[email] = password
+        if len(batch) >= batch_size:
+            await _flush_batch(session, tenant_id, batch, report)
+            batch = {}
+            logger.info(
+                "Bulk import progress tenant_id=%s processed=%d inserted=%d",
+                tenant_id,
+                report.processed,
+                report.inserted,
+            )
+            if progress is not None:
+                progress(report)
+
+    if batch:
+        await _flush_batch(session, tenant_id, batch, report)
+    if progress is not None:
+        progress(report)
+
+    logger.info(
+        "Bulk import finished tenant_id=%s processed=%d inserted=%d skipped=%d invalid=%d",
+        tenant_id,
+        report.processed,
+        report.inserted,
+        report.skipped_existing,
+        report.invalid,
+    )
+    return report
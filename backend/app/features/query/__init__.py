@@ -0,0 +1 @@
+# Analytical query feature (embedded DuckDB over dataset part files)
@@ -0,0 +1,121 @@
+"""
+Query result cache.
+
+Pages are cached as Arrow IPC bytes in a byte-bounded LRU (optionally spilling
+to disk) keyed by (tenant, normalized SQL, params, referenced dataset
+versions, page window). A dataset append bumps its version, so older entries
+can never be served again; appends also call invalidate_dataset to release
+the space right away instead of waiting for LRU eviction.
+
+The cache is per worker process (as is the spill directory).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+import re
+import uuid
+from pathlib import Path
+from typing import Any, Sequence
+
+from app.core.cache.byte_lru import ByteLRUCache
+from app.core.config.settings import settings
+from app.core.metrics.registry import numeric_stats, registry
+from app.features.query.engine import DatasetSource, QueryPage
+
+# String literals, quoted identifiers and dollar-quoted strings are kept verbatim;
+# comments are dropped; whitespace runs collapse to one space; the rest is lowercased
+# (unquoted identifiers and keywords are case-insensitive in DuckDB).
+_SQL_TOKEN = re.compile(
+    r"""(?P<literal>'(?:[^']|'')*'|"(?:[^"]|"")*"|\$(?P<tag>\w*)\$.*?\$(?P=tag)\$)"""
+    r"""|(?P<comment>--[^\n]*|/\*.*?\*/)"""
+    r"""|(?P<space>\s+)""",
+    re.DOTALL,
+)
+
+
+def _spill_dir() -> Path | None:
+    if not settings.QUERY_CACHE_SPILL_DIR:
+        return None
+    return Path(settings.QUERY_CACHE_SPILL_DIR) / f"worker-{os.getpid()}"
+
+
+query_result_cache = ByteLRUCache(
+    max_bytes=settings.QUERY_CACHE_MAX_BYTES,
+    max_entry_bytes=settings.QUERY_CACHE_MAX_ENTRY_BYTES,
+    spill_dir=_spill_dir(),
+    spill_max_bytes=settings.QUERY_CACHE_SPILL_MAX_BYTES,
+)
+registry.register_collector(
+    "Query result cache stats (see /internal/query-cache)",
+    lambda: numeric_stats("ambient_query_cache", query_result_cache.stats()),
+)
+
+
+def normalize_sql(sql: str) -> str:
+    """Canonical form of the query text for cache keys (never executed)."""
+    parts: list[str] = []
+    position = 0
+    for match in _SQL_TOKEN.finditer(sql):
+        if match.start() > position:
+            parts.append(sql[position : match.start()].lower())
+        if match.group("literal"):
+            parts.append(match.group("literal"))
+        elif not parts or parts[-1] != " ":
+            parts.append(" ")
+        position = match.end()
+    parts.append(sql[position:].lower())
+    return "".join(parts).strip().rstrip(";").strip()
+
+
+def dataset_tag(tenant_id: uuid.UUID, dataset_id: uuid.UUID) -> str:
+    return f"{tenant_id}:{dataset_id}"
+
+
+def result_cache_key(
+    tenant_id: uuid.UUID,
+    sql: str,
+    params: Sequence[Any],
+    sources: Sequence[DatasetSource],
+    *,
+    offset: int,
+    limit: int,
+) -> str:
+    versions = sorted((str(s.id), s.version) for s in sources)
+    payload = json.dumps(
+        [str(tenant_id), normalize_sql(sql), list(params), versions, offset, limit],
+        default=str,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+async def get_cached_page(key: str) -> QueryPage | None:
+    if not query_result_cache.enabled:
+        return None
+    if query_result_cache.spill_dir is not None:
+        raw = await asyncio.to_thread(query_result_cache.get, key)
+    else:
+        raw = query_result_cache.get(key)
+    return QueryPage.from_bytes(raw) if raw is not None else None
+
+
+async def store_page(
+    key: str, page: QueryPage, tenant_id: uuid.UUID, sources: Sequence[DatasetSource]
+) -> None:
+    if not query_result_cache.enabled:
+        return
+    tags = [dataset_tag(tenant_id, s.id) for s in sources]
+    raw = page.to_bytes()
+    if query_result_cache.spill_dir is not None:
+        await asyncio.to_thread(query_result_cache.set, key, raw, tags)
+    else:
+        query_result_cache.set(key, raw, tags)
+
+
+def invalidate_dataset(tenant_id: uuid.UUID, dataset_id: uuid.UUID) -> int:
+    """Drop cached pages that read the dataset (call after its data changes)."""
+    return query_result_cache.invalidate_tag(dataset_tag(tenant_id, dataset_id))
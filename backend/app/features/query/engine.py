@@ -0,0 +1,537 @@
+"""
+Embedded DuckDB execution over a tenant's dataset part files.
+
+Every query runs on its own in-memory DuckDB connection, in a worker thread
+(DuckDB releases the GIL, so the event loop keeps serving requests). Isolation
+comes from what the connection can see, not from parsing the SQL:
+- only the caller's datasets are registered, as zero-copy Arrow tables over
+  memory-mapped part files (DuckDB never gets a path; see
+  app.features.datasets.storage.mapped_parts),
+- external access (read_csv/COPY/ATTACH/extensions) is switched off and the
+  configuration locked before user SQL runs,
+- Python replacement scans are disabled, so names cannot resolve to Python
+  objects in scope.
+memory_limit and threads are set per connection; a timer interrupts queries
+that run past the timeout.
+
+A query over one dataset that has rollups is first offered to
+app.features.query.rewrite; when a rollup can answer it, that rollup's file
+is registered under the dataset's name instead of the parts and the
+rewritten SQL runs.
+
+Blocking code: run_query and open_query_stream are called on the query
+executor (see service), export_query from background job worker processes.
+"""
+
+from __future__ import annotations
+
+import functools
+import json
+import os
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Callable, Sequence
+
+from app.core.cache.mapped_arrow import MappedLease
+from app.core.errors.exceptions import BadRequestError, NotFoundError, RequestTimeoutError
+from app.features.datasets.rollups import quote
+from app.features.datasets.storage import mapped_parts, read_schema
+from app.features.query.rewrite import RollupSource, rewrite_for_rollup
+from app.features.query.streaming import BatchStream
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+MAX_ERROR_DETAIL = 300
+_HAS_MORE = "ambient.has_more"
+_ROLLUP = "ambient.rollup"
+EXPORT_BATCH_ROWS = 64 * 1024
+
+
+@dataclass(frozen=True)
+class DatasetSource:
+    """A dataset as exposed to SQL: view name plus its part files at a fixed version."""
+
+    id: uuid.UUID
+    name: str
+    version: int
+    paths: tuple[str, ...]
+    rollups: tuple[RollupSource, ...] = ()
+
+
+@dataclass(frozen=True)
+class QueryPage:
+    """One page of results, kept as an Arrow table (compact, cheap to serialize)."""
+
+    table: "pa.Table"
+    has_more: bool
+    rollup: str | None = None  # name of the rollup that answered the query
+
+    @property
+    def columns(self) -> list[dict[str, str]]:
+        return [{"name": f.name, "type": str(f.type)} for f in self.table.schema]
+
+    @property
+    def rows(self) -> list[list[Any]]:
+        # Column-wise conversion keeps duplicate column names (a dict per row would not).
+        values = [column.to_pylist() for column in self.table.columns]
+        return [list(row) for row in zip(*values)] if values else []
+
+    def to_bytes(self) -> bytes:
+        """Arrow IPC stream; has_more and rollup travel in the schema metadata."""
+        import pyarrow as pa
+
+        metadata = {_HAS_MORE: "1" if self.has_more else "0"}
+        if self.rollup is not None:
+            metadata[_ROLLUP] = self.rollup
+        table = self.table.replace_schema_metadata(metadata)
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+
+    @classmethod
+    def from_bytes(cls, raw: bytes) -> "QueryPage":
+        import pyarrow as pa
+
+        table = pa.ipc.open_stream(raw).read_all()
+        metadata = table.schema.metadata or {}
+        rollup = metadata.get(_ROLLUP.encode())
+        return cls(
+            table=table.replace_schema_metadata(None),
+            has_more=metadata.get(_HAS_MORE.encode()) == b"1",
+            rollup=rollup.decode() if rollup is not None else None,
+        )
+
+
+def _error_detail(exc: Exception) -> str:
+    text = str(exc).strip()
+    return text.splitlines()[0][:MAX_ERROR_DETAIL] if text else type(exc).__name__
+
+
+def _json_friendly(table: "pa.Table") -> "pa.Table":
+    """
+    Cast DECIMAL/HUGEINT results (e.g. SUM over integers) to int64 or float64 so
+    rows serialize as JSON numbers rather than strings.
+    """
+    import pyarrow as pa
+
+    for i, f in enumerate(table.schema):
+        if not pa.types.is_decimal(f.type):
+            continue
+        column = table.column(i)
+        if f.type.scale == 0:
+            try:
+                column = column.cast(pa.int64())
+            except pa.ArrowInvalid:  # out of int64 range
+                column = column.cast(pa.float64(), safe=False)
+        else:
+            column = column.cast(pa.float64(), safe=False)
+        table = table.set_column(i, pa.field(f.name, column.type), column)
+    return table
+
+
+def _connect(memory_limit: str, threads: int) -> Any:
+    import duckdb
+
+    return duckdb.connect(
+        ":memory:",
+        config={
+            "memory_limit": memory_limit,
+            "threads": max(1, threads),
+            "python_enable_replacements": False,
+            "autoinstall_known_extensions": False,
+            "autoload_known_extensions": False,
+        },
+    )
+
+
+def _check_single_select(con: Any, sql: str) -> None:
+    import duckdb
+
+    try:
+        statements = con.extract_statements(sql)
+    except duckdb.Error as exc:
+        raise BadRequestError(f"Invalid SQL: {_error_detail(exc)}") from exc
+    if len(statements) != 1 or statements[0].type != duckdb.StatementType.SELECT:
+        raise BadRequestError("Only a single SELECT statement is allowed")
+
+
+_parser = threading.local()
+
+
+@functools.lru_cache(maxsize=1024)
+def referenced_tables(sql: str) -> frozenset[str]:
+    """
+    Lower-cased names of the tables the SQL reads, from DuckDB's parse tree
+    (CTE names excluded). Empty when the SQL does not parse; running it then
+    reports the syntax error.
+    """
+    con = getattr(_parser, "con", None)
+    if con is None:
+        con = _parser.con = _connect("64MB", 1)
+    tree = json.loads(con.execute("SELECT json_serialize_sql(?)", [sql]).fetchone()[0])
+    if tree.get("error"):
+        return frozenset()
+    tables: set[str] = set()
+    ctes: set[str] = set()
+    pending: list[Any] = [tree]
+    while pending:
+        node = pending.pop()
+        if isinstance(node, list):
+            pending.extend(node)
+        elif isinstance(node, dict):
+            if node.get("type") == "BASE_TABLE" and "table_name" in node:
+                tables.add(node["table_name"].lower())
+            if isinstance(node.get("cte_map"), dict):
+                ctes.update(entry["key"].lower() for entry in node["cte_map"].get("map", []))
+            pending.extend(node.values())
+    return frozenset(tables - ctes)
+
+
+class _Prepared:
+    """A connection with the datasets registered, plus the leases keeping their files mapped."""
+
+    def __init__(self, con: Any, leases: list[MappedLease]) -> None:
+        self.con = con
+        self.leases = leases
+        self.rollup: str | None = None
+
+    def close(self) -> None:
+        try:
+            self.con.close()
+        finally:
+            for lease in self.leases:
+                lease.release()
+
+
+def _use_rollup(
+    prepared: _Prepared, source: DatasetSource, sql: str, params: Sequence[Any] | None
+) -> str | None:
+    """
+    Register the first of source's rollups that can answer sql under the
+    dataset's name and return the rewritten SQL; None (nothing registered)
+    if none can.
+    """
+    import duckdb
+
+    con = prepared.con
+    params = list(params) if params else []
+    empty = read_schema(source.paths[0]).empty_table()
+    con.register(source.name, empty)
+    names: list[str] = []
+
+    def output_names() -> list[str]:
+        # Only called for plain aggregates, so binding against the empty stand-in is cheap.
+        if not names:
+            names.extend(d[0] for d in con.execute(sql, params or None).description)
+        return names
+
+    try:
+        types = {
+            d[0]: str(d[1])
+            for d in con.execute(f"SELECT * FROM {quote(source.name)} LIMIT 0").description
+        }
+        for rollup in source.rollups:
+            spec = rollup.spec
+            try:
+                rewritten = rewrite_for_rollup(
+                    con,
+                    sql,
+                    params,
+                    source.name,
+                    empty.schema,
+                    types[spec.time_column],
+                    spec,
+                    output_names,
+                )
+            except duckdb.Error:
+                return None  # the query itself fails; let the normal path report it
+            if rewritten is None:
+                continue
+            try:
+                lease = mapped_parts.acquire([rollup.path])
+            except FileNotFoundError:
+                continue  # superseded by an append since the query was resolved
+            con.unregister(source.name)
+            con.register(source.name, lease.table)
+            try:
+                con.execute(f"SELECT * FROM (\n{rewritten}\n) AS q LIMIT 0", params or None)
+            except duckdb.Error:
+                lease.release()
+                con.unregister(source.name)
+                con.register(source.name, empty)
+                continue
+            prepared.leases.append(lease)
+            prepared.rollup = rollup.name
+            return rewritten
+        return None
+    finally:
+        if prepared.rollup is None:
+            con.unregister(source.name)
+
+
+def _prepare(
+    sources: Sequence[DatasetSource],
+    sql: str,
+    params: Sequence[Any] | None,
+    memory_limit: str,
+    threads: int,
+) -> tuple[_Prepared, str]:
+    """Connection with only the given datasets visible, configuration locked; plus SQL to run."""
+    import duckdb
+
+    sql = sql.strip().rstrip(";").strip()
+    if not sql:
+        raise BadRequestError("Query is empty")
+
+    prepared = _Prepared(_connect(memory_limit, threads), [])
+    con = prepared.con
+    try:
+        _check_single_select(con, sql)
+        con.execute("SET enable_external_access = false")
+        con.execute("SET lock_configuration = true")
+        rewritten = None
+        if len(sources) == 1 and sources[0].rollups:
+            rewritten = _use_rollup(prepared, sources[0], sql, params)
+        if rewritten is not None:
+            sql = rewritten
+        else:
+            for source in sources:
+                try:
+                    lease = mapped_parts.acquire(source.paths)
+                except FileNotFoundError as exc:
+                    raise NotFoundError(
+                        f"Dataset {source.name!r} is no longer available"
+                    ) from exc
+                prepared.leases.append(lease)
+                con.register(source.name, lease.table)
+    except BaseException as exc:
+        prepared.close()
+        if isinstance(exc, duckdb.Error):
+            raise BadRequestError(f"Query failed: {_error_detail(exc)}") from exc
+        raise
+    return prepared, sql
+
+
+def run_query(
+    sources: Sequence[DatasetSource],
+    sql: str,
+    params: Sequence[Any] | None,
+    *,
+    offset: int,
+    limit: int,
+    memory_limit: str,
+    threads: int,
+    timeout_seconds: float,
+) -> QueryPage:
+    """Run one SELECT and return rows [offset, offset + limit) plus whether more follow."""
+    import duckdb
+
+    prepared, sql = _prepare(sources, sql, params, memory_limit, threads)
+    con = prepared.con
+    timed_out = threading.Event()
+
+    def _interrupt() -> None:
+        timed_out.set()
+        con.interrupt()
+
+    timer = threading.Timer(timeout_seconds, _interrupt)
+    try:
+        # Newlines keep a trailing "-- comment" in the user SQL from eating the wrapper.
+        paged = f"SELECT * FROM (\n{sql}\n) AS q LIMIT {int(limit) + 1} OFFSET {int(offset)}"
+        timer.start()
+        table = con.execute(paged, list(params) if params else None).to_arrow_table()
+    except duckdb.Error as exc:
+        if timed_out.is_set():
+            raise RequestTimeoutError(
+                f"Query exceeded the {timeout_seconds:g}s time limit"
+            ) from exc
+        raise BadRequestError(f"Query failed: {_error_detail(exc)}") from exc
+    finally:
+        timer.cancel()
+        prepared.close()
+
+    return page_from_table(table, 0, limit, rollup=prepared.rollup)
+
+
+def page_from_table(
+    table: "pa.Table", offset: int, limit: int, *, rollup: str | None = None
+) -> QueryPage:
+    """Rows [offset, offset + limit) of a result table as a page."""
+    has_more = table.num_rows > offset + limit
+    return QueryPage(
+        table=_json_friendly(table.slice(offset, limit)), has_more=has_more, rollup=rollup
+    )
+
+
+class QueryStream(BatchStream):
+    """
+    Full result of one SELECT as record batches, pulled from DuckDB on demand.
+
+    The time limit covers time spent inside DuckDB, not time waiting for the
+    client to take the previous batch.
+    """
+
+    def __init__(
+        self, prepared: _Prepared, reader: Any, *, timeout_seconds: float, elapsed: float = 0.0
+    ) -> None:
+        super().__init__(reader.schema)
+        self._prepared = prepared
+        self._con = prepared.con
+        self.rollup = prepared.rollup
+        self._reader = reader
+        self._budget = timeout_seconds - elapsed
+        self._timeout_seconds = timeout_seconds
+
+    def _fetch(self) -> "pa.RecordBatch | None":
+        import duckdb
+
+        timed_out = threading.Event()
+
+        def _interrupt() -> None:
+            timed_out.set()
+            self._con.interrupt()
+
+        timer = threading.Timer(max(self._budget, 0.0), _interrupt)
+        started = time.monotonic()
+        timer.start()
+        try:
+            return self._reader.read_next_batch()
+        except StopIteration:
+            return None
+        except duckdb.Error as exc:
+            if timed_out.is_set():
+                raise RequestTimeoutError(
+                    f"Query exceeded the {self._timeout_seconds:g}s time limit"
+                ) from exc
+            raise BadRequestError(f"Query failed: {_error_detail(exc)}") from exc
+        finally:
+            timer.cancel()
+            self._budget -= time.monotonic() - started
+
+    def _interrupt(self) -> None:
+        self._con.interrupt()
+
+    def _release(self) -> None:
+        self._prepared.close()
+
+
+def open_query_stream(
+    sources: Sequence[DatasetSource],
+    sql: str,
+    params: Sequence[Any] | None,
+    *,
+    memory_limit: str,
+    threads: int,
+    timeout_seconds: float,
+    batch_rows: int = EXPORT_BATCH_ROWS,
+) -> QueryStream:
+    """Start one SELECT and return a stream of its result; SQL errors raise here."""
+    import duckdb
+
+    prepared, sql = _prepare(sources, sql, params, memory_limit, threads)
+    con = prepared.con
+    timed_out = threading.Event()
+
+    def _interrupt() -> None:
+        timed_out.set()
+        con.interrupt()
+
+    timer = threading.Timer(timeout_seconds, _interrupt)
+    started = time.monotonic()
+    try:
+        timer.start()
+        reader = con.execute(sql, list(params) if params else None).to_arrow_reader(batch_rows)
+    except BaseException as exc:
+        prepared.close()
+        if isinstance(exc, duckdb.Error):
+            if timed_out.is_set():
+                raise RequestTimeoutError(
+                    f"Query exceeded the {timeout_seconds:g}s time limit"
+                ) from exc
+            raise BadRequestError(f"Query failed: {_error_detail(exc)}") from exc
+        raise
+    finally:
+        timer.cancel()
+    return QueryStream(
+        prepared, reader, timeout_seconds=timeout_seconds, elapsed=time.monotonic() - started
+    )
+
+
+class QueryCancelled(Exception):
+    """Raised by export_query when should_cancel() turned true."""
+
+
+def export_query(
+    sources: Sequence[DatasetSource],
+    sql: str,
+    params: Sequence[Any] | None,
+    path: str,
+    *,
+    memory_limit: str,
+    threads: int,
+    timeout_seconds: float,
+    on_rows: Callable[[int], None] | None = None,
+    should_cancel: Callable[[], bool] | None = None,
+    poll_seconds: float = 0.5,
+) -> dict[str, Any]:
+    """
+    Run one SELECT and stream the full result into an Arrow IPC file at path.
+
+    on_rows(total_rows) is called after each batch; should_cancel is polled
+    from a watchdog thread that interrupts DuckDB (QueryCancelled). Returns
+    row_count, byte_size and columns.
+    """
+    import duckdb
+    import pyarrow as pa
+
+    prepared, sql = _prepare(sources, sql, params, memory_limit, threads)
+    con = prepared.con
+    stop = threading.Event()
+    timed_out = threading.Event()
+    cancelled = threading.Event()
+
+    def _watchdog() -> None:
+        deadline = time.monotonic() + timeout_seconds
+        while not stop.wait(poll_seconds):
+            if should_cancel is not None and should_cancel():
+                cancelled.set()
+            elif time.monotonic() >= deadline:
+                timed_out.set()
+            else:
+                continue
+            con.interrupt()
+            return
+
+    watchdog = threading.Thread(target=_watchdog, name="query-watchdog", daemon=True)
+    watchdog.start()
+    rows = 0
+    try:
+        reader = con.execute(sql, list(params) if params else None).to_arrow_reader(
+            EXPORT_BATCH_ROWS
+        )
+        with pa.OSFile(path, "wb") as sink, pa.ipc.new_file(sink, reader.schema) as writer:
+            for batch in reader:
+                if cancelled.is_set() or timed_out.is_set():
+                    break
+                writer.write_batch(batch)
+                rows += batch.num_rows
+                if on_rows is not None:
+                    on_rows(rows)
+            columns = [{"name": f.name, "type": str(f.type)} for f in reader.schema]
+    except duckdb.Error as exc:
+        if not (cancelled.is_set() or timed_out.is_set()):
+            raise BadRequestError(f"Query failed: {_error_detail(exc)}") from exc
+    finally:
+        stop.set()
+        watchdog.join()
+        prepared.close()
+
+    if cancelled.is_set():
+        raise QueryCancelled()
+    if timed_out.is_set():
+        raise RequestTimeoutError(f"Query exceeded the {timeout_seconds:g}s time limit")
+    return {"row_count": rows, "byte_size": os.path.getsize(path), "columns": columns}
@@ -0,0 +1,353 @@
+"""
+Answering aggregate queries from a dataset's rollups.
+
+A query over a single dataset that only groups by rollup dimensions and
+time buckets, filters on those, and aggregates rollup measures can be
+answered from the (much smaller) rollup file: the rollup is registered under
+the dataset's name and the query's expressions are rewritten, e.g.
+
+    count(*)                -> coalesce(CAST(sum("$rollup_count") AS BIGINT), 0)
+    sum(amount)             -> sum("$rollup_sum_0")
+    avg(amount)             -> CAST(sum("$rollup_sum_0") AS DOUBLE) / nullif(sum(...count_0), 0)
+    date_trunc('month', ts) -> date_trunc('month', "$rollup_bucket")   (day rollup)
+    ts >= '2024-03-01'      -> "$rollup_bucket" >= '2024-03-01'        (bucket-aligned)
+
+The query is parsed by DuckDB itself (json_serialize_sql) and the rewritten
+tree turned back into SQL with json_deserialize_sql, so nothing here parses
+SQL text. Anything not provably equivalent (other aggregates, DISTINCT or
+FILTER, window functions, subqueries, joins, CTEs, raw-row references to
+non-dimension columns, unaligned time ranges) leaves the query untouched; it
+then scans the parts as before. Output column names are kept by aliasing
+each select item to the name the original query would have produced.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Callable, Sequence
+
+from app.features.datasets.rollups import (
+    BUCKET_COLUMN,
+    COUNT_COLUMN,
+    GRANULARITIES,
+    MEASURE_STATS,
+    RollupSpec,
+    covers,
+    measure_column,
+    quote,
+)
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+
+@dataclass(frozen=True)
+class RollupSource:
+    """A rollup of a dataset at the dataset version being queried."""
+
+    name: str
+    path: str
+    spec: RollupSpec
+
+
+class _NoMatch(Exception):
+    pass
+
+
+_GRANULARITY_NAMES = {
+    **{g: g for g in GRANULARITIES},
+    **{g + "s": g for g in GRANULARITIES},
+    "min": "minute",
+    "mins": "minute",
+    "hr": "hour",
+    "hrs": "hour",
+    "mon": "month",
+    "mons": "month",
+    "yr": "year",
+    "yrs": "year",
+}
+# Expression classes whose children are checked generically; others never match.
+_PASS_THROUGH = frozenset(
+    ["BETWEEN", "CASE", "COLLATE", "CONJUNCTION", "CONSTANT", "OPERATOR", "PARAMETER"]
+)
+# time >= bound and time < bound (as written with time on the left, and mirrored):
+# exact on buckets when bound is a bucket boundary.
+_RANGE_OPERATORS = (
+    ("COMPARE_GREATERTHANOREQUALTO", "COMPARE_LESSTHANOREQUALTO"),
+    ("COMPARE_LESSTHAN", "COMPARE_GREATERTHAN"),
+)
+
+_aggregates: frozenset[str] | None = None
+_aggregates_lock = threading.Lock()
+
+
+def _aggregate_names(con: Any) -> frozenset[str]:
+    global _aggregates
+    with _aggregates_lock:
+        if _aggregates is None:
+            rows = con.execute(
+                "SELECT DISTINCT function_name FROM duckdb_functions() "
+                "WHERE function_type = 'aggregate'"
+            ).fetchall()
+            _aggregates = frozenset(r[0].lower() for r in rows) | {"count_star"}
+        return _aggregates
+
+
+def _parse(con: Any, sql: str) -> dict[str, Any] | None:
+    tree = json.loads(con.execute("SELECT json_serialize_sql(?)", [sql]).fetchone()[0])
+    if tree.get("error") or len(tree["statements"]) != 1:
+        return None
+    return tree
+
+
+_templates: dict[str, str] = {}
+
+
+def _template(con: Any, sql: str) -> dict[str, Any]:
+    """Parsed form of fixed SQL (cached as JSON; a fresh copy on every call)."""
+    raw = _templates.get(sql)
+    if raw is None:
+        tree = _parse(con, sql)
+        assert tree is not None
+        raw = _templates[sql] = json.dumps(tree)
+    return json.loads(raw)
+
+
+def _expression(con: Any, text: str) -> dict[str, Any]:
+    return _template(con, f"SELECT {text}")["statements"][0]["node"]["select_list"][0]
+
+
+def _to_sql(con: Any, tree: dict[str, Any]) -> str:
+    return con.execute("SELECT json_deserialize_sql(?::JSON)", [json.dumps(tree)]).fetchone()[0]
+
+
+def _column_ref(name: str) -> dict[str, Any]:
+    return {"class": "COLUMN_REF", "type": "COLUMN_REF", "alias": "", "column_names": [name]}
+
+
+class _Rewriter:
+    def __init__(
+        self,
+        con: Any,
+        spec: RollupSpec,
+        columns: set[str],
+        qualifiers: set[str],
+        time_type: str,
+        params: Sequence[Any],
+    ) -> None:
+        self.con = con
+        self.spec = spec
+        self.columns = columns
+        self.qualifiers = qualifiers
+        self.time_type = time_type
+        self.params = list(params)
+        self.dimensions = {d.lower() for d in spec.dimensions}
+        self.measures = {m.lower(): i for i, m in enumerate(spec.measures)}
+        self.time_column = spec.time_column.lower()
+        self.aggregates = _aggregate_names(con)
+        self.aggregated = False
+
+    def any(self, value: Any) -> Any:
+        if isinstance(value, dict):
+            if "class" in value:
+                return self.expr(value)
+            return {k: self.any(v) for k, v in value.items()}
+        if isinstance(value, list):
+            return [self.any(v) for v in value]
+        return value
+
+    def _column_name(self, expr: dict[str, Any]) -> str | None:
+        """Lower-cased dataset column an expression refers to, if it is a column reference."""
+        if expr.get("class") != "COLUMN_REF":
+            return None
+        names = expr["column_names"]
+        if len(names) > 2 or (len(names) == 2 and names[0].lower() not in self.qualifiers):
+            raise _NoMatch()  # struct field access or another table
+        return names[-1].lower()
+
+    def expr(self, expr: dict[str, Any]) -> dict[str, Any]:
+        kind = expr["class"]
+        if kind == "COLUMN_REF":
+            name = self._column_name(expr)
+            if name in self.columns and name not in self.dimensions:
+                raise _NoMatch()  # a raw row value the rollup does not keep
+            return expr  # a dimension, or an alias of a select item
+        if kind == "FUNCTION":
+            return self.function(expr)
+        if kind == "CAST":
+            return self.cast(expr)
+        if kind == "COMPARISON":
+            return self.comparison(expr)
+        if kind in _PASS_THROUGH:
+            return {k: self.any(v) for k, v in expr.items()}
+        raise _NoMatch()
+
+    def _is_time(self, expr: dict[str, Any]) -> bool:
+        return self._column_name(expr) == self.time_column
+
+    def _bucket(self, expr: dict[str, Any]) -> dict[str, Any]:
+        return {**_column_ref(BUCKET_COLUMN), "alias": expr.get("alias", "")}
+
+    def function(self, expr: dict[str, Any]) -> dict[str, Any]:
+        name = expr["function_name"].lower()
+        children = expr["children"]
+        truncates = name in ("date_trunc", "datetrunc") and len(children) == 2
+        if truncates and self._is_time(children[1]):
+            part = children[0]
+            if part["class"] != "CONSTANT" or part["value"]["type"]["id"] != "VARCHAR":
+                raise _NoMatch()
+            granularity = _GRANULARITY_NAMES.get(str(part["value"]["value"]).lower())
+            if granularity is None or not covers(self.spec.granularity, granularity):
+                raise _NoMatch()
+            return {**expr, "children": [part, self._bucket(children[1])]}
+        if name in self.aggregates:
+            return self.aggregate(expr, name)
+        return {k: self.any(v) for k, v in expr.items()}
+
+    def aggregate(self, expr: dict[str, Any], name: str) -> dict[str, Any]:
+        if expr.get("distinct") or expr.get("filter") or expr["order_bys"]["orders"]:
+            raise _NoMatch()
+        children = expr["children"]
+        if name == "count_star" or (name == "count" and not children):
+            text = f"coalesce(CAST(sum({quote(COUNT_COLUMN)}) AS BIGINT), 0)"
+        else:
+            measure = self._column_name(children[0]) if len(children) == 1 else None
+            if measure not in self.measures:
+                raise _NoMatch()
+            stat = {n: quote(measure_column(n, self.measures[measure])) for n in MEASURE_STATS}
+            average = f"CAST(sum({stat['sum']}) AS DOUBLE) / nullif(sum({stat['count']}), 0)"
+            text = {
+                "count": f"coalesce(CAST(sum({stat['count']}) AS BIGINT), 0)",
+                "sum": f"sum({stat['sum']})",
+                "min": f"min({stat['min']})",
+                "max": f"max({stat['max']})",
+                "avg": average,
+                "mean": average,
+            }.get(name, "")
+            if not text:
+                raise _NoMatch()
+        self.aggregated = True
+        return {**_expression(self.con, text), "alias": expr.get("alias", "")}
+
+    def cast(self, expr: dict[str, Any]) -> dict[str, Any]:
+        if (
+            self._is_time(expr["child"])
+            and expr["cast_type"]["id"] == "DATE"
+            and self.spec.granularity in ("minute", "hour", "day")
+        ):
+            return {**expr, "child": self._bucket(expr["child"])}
+        return {k: self.any(v) for k, v in expr.items()}
+
+    def comparison(self, expr: dict[str, Any]) -> dict[str, Any]:
+        left, right = expr["left"], expr["right"]
+        for as_left, as_right in _RANGE_OPERATORS:
+            if expr["type"] == as_left and self._is_time(left):
+                right = self.any(right)
+                if not self._aligned(right):
+                    raise _NoMatch()
+                return {**expr, "left": self._bucket(left), "right": right}
+            if expr["type"] == as_right and self._is_time(right):
+                left = self.any(left)
+                if not self._aligned(left):
+                    raise _NoMatch()
+                return {**expr, "left": left, "right": self._bucket(right)}
+        return {k: self.any(v) for k, v in expr.items()}
+
+    def _aligned(self, bound: dict[str, Any]) -> bool:
+        """Whether a constant time bound falls on a rollup bucket boundary."""
+        if '"COLUMN_REF"' in json.dumps(bound):
+            return False
+        tree = _template(self.con, "SELECT NULL")
+        # Every parameter is selected too; DuckDB rejects unused ones.
+        tree["statements"][0]["node"]["select_list"] = [bound] + [
+            {"class": "PARAMETER", "type": "VALUE_PARAMETER", "alias": "", "identifier": str(n)}
+            for n in range(1, len(self.params) + 1)
+        ]
+        value = f"CAST(t.bound AS {self.time_type})"
+        check = (
+            f"SELECT date_trunc('{self.spec.granularity}', {value}) = {value} "
+            f"FROM ({_to_sql(self.con, tree)}) AS t(bound)"
+        )
+        return bool(self.con.execute(check, self.params or None).fetchone()[0])
+
+
+def rewrite_for_rollup(
+    con: Any,
+    sql: str,
+    params: Sequence[Any],
+    table: str,
+    schema: "pa.Schema",
+    time_type: str,
+    spec: RollupSpec,
+    output_names: Callable[[], Sequence[str]],
+) -> str | None:
+    """
+    SQL computing the same result as sql from the rollup registered as
+    ``table``, or None when the query cannot be answered from it.
+
+    The caller has checked that sql is a single SELECT. schema is the
+    dataset's, time_type the DuckDB type of the time column; output_names()
+    returns the column names of the original query and is only called once
+    the query is known to match (it may bind the query).
+    """
+    import duckdb
+
+    try:
+        return _rewrite(con, sql, params, table, schema, time_type, spec, output_names)
+    except duckdb.Error:
+        return None  # e.g. a time bound that does not cast; the original query reports it
+
+
+def _rewrite(
+    con: Any,
+    sql: str,
+    params: Sequence[Any],
+    table: str,
+    schema: "pa.Schema",
+    time_type: str,
+    spec: RollupSpec,
+    output_names: Callable[[], Sequence[str]],
+) -> str | None:
+    tree = _parse(con, sql)
+    if tree is None:
+        return None
+    node = tree["statements"][0]["node"]
+    source = node.get("from_table") or {}
+    if (
+        node.get("type") != "SELECT_NODE"
+        or node["cte_map"]["map"]
+        or node.get("sample")
+        or node.get("qualify")
+        or source.get("type") != "BASE_TABLE"
+        or source.get("sample")
+        or source.get("at_clause")
+        or source.get("schema_name")
+        or source.get("catalog_name")
+        or source["table_name"].lower() != table.lower()
+    ):
+        return None
+    qualifiers = {source["table_name"].lower()}
+    if source.get("alias"):
+        qualifiers.add(source["alias"].lower())
+    rewriter = _Rewriter(
+        con, spec, {f.name.lower() for f in schema}, qualifiers, time_type, params
+    )
+    rewritten = dict(node)
+    try:
+        for key in ("select_list", "where_clause", "group_expressions", "having", "modifiers"):
+            rewritten[key] = rewriter.any(node[key])
+    except _NoMatch:
+        return None
+    grouped = node["group_expressions"] or node["aggregate_handling"] == "FORCE_AGGREGATES"
+    if not (grouped or rewriter.aggregated):
+        return None  # row-level query
+    names = list(output_names())
+    if len(names) != len(rewritten["select_list"]):
+        return None
+    rewritten["select_list"] = [
+        {**item, "alias": name} for item, name in zip(rewritten["select_list"], names)
+    ]
+    tree["statements"][0]["node"] = rewritten
+    return _to_sql(con, tree)
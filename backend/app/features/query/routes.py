@@ -0,0 +1,60 @@
+"""Analytical query router (tenant-scoped)."""
+
+from __future__ import annotations
+
+from fastapi import APIRouter, Depends, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.internal.routes import resolve_tenant
+from app.core.cache.tenant_cache import CachedTenant
+from app.core.errors.exceptions import BadRequestError
+from app.db.session import get_read_db
+from app.features.query.schemas import QueryColumn, QueryRequest, QueryResponse
+from app.features.query.service import execute_query, open_stream
+from app.features.query.streaming import (
+    STREAMED_RESPONSES,
+    negotiate_stream_format,
+    stream_response,
+)
+
+router = APIRouter()
+
+
+@router.post("", response_model=QueryResponse, responses=STREAMED_RESPONSES)
+async def run_sql_query(
+    request: Request,
+    body: QueryRequest,
+    tenant: CachedTenant = Depends(resolve_tenant),
+    db: AsyncSession = Depends(get_read_db),
+) -> QueryResponse | Response:
+    """
+    Run a read-only SELECT over the tenant's datasets, one page at a time.
+
+    With ``Accept: application/x-ndjson`` or
+    ``application/vnd.apache.arrow.stream`` the whole result is streamed
+    instead (no cursor, page size or caching).
+    """
+    fmt = negotiate_stream_format(request.headers.get("accept"))
+    if fmt is not None:
+        if body.cursor is not None:
+            raise BadRequestError("Cursors apply to paged JSON results only")
+        stream = await open_stream(db, tenant_id=tenant.id, sql=body.sql, params=body.params)
+        headers = {"X-Rollup": stream.rollup} if stream.rollup else None
+        return stream_response(stream, fmt, headers=headers)
+
+    result = await execute_query(
+        db,
+        tenant_id=tenant.id,
+        sql=body.sql,
+        params=body.params,
+        cursor=body.cursor,
+        page_size=body.page_size,
+    )
+    return QueryResponse(
+        columns=[QueryColumn(**c) for c in result.page.columns],
+        rows=result.page.rows,
+        next_cursor=result.next_cursor,
+        cached=result.cached,
+        elapsed_ms=result.elapsed_ms,
+        rollup=result.page.rollup,
+    )
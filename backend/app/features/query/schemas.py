@@ -0,0 +1,35 @@
+"""Query request/response schemas."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from pydantic import BaseModel, Field
+
+
+class QueryRequest(BaseModel):
+    """
+    A single SELECT over the tenant's datasets, referenced by name (quote names
+    that are not plain identifiers: ``SELECT * FROM "sales 2024"``). Use ``?``
+    placeholders with ``params``. Pass ``cursor`` from a previous page to
+    continue; add ORDER BY for a stable order across pages.
+    """
+
+    sql: str = Field(..., min_length=1, max_length=100_000)
+    params: list[Any] = Field(default_factory=list)
+    cursor: str | None = None
+    page_size: int | None = Field(None, ge=1)
+
+
+class QueryColumn(BaseModel):
+    name: str
+    type: str
+
+
+class QueryResponse(BaseModel):
+    columns: list[QueryColumn]
+    rows: list[list[Any]]
+    next_cursor: str | None
+    cached: bool
+    elapsed_ms: float
+    rollup: str | None = None
@@ -0,0 +1,254 @@
+"""
+Analytical queries over a tenant's datasets.
+
+Resolves which of the tenant's datasets the SQL references, pins them at their
+current committed version and runs the query on a bounded thread pool (full
+pool + queue -> 503). Pages are served from the result cache when the same
+query hits the same dataset versions. Pagination is offset based, carried in
+an opaque cursor bound to the query text and parameters.
+
+open_stream is the unpaged variant for streamed responses: the whole result
+is pulled from DuckDB batch by batch while the client reads. Each open stream
+keeps a DuckDB connection (and its memory) alive, so their number is capped
+per process (QUERY_MAX_STREAMS, then 503); streamed results are not cached.
+
+Queries over a single dataset carry its up-to-date rollups (smallest first),
+which the engine uses when one can answer the query; the result is the same,
+so the cache key does not depend on them.
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import dataclasses
+import functools
+import hashlib
+import json
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.concurrency.bounded_executor import BoundedExecutor
+from app.core.config.settings import settings
+from app.core.errors.exceptions import BadRequestError, ServiceUnavailableError
+from app.core.metrics.registry import numeric_stats, registry
+from app.db.models.dataset import Dataset
+from app.db.repos import rollup_repo
+from app.db.repos.dataset_repo import list_datasets
+from app.db.session import use_primary
+from app.features.datasets import storage
+from app.features.datasets.rollups import RollupSpec
+from app.features.query.cache import get_cached_page, result_cache_key, store_page
+from app.features.query.engine import (
+    DatasetSource,
+    QueryPage,
+    QueryStream,
+    open_query_stream,
+    referenced_tables,
+    run_query,
+)
+from app.features.query.rewrite import RollupSource
+
+# Threads, not processes: DuckDB releases the GIL and results come back as Arrow.
+query_executor = BoundedExecutor(
+    kind="thread",
+    max_workers=settings.QUERY_WORKERS,
+    max_queue=settings.QUERY_QUEUE_SIZE,
+    name="query",
+)
+_open_streams = 0
+_open_streams_lock = threading.Lock()  # released from worker threads
+
+registry.register_collector(
+    "Analytical query executor stats",
+    lambda: numeric_stats(
+        "ambient_query_executor", {**query_executor.stats(), "open_streams": _open_streams}
+    ),
+)
+
+
+@dataclass
+class QueryResult:
+    page: QueryPage
+    next_cursor: str | None
+    cached: bool
+    elapsed_ms: float
+
+
+def query_fingerprint(sql: str, params: list[Any]) -> str:
+    payload = json.dumps([sql, params], sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+def encode_cursor(offset: int, fingerprint: str) -> str:
+    raw = json.dumps({"o": offset, "f": fingerprint}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, fingerprint: str) -> int:
+    """Offset stored in the cursor; rejects cursors minted for another query."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        data = json.loads(raw)
+        offset, minted_for = int(data["o"]), data["f"]
+    except (binascii.Error, ValueError, TypeError, KeyError) as exc:
+        raise BadRequestError("Invalid cursor") from exc
+    if minted_for != fingerprint or offset < 0:
+        raise BadRequestError("Cursor does not belong to this query")
+    return offset
+
+
+async def resolve_sources(
+    session: AsyncSession, tenant_id: uuid.UUID, sql: str, *, rollups: bool = False
+) -> list[DatasetSource]:
+    """
+    The tenant's committed datasets the SQL reads as tables (by name, from
+    DuckDB's parse tree). With rollups, a single matching dataset also
+    carries its rollups that are at the dataset's version. On a replica
+    session, a table not found there is looked up again on the primary.
+    """
+    tables = referenced_tables(sql)
+    if not tables:
+        return []
+    datasets = await _committed_datasets(session, tenant_id, tables)
+    if len(datasets) < len(tables) and await use_primary(session):
+        datasets = await _committed_datasets(session, tenant_id, tables)
+    sources = []
+    for dataset in datasets:
+        paths = storage.part_paths(tenant_id, dataset.id, dataset.version)
+        sources.append(
+            DatasetSource(
+                id=dataset.id,
+                name=dataset.name,
+                version=dataset.version,
+                paths=tuple(str(p) for p in paths),
+            )
+        )
+    if rollups and len(sources) == 1:
+        source = sources[0]
+        found = await rollup_repo.list_rollups_by_size(session, tenant_id, source.id)
+        current = tuple(
+            RollupSource(
+                name=r.name,
+                path=str(storage.rollup_path(tenant_id, source.id, r.id, r.version)),
+                spec=RollupSpec(
+                    time_column=r.time_column,
+                    granularity=r.granularity,
+                    dimensions=tuple(r.dimensions),
+                    measures=tuple(r.measures),
+                ),
+            )
+            for r in found
+            if r.version == source.version
+        )
+        sources[0] = dataclasses.replace(source, rollups=current)
+    return sources
+
+
+async def _committed_datasets(
+    session: AsyncSession, tenant_id: uuid.UUID, tables: frozenset[str]
+) -> list[Dataset]:
+    return [
+        d
+        for d in await list_datasets(session, tenant_id)
+        if d.version > 0 and d.name.lower() in tables
+    ]
+
+
+async def execute_query(
+    session: AsyncSession,
+    *,
+    tenant_id: uuid.UUID,
+    sql: str,
+    params: list[Any],
+    cursor: str | None = None,
+    page_size: int | None = None,
+) -> QueryResult:
+    started = time.perf_counter()
+    limit = min(page_size or settings.QUERY_DEFAULT_PAGE_SIZE, settings.QUERY_MAX_PAGE_SIZE)
+    fingerprint = query_fingerprint(sql, params)
+    offset = decode_cursor(cursor, fingerprint) if cursor else 0
+
+    sources = await resolve_sources(session, tenant_id, sql, rollups=True)
+    # Nothing else is read from the DB; give the connection back before the query runs.
+    await session.close()
+
+    cache_key = result_cache_key(tenant_id, sql, params, sources, offset=offset, limit=limit)
+    page = await get_cached_page(cache_key)
+    cached = page is not None
+    if page is None:
+        page = await _run_on_executor(sources, sql, params, offset=offset, limit=limit)
+        await store_page(cache_key, page, tenant_id, sources)
+
+    next_cursor = encode_cursor(offset + limit, fingerprint) if page.has_more else None
+    return QueryResult(
+        page=page,
+        next_cursor=next_cursor,
+        cached=cached,
+        elapsed_ms=round((time.perf_counter() - started) * 1000, 1),
+    )
+
+
+async def _run_on_executor(
+    sources: list[DatasetSource], sql: str, params: list[Any], *, offset: int, limit: int
+) -> QueryPage:
+    return await query_executor.run(
+        functools.partial(
+            run_query,
+            sources,
+            sql,
+            params,
+            offset=offset,
+            limit=limit,
+            memory_limit=settings.QUERY_MEMORY_LIMIT,
+            threads=settings.QUERY_THREADS,
+            timeout_seconds=settings.QUERY_TIMEOUT_SECONDS,
+        )
+    )
+
+
+async def open_stream(
+    session: AsyncSession,
+    *,
+    tenant_id: uuid.UUID,
+    sql: str,
+    params: list[Any],
+) -> QueryStream:
+    """Start a query whose full result is streamed; errors before the first row raise here."""
+    global _open_streams
+    sources = await resolve_sources(session, tenant_id, sql, rollups=True)
+    await session.close()
+
+    with _open_streams_lock:
+        if _open_streams >= settings.QUERY_MAX_STREAMS:
+            raise ServiceUnavailableError("Too many streamed queries, please retry")
+        _open_streams += 1
+    try:
+        stream = await query_executor.run(
+            functools.partial(
+                open_query_stream,
+                sources,
+                sql,
+                params,
+                memory_limit=settings.QUERY_MEMORY_LIMIT,
+                threads=settings.QUERY_THREADS,
+                timeout_seconds=settings.QUERY_TIMEOUT_SECONDS,
+                batch_rows=settings.QUERY_STREAM_BATCH_ROWS,
+            )
+        )
+    except BaseException:
+        _stream_released()
+        raise
+    stream.on_release(_stream_released)
+    return stream
+
+
+def _stream_released() -> None:
+    global _open_streams
+    with _open_streams_lock:
+        _open_streams -= 1
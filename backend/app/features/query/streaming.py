@@ -0,0 +1,288 @@
+"""
+Streamed result bodies: NDJSON or the Arrow IPC stream format, chosen by Accept.
+
+A BatchStream hands out Arrow record batches one at a time from blocking code
+(a DuckDB result reader, memory-mapped IPC files). stream_response fetches and
+encodes the next batch in a worker thread only after the previous chunk has
+been sent, so a slow client holds back the producer (uvicorn's send waits
+while the socket buffer is full) and memory stays around one batch per
+response, whatever the result size.
+
+Errors before the first batch (bad SQL, timeouts, server busy) are raised
+while the stream is opened and become normal error responses. A failure
+after the headers went out can only abort the response: the body ends
+without its terminating chunk (NDJSON) or end-of-stream marker (Arrow), which
+clients see as a truncated transfer.
+
+All middleware in the app is plain ASGI and passes body chunks straight
+through, so nothing in the stack buffers these responses.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import datetime as dt
+import decimal
+import io
+import json
+import logging
+import threading
+from abc import ABC, abstractmethod
+from collections import Counter
+from typing import TYPE_CHECKING, Any, AsyncIterator, Callable, Sequence
+
+from starlette.responses import StreamingResponse
+
+from app.core.errors.exceptions import BadRequestError
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+logger = logging.getLogger(__name__)
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+STREAM_MEDIA_TYPES = {
+    NDJSON_MEDIA_TYPE: "ndjson",
+    "application/ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+    ARROW_STREAM_MEDIA_TYPE: "arrow",
+}
+_FORMAT_MEDIA_TYPES = {"ndjson": NDJSON_MEDIA_TYPE, "arrow": ARROW_STREAM_MEDIA_TYPE}
+# OpenAPI: extra 200 content types of routes that can stream.
+STREAMED_RESPONSES: dict[int | str, dict[str, Any]] = {
+    200: {"content": {NDJSON_MEDIA_TYPE: {}, ARROW_STREAM_MEDIA_TYPE: {}}}
+}
+
+
+def negotiate_stream_format(accept: str | None) -> str | None:
+    """
+    ``ndjson`` or ``arrow`` when the Accept header prefers a streamed format,
+    else None (the paged JSON response). Highest q wins; ties keep header order.
+    """
+    best: tuple[float, str] | None = None
+    for part in (accept or "").split(","):
+        media_type, *params = (p.strip() for p in part.split(";"))
+        fmt = STREAM_MEDIA_TYPES.get(media_type.lower())
+        quality = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if media_type.lower() in ("application/json", "*/*", "application/*"):
+            fmt = None
+        if quality <= 0 or (best is not None and quality <= best[0]):
+            continue
+        best = (quality, fmt or "")
+    return (best[1] or None) if best else None
+
+
+class BatchStream(ABC):
+    """
+    Blocking source of record batches, safe to close from another thread.
+
+    Subclasses implement _fetch (next batch or None when exhausted) and
+    _release; _interrupt may stop a fetch in progress. close() never blocks:
+    if a fetch is running it is interrupted and the fetching thread releases
+    the resources when it returns. Callbacks added with on_release run once,
+    after the resources are released.
+    """
+
+    def __init__(self, schema: "pa.Schema") -> None:
+        self.schema = schema
+        self._state = threading.Lock()
+        self._busy = False
+        self._closed = False
+        self._release_callbacks: list[Callable[[], None]] = []
+
+    def on_release(self, callback: Callable[[], None]) -> None:
+        self._release_callbacks.append(callback)
+
+    def _finish(self) -> None:
+        try:
+            self._release()
+        finally:
+            for callback in self._release_callbacks:
+                callback()
+
+    def next_batch(self) -> "pa.RecordBatch | None":
+        with self._state:
+            if self._closed:
+                return None
+            self._busy = True
+        try:
+            return self._fetch()
+        finally:
+            with self._state:
+                self._busy = False
+                release = self._closed
+            if release:
+                self._finish()
+
+    def close(self) -> None:
+        with self._state:
+            if self._closed:
+                return
+            self._closed = True
+            if self._busy:
+                self._interrupt()
+                return
+        self._finish()
+
+    @abstractmethod
+    def _fetch(self) -> "pa.RecordBatch | None": ...
+
+    @abstractmethod
+    def _release(self) -> None: ...
+
+    def _interrupt(self) -> None:
+        pass
+
+
+class ArrowFileStream(BatchStream):
+    """Record batches of Arrow IPC files (dataset parts, job results), memory-mapped."""
+
+    def __init__(self, paths: Sequence[str]) -> None:
+        if not paths:
+            raise ValueError("ArrowFileStream needs at least one file")
+        self._paths = list(paths)
+        self._source: Any = None
+        self._reader: Any = None
+        self._index = 0
+        self._open(self._paths.pop(0))
+        super().__init__(self._reader.schema)
+
+    def _open(self, path: str) -> None:
+        import pyarrow as pa
+
+        self._source = pa.memory_map(path)
+        self._reader = pa.ipc.open_file(self._source)
+        self._index = 0
+
+    def _fetch(self) -> "pa.RecordBatch | None":
+        while self._index >= self._reader.num_record_batches:
+            if not self._paths:
+                return None
+            self._source.close()
+            self._open(self._paths.pop(0))
+        batch = self._reader.get_batch(self._index)
+        self._index += 1
+        return batch
+
+    def _release(self) -> None:
+        self._source.close()
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (dt.datetime, dt.date, dt.time)):
+        return value.isoformat()
+    if isinstance(value, decimal.Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    if isinstance(value, bytes):
+        return base64.b64encode(value).decode()
+    return str(value)
+
+
+class NdjsonEncoder:
+    """One JSON object per row, keyed by column name."""
+
+    def __init__(self, schema: "pa.Schema") -> None:
+        duplicates = sorted(n for n, c in Counter(schema.names).items() if c > 1)
+        if duplicates:
+            raise BadRequestError(
+                "NDJSON rows need unique column names; alias "
+                + ", ".join(duplicates)
+            )
+
+    def header(self) -> bytes:
+        return b""
+
+    def encode(self, batch: "pa.RecordBatch") -> bytes:
+        dumps = json.dumps
+        return "".join(
+            dumps(row, default=_json_default, separators=(",", ":")) + "\n"
+            for row in batch.to_pylist()
+        ).encode()
+
+    def footer(self) -> bytes:
+        return b""
+
+
+class ArrowStreamEncoder:
+    """Arrow IPC stream: schema message, one message per batch, end-of-stream marker."""
+
+    def __init__(self, schema: "pa.Schema") -> None:
+        import pyarrow as pa
+
+        self._buffer = io.BytesIO()
+        self._writer = pa.ipc.new_stream(pa.PythonFile(self._buffer, mode="w"), schema)
+
+    def _drain(self) -> bytes:
+        data = self._buffer.getvalue()
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        return data
+
+    def header(self) -> bytes:
+        return self._drain()
+
+    def encode(self, batch: "pa.RecordBatch") -> bytes:
+        self._writer.write_batch(batch)
+        return self._drain()
+
+    def footer(self) -> bytes:
+        self._writer.close()
+        return self._drain()
+
+
+def _encoder(fmt: str, schema: "pa.Schema") -> NdjsonEncoder | ArrowStreamEncoder:
+    return NdjsonEncoder(schema) if fmt == "ndjson" else ArrowStreamEncoder(schema)
+
+
+async def _iter_body(
+    stream: BatchStream, encoder: NdjsonEncoder | ArrowStreamEncoder
+) -> AsyncIterator[bytes]:
+    def next_chunk() -> bytes | None:
+        batch = stream.next_batch()
+        return None if batch is None else encoder.encode(batch)
+
+    try:
+        header = encoder.header()
+        if header:
+            yield header
+        while True:
+            chunk = await asyncio.to_thread(next_chunk)
+            if chunk is None:
+                break
+            if chunk:
+                yield chunk
+        yield encoder.footer()
+    except Exception:
+        logger.exception("Streamed response aborted")
+        raise
+    finally:
+        # Also reached when the client disconnects; must not await (the task is cancelled).
+        stream.close()
+
+
+def stream_response(
+    stream: BatchStream,
+    fmt: str,
+    *,
+    headers: dict[str, str] | None = None,
+) -> StreamingResponse:
+    """Response streaming every batch of stream as fmt (``ndjson`` or ``arrow``)."""
+    try:
+        encoder = _encoder(fmt, stream.schema)
+    except BaseException:
+        stream.close()
+        raise
+    return StreamingResponse(
+        _iter_body(stream, encoder),
+        media_type=_FORMAT_MEDIA_TYPES[fmt],
+        headers=headers,
+    )
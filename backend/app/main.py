@@ -7,19 +7,33 @@ the main API router.
 
 from __future__ import annotations
 
+import asyncio
+import json
 import logging
 from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any
 
 from fastapi import FastAPI
 from fastapi.openapi.utils import get_openapi
 
 from app.api.router import api_router
+from app.core.cache.redis_client import close_redis
 from app.core.config.settings import settings
 from app.core.errors.handlers import register_exception_handlers
-from app.core.logging.setup import configure_logging
+from app.core.logging.setup import configure_logging, parse_logger_table, shutdown_logging
 from app.core.middleware.actor_context import ActorContextMiddleware
+from app.core.middleware.idempotency import IdempotencyMiddleware
+from app.core.middleware.metrics import MetricsMiddleware
+from app.core.middleware.query_budget import QueryBudgetMiddleware
+from app.core.middleware.rate_limit import RateLimitMiddleware
 from app.core.middleware.request_id import RequestIDMiddleware
 from app.core.middleware.tenant_enforcement import TenantEnforcementMiddleware
+from app.core.security.hash_executor import password_hash_executor
+from app.features.datasets.storage import mapped_parts
+from app.features.jobs.events import job_events
+from app.features.provisioning.service import bulk_hash_executor
+from app.features.query.service import query_executor
 
 logger = logging.getLogger(__name__)
 
@@ -33,16 +47,75 @@ def _redact_db_url(url: str) -> str:
     return f"{scheme}://***@{host}"
 
 
+async def _sweep_mapped_parts(interval: float) -> None:
+    """Unmap part files deleted by other processes even while no query runs here."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await asyncio.to_thread(mapped_parts.sweep)
+        except Exception:
+            logger.exception("Mapped part sweep failed")
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Startup: init logging, then boot log. Shutdown: none for now."""
-    configure_logging(settings.LOG_LEVEL)
+    """
+    Startup: init logging, boot log, start the mapped-part sweeper.
+    Shutdown: stop the sweeper, job event listener and pools, unmap parts, close Redis,
+    flush logs.
+    """
+    configure_logging(
+        settings.LOG_LEVEL,
+        async_mode=settings.LOG_ASYNC,
+        json_format=settings.LOG_FORMAT.lower() == "json",
+        sample_rates=parse_logger_table(settings.LOG_SAMPLE_RATES),
+        rate_limits=parse_logger_table(settings.LOG_RATE_LIMITS),
+    )
     logger.info(
         "Booting Ambient backend ENVIRONMENT=%s DATABASE_URL=%s",
         settings.ENVIRONMENT,
         _redact_db_url(settings.DATABASE_URL),
     )
+    sweeper = asyncio.create_task(
+        _sweep_mapped_parts(max(1.0, settings.DATASET_MAPPED_SWEEP_SECONDS))
+    )
     yield
+    sweeper.cancel()
+    await job_events.close()
+    password_hash_executor.shutdown()
+    bulk_hash_executor.shutdown()
+    query_executor.shutdown()
+    mapped_parts.clear()
+    await close_redis()
+    shutdown_logging()
+
+
+def build_openapi_schema(app: FastAPI) -> dict[str, Any]:
+    """Generate the OpenAPI schema (used at runtime and by the build-time script)."""
+    openapi_schema = get_openapi(
+        title=app.title,
+        version=app.version,
+        routes=app.routes,
+    )
+    openapi_schema.setdefault("components", {})
+    openapi_schema["components"].setdefault("securitySchemes", {})
+    openapi_schema["components"]["securitySchemes"]["bearerAuth"] = {
+        "type": "http",
+        "scheme": "bearer",
+        "bearerFormat": "JWT",
+    }
+    return openapi_schema
+
+
+def _load_prebuilt_openapi(path: str) -> dict[str, Any] | None:
+    """Load the schema artifact generated at build time, if configured and present."""
+    if not path:
+        return None
+    schema_file = Path(path)
+    if not schema_file.is_file():
+        logger.warning("OPENAPI_SCHEMA_PATH=%s not found; building schema at runtime", path)
+        return None
+    return json.loads(schema_file.read_text(encoding="utf-8"))
 
 
 def create_app() -> FastAPI:
@@ -56,27 +129,21 @@ def create_app() -> FastAPI:
     )
 
     register_exception_handlers(app)
+    app.add_middleware(IdempotencyMiddleware)  # inside TenantEnforcement: bad requests not stored
     app.add_middleware(TenantEnforcementMiddleware)
+    app.add_middleware(RateLimitMiddleware)  # before tenant checks, idempotency and handlers
     app.add_middleware(ActorContextMiddleware)  # stub: request.state.actor = None
+    app.add_middleware(QueryBudgetMiddleware)  # inside RequestID: warnings carry the ID
     app.add_middleware(RequestIDMiddleware)
+    app.add_middleware(MetricsMiddleware)  # outermost: times the whole stack
     app.include_router(api_router)
 
     def custom_openapi():
         if app.openapi_schema:
             return app.openapi_schema
-        openapi_schema = get_openapi(
-            title=app.title,
-            version=app.version,
-            routes=app.routes,
-        )
-        openapi_schema.setdefault("components", {})
-        openapi_schema["components"].setdefault("securitySchemes", {})
-        openapi_schema["components"]["securitySchemes"]["bearerAuth"] = {
-            "type": "http",
-            "scheme": "bearer",
-            "bearerFormat": "JWT",
-        }
-        app.openapi_schema = openapi_schema
+        app.openapi_schema = _load_prebuilt_openapi(
+            settings.OPENAPI_SCHEMA_PATH
+        ) or build_openapi_schema(app)
         return app.openapi_schema
 
     app.openapi = custom_openapi
@@ -0,0 +1,73 @@
+"""Helpers for consuming large request bodies as bounded, record-aligned blocks."""
+
+from __future__ import annotations
+
+from typing import AsyncIterable, AsyncIterator
+
+from app.core.errors.exceptions import BadRequestError
+
+
+def _last_boundary(
+    buffer: bytes | bytearray, start: int, in_quotes: bool, quote_aware: bool
+) -> tuple[int, bool]:
+    """
+    Index just past the last newline in buffer[start:] that ends a complete
+    record (-1 if none), and whether the end of the buffer is inside a quoted
+    field. in_quotes is that state at start, so each byte is scanned once.
+    """
+    if not quote_aware:
+        end = buffer.rfind(b"\n", start)
+        return (end + 1 if end != -1 else -1), False
+    in_quotes ^= buffer.count(b'"', start) % 2 == 1
+    quoted, stop = in_quotes, len(buffer)
+    while (end := buffer.rfind(b"\n", start, stop)) != -1:
+        quoted ^= buffer.count(b'"', end, stop) % 2 == 1
+        if not quoted:
+            return end + 1, in_quotes
+        stop = end  # newline inside a quoted CSV field; try an earlier one
+    return -1, in_quotes
+
+
+async def iter_record_blocks(
+    chunks: AsyncIterable[bytes],
+    *,
+    block_bytes: int = 1 << 20,
+    quote_aware: bool = True,
+    max_record_bytes: int | None = None,
+) -> AsyncIterator[bytes]:
+    """
+    Re-chunk a byte stream into blocks of roughly block_bytes that end on a
+    record (line) boundary. Memory stays O(block_bytes + max_record_bytes)
+    regardless of the total stream size: a record longer than
+    max_record_bytes (default 4 * block_bytes), e.g. behind an unterminated
+    quote, raises BadRequestError. With quote_aware, newlines inside
+    double-quoted CSV fields do not split a record, and a stream ending
+    inside a quoted field raises BadRequestError.
+    """
+    max_record = max_record_bytes or 4 * block_bytes
+    buffer = bytearray()
+    cut = 0  # end of the last complete record in buffer
+    in_quotes = False
+    offset = 0  # stream position of buffer[0]
+    async for chunk in chunks:
+        if not chunk:
+            continue
+        start = len(buffer)
+        buffer += chunk
+        boundary, in_quotes = _last_boundary(buffer, start, in_quotes, quote_aware)
+        if boundary != -1:
+            cut = boundary
+        if len(buffer) - cut > max_record:
+            hint = " (unterminated quoted field?)" if in_quotes else ""
+            raise BadRequestError(
+                f"Record at byte {offset + cut} is longer than {max_record} bytes{hint}"
+            )
+        if len(buffer) >= block_bytes and cut > 0:
+            yield bytes(buffer[:cut])
+            del buffer[:cut]
+            offset += cut
+            cut = 0
+    if in_quotes:
+        raise BadRequestError(f"Unterminated quoted field in the record at byte {offset + cut}")
+    if buffer:
+        yield bytes(buffer if buffer.endswith(b"\n") else buffer + b"\n")
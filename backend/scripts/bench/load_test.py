@@ -0,0 +1,268 @@
+"""
+Load test for the API built by ``create_app()``.
+
+Requests go through the real ASGI app (middleware, routing, DB, bcrypt) via
+httpx's ASGI transport, so results are reproducible without a running
+server. Scenarios that need the database run against ``--database-url``
+(use a disposable Postgres; ``--create-schema`` runs the migrations) and
+are skipped with ``--skip-db``. The rate limiter is turned off (all
+requests come from one client IP) unless ``--rate-limit`` is given.
+
+Results are written as JSON. With ``--baseline`` the run is compared against
+a previous result file and exits non-zero when throughput drops or p95
+latency grows by more than ``--max-regression`` (default 20%).
+
+Usage (from backend/):
+    python -m scripts.bench.load_test --database-url postgresql+asyncpg://... \\
+        --create-schema --concurrency 32 --requests 2000 --output bench.json
+    python -m scripts.bench.load_test ... --baseline bench-main.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import time
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable
+
+from scripts.bench.stats import latency_summary_ms
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+
+RequestFactory = Callable[[int], dict[str, Any]]
+
+
+@dataclass
+class Scenario:
+    name: str
+    method: str
+    path: str
+    needs_db: bool = False
+    # Per-request kwargs for httpx (json body, headers), indexed by request number.
+    build: RequestFactory = field(default=lambda i: {})
+    # Requests per scenario are capped (e.g. bcrypt-bound signup).
+    max_requests: int | None = None
+
+
+def _scenarios(bench_domain: str, tenant_slug: str) -> list[Scenario]:
+    return [
+        Scenario("internal_healthz", "GET", "/internal/healthz"),
+        Scenario("v1_health", "GET", "/v1/health"),
+        Scenario("auth_health", "GET", "/v1/auth/health"),
+        Scenario("db_ping", "GET", "/internal/db-ping", needs_db=True),
+        Scenario(
+            "internal_tenant",
+            "GET",
+            "/internal/tenant",
+            needs_db=True,
+            build=lambda i: {"headers": {"X-Tenant-ID": tenant_slug}},
+        ),
+        Scenario(
+            "auth_signup",
+            "POST",
+            "/v1/auth/signup",
+            needs_db=True,
+            build=lambda i: {
+                "json": {"email": f"user{i}@{bench_domain}", "password": "BenchPass123!"}
+            },
+            max_requests=200,
+        ),
+    ]
+
+
+async def _run_scenario(
+    client: Any, scenario: Scenario, concurrency: int, total: int
+) -> dict[str, Any]:
+    total = min(total, scenario.max_requests or total)
+    latencies: list[float] = []
+    statuses: dict[str, int] = {}
+    next_index = 0
+
+    async def worker() -> None:
+        nonlocal next_index
+        while next_index < total:
+            i = next_index
+            next_index += 1
+            start = time.perf_counter()
+            try:
+                response = await client.request(
+                    scenario.method, scenario.path, **scenario.build(i)
+                )
+                key = str(response.status_code)
+            except Exception as exc:  # noqa: BLE001 - count and keep going
+                key = type(exc).__name__
+            latencies.append(time.perf_counter() - start)
+            statuses[key] = statuses.get(key, 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - start
+
+    ok = sum(count for status, count in statuses.items() if status.startswith("2"))
+    return {
+        "requests": total,
+        "concurrency": concurrency,
+        "wall_s": round(wall, 4),
+        "throughput_rps": round(total / wall, 2) if wall else 0.0,
+        "error_rate": round(1 - ok / total, 4) if total else 0.0,
+        "statuses": statuses,
+        **latency_summary_ms(latencies),
+    }
+
+
+def _git_commit() -> str | None:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip()
+
+
+def bench_app(*, rate_limit: bool = False) -> Any:
+    """
+    The app under test. The rate limiter is off unless asked for: all bench
+    traffic comes from one client IP, so it would otherwise measure 429s.
+    """
+    from app.core.config.settings import settings
+    from app.main import create_app
+
+    settings.RATE_LIMIT_ENABLED = rate_limit
+    return create_app()
+
+
+async def run(args: argparse.Namespace) -> dict[str, Any]:
+    # Imported here so --database-url is applied before the engine is created.
+    import httpx
+
+    from app.core.security.auth_service import signup
+    from app.db.session import AsyncSessionLocal, engine
+
+    if args.create_schema and not args.skip_db:
+        # Migrations, not create_all: the users partitions and RLS policy live there.
+        subprocess.run(
+            [sys.executable, "-m", "alembic", "upgrade", "head"], cwd=BACKEND_DIR, check=True
+        )
+
+    bench_domain = f"bench-{uuid.uuid4().hex[:8]}.example"
+    tenant_slug = ""
+    if not args.skip_db:
+        # Seed one tenant for the tenant-scoped scenario.
+        async with AsyncSessionLocal() as session:
+            await signup(session, email=f"seed@{bench_domain}", password="BenchPass123!")
+        tenant_slug = "t_" + bench_domain.replace(".", "_")
+
+    app = bench_app(rate_limit=args.rate_limit)
+    selected = set(args.scenarios.split(",")) if args.scenarios else None
+    results: dict[str, Any] = {}
+
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        # httpx logs every request at INFO; that would be measured too.
+        logging.getLogger("httpx").setLevel(logging.WARNING)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for scenario in _scenarios(bench_domain, tenant_slug):
+                if selected is not None and scenario.name not in selected:
+                    continue
+                if scenario.needs_db and args.skip_db:
+                    continue
+                # Warm-up: first-hit costs (route compile, pool connect) are not measured.
+                for i in range(min(args.warmup, scenario.max_requests or args.warmup)):
+                    await client.request(scenario.method, scenario.path, **scenario.build(-i - 1))
+                results[scenario.name] = await _run_scenario(
+                    client, scenario, args.concurrency, args.requests
+                )
+                r = results[scenario.name]
+                print(
+                    f"{scenario.name:<18} {r['throughput_rps']:>9.1f} rps"
+                    f"  p50={r['p50_ms']:.2f}ms p95={r['p95_ms']:.2f}ms p99={r['p99_ms']:.2f}ms"
+                    f"  errors={r['error_rate']:.2%}"
+                )
+
+    await engine.dispose()
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "python": platform.python_version(),
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "db": not args.skip_db,
+            "rate_limit": args.rate_limit,
+        },
+        "scenarios": results,
+    }
+
+
+def compare(current: dict[str, Any], baseline: dict[str, Any], max_regression: float) -> list[str]:
+    """Return human-readable regressions of current vs baseline."""
+    failures = []
+    for name, base in baseline.get("scenarios", {}).items():
+        cur = current["scenarios"].get(name)
+        if cur is None:
+            continue
+        if base["throughput_rps"] and cur["throughput_rps"] < base["throughput_rps"] * (1 - max_regression):
+            failures.append(
+                f"{name}: throughput {cur['throughput_rps']} < baseline {base['throughput_rps']}"
+            )
+        if base["p95_ms"] and cur["p95_ms"] > base["p95_ms"] * (1 + max_regression):
+            failures.append(f"{name}: p95 {cur['p95_ms']}ms > baseline {base['p95_ms']}ms")
+        if cur["error_rate"] > base["error_rate"]:
+            failures.append(f"{name}: error rate {cur['error_rate']} > baseline {base['error_rate']}")
+    return failures
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="ASGI load test for the Ambient API")
+    parser.add_argument("--database-url", default=None, help="defaults to $DATABASE_URL")
+    parser.add_argument("--skip-db", action="store_true", help="only run DB-free scenarios")
+    parser.add_argument("--create-schema", action="store_true", help="run migrations (disposable DB)")
+    parser.add_argument(
+        "--rate-limit", action="store_true", help="keep the rate limiter on (off by default)"
+    )
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=1000, help="requests per scenario")
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--scenarios", default="", help="comma-separated subset")
+    parser.add_argument("--output", default="", help="write JSON results here")
+    parser.add_argument("--baseline", default="", help="JSON results to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.2)
+    args = parser.parse_args()
+
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    elif not os.environ.get("DATABASE_URL"):
+        if not args.skip_db:
+            parser.error("set --database-url / $DATABASE_URL or pass --skip-db")
+        # The engine still needs a parseable URL; it is never connected.
+        os.environ["DATABASE_URL"] = "postgresql+asyncpg://bench@localhost/bench"
+
+    result = asyncio.run(run(args))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            json.dump(result, fh, indent=2, sort_keys=True)
+        print(f"results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as fh:
+            baseline = json.load(fh)
+        failures = compare(result, baseline, args.max_regression)
+        for failure in failures:
+            print(f"REGRESSION {failure}", file=sys.stderr)
+        if failures:
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Concurrency benchmark: N parallel signups for the same (new) email domain.
+
+Each signup runs the real service in its own session/transaction against
+DATABASE_URL, exactly like concurrent HTTP requests would. Reports wall time,
+latency percentiles and failures, then checks that exactly one tenant exists
+for the domain and that every distinct email produced exactly one user.
+
+Usage (from backend/, against a disposable database):
+    python -m scripts.bench.signup_concurrency --concurrency 50
+    python -m scripts.bench.signup_concurrency --concurrency 50 --same-email
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+import uuid
+
+from sqlalchemy import func, select
+
+from app.core.security.auth_service import signup
+from app.db.models.tenant import Tenant
+from app.db.models.user import User
+from app.db.session import AsyncSessionLocal, engine, set_session_tenant
+from scripts.bench.stats import latency_summary_ms
+
+
+async def _one_signup(email: str) -> tuple[float, str | None]:
+    start = time.perf_counter()
+    try:
+        async with AsyncSessionLocal() as session:
+            await signup(session, email=email, password="BenchPass123!")
+    except Exception as exc:  # noqa: BLE001 - report, do not abort the run
+        return time.perf_counter() - start, f"{type(exc).__name__}: {exc}"
+    return time.perf_counter() - start, None
+
+
+async def run(concurrency: int, same_email: bool) -> int:
+    domain = f"bench-{uuid.uuid4().hex[:8]}.example"
+    emails = [
+        f"user@{domain}" if same_email else f"user{i}@{domain}" for i in range(concurrency)
+    ]
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(_one_signup(email) for email in emails))
+    wall = time.perf_counter() - start
+
+    latency = latency_summary_ms([r[0] for r in results])
+    errors = [r[1] for r in results if r[1] is not None]
+
+    async with AsyncSessionLocal() as session:
+        tenant_ids = (
+            await session.scalars(select(Tenant.id).where(Tenant.primary_domain == domain))
+        ).all()
+        tenants = len(tenant_ids)
+        users = 0
+        for tenant_id in tenant_ids:  # users are visible per tenant (row-level security)
+            await set_session_tenant(session, tenant_id)
+            users += await session.scalar(
+                select(func.count()).select_from(User).where(User.tenant_id == tenant_id)
+            )
+    await engine.dispose()
+
+    print(f"domain        {domain}")
+    print(f"signups       {concurrency} ({'same email' if same_email else 'distinct emails'})")
+    print(f"wall time     {wall * 1000:.1f} ms")
+    print(
+        f"latency ms    p50={latency['p50_ms']:.1f} p95={latency['p95_ms']:.1f}"
+        f" p99={latency['p99_ms']:.1f} mean={latency['mean_ms']:.1f}"
+    )
+    print(f"errors        {len(errors)}")
+    for err in errors[:5]:
+        print(f"  {err}")
+    print(f"tenants       {tenants} (expected 1)")
+    print(f"users         {users} (expected {len(set(emails))})")
+
+    ok = not errors and tenants == 1 and users == len(set(emails))
+    print("result        " + ("OK" if ok else "FAILED"))
+    return 0 if ok else 1
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Parallel same-domain signup benchmark")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--same-email", action="store_true")
+    args = parser.parse_args()
+    raise SystemExit(asyncio.run(run(args.concurrency, args.same_email)))
+
+
+if __name__ == "__main__":
+    main()
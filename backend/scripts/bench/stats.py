@@ -0,0 +1,23 @@
+"""Small helpers shared by the benchmark scripts."""
+
+from __future__ import annotations
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list (pct in 0..100)."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, round(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def latency_summary_ms(latencies_seconds: list[float]) -> dict[str, float]:
+    values = sorted(latencies_seconds)
+    mean = sum(values) / len(values) if values else 0.0
+    return {
+        "p50_ms": round(percentile(values, 50) * 1000, 3),
+        "p95_ms": round(percentile(values, 95) * 1000, 3),
+        "p99_ms": round(percentile(values, 99) * 1000, 3),
+        "mean_ms": round(mean * 1000, 3),
+        "max_ms": round((values[-1] if values else 0.0) * 1000, 3),
+    }
@@ -0,0 +1,32 @@
+"""
+Build-time OpenAPI artifact.
+
+Writes the schema that ``create_app().openapi()`` would produce to a JSON
+file. Point OPENAPI_SCHEMA_PATH at it so workers serve /openapi.json without
+generating the schema on first access.
+
+Usage (from backend/):
+    python -m scripts.maintenance.build_openapi --output openapi.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+
+from app.main import build_openapi_schema, create_app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Write the OpenAPI schema to a file")
+    parser.add_argument("--output", default="openapi.json")
+    args = parser.parse_args()
+
+    schema = build_openapi_schema(create_app())
+    with open(args.output, "w", encoding="utf-8") as fh:
+        json.dump(schema, fh, separators=(",", ":"), sort_keys=True)
+    print(f"OpenAPI schema written to {args.output} ({len(schema.get('paths', {}))} paths)")
+
+
+if __name__ == "__main__":
+    main()
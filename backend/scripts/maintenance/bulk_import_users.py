@@ -0,0 +1,80 @@
+"""
+Bulk-import users into a tenant from a CSV file (``email,password`` header).
+
+Streams the file in fixed-size chunks through the same service as
+``POST /v1/users/bulk``: bounded memory, process-pool hashing, batched
+``INSERT ... ON CONFLICT DO NOTHING``. Safe to re-run after an interruption.
+
+Usage (from backend/):
+    python -m scripts.maintenance.bulk_import_users --tenant t_acme_com users.csv
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+from typing import AsyncIterator
+
+from app.db.repos.tenant_repo import get_tenant_by_slug
+from app.db.session import AsyncSessionLocal, engine, set_session_tenant
+from app.features.provisioning.service import ImportReport, bulk_hash_executor, import_users
+
+CHUNK_BYTES = 1 << 20
+
+
+async def _read_file(path: str) -> AsyncIterator[bytes]:
+    with open(path, "rb") as fh:
+        while chunk := fh.read(CHUNK_BYTES):
+            yield chunk
+            await asyncio.sleep(0)
+
+
+def _print_progress(report: ImportReport) -> None:
+    rate = report.processed / (report.elapsed_ms / 1000) if report.elapsed_ms else 0.0
+    print(
+        f"\rprocessed={report.processed} inserted={report.inserted}"
+        f" skipped={report.skipped_existing} invalid={report.invalid}"
+        f" ({rate:.0f} rows/s)",
+        end="",
+        flush=True,
+    )
+
+
+async def run(tenant_slug: str, path: str, batch_size: int | None) -> int:
+    try:
+        async with AsyncSessionLocal() as session:
+            tenant = await get_tenant_by_slug(session, tenant_slug)
+            if tenant is None:
+                print(f"tenant {tenant_slug!r} not found", file=sys.stderr)
+                return 1
+            await set_session_tenant(session, tenant.id)
+            report = await import_users(
+                session,
+                tenant_id=str(tenant.id),
+                chunks=_read_file(path),
+                batch_size=batch_size,
+                progress=_print_progress,
+            )
+    finally:
+        bulk_hash_executor.shutdown()
+        await engine.dispose()
+
+    print()
+    for error in report.errors:
+        print(f"  {error}")
+    print(f"done in {report.elapsed_ms / 1000:.1f}s")
+    return 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Bulk-import users from CSV")
+    parser.add_argument("csv_path")
+    parser.add_argument("--tenant", required=True, help="tenant slug")
+    parser.add_argument("--batch-size", type=int, default=None)
+    args = parser.parse_args()
+    raise SystemExit(asyncio.run(run(args.tenant, args.csv_path, args.batch_size)))
+
+
+if __name__ == "__main__":
+    main()
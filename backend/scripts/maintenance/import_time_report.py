@@ -0,0 +1,112 @@
+"""
+Import-time report aggregated per top-level package.
+
+Runs ``python -X importtime -c "import <module>"`` in a fresh interpreter and
+sums the self time of every imported module by top-level package (``app``,
+``sqlalchemy``, ``fastapi``, ...). With budgets it exits non-zero so CI
+catches startup regressions.
+
+Usage (from backend/):
+    python -m scripts.maintenance.import_time_report
+    python -m scripts.maintenance.import_time_report --budget-ms 1200 \\
+        --package-budget app=150 --package-budget passlib=0 --json report.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S.*)$")
+
+
+def collect(module: str, runs: int) -> dict[str, dict[str, float]]:
+    """Per-package {self_ms, modules}, taking the fastest of `runs` cold imports."""
+    best: dict[str, dict[str, float]] | None = None
+    env = dict(os.environ)
+    # The engine needs a parseable URL at import; it is never connected.
+    env.setdefault("DATABASE_URL", "postgresql+asyncpg://report@localhost/report")
+
+    for _ in range(runs):
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            capture_output=True,
+            text=True,
+            env=env,
+        )
+        if proc.returncode != 0:
+            raise SystemExit(f"import {module} failed:\n{proc.stderr[-2000:]}")
+
+        packages: dict[str, dict[str, float]] = defaultdict(lambda: {"self_ms": 0.0, "modules": 0})
+        for line in proc.stderr.splitlines():
+            match = _LINE.match(line)
+            if not match:
+                continue
+            package = match.group(4).strip().split(".")[0]
+            packages[package]["self_ms"] += int(match.group(1)) / 1000
+            packages[package]["modules"] += 1
+
+        total = sum(p["self_ms"] for p in packages.values())
+        if best is None or total < sum(p["self_ms"] for p in best.values()):
+            best = dict(packages)
+    return best or {}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Aggregate -X importtime per top-level package")
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--runs", type=int, default=3, help="report the fastest run")
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--budget-ms", type=float, default=None, help="total import budget")
+    parser.add_argument(
+        "--package-budget",
+        action="append",
+        default=[],
+        metavar="PKG=MS",
+        help="per-package budget; repeatable (PKG=0 asserts it is not imported)",
+    )
+    parser.add_argument("--json", default="", help="write the report as JSON")
+    args = parser.parse_args()
+
+    packages = collect(args.module, args.runs)
+    total = sum(p["self_ms"] for p in packages.values())
+    ranked = sorted(packages.items(), key=lambda item: item[1]["self_ms"], reverse=True)
+
+    print(f"import {args.module}: {total:.1f} ms across {len(packages)} packages")
+    print(f"{'package':<28}{'self ms':>10}{'share':>8}{'modules':>9}")
+    for name, data in ranked[: args.top]:
+        share = data["self_ms"] / total if total else 0.0
+        print(f"{name:<28}{data['self_ms']:>10.1f}{share:>8.1%}{int(data['modules']):>9}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as fh:
+            json.dump(
+                {"module": args.module, "total_ms": round(total, 3), "packages": packages},
+                fh,
+                indent=2,
+                sort_keys=True,
+            )
+
+    failures = []
+    if args.budget_ms is not None and total > args.budget_ms:
+        failures.append(f"total {total:.1f} ms > budget {args.budget_ms:.1f} ms")
+    for item in args.package_budget:
+        name, _, limit = item.partition("=")
+        spent = packages.get(name, {}).get("self_ms", 0.0)
+        if float(limit) == 0 and name in packages:
+            failures.append(f"{name} is imported at startup but should be lazy")
+        elif spent > float(limit) > 0:
+            failures.append(f"{name} {spent:.1f} ms > budget {float(limit):.1f} ms")
+    for failure in failures:
+        print(f"BUDGET EXCEEDED {failure}", file=sys.stderr)
+    if failures:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,12 @@
 """Unit tests for auth scaffold endpoints."""
 
+import asyncio
 import uuid
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 from fastapi.testclient import TestClient
 
+from app.core.security.auth_service import signup
 from app.main import app
 
 client = TestClient(app)
@@ -77,3 +79,24 @@ def test_signup_same_email_returns_ok_no_enumeration() -> None:
         )
     assert response.status_code == 200
     assert response.json() == {"status": "ok"}
+
+
+def test_signup_invalidates_tenant_cache_after_commit() -> None:
+    """A new tenant's slug is uncached only once the row is visible to other sessions."""
+    order = MagicMock()
+    session = MagicMock(commit=AsyncMock(side_effect=lambda: order.commit()))
+    tenant = MagicMock(id=uuid.uuid4(), slug="t_acme_com")
+    with (
+        patch("app.core.security.auth_service.hash_password_async", AsyncMock(return_value="h")),
+        patch(
+            "app.core.security.auth_service.upsert_tenant_by_domain",
+            AsyncMock(return_value=(tenant, True)),
+        ),
+        patch("app.core.security.auth_service.insert_user_if_absent", AsyncMock()),
+        patch("app.core.security.auth_service.tenant_cache") as cache,
+    ):
+        cache.invalidate = AsyncMock(side_effect=lambda slug: order.invalidate(slug))
+        asyncio.run(signup(session, email="a@acme.com", password="Passw0rd!Passw0rd"))
+
+    assert [c[0] for c in order.mock_calls] == ["commit", "invalidate"]
+    order.invalidate.assert_called_once_with("t_acme_com")
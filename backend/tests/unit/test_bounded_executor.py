@@ -0,0 +1,102 @@
+"""Unit tests for the bounded thread/process pool executor."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.core.errors.exceptions import ServiceUnavailableError
+from app.core.concurrency.bounded_executor import BoundedExecutor
+
+
+def test_run_returns_result_and_records_stats() -> None:
+    executor = BoundedExecutor(kind="thread", name="test", max_workers=1, max_queue=1)
+    try:
+        result = asyncio.run(executor.run(str.upper, "abc"))
+    finally:
+        executor.shutdown()
+
+    assert result == "ABC"
+    stats = executor.stats()
+    assert stats["completed"] == 1
+    assert stats["in_flight"] == 0
+    assert stats["rejected"] == 0
+
+
+def test_full_queue_fails_fast_with_503() -> None:
+    executor = BoundedExecutor(kind="thread", name="test", max_workers=1, max_queue=1)
+    release = threading.Event()
+
+    async def scenario() -> None:
+        running = asyncio.ensure_future(executor.run(release.wait, 5))
+        queued = asyncio.ensure_future(executor.run(release.wait, 5))
+        await asyncio.sleep(0.05)
+
+        assert executor.stats()["queue_depth"] == 1
+        with pytest.raises(ServiceUnavailableError) as exc_info:
+            await executor.run(release.wait, 5)
+        assert exc_info.value.status_code == 503
+
+        release.set()
+        await asyncio.gather(running, queued)
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        executor.shutdown()
+
+    stats = executor.stats()
+    assert stats["rejected"] == 1
+    assert stats["completed"] == 2
+    assert stats["wait_ms_max"] > 0
+
+
+def test_cancelled_caller_holds_its_slot_until_the_job_finishes() -> None:
+    executor = BoundedExecutor(kind="thread", name="test", max_workers=1, max_queue=0)
+    release = threading.Event()
+
+    async def scenario() -> None:
+        caller = asyncio.ensure_future(executor.run(release.wait, 5))
+        await asyncio.sleep(0.05)
+        caller.cancel()
+        await asyncio.sleep(0.01)
+
+        # The job still occupies the only worker, so admission keeps rejecting
+        assert executor.stats()["in_flight"] == 1
+        with pytest.raises(ServiceUnavailableError):
+            await executor.run(release.wait, 5)
+
+        release.set()
+        for _ in range(100):
+            if executor.stats()["in_flight"] == 0:
+                break
+            await asyncio.sleep(0.01)
+        assert executor.stats()["in_flight"] == 0
+        assert await executor.run(str.upper, "ok") == "OK"
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        executor.shutdown()
+
+
+class _SlowHandoffExecutor(ThreadPoolExecutor):
+    """Takes a while to accept a job, like a process pool starting its workers."""
+
+    def submit(self, fn, /, *args, **kwargs):
+        time.sleep(0.05)
+        return super().submit(fn, *args, **kwargs)
+
+
+def test_wait_time_includes_the_handoff_to_the_pool() -> None:
+    executor = BoundedExecutor(kind="thread", name="test", max_workers=1, max_queue=0)
+    executor._executor = _SlowHandoffExecutor(max_workers=1)
+    try:
+        assert asyncio.run(executor.run(str.upper, "abc")) == "ABC"
+    finally:
+        executor.shutdown()
+    assert executor.stats()["wait_ms_max"] >= 45
@@ -0,0 +1,99 @@
+"""Unit tests for streamed CSV parsing and batched bulk user import."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import AsyncIterator
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.core.errors.exceptions import BadRequestError
+from app.features.provisioning import service
+from app.shared.utils.streams import iter_record_blocks
+
+
+async def _chunks(data: bytes, size: int) -> AsyncIterator[bytes]:
+    for i in range(0, len(data), size):
+        yield data[i : i + size]
+
+
+async def _collect(aiter) -> list:
+    return [item async for item in aiter]
+
+
+def test_record_blocks_end_on_line_boundaries_and_respect_quotes() -> None:
+    data = b'a,b\n1,"multi\nline"\n2,x\n3,y'
+    blocks = asyncio.run(_collect(iter_record_blocks(_chunks(data, 3), block_bytes=8)))
+    assert b"".join(blocks) == data + b"\n"
+    for block in blocks:
+        assert block.endswith(b"\n")
+        assert block.count(b'"') % 2 == 0
+
+
+def test_record_blocks_reject_a_record_over_the_cap() -> None:
+    data = b'email,password\n"unterminated,pw\n' + b"x@acme.com,pw\n" * 5000
+    blocks = iter_record_blocks(_chunks(data, 100), block_bytes=1024)
+    with pytest.raises(BadRequestError, match="byte 15 .*unterminated quoted field"):
+        asyncio.run(_collect(blocks))
+
+    long_line = b"a" * 5000 + b"\n"
+    with pytest.raises(BadRequestError, match="longer than 4096 bytes"):
+        asyncio.run(_collect(iter_record_blocks(_chunks(long_line, 100), block_bytes=1024)))
+
+
+def test_iter_user_rows_maps_header_columns() -> None:
+    data = b'\xef\xbb\xbfName,Email,Password\n"Doe, J",j@acme.com,pw1\nX,k@acme.com,pw2\n'
+    rows = asyncio.run(_collect(service.iter_user_rows(_chunks(data, 5))))
+    assert rows == [(1, "j@acme.com", "pw1"), (2, "k@acme.com", "pw2")]
+
+
+def test_iter_user_rows_requires_columns() -> None:
+    with pytest.raises(BadRequestError):
+        asyncio.run(_collect(service.iter_user_rows(_chunks(b"email\nx@y.z\n", 64))))
+
+
+def test_iter_user_rows_rejects_invalid_utf8() -> None:
+    data = b"email,password\na@acme.com,pw\nb@acme.com,p\xffw\n"
+    with pytest.raises(BadRequestError, match="row 2 is not valid UTF-8 \\(byte 41\\)"):
+        asyncio.run(_collect(service.iter_user_rows(_chunks(data, 5))))
+    with pytest.raises(BadRequestError, match="header is not valid UTF-8 \\(byte 2\\)"):
+        asyncio.run(_collect(service.iter_user_rows(_chunks(b"em\xffail,password\n", 5))))
+
+
+def test_import_users_batches_skips_existing_and_reports_invalid() -> None:
+    lines = ["email,password"] + [f"User{i}@Acme.com,pw{i}" for i in range(5)] + ["nope,pw", "z@acme.com,"]
+    data = ("\n".join(lines) + "\n").encode()
+    session = MagicMock()
+    session.commit = AsyncMock()
+    inserted_rows: list[list[tuple[str, str]]] = []
+
+    async def fake_insert(session, *, tenant_id, rows):
+        inserted_rows.append(rows)
+        return len(rows)
+
+    async def fake_hash(passwords):
+        return [f"hash:{p}" for p in passwords]
+
+    async def fake_existing(session, tenant_id, emails):
+        return {"user0@acme.com"} & set(emails)
+
+    with (
+        patch.object(service, "get_existing_emails", side_effect=fake_existing),
+        patch.object(service, "bulk_insert_users", side_effect=fake_insert),
+        patch.object(service, "_hash_batch", side_effect=fake_hash),
+    ):
+        report = asyncio.run(
+            service.import_users(
+                session, tenant_id="00000000-0000-0000-0000-000000000001",
+                chunks=_chunks(data, 16), batch_size=2,
+            )
+        )
+
+    assert report.processed == 7
+    assert report.invalid == 2
+    assert report.errors == ["row 6: invalid email", "row 7: empty password"]
+    assert report.inserted == 4
+    assert report.skipped_existing == 1
+    assert session.commit.await_count == 3
+    assert all(h.startswith("hash:") for rows in inserted_rows for _, h in rows)
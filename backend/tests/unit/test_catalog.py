@@ -0,0 +1,125 @@
+"""Unit tests for the in-memory catalog search index."""
+
+from __future__ import annotations
+
+import datetime as dt
+import random
+import uuid
+
+from fastapi.testclient import TestClient
+
+from app.features.catalog.index import CatalogIndex, DatasetDoc, trigrams
+from app.main import app
+
+client = TestClient(app)
+STAMP = dt.datetime(2024, 1, 1, tzinfo=dt.timezone.utc)
+
+
+def _doc(name: str, columns: list[str], description: str | None = None, **kwargs) -> DatasetDoc:
+    return DatasetDoc(
+        id=kwargs.get("id") or uuid.uuid4(),
+        name=name,
+        description=description,
+        columns=[{"name": c, "type": "int64"} for c in columns],
+        stamp=kwargs.get("stamp") or STAMP,
+    )
+
+
+def _similarity(a: str, b: str) -> float:
+    x, y = trigrams(a), trigrams(b)
+    return len(x & y) / len(x | y) if x | y else 0.0
+
+
+def test_exact_then_prefix_then_fuzzy_then_description() -> None:
+    index = CatalogIndex()
+    index.apply(
+        [
+            _doc("orders", ["order_id", "customer_id", "amount"], "Webshop orders"),
+            _doc("customers", ["customer_id", "customer_name", "created_at"]),
+            _doc("web_sessions", ["session_id", "custmer"], "Clickstream by customer"),
+        ]
+    )
+
+    hits = index.search("customer_id")
+    assert [(h.entry.dataset_name, h.match) for h in hits[:2]] == [
+        ("customers", "exact"),
+        ("orders", "exact"),
+    ]
+
+    hits = index.search("cust")
+    assert {h.entry.name for h in hits if h.match == "prefix"} == {
+        "customers",
+        "customer_id",
+        "customer_name",
+        "custmer",
+    }
+    assert [h.match for h in hits] == sorted(
+        (h.match for h in hits), key=["exact", "prefix", "fuzzy", "description"].index
+    )
+
+    typo = index.search("custmer_nme", kind="column")
+    assert {h.entry.name for h in typo} >= {"customer_name", "custmer"}
+    assert {h.match for h in typo} == {"fuzzy"}
+    assert [(h.entry.name, h.match) for h in index.search("webshop")] == [
+        ("orders", "description")
+    ]
+    assert all(h.entry.kind == "dataset" for h in index.search("o", kind="dataset"))
+    assert index.search("zzz") == [] and index.search("  ") == []
+
+
+def test_fuzzy_matches_agree_with_trigram_similarity() -> None:
+    rng = random.Random(7)
+    words = ["order", "total", "amount", "region", "user", "price", "city", "zip", "status"]
+    names = {"_".join(rng.sample(words, rng.randint(1, 3))) for _ in range(300)}
+    index = CatalogIndex()
+    index.apply([_doc(f"t{i}", [n]) for i, n in enumerate(sorted(names))])
+
+    for query in ("ordr_totl", "amount region", "cityzip", "price_user_stat"):
+        hits = index.search(query, kind="column", limit=1000, threshold=0.3)
+        expected = {n for n in names if _similarity(query, n) >= 0.3}
+        assert {h.entry.name for h in hits} >= expected
+        for hit in hits:
+            if hit.match == "fuzzy":
+                assert hit.score == round(_similarity(query, hit.entry.name), 4)
+        fuzzy = [h.score for h in hits if h.match == "fuzzy"]
+        assert fuzzy == sorted(fuzzy, reverse=True)
+
+
+def test_apply_reindexes_changed_and_drops_removed_datasets() -> None:
+    index = CatalogIndex()
+    keep, change, drop = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    index.apply(
+        [
+            _doc("keep", ["alpha"], id=keep),
+            _doc("change", ["beta"], id=change),
+            _doc("drop", ["gamma", "alpha"], id=drop),
+        ]
+    )
+    later = STAMP + dt.timedelta(seconds=1)
+    index.apply([_doc("change", ["delta"], id=change, stamp=later)], removed=[drop])
+
+    assert index.stamps() == {keep: STAMP, change: later}
+    assert index.search("gamma") == [] and index.search("beta") == []
+    assert [h.entry.dataset_name for h in index.search("alpha")] == ["keep"]
+    assert [h.entry.dataset_name for h in index.search("delta")] == ["change"]
+
+
+def test_holes_are_compacted_without_losing_entries() -> None:
+    index = CatalogIndex()
+    ids = [uuid.uuid4() for _ in range(30)]
+    columns = [f"col_{i}" for i in range(100)]
+    index.apply([_doc(f"d{i}", columns, id=ids[i]) for i in range(30)])
+    for i in range(29):
+        index.apply([], removed=[ids[i]])
+
+    stats = index.stats()
+    assert stats == {"datasets": 1, "entries": 101, "terms": 101}
+    assert len(index._entries) < 30 * 101  # rebuilt at least once
+    best = index.search("col_42")[0]
+    assert (best.entry.dataset_name, best.match) == ("d29", "exact")
+    assert {h.entry.name for h in index.search("col_4", limit=100)} >= {"col_4", "col_42"}
+
+
+def test_catalog_search_requires_tenant_header() -> None:
+    response = client.get("/v1/catalog/search", params={"q": "x"})
+    assert response.status_code == 400
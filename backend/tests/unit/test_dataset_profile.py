@@ -0,0 +1,107 @@
+"""Unit tests for ingest-time column profiles."""
+
+from __future__ import annotations
+
+import random
+import statistics
+from pathlib import Path
+
+import pyarrow as pa
+import pytest
+
+from app.features.datasets.ingest import PartWriter
+from app.features.datasets.profile import (
+    TableProfiler,
+    merge_profiles,
+    profile_files,
+    summarize_profile,
+)
+
+
+@pytest.fixture
+def table() -> pa.Table:
+    rng = random.Random(7)
+    n = 40_000
+    cities = ["a"] * 6 + ["b"] * 3 + [f"z{k}" for k in range(300)]
+    return pa.table(
+        {
+            "x": [rng.gauss(100, 15) for _ in range(n)],
+            "i": [rng.randint(0, 9_999) if k % 10 else None for k in range(n)],
+            "city": [rng.choice(cities) for _ in range(n)],
+            "empty": pa.nulls(n),
+        }
+    )
+
+
+def _profile(table: pa.Table, block_rows: int = 5_000) -> dict:
+    profiler = TableProfiler(table.schema)
+    for offset in range(0, table.num_rows, block_rows):
+        profiler.update(table.slice(offset, block_rows))
+    return profiler.to_dict()
+
+
+def _by_name(profile: dict) -> dict[str, dict]:
+    return {c["name"]: c for c in summarize_profile(profile)}
+
+
+def test_statistics_match_the_data(table: pa.Table) -> None:
+    stats = _by_name(_profile(table))
+    xs = table.column("x").to_pylist()
+    ints = [v for v in table.column("i").to_pylist() if v is not None]
+
+    x = stats["x"]
+    assert x["count"] == table.num_rows and x["null_count"] == 0
+    assert x["min"] == min(xs) and x["max"] == max(xs)
+    assert x["mean"] == pytest.approx(statistics.fmean(xs))
+    assert x["stddev"] == pytest.approx(statistics.stdev(xs))
+    ordered = sorted(xs)
+    for key, q in (("p05", 0.05), ("p50", 0.5), ("p95", 0.95)):
+        assert x["quantiles"][key] == pytest.approx(ordered[int(q * (len(xs) - 1))], rel=0.03)
+
+    i = stats["i"]
+    assert i["null_count"] == table.num_rows // 10
+    assert i["null_fraction"] == pytest.approx(0.1)
+    assert i["distinct_estimate"] == pytest.approx(len(set(ints)), rel=0.05)
+    assert i["top_values"] == []  # nothing stands out from uniform data
+
+    city = stats["city"]
+    assert city["distinct_estimate"] == pytest.approx(302, rel=0.05)
+    assert [t["value"] for t in city["top_values"][:2]] == ["a", "b"]
+    true_a = table.column("city").to_pylist().count("a")
+    assert city["top_values"][0]["count"] <= true_a
+
+    empty = stats["empty"]
+    assert empty["null_fraction"] == 1.0
+    assert empty["distinct_estimate"] is None and empty["min"] is None
+
+
+def test_merged_profiles_match_a_single_pass(table: pa.Table) -> None:
+    half = table.num_rows // 2
+    merged = merge_profiles(_profile(table.slice(0, half)), _profile(table.slice(half)))
+    whole = _profile(table)
+    assert merged["rows"] == whole["rows"]
+
+    merged_stats, whole_stats = _by_name(merged), _by_name(whole)
+    for name in ("x", "i"):
+        a, b = merged_stats[name], whole_stats[name]
+        assert (a["count"], a["null_count"], a["min"], a["max"]) == (
+            b["count"], b["null_count"], b["min"], b["max"]
+        )
+        assert a["mean"] == pytest.approx(b["mean"])
+        assert a["stddev"] == pytest.approx(b["stddev"])
+        assert a["quantiles"] == b["quantiles"]
+        # HyperLogLog registers merge losslessly.
+        assert a["distinct_estimate"] == b["distinct_estimate"]
+
+
+def test_part_writer_profiles_while_writing(tmp_path: Path) -> None:
+    writer = PartWriter(tmp_path / "part.arrow", "csv")
+    writer.write_block(b"city,amount\na,1\nb,2\n")
+    writer.write_block(b"a,3\n")
+    info = writer.close()
+
+    stats = _by_name(info.profile)
+    assert info.profile["rows"] == 3
+    assert stats["amount"]["max"] == 3 and stats["amount"]["mean"] == pytest.approx(2)
+    assert stats["city"]["top_values"] == [{"value": "a", "count": 2}, {"value": "b", "count": 1}]
+    assert profile_files([str(tmp_path / "part.arrow")]) == info.profile
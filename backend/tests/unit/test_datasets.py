@@ -0,0 +1,117 @@
+"""Unit tests for streamed dataset ingestion into Arrow IPC part files."""
+
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+from typing import AsyncIterator
+
+import pyarrow as pa
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.errors.exceptions import BadRequestError, UnsupportedMediaTypeError
+from app.features.datasets.ingest import PartWriter, describe_schema, detect_format, ingest_stream
+from app.features.datasets.storage import read_schema
+from app.main import app
+
+client = TestClient(app)
+
+
+async def _chunks(data: bytes, size: int) -> AsyncIterator[bytes]:
+    for i in range(0, len(data), size):
+        yield data[i : i + size]
+
+
+def _read(path: Path) -> pa.Table:
+    with pa.memory_map(str(path)) as source:
+        return pa.ipc.open_file(source).read_all()
+
+
+def test_csv_upload_is_converted_block_by_block(tmp_path: Path) -> None:
+    rows = b"".join(b'%d,"name, %d",%d.5,\n' % (i, i, i) for i in range(500))
+    data = b"\xef\xbb\xbfid,name,score,note\n" + rows
+    writer = PartWriter(tmp_path / "part.arrow", "csv")
+
+    info = asyncio.run(ingest_stream(_chunks(data, 97), writer, block_bytes=1024))
+
+    assert writer.blocks > 1
+    assert info.rows == 500
+    table = _read(tmp_path / "part.arrow")
+    assert table.num_rows == 500
+    assert table.slice(1, 1).to_pylist() == [{"id": 1, "name": "name, 1", "score": 1.5, "note": None}]
+    # All-null column in the first block is widened to string.
+    assert describe_schema(read_schema(tmp_path / "part.arrow")) == [
+        {"name": "id", "type": "int64", "nullable": True},
+        {"name": "name", "type": "string", "nullable": True},
+        {"name": "score", "type": "double", "nullable": True},
+        {"name": "note", "type": "string", "nullable": True},
+    ]
+
+
+def test_append_is_parsed_against_existing_schema(tmp_path: Path) -> None:
+    schema = pa.schema([("id", pa.int64()), ("label", pa.string())])
+    info = asyncio.run(
+        ingest_stream(_chunks(b"id,label\n7,x\n", 4), PartWriter(tmp_path / "a.arrow", "csv", schema))
+    )
+    assert info.rows == 1 and info.schema == schema
+
+    bad = PartWriter(tmp_path / "b.arrow", "csv", schema)
+    with pytest.raises(BadRequestError):
+        asyncio.run(ingest_stream(_chunks(b"id,label\nseven,x\n", 64), bad))
+    assert not (tmp_path / "b.arrow").exists()
+
+    renamed = PartWriter(tmp_path / "c.arrow", "csv", schema)
+    with pytest.raises(BadRequestError, match="Columns do not match"):
+        asyncio.run(ingest_stream(_chunks(b"label,id\nx,7\n", 64), renamed))
+
+
+def test_ndjson_upload_and_unexpected_fields(tmp_path: Path) -> None:
+    data = b"".join(b'{"a": %d, "tags": {"k": "v"}}\n' % i for i in range(100))
+    writer = PartWriter(tmp_path / "n.arrow", "ndjson")
+    info = asyncio.run(ingest_stream(_chunks(data, 50), writer, block_bytes=512))
+    assert info.rows == 100
+    assert _read(tmp_path / "n.arrow").column("a").to_pylist() == list(range(100))
+
+    extra = PartWriter(tmp_path / "m.arrow", "ndjson", info.schema)
+    with pytest.raises(BadRequestError):
+        asyncio.run(ingest_stream(_chunks(b'{"a": 1, "zz": 2}\n', 64), extra))
+
+
+def test_empty_upload_is_rejected(tmp_path: Path) -> None:
+    with pytest.raises(BadRequestError, match="empty"):
+        asyncio.run(ingest_stream(_chunks(b"", 1), PartWriter(tmp_path / "e.arrow", "csv")))
+    assert not (tmp_path / "e.arrow").exists()
+
+
+def test_unterminated_quoted_field_is_rejected(tmp_path: Path) -> None:
+    data = b'id,name\n1,"open\n' + b"2,fine\n" * 2000
+    writer = PartWriter(tmp_path / "q.arrow", "csv")
+    with pytest.raises(BadRequestError, match="unterminated quoted field") as raised:
+        asyncio.run(ingest_stream(_chunks(data, 64), writer, block_bytes=1024))
+    assert raised.value.status_code == 400
+    assert not (tmp_path / "q.arrow").exists()
+
+    # Under the size cap the stream still ends inside the quote
+    short = PartWriter(tmp_path / "s.arrow", "csv")
+    with pytest.raises(BadRequestError, match="Unterminated quoted field .* byte 8"):
+        asyncio.run(ingest_stream(_chunks(b'id,name\n1,"open\n2,x\n', 4), short))
+    assert not (tmp_path / "s.arrow").exists()
+
+
+def test_detect_format() -> None:
+    assert detect_format("text/csv; charset=utf-8") == "csv"
+    assert detect_format("application/x-ndjson") == "ndjson"
+    with pytest.raises(UnsupportedMediaTypeError):
+        detect_format("application/octet-stream")
+
+
+def test_dataset_routes_require_tenant_header() -> None:
+    assert client.get("/v1/datasets").status_code == 400
+    response = client.post(
+        "/v1/datasets/00000000-0000-0000-0000-000000000001/data",
+        content=b"a\n1\n",
+        headers={"Content-Type": "text/csv"},
+    )
+    assert response.status_code == 400
+    assert response.json() == {"detail": "X-Tenant-ID header required"}
@@ -0,0 +1,39 @@
+"""Unit tests for connection pool configuration and the /internal/db-pool endpoint."""
+
+from __future__ import annotations
+
+from fastapi.testclient import TestClient
+
+from app.core.config.settings import settings
+from app.db.pool_metrics import InstrumentedAsyncPool, PoolMetrics
+from app.db.session import engine
+from app.main import app
+
+client = TestClient(app)
+
+
+def test_engine_uses_configured_pool() -> None:
+    pool = engine.sync_engine.pool
+    assert isinstance(pool, InstrumentedAsyncPool)
+    assert pool.size() == settings.DB_POOL_SIZE
+    assert pool._max_overflow == settings.DB_MAX_OVERFLOW
+    assert pool._timeout == settings.DB_POOL_TIMEOUT
+
+
+def test_db_pool_endpoint_reports_gauges_and_counters() -> None:
+    response = client.get("/internal/db-pool")
+    assert response.status_code == 200
+    data = response.json()
+    for key in ("size", "checked_out", "overflow", "waits", "checkout_ms_avg", "timeouts"):
+        assert key in data
+
+
+def test_pool_metrics_checkout_latency() -> None:
+    metrics = PoolMetrics()
+    metrics.checkouts = 2
+    metrics.record_checkout(0.010, waited=False)
+    metrics.record_checkout(0.030, waited=True)
+    snapshot = metrics.snapshot()
+    assert snapshot["waits"] == 1
+    assert snapshot["checkout_ms_avg"] == 20.0
+    assert snapshot["checkout_ms_max"] == 30.0
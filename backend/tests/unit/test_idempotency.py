@@ -0,0 +1,242 @@
+"""Unit tests for Idempotency-Key handling (middleware and stores)."""
+
+from __future__ import annotations
+
+import asyncio
+from unittest.mock import patch
+
+import httpx
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+
+from app.core.cache.idempotency_store import (
+    _COMPLETE_SCRIPT,
+    IN_PROGRESS,
+    IdempotencyRecord,
+    MemoryIdempotencyStore,
+    RedisIdempotencyStore,
+)
+from app.core.config.settings import settings
+from app.core.middleware.idempotency import IdempotencyMiddleware
+
+
+class FakeRedis:
+    """Dict-backed stand-in for the redis.asyncio calls used by RedisIdempotencyStore."""
+
+    def __init__(self) -> None:
+        self.data: dict[str, bytes] = {}
+
+    async def get(self, key: str) -> bytes | None:
+        return self.data.get(key)
+
+    async def set(self, key: str, value: bytes, nx: bool = False, ex: int | None = None) -> bool:
+        if nx and key in self.data:
+            return False
+        self.data[key] = value
+        return True
+
+    async def eval(self, script: str, numkeys: int, key: str, marker: bytes, *args: object) -> None:
+        if self.data.get(key) != marker:
+            return
+        if script == _COMPLETE_SCRIPT:
+            self.data[key] = args[0]  # type: ignore[assignment]
+        else:
+            del self.data[key]
+
+
+def _app(store: MemoryIdempotencyStore | RedisIdempotencyStore | None = None):
+    app = FastAPI()
+    app.add_middleware(
+        IdempotencyMiddleware, store=store or MemoryIdempotencyStore(ttl_seconds=60, max_entries=8)
+    )
+    calls: list[dict] = []
+    gate = {"event": None, "status": 201}
+
+    @app.post("/orders")
+    async def create_order(request: Request) -> JSONResponse:
+        payload = await request.json()
+        calls.append(payload)
+        if gate["event"] is not None:
+            await gate["event"].wait()
+        return JSONResponse({"order": len(calls), **payload}, status_code=gate["status"])
+
+    return app, calls, gate
+
+
+def test_retry_replays_stored_response_without_running_handler() -> None:
+    app, calls, _ = _app()
+    client = TestClient(app)
+    headers = {"Idempotency-Key": "k1", "X-Tenant-ID": "t_acme"}
+
+    first = client.post("/orders", json={"sku": "a"}, headers=headers)
+    second = client.post("/orders", json={"sku": "a"}, headers=headers)
+    assert first.status_code == second.status_code == 201
+    assert first.json() == second.json() == {"order": 1, "sku": "a"}
+    assert second.headers["Idempotent-Replayed"] == "true"
+    assert "Idempotent-Replayed" not in first.headers
+    assert len(calls) == 1
+
+    # Keys are scoped per tenant; requests without a key are never deduplicated
+    other_tenant = client.post(
+        "/orders", json={"sku": "a"}, headers={"Idempotency-Key": "k1", "X-Tenant-ID": "t_b"}
+    )
+    assert other_tenant.json()["order"] == 2
+    client.post("/orders", json={"sku": "a"})
+    client.post("/orders", json={"sku": "a"})
+    assert len(calls) == 4
+
+
+def test_key_reused_for_a_different_request_is_rejected() -> None:
+    app, calls, _ = _app()
+    client = TestClient(app)
+    client.post("/orders", json={"sku": "a"}, headers={"Idempotency-Key": "k1"})
+
+    response = client.post("/orders", json={"sku": "b"}, headers={"Idempotency-Key": "k1"})
+    assert response.status_code == 422
+    assert "different request" in response.json()["detail"]
+
+    too_long = client.post("/orders", json={"sku": "a"}, headers={"Idempotency-Key": "k" * 256})
+    assert too_long.status_code == 400
+    assert len(calls) == 1
+
+
+def test_server_errors_are_not_stored() -> None:
+    app, calls, gate = _app()
+    client = TestClient(app)
+    gate["status"] = 503
+    assert client.post("/orders", json={}, headers={"Idempotency-Key": "k"}).status_code == 503
+
+    gate["status"] = 201
+    retry = client.post("/orders", json={}, headers={"Idempotency-Key": "k"})
+    assert retry.status_code == 201 and "Idempotent-Replayed" not in retry.headers
+    assert len(calls) == 2
+
+
+def test_concurrent_duplicates_wait_for_the_first_response() -> None:
+    app, calls, gate = _app()
+
+    async def scenario() -> tuple[list[httpx.Response], httpx.Response]:
+        gate["event"] = asyncio.Event()
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            def post(key: str) -> asyncio.Task[httpx.Response]:
+                return asyncio.create_task(
+                    client.post("/orders", json={"sku": "a"}, headers={"Idempotency-Key": key})
+                )
+
+            with patch.object(settings, "IDEMPOTENCY_WAIT_SECONDS", 0.05):
+                slow = post("slow")
+                await asyncio.sleep(0.01)
+                conflict = await post("slow")
+
+            with patch.object(settings, "IDEMPOTENCY_WAIT_SECONDS", 5):
+                tasks = [post("k") for _ in range(5)]
+                await asyncio.sleep(0.05)
+                gate["event"].set()
+                responses = await asyncio.gather(*tasks)
+            await slow
+        return responses, conflict
+
+    responses, conflict = asyncio.run(scenario())
+    assert conflict.status_code == 409
+    assert [r.json() for r in responses] == [responses[0].json()] * 5
+    assert sum(r.headers.get("Idempotent-Replayed") == "true" for r in responses) == 4
+    assert len(calls) == 2  # "slow" and one "k"
+
+
+def test_response_is_stored_only_once_the_whole_body_was_hashed() -> None:
+    app, calls, _ = _app()
+    ran: list[int] = []
+
+    @app.post("/orders/{order}/ping")
+    async def ping(order: int) -> dict[str, int]:  # never reads the body
+        ran.append(order)
+        return {"order": order}
+
+    @app.post("/v1/datasets")
+    async def upload(request: Request) -> dict[str, int]:
+        ran.append(len(await request.body()))
+        return {"size": ran[-1]}
+
+    client = TestClient(app)
+    headers = {"Idempotency-Key": "k"}
+    for _ in range(2):
+        assert client.post("/orders/1/ping", content=b"ignored", headers=headers).status_code == 200
+        client.post("/v1/datasets", content=b"rows", headers=headers)
+    assert ran == [1, 4, 1, 4]  # body left unread / streamed upload: not deduplicated
+
+    first = client.post("/orders/2/ping", headers=headers)
+    assert "Idempotent-Replayed" not in first.headers
+    assert client.post("/orders/2/ping", headers=headers).headers["Idempotent-Replayed"] == "true"
+    assert ran == [1, 4, 1, 4, 2]
+
+
+def test_client_leaving_mid_body_stores_nothing() -> None:
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "path": "/orders",
+        "query_string": b"",
+        "headers": [(b"idempotency-key", b"k"), (b"content-length", b"10")],
+    }
+    statuses: list[int] = []
+
+    async def app(scope: dict, receive, send) -> None:
+        while (await receive()).get("more_body"):
+            pass
+        await send({"type": "http.response.start", "status": 201, "headers": []})
+        await send({"type": "http.response.body", "body": b"{}"})
+
+    async def send(message: dict) -> None:
+        if message["type"] == "http.response.start":
+            statuses.append(message["status"])
+
+    def receiving(*messages: dict):
+        pending = list(messages)
+
+        async def receive() -> dict:
+            return pending.pop(0)
+
+        return receive
+
+    async def scenario() -> None:
+        middleware = IdempotencyMiddleware(
+            app, store=MemoryIdempotencyStore(ttl_seconds=60, max_entries=8)
+        )
+        partial = {"type": "http.request", "body": b"12345", "more_body": True}
+        rest = {"type": "http.request", "body": b"67890", "more_body": False}
+        await middleware(scope, receiving(partial, {"type": "http.disconnect"}), send)
+        await middleware(scope, receiving(partial, rest), send)  # runs again: nothing stored
+        await middleware(scope, receiving(partial, {"type": "http.disconnect"}), send)
+
+    asyncio.run(scenario())
+    assert statuses == [201, 201]  # the last duplicate left before its body could be checked
+
+
+def test_redis_store_claims_completes_and_releases() -> None:
+    redis = FakeRedis()
+    owner = RedisIdempotencyStore(redis, ttl_seconds=60, lock_seconds=10)
+    other = RedisIdempotencyStore(redis, ttl_seconds=60, lock_seconds=10)
+    record = IdempotencyRecord("h", 201, ((b"content-type", b"application/json"),), b"{}")
+
+    async def scenario() -> None:
+        assert await owner.claim("k") is None
+        assert await other.claim("k") is IN_PROGRESS
+        await other.release("k")  # not the owner: no effect
+        assert await other.claim("k") is IN_PROGRESS
+
+        await owner.complete("k", record)
+        await other.wait("k", 1)
+        assert await other.claim("k") == record
+
+        assert await owner.claim("gone") is None
+        await owner.release("gone")
+        assert await other.claim("gone") is None
+
+    asyncio.run(scenario())
+    app, calls, _ = _app(RedisIdempotencyStore(redis, ttl_seconds=60, lock_seconds=10))
+    client = TestClient(app)
+    for _ in range(2):
+        client.post("/orders", json={"sku": "a"}, headers={"Idempotency-Key": "r"})
+    assert len(calls) == 1
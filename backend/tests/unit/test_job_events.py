@@ -0,0 +1,167 @@
+"""Unit tests for job event fan-out and the Server-Sent Events stream."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import uuid
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config.settings import settings
+from app.core.errors.exceptions import ServiceUnavailableError
+from app.features.jobs import events
+from app.features.jobs.events import JobEvent, JobEventHub
+from app.main import app
+
+client = TestClient(app)
+
+TENANT = uuid.UUID("00000000-0000-0000-0000-00000000000a")
+JOB = uuid.UUID("00000000-0000-0000-0000-00000000000c")
+
+
+def _event(status: str = "running", progress: float = 0.5, **kwargs) -> JobEvent:
+    return JobEvent(
+        id=kwargs.get("id", JOB),
+        tenant_id=TENANT,
+        status=status,
+        progress=progress,
+        progress_message=kwargs.get("message"),
+        cancel_requested=kwargs.get("cancel_requested", False),
+    )
+
+
+def _job(status: str, progress: float = 0.0) -> SimpleNamespace:
+    return SimpleNamespace(
+        id=JOB,
+        tenant_id=TENANT,
+        kind="query",
+        status=status,
+        progress=progress,
+        progress_message=None,
+        error=None,
+        result=None,
+        cancel_requested=False,
+        attempts=1,
+        request_id=None,
+        created_at="2024-01-01T00:00:00Z",
+        started_at=None,
+        finished_at=None,
+    )
+
+
+def _hub() -> JobEventHub:
+    hub = JobEventHub()
+    hub._ensure_source = lambda: None  # no database in unit tests
+    return hub
+
+
+def test_payload_roundtrip_and_fan_out_by_job() -> None:
+    payload = json.dumps(
+        {
+            "id": str(JOB),
+            "tenant_id": str(TENANT),
+            "status": "running",
+            "progress": 0.25,
+            "progress_message": "scanning",
+            "cancel_requested": False,
+        }
+    )
+    assert JobEvent.from_payload(payload) == _event(progress=0.25, message="scanning")
+
+    async def scenario() -> None:
+        hub = _hub()
+        first, second = hub.subscribe(JOB), hub.subscribe(JOB)
+        other = hub.subscribe(uuid.uuid4())
+        hub._on_notify(None, 0, "job_events", payload)
+        hub._on_notify(None, 0, "job_events", "not json")
+        assert await first.next_events(0.1) == [_event(progress=0.25, message="scanning")]
+        assert len(await second.next_events(0.1)) == 1
+        assert await other.next_events(0.01) == []
+
+        hub.resync()
+        assert await other.next_events(0.1) == [None]
+        for subscription in (first, second, other):
+            subscription.close()
+        assert hub.stats()["watched_jobs"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_overflowing_backlog_collapses_to_resync() -> None:
+    async def scenario() -> None:
+        hub = _hub()
+        subscription = hub.subscribe(JOB)
+        for i in range(events._MAX_PENDING + 5):
+            hub.publish(_event(progress=i / 100))
+        pending = await subscription.next_events(0.1)
+        assert pending[0] is None and len(pending) == 5
+        subscription.close()
+
+    asyncio.run(scenario())
+
+
+def test_stream_sends_progress_then_rereads_on_status_change() -> None:
+    hub = _hub()
+
+    async def scenario() -> list[str]:
+        hub.acquire_stream()
+        subscription = hub.subscribe(JOB)
+        body = events._job_event_body(subscription, _job("running", 0.1))
+        chunks = [await body.__anext__(), await body.__anext__()]
+        hub.publish(_event(progress=0.5, message="half"))
+        chunks.append(await body.__anext__())
+        hub.publish(_event(status="succeeded", progress=1.0))
+
+        async def read_job(tenant_id, job_id):
+            return _job("succeeded", 1.0)
+
+        with patch.object(events, "_read_job", read_job):
+            chunks += [chunk async for chunk in body]
+        assert hub.stats()["watched_jobs"] == hub.stats()["streams"] == 0
+        return [c.decode() for c in chunks]
+
+    with patch.object(events, "job_events", hub):
+        chunks = asyncio.run(scenario())
+
+    assert chunks[0].startswith("retry: ")
+    assert chunks[1].startswith("event: status\n")
+    assert json.loads(chunks[1].split("data: ")[1])["status"] == "running"
+    assert chunks[2] == (
+        'event: progress\ndata: {"id":"%s","progress":0.5,"progress_message":"half"}\n\n' % JOB
+    )
+    assert json.loads(chunks[3].split("data: ")[1])["status"] == "succeeded"
+    assert len(chunks) == 4
+
+
+def test_stream_limit_and_keepalive() -> None:
+    hub = _hub()
+    with patch.object(settings, "JOB_EVENTS_MAX_STREAMS", 1):
+        hub.acquire_stream()
+        with pytest.raises(ServiceUnavailableError):
+            hub.acquire_stream()
+        hub.release_stream()
+        hub.acquire_stream()
+
+    async def scenario() -> bytes:
+        subscription = hub.subscribe(JOB)
+        body = events._job_event_body(subscription, _job("queued"))
+        await body.__anext__()
+        await body.__anext__()
+        chunk = await body.__anext__()
+        await body.aclose()
+        return chunk
+
+    with patch.object(events, "job_events", hub), patch.object(
+        settings, "JOB_EVENTS_KEEPALIVE_SECONDS", 0.01
+    ):
+        assert asyncio.run(scenario()) == b": keepalive\n\n"
+    assert hub.stats()["streams"] == 0
+
+
+def test_job_events_requires_tenant_header() -> None:
+    response = client.get(f"/v1/jobs/{JOB}/events")
+    assert response.status_code == 400
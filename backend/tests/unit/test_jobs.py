@@ -0,0 +1,312 @@
+"""Unit tests for background job handlers and result paging."""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import os
+import queue
+import time
+import uuid
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timezone
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pyarrow as pa
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import delete, select, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.core.config.settings import settings
+from app.core.errors.exceptions import BadRequestError
+from app.core.logging.setup import RequestIdFilter
+from app.db.models.job import Job
+from app.db.models.tenant import Tenant
+from app.db.repos import job_repo
+from app.features.jobs import worker as worker_module
+from app.features.datasets import storage
+from app.features.jobs.handlers import JobCancelled, execute_job
+from app.features.jobs.results import read_result_page
+from app.features.jobs.worker import JobWorker
+from app.main import app
+
+client = TestClient(app)
+
+TENANT = uuid.UUID("00000000-0000-0000-0000-00000000000a")
+DATASET = uuid.UUID("00000000-0000-0000-0000-00000000000b")
+
+
+@pytest.fixture
+def datasets_dir(tmp_path: Path):
+    with patch.object(settings, "DATASETS_DIR", str(tmp_path / "datasets")):
+        path = storage.part_path(TENANT, DATASET, 1)
+        path.parent.mkdir(parents=True)
+        table = pa.table({"city": ["a", "b", "a", "c"], "amount": [1, 2, 3, 4]})
+        with pa.OSFile(str(path), "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        yield tmp_path
+
+
+def _run(sql: str, result: Path, cancel_flags: dict | None = None, request_id: str = "req-1"):
+    progress: queue.Queue = queue.Queue()
+    payload = {"sql": sql, "params": [], "sources": [{"id": str(DATASET), "name": "sales", "version": 1}]}
+    outcome = execute_job(
+        "query", "job-1", str(TENANT), payload, str(result), request_id, progress, cancel_flags or {}
+    )
+    updates = []
+    while not progress.empty():
+        updates.append(progress.get())
+    return outcome, updates
+
+
+def test_query_job_writes_full_result_and_reports_progress(datasets_dir: Path) -> None:
+    result = datasets_dir / "job.arrow"
+    outcome, updates = _run("SELECT city, sum(amount) AS total FROM sales GROUP BY city ORDER BY city", result)
+
+    assert outcome["row_count"] == 3
+    assert [c["name"] for c in outcome["columns"]] == ["city", "total"]
+    assert updates[0] == ("job-1", 0.05, "Running query")
+    assert updates[-1] == ("job-1", 1.0, "Done (3 rows)")
+    # The total is unknown while writing, so row counts leave the progress as it was.
+    assert ("job-1", None, "Writing results (3 rows)") in updates
+
+    first = read_result_page(result, 0, 2)
+    assert first.rows == [["a", 4], ["b", 2]] and first.has_more is True
+    rest = read_result_page(result, 2, 2)
+    assert rest.rows == [["c", 4]] and rest.has_more is False
+
+
+def test_query_job_rejects_non_select(datasets_dir: Path) -> None:
+    with pytest.raises(BadRequestError):
+        _run("DELETE FROM sales", datasets_dir / "job.arrow")
+
+
+def test_query_job_stops_when_cancelled(datasets_dir: Path) -> None:
+    with pytest.raises(JobCancelled):
+        _run(
+            "SELECT sum(i * i) FROM range(100000000000) t(i)",
+            datasets_dir / "job.arrow",
+            cancel_flags={"job-1": True},
+        )
+
+
+def test_worker_sweeps_expired_results_at_most_once_per_interval(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "JOB_RESULTS_DIR", str(tmp_path))
+    old = tmp_path / str(TENANT) / "old.arrow"
+    fresh = tmp_path / str(TENANT) / "fresh.arrow"
+    old.parent.mkdir()
+    old.write_bytes(b"x")
+    fresh.write_bytes(b"x")
+    week_ago = time.time() - 7 * 86400
+    os.utime(old, (week_ago, week_ago))
+    worker = JobWorker(
+        processes=1, poll_interval=0.1, stale_seconds=60, max_attempts=3, result_ttl_seconds=86400
+    )
+
+    asyncio.run(worker._sweep_results())
+    assert not old.exists() and fresh.exists()
+
+    os.utime(fresh, (week_ago, week_ago))
+    asyncio.run(worker._sweep_results())  # within RESULT_SWEEP_INTERVAL: skipped
+    assert fresh.exists()
+
+
+def test_job_routes_require_tenant_header() -> None:
+    assert client.post("/v1/jobs", json={"sql": "SELECT 1"}).status_code == 400
+    assert client.get(f"/v1/jobs/{uuid.uuid4()}").status_code == 400
+
+
+class _DyingPool:
+    """Pool whose submitted jobs all fail with BrokenProcessPool once die() is called."""
+
+    def __init__(self) -> None:
+        self.futures: list[Future] = []
+        self.shutdowns = 0
+
+    def submit(self, fn, *args) -> Future:
+        future: Future = Future()
+        self.futures.append(future)
+        return future
+
+    def die(self) -> None:
+        for future in self.futures:
+            future.set_exception(BrokenProcessPool("A child process terminated abruptly"))
+
+    def shutdown(self, wait: bool = True, cancel_futures: bool = False) -> None:
+        self.shutdowns += 1
+
+
+def test_broken_pool_is_replaced_once_and_job_logs_carry_request_id(
+    tmp_path: Path, caplog: pytest.LogCaptureFixture
+) -> None:
+    worker = JobWorker(processes=3, poll_interval=0.1, stale_seconds=60, max_attempts=3)
+    broken, replacements = _DyingPool(), []
+    worker._pool = broken
+    worker._new_pool = lambda: replacements.append(MagicMock()) or replacements[-1]
+    worker._cancel_flags = {}
+    jobs = [
+        SimpleNamespace(
+            id=uuid.uuid4(), tenant_id=TENANT, kind="query", payload={}, attempts=1,
+            request_id=f"req-{i}",
+        )
+        for i in range(3)
+    ]
+
+    @contextlib.asynccontextmanager
+    async def fake_session():
+        yield MagicMock(commit=AsyncMock())
+
+    async def scenario() -> None:
+        tasks = [asyncio.create_task(worker._run_job(job)) for job in jobs]
+        while len(broken.futures) < len(jobs):
+            await asyncio.sleep(0.01)
+        broken.die()
+        await asyncio.gather(*tasks)
+
+    caplog.handler.addFilter(RequestIdFilter())
+    with (
+        caplog.at_level(logging.INFO, logger="app.features.jobs.worker"),
+        patch.object(worker_module, "AsyncSessionLocal", fake_session),
+        patch.object(worker_module, "result_path", lambda t, j: tmp_path / f"{j}.arrow"),
+        patch.object(worker_module.job_repo, "finish_job", AsyncMock()) as finish,
+    ):
+        asyncio.run(scenario())
+
+    assert len(replacements) == 1 and worker._pool is replacements[0]
+    assert broken.shutdowns == 1
+    assert {c.kwargs["error"] for c in finish.await_args_list} == {
+        "Job process terminated unexpectedly"
+    }
+    for job in jobs:
+        lines = [r for r in caplog.records if str(job.id) in r.getMessage()]
+        assert len(lines) >= 3  # claimed, process died, finished
+        assert {r.request_id for r in lines} == {job.request_id}
+
+
+def _database_reachable() -> bool:
+    async def ping() -> None:
+        probe = create_async_engine(settings.DATABASE_URL)
+        try:
+            async with probe.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+        finally:
+            await probe.dispose()
+
+    try:
+        asyncio.run(asyncio.wait_for(ping(), 3))
+    except Exception:
+        return False
+    return True
+
+
+needs_database = pytest.mark.skipif(not _database_reachable(), reason="needs a migrated database")
+# Older than any real row, so claims in these tests only ever see their own jobs
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+async def _with_tenant(test) -> None:
+    engine = create_async_engine(settings.DATABASE_URL, poolclass=NullPool)
+    tenant_id = uuid.uuid4()
+    try:
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            session.add(Tenant(id=tenant_id, slug=f"t_jobs_{tenant_id.hex[:12]}", name="jobs"))
+            await session.commit()
+        await test(engine, tenant_id)
+    finally:
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            await session.execute(delete(Tenant).where(Tenant.id == tenant_id))
+            await session.commit()
+        await engine.dispose()
+
+
+async def _add_jobs(engine, tenant_id: uuid.UUID, *rows: dict) -> list[uuid.UUID]:
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        jobs = [
+            Job(tenant_id=tenant_id, kind="query", payload={}, attempts=0, **row) for row in rows
+        ]
+        session.add_all(jobs)
+        await session.commit()
+        return [job.id for job in jobs]
+
+
+async def _status(engine, job_id: uuid.UUID) -> tuple[str, bool, int]:
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        job = (await session.execute(select(Job).where(Job.id == job_id))).scalar_one()
+        return job.status, job.cancel_requested, job.attempts
+
+
+@needs_database
+def test_concurrent_claims_skip_locked_rows() -> None:
+    async def test(engine, tenant_id: uuid.UUID) -> None:
+        first, second = await _add_jobs(
+            engine,
+            tenant_id,
+            {"status": "queued", "created_at": EPOCH},
+            {"status": "queued", "created_at": EPOCH.replace(day=2)},
+        )
+        async with (
+            AsyncSession(engine, expire_on_commit=False) as a,
+            AsyncSession(engine, expire_on_commit=False) as b,
+        ):
+            claimed_a = await job_repo.claim_next_job(a, "worker-a")
+            # a still holds the row lock on the oldest job: b takes the next one, no waiting
+            claimed_b = await asyncio.wait_for(job_repo.claim_next_job(b, "worker-b"), 5)
+            assert (claimed_a.id, claimed_b.id) == (first, second)
+            await a.commit()
+            await b.commit()
+        assert await _status(engine, first) == ("running", False, 1)
+        assert await _status(engine, second) == ("running", False, 1)
+
+    asyncio.run(_with_tenant(test))
+
+
+@needs_database
+def test_stale_jobs_are_requeued_failed_or_cancelled() -> None:
+    async def test(engine, tenant_id: uuid.UUID) -> None:
+        stale = {"status": "running", "heartbeat_at": EPOCH}
+        retry, exhausted, cancelled = await _add_jobs(
+            engine,
+            tenant_id,
+            {**stale},
+            {**stale},
+            {**stale, "cancel_requested": True},
+        )
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            await session.execute(
+                Job.__table__.update().where(Job.id == exhausted).values(attempts=3)
+            )
+            requeued, failed = await job_repo.requeue_stale_jobs(
+                session, stale_before=EPOCH.replace(day=2), max_attempts=3
+            )
+            await session.commit()
+        assert (requeued, failed) == (1, 1)
+        assert (await _status(engine, retry))[0] == "queued"
+        assert (await _status(engine, exhausted))[0] == "failed"
+        assert (await _status(engine, cancelled))[0] == "cancelled"
+
+    asyncio.run(_with_tenant(test))
+
+
+@needs_database
+def test_cancel_stops_queued_jobs_and_flags_running_ones() -> None:
+    async def test(engine, tenant_id: uuid.UUID) -> None:
+        queued, running = await _add_jobs(
+            engine, tenant_id, {"status": "queued"}, {"status": "running"}
+        )
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            for job_id in (queued, running):
+                job = await job_repo.get_job(session, tenant_id, job_id)
+                await job_repo.request_cancel(session, job)
+            await session.commit()
+        assert await _status(engine, queued) == ("cancelled", True, 0)
+        assert await _status(engine, running) == ("running", True, 0)
+
+    asyncio.run(_with_tenant(test))
@@ -0,0 +1,41 @@
+"""Unit tests for the load test harness (scripts.bench.load_test)."""
+
+from __future__ import annotations
+
+import asyncio
+from unittest.mock import patch
+
+import httpx
+
+from app.core.config.settings import settings
+from app.core.middleware import rate_limit as rate_limit_middleware
+from app.core.security.rate_limit import MemoryRateLimiter
+from scripts.bench.load_test import Scenario, _run_scenario, bench_app
+
+
+def _statuses(rate_limit: bool) -> dict[str, int]:
+    scenario = Scenario("signup_shaped", "POST", "/v1/auth/signup", build=lambda i: {"json": {}})
+
+    async def scenario_run() -> dict[str, int]:
+        app = bench_app(rate_limit=rate_limit)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            result = await _run_scenario(client, scenario, concurrency=4, total=40)
+        return result["statuses"]
+
+    return asyncio.run(scenario_run())
+
+
+def test_harness_traffic_is_not_rate_limited() -> None:
+    limits = dict(
+        RATE_LIMIT_ENABLED=True,
+        RATE_LIMIT_IP_RATE=1,
+        RATE_LIMIT_IP_BURST=10,
+        RATE_LIMIT_COSTS="POST /v1/auth/signup=5",
+    )
+    with patch.multiple(settings, **limits), patch.object(
+        rate_limit_middleware, "rate_limiter", MemoryRateLimiter(max_keys=10)
+    ):
+        assert "429" not in _statuses(rate_limit=False)  # 422: empty body, but not throttled
+        assert settings.RATE_LIMIT_ENABLED is False
+        assert _statuses(rate_limit=True).get("429", 0) >= 30
@@ -0,0 +1,132 @@
+"""Unit tests for the logging pipeline (async mode, JSON, sampling, rate limits)."""
+
+from __future__ import annotations
+
+import io
+import json
+import logging
+import sys
+
+from app.core.logging import setup
+from app.core.logging.setup import (
+    JsonFormatter,
+    RateLimitFilter,
+    SamplingFilter,
+    configure_logging,
+    parse_logger_table,
+    request_id_ctx,
+    shutdown_logging,
+)
+
+
+def _record(name: str, level: int = logging.INFO, msg: str = "hello") -> logging.LogRecord:
+    return logging.LogRecord(name, level, __file__, 1, msg, None, None)
+
+
+def test_parse_logger_table() -> None:
+    assert parse_logger_table("a.b=0.5, c=2") == {"a.b": 0.5, "c": 2.0}
+    assert parse_logger_table("") == {}
+
+
+def test_sampling_matches_prefix_and_keeps_warnings() -> None:
+    flt = SamplingFilter({"app.api": 0.0})
+    assert not flt.filter(_record("app.api.internal.routes"))
+    assert flt.filter(_record("app.api.internal.routes", logging.WARNING))
+    assert flt.filter(_record("app.db"))
+
+
+def test_rate_limit_suppresses_and_reports_count() -> None:
+    flt = RateLimitFilter({"app.api.internal.routes": 1})
+    results = [flt.filter(_record("app.api.internal.routes")) for _ in range(5)]
+    assert results == [True, False, False, False, False]
+
+    bucket = flt._buckets["app.api.internal.routes"]
+    bucket[0] = 1  # refill as if a second passed
+    record = _record("app.api.internal.routes")
+    assert flt.filter(record)
+    assert record.msg == "hello [4 similar suppressed]"
+
+
+def test_json_formatter_includes_request_id() -> None:
+    record = _record("app.test")
+    record.request_id = "rid-1"
+    payload = json.loads(JsonFormatter().format(record))
+    assert payload["request_id"] == "rid-1"
+    assert payload["message"] == "hello"
+    assert payload["level"] == "INFO"
+
+
+def test_async_mode_writes_from_background_thread(monkeypatch) -> None:
+    buffer = io.StringIO()
+    monkeypatch.setattr(sys, "stdout", buffer)
+    root = logging.getLogger()
+    saved = (root.level, list(root.handlers))
+    try:
+        configure_logging("INFO", async_mode=True, json_format=True)
+        assert setup._listener is not None
+
+        token = request_id_ctx.set("rid-async")
+        try:
+            logging.getLogger("app.test").info("queued %s", "message")
+        finally:
+            request_id_ctx.reset(token)
+        shutdown_logging()
+    finally:
+        root.setLevel(saved[0])
+        root.handlers[:] = saved[1]
+
+    line = json.loads(buffer.getvalue().strip().splitlines()[-1])
+    assert line["message"] == "queued message"
+    assert line["request_id"] == "rid-async"
+
+
+def test_async_mode_formats_exceptions_on_the_listener(monkeypatch) -> None:
+    buffer = io.StringIO()
+    monkeypatch.setattr(sys, "stdout", buffer)
+    root = logging.getLogger()
+    saved = (root.level, list(root.handlers))
+    prepared: list[logging.LogRecord] = []
+    try:
+        configure_logging("INFO", async_mode=True, json_format=True)
+        (handler,) = root.handlers
+        original_prepare = handler.prepare
+
+        def recording_prepare(record: logging.LogRecord) -> logging.LogRecord:
+            prepared.append(original_prepare(record))
+            return prepared[-1]
+
+        monkeypatch.setattr(handler, "prepare", recording_prepare)
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            logging.getLogger("app.test").exception("failed %s", "job")
+        shutdown_logging()
+    finally:
+        root.setLevel(saved[0])
+        root.handlers[:] = saved[1]
+
+    # Message interpolated on the caller; the traceback is left for the listener's formatter
+    assert (prepared[0].msg, prepared[0].args) == ("failed job", None)
+    assert prepared[0].exc_info is not None
+    line = json.loads(buffer.getvalue().strip().splitlines()[-1])
+    assert line["message"] == "failed job"
+    assert "ValueError: boom" in line["exc_info"]
+
+
+def test_async_mode_formats_arguments_at_the_call(monkeypatch) -> None:
+    buffer = io.StringIO()
+    monkeypatch.setattr(sys, "stdout", buffer)
+    root = logging.getLogger()
+    saved = (root.level, list(root.handlers))
+    try:
+        configure_logging("INFO", async_mode=True, json_format=True)
+        batch = {"rows": 1}
+        logging.getLogger("app.test").info("batch %s", batch)
+        batch["rows"] = 2  # before the listener gets to the record
+        shutdown_logging()
+    finally:
+        root.setLevel(saved[0])
+        root.handlers[:] = saved[1]
+
+    line = json.loads(buffer.getvalue().strip().splitlines()[-1])
+    assert line["message"] == "batch {'rows': 1}"
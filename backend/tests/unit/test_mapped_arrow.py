@@ -0,0 +1,78 @@
+"""Unit tests for the memory-mapped Arrow file registry."""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+import pyarrow as pa
+import pytest
+
+from app.core.cache.mapped_arrow import MappedArrowRegistry
+
+
+def _write(path: Path, values: list[int]) -> str:
+    table = pa.table({"n": values})
+    with pa.OSFile(str(path), "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    return str(path)
+
+
+def test_lease_is_a_zero_copy_view_shared_by_readers(tmp_path: Path) -> None:
+    p1 = _write(tmp_path / "p1.arrow", list(range(100_000)))
+    p2 = _write(tmp_path / "p2.arrow", [7])
+    registry = MappedArrowRegistry()
+
+    allocated = pa.total_allocated_bytes()
+    first = registry.acquire([p1, p2])
+    second = registry.acquire([p1])
+    assert pa.total_allocated_bytes() == allocated  # column data lives in the mapping
+    assert first.table.num_rows == 100_001 and first.table.column("n")[-1].as_py() == 7
+    assert second.table.num_rows == 100_000
+
+    stats = registry.stats()
+    assert stats["mapped_files"] == 2 and stats["misses"] == 2 and stats["hits"] == 1
+    first.release()
+    second.release()
+    assert registry.stats()["idle_files"] == 2
+
+
+def test_idle_mappings_are_bounded(tmp_path: Path) -> None:
+    paths = [_write(tmp_path / f"p{i}.arrow", [i]) for i in range(3)]
+    registry = MappedArrowRegistry(max_idle_files=1)
+    for path in paths:
+        registry.acquire([path]).release()
+    stats = registry.stats()
+    assert stats["mapped_files"] == 1 and stats["unmapped"] == 2
+
+
+def test_invalidated_files_unmap_after_last_release(tmp_path: Path) -> None:
+    path = _write(tmp_path / "p1.arrow", [1, 2])
+    registry = MappedArrowRegistry()
+    lease = registry.acquire([path])
+
+    assert registry.invalidate_dir(tmp_path) == 1
+    assert registry.stats()["retired_in_use"] == 1
+    assert lease.table.column("n").to_pylist() == [1, 2]  # still readable while leased
+
+    lease.release()
+    stats = registry.stats()
+    assert stats["mapped_files"] == 0 and stats["unmapped"] == 1
+
+
+def test_deleted_and_replaced_files_are_detected(tmp_path: Path) -> None:
+    path = _write(tmp_path / "p1.arrow", [1])
+    registry = MappedArrowRegistry()
+    registry.acquire([path]).release()
+
+    replacement = _write(tmp_path / "new.arrow", [2, 3])
+    os.replace(replacement, path)
+    with registry.acquire([path]) as lease:
+        assert lease.table.column("n").to_pylist() == [2, 3]
+    assert registry.stats()["unmapped"] == 1
+
+    os.unlink(path)
+    assert registry.sweep() == 1
+    assert registry.stats()["mapped_files"] == 0
+    with pytest.raises(FileNotFoundError):
+        registry.acquire([path])
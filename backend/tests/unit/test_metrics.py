@@ -0,0 +1,54 @@
+"""Unit tests for the metrics registry, request metrics and /internal/metrics."""
+
+from __future__ import annotations
+
+from fastapi.testclient import TestClient
+
+from app.core.metrics.http import http_requests_total
+from app.core.metrics.registry import Registry
+from app.db.query_metrics import statement_verb
+from app.main import app
+
+client = TestClient(app)
+
+
+def test_histogram_renders_cumulative_buckets() -> None:
+    reg = Registry()
+    hist = reg.histogram("t_latency_seconds", "test", ("route",), buckets=(0.1, 1.0))
+    hist.observe(("/a",), 0.05)
+    hist.observe(("/a",), 0.5)
+    hist.observe(("/a",), 5.0)
+
+    text = reg.render()
+    assert 't_latency_seconds_bucket{route="/a",le="0.1"} 1' in text
+    assert 't_latency_seconds_bucket{route="/a",le="1"} 2' in text
+    assert 't_latency_seconds_bucket{route="/a",le="+Inf"} 3' in text
+    assert 't_latency_seconds_count{route="/a"} 3' in text
+
+
+def test_collector_errors_do_not_break_scrape() -> None:
+    reg = Registry()
+    reg.counter("t_total", "test").inc()
+    reg.register_collector("broken", lambda: 1 / 0)  # type: ignore[arg-type, return-value]
+    assert "t_total 1" in reg.render()
+
+
+def test_statement_verb_is_low_cardinality() -> None:
+    assert statement_verb("  select * from users") == "SELECT"
+    assert statement_verb("INSERT INTO tenants ...") == "INSERT"
+    assert statement_verb("VACUUM tenants") == "OTHER"
+
+
+def test_request_metrics_use_route_template_labels() -> None:
+    before = http_requests_total.value(("GET", "/v1/health", "200"))
+    client.get("/v1/health")
+    client.get("/does-not-exist-12345")
+    assert http_requests_total.value(("GET", "/v1/health", "200")) == before + 1
+    assert http_requests_total.value(("GET", "<unmatched>", "404")) >= 1
+
+    response = client.get("/internal/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "ambient_http_request_duration_seconds_bucket" in response.text
+    assert "does-not-exist" not in response.text
+    assert "ambient_password_hash_in_flight" in response.text
@@ -0,0 +1,78 @@
+"""Unit tests for the pure-ASGI request context middleware stack."""
+
+from __future__ import annotations
+
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.core.logging.setup import request_id_ctx
+from app.core.middleware.actor_context import ActorContextMiddleware
+from app.core.middleware.request_id import RequestIDMiddleware
+from app.core.middleware.tenant_enforcement import TenantEnforcementMiddleware
+
+
+def _build_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/ctx")
+    async def ctx(request: Request) -> dict[str, str | None]:
+        return {
+            "state_request_id": request.state.request_id,
+            "ctx_request_id": request_id_ctx.get(),
+            "actor": request.state.actor,
+        }
+
+    @app.get("/stream")
+    async def stream() -> StreamingResponse:
+        async def chunks():
+            for i in range(3):
+                yield f"chunk-{i}-{request_id_ctx.get()}\n"
+
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    app.add_middleware(TenantEnforcementMiddleware)
+    app.add_middleware(ActorContextMiddleware)
+    app.add_middleware(RequestIDMiddleware)
+    return app
+
+
+client = TestClient(_build_app())
+
+
+def test_incoming_request_id_is_preserved() -> None:
+    response = client.get("/ctx", headers={"X-Request-ID": "abc-123"})
+    assert response.headers["X-Request-ID"] == "abc-123"
+    assert response.json() == {
+        "state_request_id": "abc-123",
+        "ctx_request_id": "abc-123",
+        "actor": None,
+    }
+
+
+def test_request_id_generated_and_context_var_reset() -> None:
+    response = client.get("/ctx")
+    rid = response.headers["X-Request-ID"]
+    assert rid
+    assert response.json()["ctx_request_id"] == rid
+    assert request_id_ctx.get() is None
+
+
+def test_streaming_response_keeps_request_id_context() -> None:
+    response = client.get("/stream", headers={"X-Request-ID": "stream-1"})
+    assert response.status_code == 200
+    assert response.headers["X-Request-ID"] == "stream-1"
+    assert response.text.splitlines() == [f"chunk-{i}-stream-1" for i in range(3)]
+
+
+def test_tenant_required_400_carries_request_id() -> None:
+    app = _build_app()
+
+    @app.get("/internal/tenant")
+    async def tenant() -> dict[str, str]:
+        return {"status": "ok"}
+
+    response = TestClient(app).get("/internal/tenant", headers={"X-Request-ID": "rid-400"})
+    assert response.status_code == 400
+    assert response.json() == {"detail": "X-Tenant-ID header required"}
+    assert response.headers.get_list("X-Request-ID") == ["rid-400"]
@@ -0,0 +1,29 @@
+"""Unit tests for OpenAPI schema generation and the prebuilt schema artifact."""
+
+from __future__ import annotations
+
+import json
+
+from app.core.config.settings import settings
+from app.main import build_openapi_schema, create_app
+
+
+def test_generated_schema_has_bearer_scheme() -> None:
+    schema = create_app().openapi()
+    assert schema["components"]["securitySchemes"]["bearerAuth"]["scheme"] == "bearer"
+    assert "/internal/healthz" in schema["paths"]
+
+
+def test_prebuilt_schema_is_loaded_instead_of_generated(tmp_path, monkeypatch) -> None:
+    schema = build_openapi_schema(create_app())
+    schema["info"]["title"] = "prebuilt"
+    path = tmp_path / "openapi.json"
+    path.write_text(json.dumps(schema), encoding="utf-8")
+    monkeypatch.setattr(settings, "OPENAPI_SCHEMA_PATH", str(path))
+
+    assert create_app().openapi()["info"]["title"] == "prebuilt"
+
+
+def test_missing_prebuilt_schema_falls_back_to_generation(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(settings, "OPENAPI_SCHEMA_PATH", str(tmp_path / "missing.json"))
+    assert create_app().openapi()["info"]["title"] == "Ambient Data Analyst API"
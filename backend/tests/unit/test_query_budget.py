@@ -0,0 +1,163 @@
+"""Unit tests for per-request SQL accounting and the query budget middleware."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import uuid
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.config.settings import settings
+from app.core.metrics.query_budget import (
+    assert_max_queries,
+    count_queries,
+    exempt_from_query_budget,
+    normalize_statement,
+    record_statement,
+)
+from app.core.middleware.query_budget import QueryBudgetMiddleware
+from app.core.security.auth_service import signup
+from app.db.query_metrics import install_query_metrics
+from app.db.session import engine
+from app.main import app as main_app
+
+
+def test_normalize_statement_groups_by_shape() -> None:
+    a = normalize_statement(
+        "SELECT users.id FROM users\n WHERE users.tenant_id = $1::UUID"
+        " AND users.email IN ($2::VARCHAR, $3::VARCHAR) LIMIT 10"
+    )
+    b = normalize_statement(
+        "SELECT users.id FROM users WHERE users.tenant_id = $7::UUID"
+        " AND users.email IN ($8::VARCHAR) LIMIT 20"
+    )
+    assert a == b == (
+        "SELECT users.id FROM users WHERE users.tenant_id = ? AND users.email IN (...) LIMIT ?"
+    )
+    assert normalize_statement(
+        "INSERT INTO t (a, b) VALUES (1, 'x''y'), (2, :b), (%(c)s, ?)"
+    ) == "INSERT INTO t (a, b) VALUES (...)"
+    assert normalize_statement("SELECT x::int FROM users_p3") == "SELECT x::int FROM users_p3"
+
+
+def test_engine_statements_are_counted() -> None:
+    sqlite = create_engine("sqlite://")
+    install_query_metrics(sqlite)
+    with sqlite.connect() as conn:
+        conn.execute(text("CREATE TABLE t (id INTEGER)"))
+        with count_queries() as stats:
+            for i in range(3):
+                conn.execute(text("INSERT INTO t VALUES (:i)"), {"i": i})
+            conn.execute(text("UPDATE t SET id = id + 1"))
+        assert stats.statements == 4
+        assert stats.rows == 6
+        assert stats.most_repeated() == ("INSERT INTO t VALUES (...)", 3)
+
+        with pytest.raises(AssertionError, match="3 x INSERT INTO t VALUES"):
+            with assert_max_queries(2):
+                for i in range(3):
+                    conn.execute(text("INSERT INTO t VALUES (:i)"), {"i": i})
+
+
+def _app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(QueryBudgetMiddleware)
+
+    @app.get("/items/{item_id}")
+    async def item(item_id: int, n: int = 1, exempt: bool = False) -> dict[str, int]:
+        if exempt:
+            exempt_from_query_budget()
+        for i in range(n):
+            record_statement(f"SELECT * FROM items WHERE id = {i}", 0.001, 1)
+        return {"id": item_id}
+
+    return app
+
+
+def test_middleware_warns_on_repeats_and_budget(caplog: pytest.LogCaptureFixture) -> None:
+    client = TestClient(_app())
+    logger = "app.core.middleware.query_budget"
+    with caplog.at_level(logging.WARNING, logger=logger), patch.multiple(
+        settings, DB_QUERY_BUDGET=8, DB_QUERY_REPEAT_THRESHOLD=5
+    ):
+        client.get("/items/1", params={"n": 4})
+        assert not caplog.records
+
+        client.get("/items/1", params={"n": 5})
+        (record,) = caplog.records
+        assert "N+1" in record.getMessage() and "/items/{item_id}" in record.getMessage()
+        assert "SELECT * FROM items WHERE id = ?" in record.getMessage()
+
+        caplog.clear()
+        client.get("/items/2", params={"n": 9})
+        assert "budget 8" in caplog.records[0].getMessage()
+
+        caplog.clear()
+        client.get("/items/3", params={"n": 50, "exempt": True})
+        assert not caplog.records
+
+
+class _RecordingSession:
+    """Compiles and records each statement the way the engine hook would; canned results."""
+
+    def __init__(self, results: list[object]) -> None:
+        self.results = results
+
+    async def execute(self, statement, params=None, **kwargs) -> MagicMock:
+        record_statement(str(statement.compile(dialect=postgresql.asyncpg.dialect())), 0.0, 1)
+        return MagicMock(scalar_one_or_none=MagicMock(return_value=self.results.pop(0)))
+
+    async def commit(self) -> None:
+        pass
+
+
+def test_signup_runs_two_statements() -> None:
+    """Runs without Postgres: the real repos, with statements recorded instead of sent."""
+    tenant = SimpleNamespace(id=uuid.uuid4(), slug="t_acme_com")  # existing tenant
+    session = _RecordingSession([tenant, uuid.uuid4()])
+    with patch(
+        "app.core.security.auth_service.hash_password_async", AsyncMock(return_value="h")
+    ), assert_max_queries(2) as stats:
+        asyncio.run(signup(session, email="a@acme.com", password="Passw0rd!Passw0rd"))
+    assert [shape.split(" AS ")[0] for shape in stats.shapes] == [
+        "WITH inserted",  # tenant get-or-create
+        "WITH scope",  # set_config + user insert
+    ]
+
+
+def _database_reachable() -> bool:
+    async def ping() -> None:
+        probe = create_async_engine(settings.DATABASE_URL)
+        try:
+            async with probe.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+        finally:
+            await probe.dispose()
+
+    try:
+        asyncio.run(asyncio.wait_for(ping(), 3))
+    except Exception:
+        return False
+    return True
+
+
+@pytest.mark.skipif(not _database_reachable(), reason="needs a migrated database")
+def test_signup_statement_budget() -> None:
+    email = f"budget@d{uuid.uuid4().hex[:12]}.com"
+    with TestClient(main_app) as client:
+        try:
+            with assert_max_queries(2):  # tenant get-or-create, user insert (sets tenant)
+                response = client.post(
+                    "/v1/auth/signup", json={"email": email, "password": "Passw0rd!Passw0rd"}
+                )
+            assert response.status_code == 200
+        finally:
+            client.portal.call(engine.dispose)
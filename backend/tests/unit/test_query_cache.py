@@ -0,0 +1,100 @@
+"""Unit tests for the byte-bounded result cache and query result caching."""
+
+from __future__ import annotations
+
+import asyncio
+import uuid
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pyarrow as pa
+
+from app.core.cache.byte_lru import ByteLRUCache
+from app.features.query import cache as query_cache
+from app.features.query import service
+from app.features.query.engine import DatasetSource, QueryPage
+
+
+def test_memory_is_bounded_by_bytes_in_lru_order() -> None:
+    cache = ByteLRUCache(max_bytes=10, max_entry_bytes=6)
+    cache.set("a", b"aaaa")
+    cache.set("b", b"bbbb")
+    assert cache.get("a") == b"aaaa"  # b is now least recently used
+    cache.set("c", b"cccc")
+    assert cache.get("b") is None
+    assert cache.get("a") == b"aaaa" and cache.get("c") == b"cccc"
+    assert cache.set("big", b"x" * 7) is False
+    stats = cache.stats()
+    assert stats["bytes"] == 8 and stats["entries"] == 2
+    assert stats["evictions"] == 1 and stats["rejected"] == 1
+    assert stats["hit_ratio"] == 0.75
+
+
+def test_evictions_spill_to_disk_and_promote_back(tmp_path: Path) -> None:
+    cache = ByteLRUCache(max_bytes=8, spill_dir=tmp_path, spill_max_bytes=8)
+    cache.set("a", b"aaaa", tags=["t1"])
+    cache.set("b", b"bbbb", tags=["t2"])
+    cache.set("c", b"cccc", tags=["t1"])  # evicts a to disk
+    assert cache.stats()["disk_entries"] == 1 and len(list(tmp_path.iterdir())) == 1
+
+    assert cache.get("a") == b"aaaa"  # promoted; b spills
+    stats = cache.stats()
+    assert stats["disk_hits"] == 1 and stats["disk_entries"] == 1 and stats["bytes"] == 8
+
+    cache.set("d", b"dddd")  # c spills; disk tier (8 bytes) now holds b and c
+    assert cache.invalidate_tag("t1") == 2  # a in memory, c on disk
+    assert cache.get("a") is None and cache.get("c") is None
+    assert cache.get("b") == b"bbbb"
+    assert cache.stats()["disk_bytes"] == 0
+
+
+def test_normalize_sql_ignores_layout_but_not_literals() -> None:
+    a = query_cache.normalize_sql("SELECT  city,\n sum(x) -- total\nFROM sales WHERE c = 'A  b';")
+    b = query_cache.normalize_sql("select city, sum(x) from SALES where c = 'A  b'")
+    assert a == b
+    assert a != query_cache.normalize_sql("select city, sum(x) from sales where c = 'a b'")
+    assert query_cache.normalize_sql('select "Big  Col" from t') == 'select "Big  Col" from t'
+
+
+def test_key_depends_on_dataset_version_and_page() -> None:
+    tenant, dataset = uuid.uuid4(), uuid.uuid4()
+    v1 = [DatasetSource(id=dataset, name="s", version=1, paths=())]
+    v2 = [DatasetSource(id=dataset, name="s", version=2, paths=())]
+    key = query_cache.result_cache_key(tenant, "select 1", [], v1, offset=0, limit=10)
+    assert key == query_cache.result_cache_key(tenant, "SELECT 1;", [], v1, offset=0, limit=10)
+    assert key != query_cache.result_cache_key(tenant, "select 1", [], v2, offset=0, limit=10)
+    assert key != query_cache.result_cache_key(tenant, "select 1", [], v1, offset=10, limit=10)
+    assert key != query_cache.result_cache_key(uuid.uuid4(), "select 1", [], v1, offset=0, limit=10)
+
+
+def test_page_round_trips_through_bytes() -> None:
+    page = QueryPage(table=pa.table({"a": [1, None], "a2": ["x", "y"]}), has_more=True)
+    restored = QueryPage.from_bytes(page.to_bytes())
+    assert restored.has_more is True
+    assert restored.rows == [[1, "x"], [None, "y"]]
+    assert restored.columns == page.columns
+
+
+def test_execute_query_serves_repeats_from_cache_until_dataset_changes() -> None:
+    tenant, dataset = uuid.uuid4(), uuid.uuid4()
+    sources = [DatasetSource(id=dataset, name="sales", version=1, paths=())]
+    session = MagicMock()
+    session.close = AsyncMock()
+    run = AsyncMock(return_value=QueryPage(table=pa.table({"n": [1]}), has_more=False))
+    cache = ByteLRUCache(max_bytes=1 << 20)
+
+    async def query() -> service.QueryResult:
+        return await service.execute_query(session, tenant_id=tenant, sql="select count(*) n from sales", params=[])
+
+    with (
+        patch.object(query_cache, "query_result_cache", cache),
+        patch.object(service, "resolve_sources", AsyncMock(return_value=sources)),
+        patch.object(service, "_run_on_executor", run),
+    ):
+        first, second = asyncio.run(query()), asyncio.run(query())
+        assert (first.cached, second.cached) == (False, True)
+        assert second.page.rows == [[1]] and run.await_count == 1
+
+        assert query_cache.invalidate_dataset(tenant, dataset) == 1
+        assert asyncio.run(query()).cached is False
+        assert run.await_count == 2
@@ -0,0 +1,146 @@
+"""Unit tests for token-bucket rate limiting (limiters and middleware)."""
+
+from __future__ import annotations
+
+import asyncio
+from unittest.mock import patch
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.config.settings import settings
+from app.core.middleware.rate_limit import RateLimitMiddleware, parse_route_costs
+from app.core.security.rate_limit import (
+    _ACQUIRE_SCRIPT,
+    Bucket,
+    MemoryRateLimiter,
+    RedisRateLimiter,
+)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakeRedis:
+    """Records eval calls and answers with a canned script result."""
+
+    def __init__(self, result: list[object]) -> None:
+        self.result = result
+        self.calls: list[tuple[object, ...]] = []
+
+    async def eval(self, *args: object) -> list[object]:
+        self.calls.append(args)
+        return self.result
+
+
+class BrokenLimiter:
+    async def acquire(self, buckets: list[Bucket], cost: float) -> None:
+        raise ConnectionError("redis down")
+
+
+def test_bucket_refills_and_debits_all_buckets_or_none() -> None:
+    clock = FakeClock()
+    limiter = MemoryRateLimiter(max_keys=10, clock=clock)
+    tenant = Bucket("tenant", "tenant:a", rate=1, burst=10)
+    ip = Bucket("ip", "ip:1", rate=2, burst=4)
+
+    async def scenario() -> None:
+        assert (await limiter.acquire([tenant, ip], 3)).allowed
+        decision = await limiter.acquire([tenant, ip], 3)
+        assert not decision.allowed and decision.limited_by == "ip"
+        assert decision.retry_after == 1.0  # 1 token left, 2 more at 2/s
+
+        clock.now += 1
+        assert (await limiter.acquire([tenant, ip], 3)).allowed
+        # The rejected attempt took nothing from the tenant bucket: 10 - 3 - 3 + 1 refilled
+        assert (await limiter.acquire([tenant], 5)).allowed
+        decision = await limiter.acquire([tenant], 1)
+        assert (decision.allowed, decision.limited_by) == (False, "tenant")
+
+        # A cost above the burst passes a full bucket instead of never passing
+        assert (await limiter.acquire([Bucket("ip", "ip:2", 1, 4)], 50)).allowed
+
+    asyncio.run(scenario())
+
+
+def test_least_recently_used_buckets_are_dropped() -> None:
+    limiter = MemoryRateLimiter(max_keys=2, clock=FakeClock())
+
+    async def scenario() -> None:
+        for key in ("a", "b", "c"):
+            await limiter.acquire([Bucket("ip", key, 1, 1)], 1)
+        assert len(limiter) == 2
+        assert (await limiter.acquire([Bucket("ip", "a", 1, 1)], 1)).allowed  # back full
+
+    asyncio.run(scenario())
+
+
+def test_redis_limiter_runs_one_script_for_all_buckets() -> None:
+    redis = FakeRedis([2, "0.75"])
+    limiter = RedisRateLimiter(redis)
+    buckets = [Bucket("tenant", "tenant:a", 50, 200), Bucket("ip", "ip:1", 20, 100)]
+
+    decision = asyncio.run(limiter.acquire(buckets, 5))
+    assert (decision.allowed, decision.retry_after, decision.limited_by) == (False, 0.75, "ip")
+    assert redis.calls == [
+        (_ACQUIRE_SCRIPT, 2, "ratelimit:tenant:a", "ratelimit:ip:1", 5, 50, 200, 20, 100)
+    ]
+
+    redis.result = [0, "0"]
+    assert asyncio.run(limiter.acquire(buckets, 5)).allowed
+
+
+def test_parse_route_costs() -> None:
+    assert parse_route_costs("POST /v1/auth/signup=5, get /v1/query/=2,bad,=3") == {
+        ("POST", "/v1/auth/signup"): 5.0,
+        ("GET", "/v1/query"): 2.0,
+    }
+
+
+def _client(limiter: object) -> TestClient:
+    app = FastAPI()
+    app.add_middleware(RateLimitMiddleware, limiter=limiter)
+
+    @app.post("/v1/auth/signup")
+    async def signup() -> dict[str, bool]:
+        return {"ok": True}
+
+    @app.get("/v1/datasets")
+    async def datasets() -> list[str]:
+        return []
+
+    @app.get("/internal/healthz")
+    async def healthz() -> dict[str, str]:
+        return {"status": "ok"}
+
+    return TestClient(app)
+
+
+def test_middleware_returns_429_with_retry_after() -> None:
+    limits = dict(
+        RATE_LIMIT_IP_RATE=1,
+        RATE_LIMIT_IP_BURST=10,
+        RATE_LIMIT_TENANT_RATE=0.5,
+        RATE_LIMIT_TENANT_BURST=3,
+        RATE_LIMIT_COSTS="POST /v1/auth/signup=5",
+    )
+    with patch.multiple(settings, **limits):
+        client = _client(MemoryRateLimiter(max_keys=100, clock=FakeClock()))
+        assert [client.post("/v1/auth/signup").status_code for _ in range(3)] == [200, 200, 429]
+        response = client.post("/v1/auth/signup")
+        assert response.json() == {"detail": "Rate limit exceeded"}
+        assert response.headers["Retry-After"] == "5"
+        assert client.get("/internal/healthz").status_code == 200
+
+        client = _client(MemoryRateLimiter(max_keys=100, clock=FakeClock()))
+        tenant = {"X-Tenant-ID": "t_acme"}
+        statuses = [client.get("/v1/datasets", headers=tenant).status_code for _ in range(4)]
+        assert statuses == [200, 200, 200, 429]
+        assert client.get("/v1/datasets", headers={"X-Tenant-ID": "t_other"}).status_code == 200
+
+        assert _client(BrokenLimiter()).post("/v1/auth/signup").status_code == 200
@@ -0,0 +1,71 @@
+"""Unit tests for read replica routing of read-only sessions."""
+
+from __future__ import annotations
+
+import asyncio
+from unittest.mock import patch
+
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.core.config.settings import settings
+from app.db import session as db_session
+from app.db.session import ReplicaMonitor, get_read_db, use_primary
+
+REPLICA_URL = "postgresql+asyncpg://u:p@replica.invalid/db"
+
+
+def test_monitor_routes_on_cached_lag() -> None:
+    monitor = ReplicaMonitor(create_async_engine(REPLICA_URL))
+    lags = iter([0.2, 30.0])
+    measured = []
+
+    async def measure() -> None:
+        measured.append(1)
+        monitor.lag_seconds = next(lags)
+
+    async def scenario() -> list[bool]:
+        with patch.object(monitor, "_measure", measure), patch.multiple(
+            settings, DB_READ_MAX_LAG_SECONDS=5.0, DB_READ_LAG_CHECK_SECONDS=60.0
+        ):
+            first = [await monitor.usable() for _ in range(3)]
+            monitor._checked_at = float("-inf")
+            return first + [await monitor.usable()]
+
+    assert asyncio.run(scenario()) == [True, True, True, False]
+    assert len(measured) == 2
+
+
+def test_unreachable_replica_is_not_usable() -> None:
+    monitor = ReplicaMonitor(
+        create_async_engine(REPLICA_URL, connect_args={"timeout": 0.5})
+    )
+    monitor.lag_seconds = 0.0
+    with patch.object(settings, "DB_READ_LAG_CHECK_SECONDS", 0.0):
+        assert asyncio.run(monitor.usable()) is False
+    assert monitor.stats()["replica_up"] == 0
+    assert monitor.stats()["lag_check_errors"] == 1
+
+
+def test_read_sessions_use_primary_without_replica() -> None:
+    async def scenario() -> AsyncSession:
+        dependency = get_read_db()
+        session = await dependency.__anext__()
+        await dependency.aclose()
+        return session
+
+    with patch.object(db_session, "replica_monitor", None):
+        session = asyncio.run(scenario())
+    assert session.bind is db_session.engine
+    assert not session.info.get("replica")
+
+
+def test_use_primary_rebinds_replica_sessions_once() -> None:
+    async def scenario() -> tuple[bool, bool, AsyncSession]:
+        session = AsyncSession(bind=create_async_engine(REPLICA_URL))
+        session.info["replica"] = True
+        return await use_primary(session), await use_primary(session), session
+
+    moved, again, session = asyncio.run(scenario())
+    assert (moved, again) == (True, False)
+    assert session.bind is db_session.engine
+    assert session.sync_session.bind is db_session.engine.sync_engine
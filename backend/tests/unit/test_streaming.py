@@ -0,0 +1,113 @@
+"""Unit tests for streamed (NDJSON / Arrow IPC stream) result bodies."""
+
+from __future__ import annotations
+
+import datetime as dt
+import json
+import uuid
+from pathlib import Path
+
+import pyarrow as pa
+import pytest
+
+from app.core.errors.exceptions import BadRequestError
+from app.features.query.engine import DatasetSource, open_query_stream
+from app.features.query.streaming import (
+    ArrowFileStream,
+    ArrowStreamEncoder,
+    NdjsonEncoder,
+    negotiate_stream_format,
+)
+
+LIMITS = {"memory_limit": "128MB", "threads": 1, "timeout_seconds": 10}
+
+
+def _write_part(path: Path, table: pa.Table) -> str:
+    with pa.OSFile(str(path), "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table, max_chunksize=2)
+    return str(path)
+
+
+def _drain(stream) -> list[pa.RecordBatch]:
+    batches = []
+    while (batch := stream.next_batch()) is not None:
+        batches.append(batch)
+    return batches
+
+
+@pytest.mark.parametrize(
+    ("accept", "expected"),
+    [
+        (None, None),
+        ("application/json", None),
+        ("*/*", None),
+        ("application/x-ndjson", "ndjson"),
+        ("application/vnd.apache.arrow.stream, application/json;q=0.5", "arrow"),
+        ("application/json, application/x-ndjson;q=0.9", None),
+        ("application/x-ndjson;q=0", None),
+    ],
+)
+def test_negotiate_stream_format(accept: str | None, expected: str | None) -> None:
+    assert negotiate_stream_format(accept) == expected
+
+
+def test_arrow_file_stream_reads_parts_in_order(tmp_path: Path) -> None:
+    paths = [
+        _write_part(tmp_path / "p1.arrow", pa.table({"n": [1, 2, 3]})),
+        _write_part(tmp_path / "p2.arrow", pa.table({"n": [4]})),
+    ]
+    stream = ArrowFileStream(paths)
+    batches = _drain(stream)
+    stream.close()
+    assert [b.num_rows for b in batches] == [2, 1, 1]
+    assert pa.Table.from_batches(batches).column("n").to_pylist() == [1, 2, 3, 4]
+
+
+def test_close_runs_release_callbacks_once(tmp_path: Path) -> None:
+    stream = ArrowFileStream([_write_part(tmp_path / "p1.arrow", pa.table({"n": [1]}))])
+    released = []
+    stream.on_release(lambda: released.append(True))
+    stream.close()
+    stream.close()
+    assert released == [True]
+    assert stream.next_batch() is None
+
+
+def test_ndjson_encoder_writes_one_object_per_row() -> None:
+    batch = pa.record_batch(
+        {"d": [dt.date(2024, 1, 2), None], "x": [1.5, 2.0]},
+    )
+    lines = NdjsonEncoder(batch.schema).encode(batch).decode().splitlines()
+    assert [json.loads(line) for line in lines] == [
+        {"d": "2024-01-02", "x": 1.5},
+        {"d": None, "x": 2.0},
+    ]
+
+
+def test_ndjson_encoder_rejects_duplicate_column_names() -> None:
+    schema = pa.schema([("a", pa.int64()), ("a", pa.int64())])
+    with pytest.raises(BadRequestError):
+        NdjsonEncoder(schema)
+
+
+def test_arrow_stream_encoder_output_is_a_valid_ipc_stream() -> None:
+    batch = pa.record_batch({"n": [1, 2]})
+    encoder = ArrowStreamEncoder(batch.schema)
+    body = encoder.header() + encoder.encode(batch) + encoder.encode(batch) + encoder.footer()
+    assert pa.ipc.open_stream(body).read_all().column("n").to_pylist() == [1, 2, 1, 2]
+
+
+def test_query_stream_yields_whole_result_in_batches(tmp_path: Path) -> None:
+    path = _write_part(tmp_path / "p1.arrow", pa.table({"n": list(range(10))}))
+    source = DatasetSource(id=uuid.uuid4(), name="nums", version=1, paths=(path,))
+    stream = open_query_stream(
+        [source], "SELECT n * 2 AS m FROM nums ORDER BY n", None, batch_rows=4, **LIMITS
+    )
+    batches = _drain(stream)
+    stream.close()
+    assert pa.Table.from_batches(batches).column("m").to_pylist() == [n * 2 for n in range(10)]
+
+
+def test_query_stream_reports_sql_errors_before_streaming() -> None:
+    with pytest.raises(BadRequestError):
+        open_query_stream([], "SELECT * FROM missing", None, **LIMITS)
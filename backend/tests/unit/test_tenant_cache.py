@@ -0,0 +1,172 @@
+"""Unit tests for the two-tier tenant resolution cache."""
+
+from __future__ import annotations
+
+import asyncio
+import uuid
+
+from app.core.cache.tenant_cache import CachedTenant, TenantCache
+
+
+class FakeRedis:
+    """Dict-backed stand-in for the redis.asyncio calls used by the shared tier."""
+
+    def __init__(self) -> None:
+        self.data: dict[str, bytes] = {}
+
+    async def get(self, key: str) -> bytes | None:
+        return self.data.get(key)
+
+    async def set(self, key: str, value: bytes, ex: int | None = None) -> None:
+        self.data[key] = value
+
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            self.data.pop(key, None)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+ACME = CachedTenant(id=uuid.uuid4(), slug="t_acme", name="acme.com", primary_domain="acme.com")
+
+
+def _loader(db: dict[str, CachedTenant], calls: list[str]):
+    async def load(slug: str) -> CachedTenant | None:
+        calls.append(slug)
+        return db.get(slug)
+
+    return load
+
+
+def _cache(shared: FakeRedis | None = None, clock: FakeClock | None = None) -> TenantCache:
+    return TenantCache(
+        ttl_seconds=60,
+        negative_ttl_seconds=5,
+        max_entries=2,
+        shared=shared,
+        clock=clock or FakeClock(),
+    )
+
+
+def test_hit_after_first_load() -> None:
+    cache = _cache()
+    calls: list[str] = []
+    load = _loader({"t_acme": ACME}, calls)
+
+    async def scenario() -> None:
+        assert await cache.get("t_acme", load) == ACME
+        assert await cache.get("t_acme", load) == ACME
+
+    asyncio.run(scenario())
+    assert calls == ["t_acme"]
+    stats = cache.stats()
+    assert stats["misses"] == 1
+    assert stats["local_hits"] == 1
+
+
+def test_unknown_slug_is_negatively_cached_until_ttl() -> None:
+    clock = FakeClock()
+    cache = _cache(clock=clock)
+    calls: list[str] = []
+    load = _loader({}, calls)
+
+    async def scenario() -> None:
+        assert await cache.get("nope", load) is None
+        assert await cache.get("nope", load) is None
+        clock.now += 6
+        assert await cache.get("nope", load) is None
+
+    asyncio.run(scenario())
+    assert calls == ["nope", "nope"]
+    assert cache.stats()["negative_hits"] == 1
+
+
+def test_shared_tier_serves_other_workers_and_invalidation_clears_both() -> None:
+    shared = FakeRedis()
+    worker_a = _cache(shared=shared)
+    worker_b = _cache(shared=shared)
+    db: dict[str, CachedTenant] = {}
+    calls: list[str] = []
+    load = _loader(db, calls)
+
+    async def scenario() -> None:
+        assert await worker_a.get("t_acme", load) is None
+        assert await worker_b.get("t_acme", load) is None  # negative entry from Redis
+
+        db["t_acme"] = ACME
+        await worker_b.invalidate("t_acme")
+        assert await worker_b.get("t_acme", load) == ACME
+        worker_a.clear_local()
+        assert await worker_a.get("t_acme", load) == ACME  # from Redis, no DB
+
+    asyncio.run(scenario())
+    assert calls == ["t_acme", "t_acme"]
+    assert worker_a.stats()["shared_hits"] == 1
+
+
+def test_tenant_created_on_one_worker_resolves_on_another_within_a_second() -> None:
+    shared = FakeRedis()
+    clock = FakeClock()
+    worker_a = _cache(shared=shared, clock=clock)
+    worker_b = _cache(shared=shared, clock=clock)
+    db: dict[str, CachedTenant] = {}
+    calls: list[str] = []
+    load = _loader(db, calls)
+
+    async def scenario() -> None:
+        assert await worker_b.get("t_acme", load) is None  # probed before signup
+
+        db["t_acme"] = ACME  # signup on worker A commits, then invalidates
+        await worker_a.invalidate("t_acme")
+        assert await worker_b.get("t_acme", load) is None  # B's local entry, for now
+        clock.now += 1.1
+        assert await worker_b.get("t_acme", load) == ACME
+
+        # Without an invalidation the negative entry lives on in Redis
+        assert await worker_b.get("t_other", load) is None
+        clock.now += 1.1
+        assert await worker_b.get("t_other", load) is None
+        assert worker_b.stats()["shared_hits"] == 1
+
+    asyncio.run(scenario())
+    assert calls == ["t_acme", "t_acme", "t_other"]
+
+
+def test_concurrent_misses_coalesce_into_one_load() -> None:
+    cache = _cache()
+    calls: list[str] = []
+
+    async def slow_load(slug: str) -> CachedTenant | None:
+        calls.append(slug)
+        await asyncio.sleep(0.01)
+        return ACME
+
+    async def scenario() -> list[CachedTenant | None]:
+        return await asyncio.gather(*(cache.get("t_acme", slow_load) for _ in range(10)))
+
+    results = asyncio.run(scenario())
+    assert results == [ACME] * 10
+    assert calls == ["t_acme"]
+
+
+def test_lru_eviction() -> None:
+    cache = _cache()
+    tenants = {
+        slug: CachedTenant(id=uuid.uuid4(), slug=slug, name=slug) for slug in ("a", "b", "c")
+    }
+    calls: list[str] = []
+    load = _loader(tenants, calls)
+
+    async def scenario() -> None:
+        for slug in ("a", "b", "c", "a"):
+            await cache.get(slug, load)
+
+    asyncio.run(scenario())
+    assert calls == ["a", "b", "c", "a"]
+    assert cache.stats()["local_entries"] == 2
@@ -0,0 +1,60 @@
+"""Unit tests for tenant-scoped sessions (row-level security on users)."""
+
+from __future__ import annotations
+
+import asyncio
+import uuid
+from unittest.mock import AsyncMock, MagicMock
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.db.models.user import User
+from app.db.session import _apply_session_tenant, set_session_tenant
+from app.main import app
+
+client = TestClient(app)
+TENANT = uuid.UUID("00000000-0000-0000-0000-00000000000a")
+
+
+def test_users_are_hash_partitioned_by_tenant() -> None:
+    table = User.__table__
+    assert table.dialect_options["postgresql"]["partition_by"] == "HASH (tenant_id)"
+    assert {c.name for c in table.primary_key} == {"id", "tenant_id"}
+
+
+def test_tenant_is_set_at_the_start_of_every_transaction() -> None:
+    session = Session()
+    connection = MagicMock()
+    _apply_session_tenant(session, None, connection)
+    connection.execute.assert_not_called()
+
+    session.info["tenant_id"] = str(TENANT)
+    _apply_session_tenant(session, None, connection)
+    statement, params = connection.execute.call_args.args
+    assert "set_config('app.tenant_id'" in str(statement)
+    assert params == {"tenant_id": str(TENANT)}
+
+
+def test_set_session_tenant_applies_to_an_open_transaction() -> None:
+    session = MagicMock(info={}, execute=AsyncMock())
+    session.in_transaction.return_value = False
+    asyncio.run(set_session_tenant(session, TENANT))
+    assert session.info["tenant_id"] == str(TENANT)
+    session.execute.assert_not_called()
+
+    session.in_transaction.return_value = True
+    asyncio.run(set_session_tenant(session, TENANT))
+    session.execute.assert_awaited_once()
+
+
+def test_bulk_provisioning_requires_tenant_header() -> None:
+    response = client.post("/v1/users/bulk", content=b"email,password\n")
+    assert response.status_code == 400
+
+
+def test_bulk_provisioning_is_disabled_by_default() -> None:
+    response = client.post(
+        "/v1/users/bulk", content=b"email,password\n", headers={"X-Tenant-ID": "t_acme"}
+    )
+    assert response.status_code == 404